@@ -22,10 +22,10 @@ _obdiag_completion() {
                     type_list="scene"
                     ;;
                 analyze)
-                    type_list="log flt_trace parameter variable index_space queue memory sql sql_review"
+                    type_list="log flt_trace parameter variable index_space queue memory combined sql sql_review"
                     ;;
                 rca)
-                    type_list="run list"
+                    type_list="run list sweep"
                     ;;
                 tool)
                     type_list="crypto_config ai_assistant io_performance config_check"
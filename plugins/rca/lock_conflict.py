@@ -22,10 +22,10 @@
 """
 import json
 import os
-import re
 
 from src.handler.rca.rca_exception import RCAInitException, RCANotNeedExecuteException, RCAExecuteException
 from src.handler.rca.rca_handler import RcaScene, RCA_ResultRecord
+from src.common.ob_log_parser import ObLogParser
 from src.common.tool import StringUtils, DateTimeEncoder
 
 
@@ -120,14 +120,11 @@ class LockConflictScene(RcaScene):
         data_trans_id_value = None
         for log_name in logs_name:
             try:
-                with open(log_name, "r") as f:
-                    lines = f.readlines()
-                    for line in lines:
-                        if "data_trans_id" in line:
-                            match = re.search(r"data_trans_id_:\{txid:(\d+)\}", line)
-                            if match:
-                                data_trans_id_value = match.group(1)
-                                break
+                for line, fields in ObLogParser.get_field_extractor("data_trans_id", ["data_trans_id_/txid"]).iter_file(log_name):
+                    tx_id = fields["data_trans_id_/txid"]
+                    if tx_id and tx_id.isdigit():
+                        data_trans_id_value = tx_id
+                        break
                 if data_trans_id_value:
                     break
             except Exception as e:
@@ -169,14 +166,11 @@ class LockConflictScene(RcaScene):
         conflict_tx_id_value = None
         for log_name in logs_name:
             try:
-                with open(log_name, "r") as f:
-                    lines = f.readlines()
-                    for line in lines:
-                        if "conflict_tx_id" in line:
-                            match = re.search(r"conflict_tx_id=\{txid:(\d+)\}", line)
-                            if match:
-                                conflict_tx_id_value = match.group(1)
-                                break
+                for line, fields in ObLogParser.get_field_extractor("conflict_tx_id", ["conflict_tx_id/txid"]).iter_file(log_name):
+                    tx_id = fields["conflict_tx_id/txid"]
+                    if tx_id and tx_id.isdigit():
+                        conflict_tx_id_value = tx_id
+                        break
                 if conflict_tx_id_value:
                     break
             except Exception as e:
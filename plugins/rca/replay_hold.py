@@ -20,6 +20,7 @@ import os
 from src.handler.rca.rca_exception import RCAInitException, RCAExecuteException, RCANotNeedExecuteException
 from src.handler.rca.rca_handler import RcaScene, RCA_ResultRecord
 from src.common.tool import StringUtils
+from src.handler.analyzer.log_parser.record_engine import FirstMatchConsumer, LogRecordEngine
 
 
 class ReplayHoldScene(RcaScene):
@@ -95,12 +96,13 @@ class ReplayHoldScene(RcaScene):
     def __check_start_port_in_log(self):
         if self.logs_name is None:
             return False
-        for log in self.logs_name:
-            with open(log, 'r') as f:
-                for line in f:
-                    if "fatal error" in line:
-                        self.record.add_record("find 'fatal error' in log: {0}".format(log))
-                        return True
+        # stops reading at the first match
+        engine = LogRecordEngine(self.stdio)
+        fatal_error = engine.register(FirstMatchConsumer("fatal error"))
+        engine.run(self.logs_name)
+        if fatal_error.match is not None:
+            self.record.add_record("find 'fatal error' in log: {0}".format(fatal_error.match.file_name))
+            return True
         return False
 
     def __execute_sql_with_save(self, sql: str, save_file_name: str):
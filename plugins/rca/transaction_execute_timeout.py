@@ -25,6 +25,7 @@ from src.handler.rca.rca_exception import (
     RCAExecuteException,
 )
 from src.handler.rca.rca_handler import RcaScene
+from src.common.ob_log_parser import ObLogParser
 from src.common.tool import StringUtils
 
 # Common retry error codes that may cause timeout
@@ -204,24 +205,21 @@ class TransactionExecuteTimeoutScene(RcaScene):
             self.record.add_record("No 'dump tenant' logs found")
             return
 
+        extractor = ObLogParser.get_field_extractor('dump tenant', ['req_queue:total_size', ['tenant/id', 'tenant_id']])
         for log_name in logs_name:
             try:
-                with open(log_name, 'r', encoding='utf-8') as f:
-                    content = f.readlines()
-                    for line in content:
-                        if 'dump tenant' in line:
-                            # Check req_queue total_size
-                            match = re.search(r'req_queue:total_size=(\d+)', line)
-                            if match:
-                                total_size = int(match.group(1))
-                                if total_size != 0:
-                                    # Get tenant_id
-                                    match_tenant_id = re.search(r'tenant=\{id:(\d+)', line)
-                                    if match_tenant_id:
-                                        tenant_id = match_tenant_id.group(1)
-                                        self.record.add_record("Found queue backlog: tenant_id={0}, total_size={1}".format(tenant_id, total_size))
-                                        self.record.add_suggest("Tenant {0} has queue backlog (total_size={1}). " "This may cause request delays and timeouts. " "Consider increasing tenant worker resources.".format(tenant_id, total_size))
-                                        return
+                for line, fields in extractor.iter_file(log_name, encoding='utf-8'):
+                    # Check req_queue total_size
+                    total_size = fields['req_queue:total_size']
+                    if total_size and total_size.isdigit():
+                        total_size = int(total_size)
+                        if total_size != 0:
+                            # Get tenant_id
+                            tenant_id = fields['tenant_id']
+                            if tenant_id and tenant_id.isdigit():
+                                self.record.add_record("Found queue backlog: tenant_id={0}, total_size={1}".format(tenant_id, total_size))
+                                self.record.add_suggest("Tenant {0} has queue backlog (total_size={1}). " "This may cause request delays and timeouts. " "Consider increasing tenant worker resources.".format(tenant_id, total_size))
+                                return
             except Exception as e:
                 self.verbose("Error reading log file {0}: {1}".format(log_name, e))
 
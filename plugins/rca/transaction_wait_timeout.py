@@ -19,7 +19,6 @@
        Reference: [4.0] 事务问题通用排查手册
 """
 import os
-import re
 
 from src.handler.rca.rca_exception import (
     RCAInitException,
@@ -27,6 +26,7 @@ from src.handler.rca.rca_exception import (
     RCANotNeedExecuteException,
 )
 from src.handler.rca.rca_handler import RcaScene
+from src.common.ob_log_parser import ObLogParser
 from src.common.tool import StringUtils
 
 
@@ -108,15 +108,12 @@ class TransactionWaitTimeoutScene(RcaScene):
         data_trans_id_line = None
         for log_name in logs_name:
             try:
-                with open(log_name, "r") as f:
-                    lines = f.readlines()
-                    for line in lines:
-                        if "data_trans_id" in line:
-                            data_trans_id_line = line
-                            match = re.search(r"data_trans_id_:\{txid:(\d+)\}", line)
-                            if match:
-                                self.data_trans_id_value = match.group(1)
-                                break
+                for line, fields in ObLogParser.get_field_extractor("data_trans_id", ["data_trans_id_/txid"]).iter_file(log_name):
+                    data_trans_id_line = line
+                    tx_id = fields["data_trans_id_/txid"]
+                    if tx_id and tx_id.isdigit():
+                        self.data_trans_id_value = tx_id
+                        break
                 if self.data_trans_id_value:
                     break
             except Exception as e:
@@ -160,15 +157,12 @@ class TransactionWaitTimeoutScene(RcaScene):
         conflict_tx_id_line = None
         for log_name in logs_name:
             try:
-                with open(log_name, "r") as f:
-                    lines = f.readlines()
-                    for line in lines:
-                        if "conflict_tx_id" in line:
-                            conflict_tx_id_line = line
-                            match = re.search(r"conflict_tx_id=\{txid:(\d+)\}", line)
-                            if match:
-                                self.conflict_tx_id_value = match.group(1)
-                                break
+                for line, fields in ObLogParser.get_field_extractor("conflict_tx_id", ["conflict_tx_id/txid"]).iter_file(log_name):
+                    conflict_tx_id_line = line
+                    tx_id = fields["conflict_tx_id/txid"]
+                    if tx_id and tx_id.isdigit():
+                        self.conflict_tx_id_value = tx_id
+                        break
                 if self.conflict_tx_id_value:
                     break
             except Exception as e:
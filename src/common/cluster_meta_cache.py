@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: cluster_meta_cache.py
+@desc: Per-cluster metadata cache (version, commit id, pids, home paths) stored under ~/.obdiag/cache.
+       Entries expire by TTL; node entries are also dropped when the recorded process start time changes.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+from src.common.constant import obdiag_path
+
+DEFAULT_CLUSTER_META_CACHE_TTL = 600
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+class ClusterMetaCache(object):
+    """
+    A small JSON backed key/value cache shared by every handler of one obdiag process and,
+    through the cache file, by later obdiag invocations against the same cluster.
+
+    Layout of the cache file:
+        {"cluster": {name: {"value": v, "ts": t}},
+         "nodes": {node_key: {"start_time": s, "entries": {name: {"value": v, "ts": t}}}}}
+    """
+
+    def __init__(self, cache_file, ttl=DEFAULT_CLUSTER_META_CACHE_TTL, stdio=None):
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.stdio = stdio
+        self._lock = threading.RLock()
+        self._data = self._load()
+
+    def _load(self):
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                data.setdefault("cluster", {})
+                data.setdefault("nodes", {})
+                return data
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self._verbose("cluster meta cache {0} is broken, ignore it: {1}".format(self.cache_file, e))
+        return {"cluster": {}, "nodes": {}}
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp_file = "{0}.{1}.tmp".format(self.cache_file, os.getpid())
+            with open(tmp_file, 'w') as f:
+                json.dump(self._data, f)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            self._verbose("save cluster meta cache {0} failed: {1}".format(self.cache_file, e))
+
+    def _verbose(self, msg):
+        if self.stdio is not None:
+            self.stdio.verbose(msg)
+
+    def _entries(self, node=None, create=False):
+        if node is None:
+            return self._data["cluster"]
+        node_data = self._data["nodes"].get(node)
+        if node_data is None:
+            if not create:
+                return {}
+            node_data = {"start_time": None, "entries": {}}
+            self._data["nodes"][node] = node_data
+        return node_data["entries"]
+
+    def get(self, name, node=None):
+        """Return the cached value, or None when it is missing or older than the TTL."""
+        with self._lock:
+            entry = self._entries(node).get(name)
+            if entry is None:
+                return None
+            if time.time() - entry.get("ts", 0) > self.ttl:
+                return None
+            self._verbose("cluster meta cache hit: {0} node={1}".format(name, node))
+            return entry.get("value")
+
+    def set(self, name, value, node=None):
+        with self._lock:
+            self._entries(node, create=True)[name] = {"value": value, "ts": time.time()}
+            self._save()
+
+    def get_or_load(self, name, loader, node=None):
+        """
+        Return the cached value of name, calling loader() to fill the cache on a miss.
+        Empty results ("", None, []) are returned but not cached.
+        """
+        value = self.get(name, node)
+        if value is not None:
+            return value
+        value = loader()
+        if value:
+            self.set(name, value, node)
+        return value
+
+    def get_start_time(self, node):
+        with self._lock:
+            node_data = self._data["nodes"].get(node)
+            return node_data.get("start_time") if node_data else None
+
+    def check_start_time(self, node, start_time):
+        """
+        Compare the process start time of node with the recorded one.
+        When it changed the process was restarted, so everything cached for the cluster
+        (pids, home paths, and possibly the version after an upgrade) is dropped.
+        :return: True if the recorded start time is still valid
+        """
+        with self._lock:
+            recorded = self.get_start_time(node)
+            if recorded is not None and recorded == start_time:
+                return True
+            if recorded is not None:
+                self._verbose("process start time on {0} changed ({1} -> {2}), invalidate cluster meta cache".format(node, recorded, start_time))
+                self.invalidate()
+            return False
+
+    def set_start_time(self, node, start_time):
+        with self._lock:
+            self._entries(node, create=True)
+            self._data["nodes"][node]["start_time"] = start_time
+            self._save()
+
+    def invalidate(self, node=None):
+        """Drop the entries of one node, or of the whole cluster when node is None."""
+        with self._lock:
+            if node is None:
+                self._data = {"cluster": {}, "nodes": {}}
+            else:
+                self._data["nodes"].pop(node, None)
+            self._save()
+
+
+def _cache_identity(context, component):
+    if component == "obproxy":
+        config = getattr(context, "obproxy_config", None)
+        if not isinstance(config, dict):
+            return None
+        servers = config.get("servers") or []
+        first = servers[0] if servers else {}
+        return [component, config.get("obproxy_cluster_name"), first.get("ip"), first.get("home_path")]
+    config = getattr(context, "cluster_config", None)
+    if not isinstance(config, dict):
+        return None
+    return [component, config.get("ob_cluster_name"), config.get("db_host"), config.get("db_port")]
+
+
+def get_cluster_meta_cache(context, component="observer"):
+    """
+    Return the ClusterMetaCache shared by all handlers of this process for the cluster described by context,
+    or None if caching is disabled (obdiag.basic.cluster_meta_cache_ttl <= 0) or the context has no cluster config.
+    """
+    if context is None:
+        return None
+    identity = _cache_identity(context, component)
+    if identity is None:
+        return None
+    inner_config = getattr(context, "inner_config", None)
+    ttl = DEFAULT_CLUSTER_META_CACHE_TTL
+    if isinstance(inner_config, dict):
+        try:
+            ttl = int(inner_config.get("obdiag", {}).get("basic", {}).get("cluster_meta_cache_ttl", DEFAULT_CLUSTER_META_CACHE_TTL))
+        except (TypeError, ValueError):
+            ttl = DEFAULT_CLUSTER_META_CACHE_TTL
+    if ttl <= 0:
+        return None
+    digest = hashlib.sha1(json.dumps(identity, default=str).encode("utf-8")).hexdigest()[:16]
+    cache_file = obdiag_path("cache", "cluster_meta", "{0}_{1}.json".format(component, digest))
+    with _caches_lock:
+        cache = _caches.get(cache_file)
+        if cache is None:
+            cache = ClusterMetaCache(cache_file, ttl=ttl, stdio=getattr(context, "stdio", None))
+            _caches[cache_file] = cache
+        return cache
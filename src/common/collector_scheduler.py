@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: collector_scheduler.py
+@desc: Run collectors as a DAG: a collector starts once the collectors it depends on are done and the
+       per-node budgets (cpu, io, ssh) of every node it touches have room for it.
+"""
+import threading
+import time
+
+RESOURCES = ("cpu", "io", "ssh")
+
+
+class Collector(object):
+    """
+    :param run: callable without arguments doing the collection, its return value is kept as the result
+    :param nodes: the hosts the collector works on
+    :param depends_on: names of the collectors that must be finished first (whatever their status)
+    """
+
+    def __init__(self, name, run, nodes, cpu=0, io=0, ssh=1, depends_on=()):
+        self.name = name
+        self.run = run
+        self.nodes = list(dict.fromkeys(nodes))
+        self.demand = {"cpu": cpu, "io": io, "ssh": ssh}
+        self.depends_on = list(depends_on)
+
+
+class CollectorRecord(object):
+    def __init__(self, collector):
+        self.name = collector.name
+        self.status = "pending"
+        self.result = None
+        self.error = ""
+        self.queued_at = None
+        self.start = None
+        self.end = None
+
+    @property
+    def elapsed(self):
+        if self.start is None or self.end is None:
+            return 0
+        return self.end - self.start
+
+    @property
+    def waited(self):
+        if self.queued_at is None or self.start is None:
+            return 0
+        return self.start - self.queued_at
+
+
+class CollectorScheduler(object):
+    """
+    Runs every collector on its own thread as soon as it may start. budget is the amount of each resource
+    a single node can give, e.g. {"cpu": 2, "io": 1, "ssh": 4}; a collector asking for more than the budget
+    runs alone on its nodes instead of never.
+    """
+
+    def __init__(self, stdio, budget):
+        self.stdio = stdio
+        self.budget = {resource: budget.get(resource) for resource in RESOURCES}
+        self._usage = {}
+        self._cond = threading.Condition()
+
+    @staticmethod
+    def check(collectors):
+        names = [collector.name for collector in collectors]
+        if len(set(names)) != len(names):
+            raise ValueError("collector names must be unique: {0}".format(names))
+        deps = {collector.name: collector.depends_on for collector in collectors}
+        for name, depends_on in deps.items():
+            for dep in depends_on:
+                if dep not in deps:
+                    raise ValueError("collector {0} depends on unknown collector {1}".format(name, dep))
+        visiting, done = set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError("collectors depend on each other: {0}".format(name))
+            visiting.add(name)
+            for dep in deps[name]:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in names:
+            visit(name)
+
+    def _fits(self, collector):
+        for node in collector.nodes:
+            usage = self._usage.get(node, {})
+            for resource in RESOURCES:
+                limit = self.budget[resource]
+                demand = collector.demand[resource]
+                used = usage.get(resource, 0)
+                if limit is None or demand <= 0 or used == 0:
+                    continue
+                if used + demand > limit:
+                    return False
+        return True
+
+    def _acquire(self, collector, sign):
+        for node in collector.nodes:
+            usage = self._usage.setdefault(node, {})
+            for resource in RESOURCES:
+                usage[resource] = usage.get(resource, 0) + sign * collector.demand[resource]
+
+    def run(self, collectors):
+        """run all collectors, returns {name: CollectorRecord} in the order of collectors"""
+        self.check(collectors)
+        records = {collector.name: CollectorRecord(collector) for collector in collectors}
+        pending = list(collectors)
+        threads = []
+        now = time.time()
+        for record in records.values():
+            record.queued_at = now
+
+        def work(collector, record):
+            try:
+                record.result = collector.run()
+                record.status = "ok"
+            except Exception as e:
+                record.status = "error"
+                record.error = str(e)
+                self.stdio.verbose("collector {0} failed: {1}".format(collector.name, e))
+            finally:
+                with self._cond:
+                    record.end = time.time()
+                    self._acquire(collector, -1)
+                    self._cond.notify_all()
+
+        with self._cond:
+            while pending:
+                started = False
+                for collector in list(pending):
+                    if any(records[dep].end is None for dep in collector.depends_on):
+                        continue
+                    if not self._fits(collector):
+                        continue
+                    pending.remove(collector)
+                    record = records[collector.name]
+                    record.status = "running"
+                    record.start = time.time()
+                    self._acquire(collector, 1)
+                    self.stdio.verbose("collector {0} starts after waiting {1:.1f}s".format(collector.name, record.waited))
+                    thread = threading.Thread(target=work, args=(collector, record), name="collector-{0}".format(collector.name))
+                    thread.start()
+                    threads.append(thread)
+                    started = True
+                if pending and not started:
+                    self._cond.wait()
+        for thread in threads:
+            thread.join()
+        return records
@@ -18,6 +18,7 @@
 import re
 import subprocess
 import traceback
+from src.common.cluster_meta_cache import get_cluster_meta_cache
 from src.common.ob_connector import OBConnector
 from src.common.ssh_client.ssh import SshClient
 from src.common.tool import TimeUtils
@@ -222,8 +223,15 @@ def is_support_arch(ssh_client):
 
 def get_observer_version(context):
     """
-    get observer version
+    get observer version, served from the cluster meta cache when possible
     """
+    cache = get_cluster_meta_cache(context)
+    if cache is None:
+        return _get_observer_version(context)
+    return cache.get_or_load("observer_version", lambda: _get_observer_version(context))
+
+
+def _get_observer_version(context):
     stdio = context.stdio
     observer_version = ""
     try:
@@ -248,8 +256,15 @@ def get_observer_version(context):
 
 def get_observer_commit_id(context):
     """
-    get observer commit id
+    get observer commit id, served from the cluster meta cache when possible
     """
+    cache = get_cluster_meta_cache(context)
+    if cache is None:
+        return _get_observer_commit_id(context)
+    return cache.get_or_load("observer_commit_id", lambda: _get_observer_commit_id(context))
+
+
+def _get_observer_commit_id(context):
     stdio = context.stdio
     observer_commit_id = ""
     try:
@@ -327,9 +342,16 @@ def get_observer_version_by_ssh(ssh_client, ob_install_dir, stdio):
 
 def get_obproxy_version(context):
     """
-    get obproxy version
+    get obproxy version, served from the cluster meta cache when possible
     :return:
     """
+    cache = get_cluster_meta_cache(context, component="obproxy")
+    if cache is None:
+        return _get_obproxy_version(context)
+    return cache.get_or_load("obproxy_version", lambda: _get_obproxy_version(context))
+
+
+def _get_obproxy_version(context):
     stdio = context.stdio
     obproxy_nodes = context.obproxy_config.get("servers")
     if len(obproxy_nodes) < 1:
@@ -418,11 +440,47 @@ def get_observer_version_by_sql(context, ob_cluster):
         return version[0]
 
 
+def _get_process_start_times(ssh_client, pid_list):
+    """
+    get "pid start_time" of the given pids in one ps call, used to detect process restarts
+    :return: sorted list of "pid lstart" strings, empty when none of the pids exists
+    """
+    if not pid_list:
+        return []
+    cmd = "ps -o pid=,lstart= -p {} 2>/dev/null".format(",".join(pid_list))
+    try:
+        result = ssh_client.exec_cmd(cmd)
+    except Exception:
+        return []
+    return sorted(" ".join(line.split()) for line in (result or "").splitlines() if line.strip())
+
+
 def get_observer_pid(ssh_client, ob_install_dir, stdio=None):
     """
     get observer pid
+    The pids are kept in the cluster meta cache together with the process start time,
+    so a later call costs one ps and a restarted observer is detected.
     :return: list of observer pids (only valid integers for existing processes)
     """
+    context = getattr(ssh_client, "context", None)
+    cache = get_cluster_meta_cache(context)
+    if cache is None:
+        return _get_observer_pid(ssh_client, ob_install_dir, stdio)
+    node_key = "{0}:{1}".format(ssh_client.get_ip(), ob_install_dir)
+    cached_pids = cache.get("observer_pid", node_key)
+    if cached_pids:
+        if cache.check_start_time(node_key, _get_process_start_times(ssh_client, cached_pids)):
+            return cached_pids
+    pid_list = _get_observer_pid(ssh_client, ob_install_dir, stdio)
+    if pid_list:
+        start_times = _get_process_start_times(ssh_client, pid_list)
+        if not cache.check_start_time(node_key, start_times):
+            cache.set_start_time(node_key, start_times)
+        cache.set("observer_pid", pid_list, node_key)
+    return pid_list
+
+
+def _get_observer_pid(ssh_client, ob_install_dir, stdio=None):
     pid_file_path = "{ob_install_dir}/run/observer.pid".format(ob_install_dir=ob_install_dir)
 
     def _valid_pids(pid_list):
@@ -624,6 +682,17 @@ def analyze_log_get_sqc_addr(uzip_dir, stdio):
 
 
 def find_home_path_by_port(ssh_client, internal_port_str, stdio):
+    """
+    find observer home path by its internal port, served from the cluster meta cache when possible
+    """
+    cache = get_cluster_meta_cache(getattr(ssh_client, "context", None))
+    if cache is None:
+        return _find_home_path_by_port(ssh_client, internal_port_str, stdio)
+    node_key = "{0}:{1}".format(ssh_client.get_ip(), internal_port_str)
+    return cache.get_or_load("home_path", lambda: _find_home_path_by_port(ssh_client, internal_port_str, stdio), node_key)
+
+
+def _find_home_path_by_port(ssh_client, internal_port_str, stdio):
     cmd = "ps aux | grep observer | grep 'P {internal_port_str}' |  grep -oP '/[^\s]*/bin/observer' ".format(internal_port_str=internal_port_str)
     stdout = ssh_client.exec_cmd(cmd)
     str_list = stdout.strip().split('\n')
@@ -77,6 +77,7 @@ DEFAULT_INNER_CONFIG = {
             'file_size_limit': '2G',
             'dis_rsa_algorithms': 0,
             'strict_host_key_checking': 0,
+            'cluster_meta_cache_ttl': 600,
         },
         'logger': {
             'log_dir': '~/.obdiag/log',
@@ -90,6 +91,12 @@ DEFAULT_INNER_CONFIG = {
         },
         'ssh_client': {
             'remote_client_sudo': False,
+            'kubernetes_transfer_compress': True,
+            'kubernetes_transfer_timeout': 180,
+        },
+        'ob_connector': {
+            'pool_size': 8,
+            'health_check_interval': 30,
         },
     },
     'analyze': {"thread_nums": 3},
@@ -103,7 +110,15 @@ DEFAULT_INNER_CONFIG = {
         'package_file': '~/.obdiag/check/check_package.yaml',
         'tasks_base_path': '~/.obdiag/check/tasks/',
     },
-    'gather': {'scenes_base_path': '~/.obdiag/gather/tasks', 'redact_processing_num': 3, "thread_nums": 3},
+    'gather': {
+        'scenes_base_path': '~/.obdiag/gather/tasks',
+        'redact_processing_num': 3,
+        "thread_nums": 3,
+        "node_timeout": 300,
+        "all": {"cpu_per_node": 2, "io_per_node": 1, "ssh_per_node": 4},
+        "sysstat": {"sample_interval": 1, "sample_duration": 10},
+        "obadmin": {"dump_parallel": 8, "dump_cpu_ratio": 0.25},
+    },
     'rca': {
         'result_path': './obdiag_rca/',
     },
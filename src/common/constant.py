@@ -78,18 +78,39 @@ const.GATHER_LOG_TEMPORARY_DIR_DEFAULT = "/tmp"
 const.OBSTACK2_DEFAULT_INSTALL_PATH = '/tmp/obstack'
 const.OBSTACK2_LOCAL_STORED_PATH_AARCH64 = "./dependencies/bin/obstack_aarch64"
 const.OBSTACK2_LOCAL_STORED_PATH_X86_64 = "./dependencies/bin/obstack_x86_64"
+# gather stack: 所有节点准备好之后, 统一在这之后的若干秒同时执行 obstack
+const.OBSTACK_SYNC_START_DELAY = 0.2
+# gather stack: 等待其他节点准备好的最长时间
+const.OBSTACK_SYNC_PREPARE_TIMEOUT = 60
 
 # for perf
-const.FLAMEGRAPH_STACKCOLLAPSE_PL = "./dependencies/bin/stackcollapse-perf.pl"
-const.FLAMEGRAPH_FLAMEGRAPH_PL = "./dependencies/bin/flamegraph.pl"
+# gather perf --concurrent: 所有节点准备好之后, 统一在这之后的若干秒同时开始 perf record
+const.PERF_SYNC_START_DELAY = 0.5
+# gather perf --concurrent: 等待其他节点准备 (ssh/pid/perf 检查) 的最长时间
+const.PERF_SYNC_PREPARE_TIMEOUT = 60
+
+# for awr
+# gather awr: 等待 OCP 生成 awr 报告任务完成的最长时间(秒)
+const.AWR_REPORT_TASK_TIMEOUT = 30 * 60
+
+# for display
+# display scene run --watch: 查询变慢时刷新间隔的上限(秒)
+const.DISPLAY_WATCH_MAX_INTERVAL = 60
+# display scene: 同时执行步骤的节点数
+const.DISPLAY_MAX_PARALLEL_NODES = 16
 # 限制收集任务的并发线程数量 10
 const.GATHER_THREADS_LIMIT = 10
+# 并行建立 SSH 连接的线程数量上限
+const.SSH_CONNECT_THREADS_LIMIT = 16
 # 限制收集任务的并发线程单个线程的执行超时时间 15分钟
 const.GATHER_THREAD_TIMEOUT = 15 * 60
 # obstack2收集堆栈信息支持的最小版本
 const.MIN_OB_VERSION_SUPPORT_GATHER_OBSTACK = "2.0.0"
 
 const.MAX_OB_VERSION_SUPPORT_GATHER_OBADMIN = "4.0.0"
+# gather clog/slog 每个节点同时运行的 ob_admin 上限，以及最多占用的 CPU 核数比例
+const.GATHER_OBADMIN_DUMP_PARALLEL_DEFAULT = 8
+const.GATHER_OBADMIN_DUMP_CPU_RATIO_DEFAULT = 0.25
 
 const.DEFAULT_CONFIG_PATH = os.path.join(os.path.expanduser('~'), ".obdiag/config.yml")
 
@@ -23,10 +23,12 @@ from optparse import Values
 from copy import copy
 
 from src.common.ssh_client.remote_client import dis_rsa_algorithms
+from src.handler.gather.gather_all import GatherAllHandler
 from src.handler.gather.gather_ash_report import GatherAshReportHandler
 from src.handler.gather.gather_component_log import GatherComponentLogHandler
 from src.handler.rca.rca_handler import RCAHandler
 from src.handler.rca.rca_list import RcaScenesListHandler
+from src.handler.rca.rca_sweep import RCASweepHandler
 from src.common.ssh import SshClient, SshConfig
 from src.common.context import HandlerContextNamespace, HandlerContext
 from src.common.config import ConfigManager, InnerConfigManager
@@ -38,6 +40,7 @@ from src.handler.analyzer.analyze_sql_review import AnalyzeSQLReviewHandler
 from src.handler.analyzer.analyze_parameter import AnalyzeParameterHandler
 from src.handler.analyzer.analyze_variable import AnalyzeVariableHandler
 from src.handler.analyzer.analyze_memory import AnalyzeMemoryHandler
+from src.handler.analyzer.analyze_combined import AnalyzeCombinedHandler
 from src.handler.analyzer.analyze_index_space import AnalyzeIndexSpaceHandler
 from src.handler.check.check_handler import CheckHandler
 from src.handler.check.check_list import CheckListHandler
@@ -296,56 +299,8 @@ class ObdiagHome(object):
                 handler = GatherPlanMonitorHandler(self.context)
                 return handler.handle()
             elif function_type == 'gather_all':
-                try:
-                    handler_sysstat = GatherOsInfoHandler(self.context)
-                    handler_sysstat.handle()
-                except Exception as e:
-                    self.stdio.error("gather_sysstat failed: %s", str(e))
-                try:
-                    handler_stack = GatherObstack2Handler(self.context)
-                    handler_stack.handle()
-                except Exception as e:
-                    self.stdio.error("gather_obstack failed: %s", str(e))
-                try:
-                    handler_perf = GatherPerfHandler(self.context)
-                    handler_perf.handle()
-                except Exception as e:
-                    self.stdio.error("gather_perf failed: %s", str(e))
-                try:
-                    handler_observer_log = GatherComponentLogHandler()
-                    handler_observer_log.init(
-                        self.context,
-                        target="observer",
-                        from_option=Util.get_option(options, 'from'),
-                        to_option=Util.get_option(options, 'to'),
-                        since=Util.get_option(options, 'since'),
-                        grep=Util.get_option(options, 'grep'),
-                        store_dir=Util.get_option(options, 'store_dir'),
-                        temp_dir=Util.get_option(options, 'temp_dir'),
-                        redact=Util.get_option(options, 'redact'),
-                        recent_count=Util.get_option(options, 'recent_count'),
-                    )
-                    handler_observer_log.handle()
-                except Exception as e:
-                    self.stdio.error("gather_observer_log failed: %s", str(e))
-                try:
-                    handler_obproxy = GatherComponentLogHandler()
-                    handler_obproxy.init(
-                        self.context,
-                        target="obproxy",
-                        from_option=Util.get_option(options, 'from'),
-                        to_option=Util.get_option(options, 'to'),
-                        since=Util.get_option(options, 'since'),
-                        grep=Util.get_option(options, 'grep'),
-                        store_dir=Util.get_option(options, 'store_dir'),
-                        temp_dir=Util.get_option(options, 'temp_dir'),
-                        redact=Util.get_option(options, 'redact'),
-                        recent_count=Util.get_option(options, 'recent_count'),
-                    )
-                    return handler_obproxy.handle()
-                except Exception as e:
-                    self.stdio.error("gather_obproxy failed: %s", str(e))
-
+                handler = GatherAllHandler(self.context)
+                return handler.handle()
             elif function_type == 'gather_sysstat':
                 handler = GatherOsInfoHandler(self.context)
                 return handler.handle()
@@ -511,6 +466,10 @@ class ObdiagHome(object):
                 self.set_context_skip_cluster_conn(function_type, 'analyze', config)
                 handler = AnalyzeMemoryHandler(self.context)
                 return handler.handle()
+            elif function_type == 'analyze_combined_offline':
+                self.set_context_skip_cluster_conn(function_type, 'analyze', config)
+                handler = AnalyzeCombinedHandler(self.context)
+                return handler.handle()
             elif function_type == 'analyze_memory':
                 self.set_context_stdio()
                 self.update_obcluster_nodes(config)
@@ -589,6 +548,23 @@ class ObdiagHome(object):
                 self.stdio.verbose(traceback.format_exc())
                 return ObdiagResult(ObdiagResult.SERVER_ERROR_CODE, error_data="rca run Exception: {0}".format(e))
 
+    def rca_sweep(self, opts):
+        config = self.config_manager
+        if not config:
+            self._call_stdio('error', 'No such custum config')
+            return ObdiagResult(ObdiagResult.INPUT_ERROR_CODE, error_data='No such custum config')
+        else:
+            self.set_context('rca_sweep', 'rca_sweep', config)
+            if config.get_ob_cluster_config.get("db_host") is not None and config.get_ob_cluster_config.get("servers") is not None:
+                self.update_obcluster_nodes(config)
+            try:
+                handler = RCASweepHandler(self.context)
+                return handler.handle()
+            except Exception as e:
+                self.stdio.error("rca sweep Exception: {0}".format(e))
+                self.stdio.verbose(traceback.format_exc())
+                return ObdiagResult(ObdiagResult.SERVER_ERROR_CODE, error_data="rca sweep Exception: {0}".format(e))
+
     def rca_list(self, opts):
         config = self.config_manager
         if not config:
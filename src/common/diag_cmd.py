@@ -520,6 +520,8 @@ class ObdiagGatherSysStatCommand(ObdiagOriginCommand):
     def __init__(self):
         super(ObdiagGatherSysStatCommand, self).__init__('sysstat', 'Gather Host information')
         self.parser.add_option('--store_dir', type='string', help='the dir to store gather result, current dir by default.', default='./')
+        self.parser.add_option('--sample_interval', type='float', help='seconds between two /proc samples of the built-in sampler, e.g. 0.1. gather.sysstat.sample_interval of the inner config (1) by default.')
+        self.parser.add_option('--sample_duration', type='int', help='seconds the built-in /proc sampler runs on every node. Without it the sampler only runs when tsar is not installed, for gather.sysstat.sample_duration of the inner config (10).')
         self.parser.add_option('-c', type='string', help='obdiag custom config', default=os.path.expanduser('~/.obdiag/config.yml'))
         self.parser.add_option('--config', action="append", type="string", help='config options Format: --config key=value')
 
@@ -538,6 +540,8 @@ class ObdiagGatherStackCommand(ObdiagOriginCommand):
         super(ObdiagGatherStackCommand, self).__init__('stack', 'Gather stack')
 
         self.parser.add_option('--store_dir', type='string', help='the dir to store gather result, current dir by default.', default='./')
+        self.parser.add_option('--thread_nums', type='int', help='the number of nodes prepared and downloaded at the same time, gather.thread_nums of the inner config by default.')
+        self.parser.add_option('--node_timeout', type='int', help='seconds a node may take, a node not done by then is skipped. gather.node_timeout of the inner config (300) by default.')
         self.parser.add_option('-c', type='string', help='obdiag custom config', default=os.path.expanduser('~/.obdiag/config.yml'))
         self.parser.add_option('--config', action="append", type="string", help='config options Format: --config key=value')
 
@@ -558,6 +562,9 @@ class ObdiagGatherPerfCommand(ObdiagOriginCommand):
         self.parser.add_option('--store_dir', type='string', help='the dir to store gather result, current dir by default.', default='./')
         self.parser.add_option('--scope', type='string', help="perf type constrains, choices=[sample, flame, pstack, all]", default='all')
         self.parser.add_option('--count', type='int', help="perf event period to sample >= 1000000", default='100000000')
+        self.parser.add_option('--concurrent', action='store_true', help="start perf on all nodes at the same time, one 20s perf session per node (sampled every --count cycles) serves both the sample and flame outputs", default=False)
+        self.parser.add_option('--diff_node', type='string', help="generate a differential flame graph of this node (its name in the summary, or its ip / 'ip(obproxy)' when it is alone on the host) against the other nodes")
+        self.parser.add_option('--diff_base', type='string', help="generate a differential flame graph against an earlier capture: a .folded file, a gather perf pack dir or one of its perf_*.tar.gz")
         self.parser.add_option('-c', type='string', help='obdiag custom config', default=os.path.expanduser('~/.obdiag/config.yml'))
         self.parser.add_option('--config', action="append", type="string", help='config options Format: --config key=value')
 
@@ -614,8 +621,10 @@ class ObdiagGatherAwrCommand(ObdiagOriginCommand):
 
     def __init__(self):
         super(ObdiagGatherAwrCommand, self).__init__('awr', 'Gather ParalleSQL information')
-        self.parser.add_option('--cluster_name', type='string', help='cluster_name from ocp')
-        self.parser.add_option('--cluster_id', type='string', help='cluster_id from ocp')
+        self.parser.add_option('--cluster_name', type='string', help='cluster_name from ocp, several clusters separated by commas')
+        self.parser.add_option('--cluster_id', type='string', help='cluster_id from ocp, in the same order as --cluster_name')
+        self.parser.add_option('--report_span', type='string', help="split the time range into reports of this length, generated at the same time. format: <n> <m|h|d>. example: 1h.")
+        self.parser.add_option('--thread_nums', type='int', help='the number of awr reports generated and downloaded at the same time, gather.thread_nums of the inner config by default.')
         self.parser.add_option('--from', type='string', help="specify the start of the time range. format: 'yyyy-mm-dd hh:mm:ss'")
         self.parser.add_option('--to', type='string', help="specify the end of the time range. format: 'yyyy-mm-dd hh:mm:ss'")
         self.parser.add_option('--since', type='string', help="Specify time range that from 'n' [d]ays, 'n' [h]ours or 'n' [m]inutes. before to now. format: <n> <m|h|d>. example: 1h.", default='30m')
@@ -636,7 +645,7 @@ class ObdiagGatherPlanMonitorCommand(ObdiagOriginCommand):
 
     def __init__(self):
         super(ObdiagGatherPlanMonitorCommand, self).__init__('plan_monitor', 'Gather ParalleSQL information')
-        self.parser.add_option('--trace_id', type='string', help='sql trace id')
+        self.parser.add_option('--trace_id', type='string', help='sql trace id, several trace ids separated by commas are reported concurrently')
         self.parser.add_option('--store_dir', type='string', help='the dir to store gather result, current dir by default.', default='./')
         self.parser.add_option(
             '--env',
@@ -645,6 +654,8 @@ class ObdiagGatherPlanMonitorCommand(ObdiagOriginCommand):
             help='env options Format: --env key=value. Multiple --env options can be specified. For database connection, use: --env host=127.0.0.1 --env port=2881 --env user=test@test --env password=****** --env database=test',
         )
         self.parser.add_option('--skip', type='string', help="choices=[dbms_xplan]")
+        self.parser.add_option('--split_by_server', action='store_true', help='query sql_audit and sql_plan_monitor of each server in parallel, a slow server only loses its own rows', default=False)
+        self.parser.add_option('--server_timeout', type='string', help='with --split_by_server: seconds to wait for the servers, the report is marked partial after that')
         self.parser.add_option('-c', type='string', help='obdiag custom config', default=os.path.expanduser('~/.obdiag/config.yml'))
         self.parser.add_option('--config', action="append", type="string", help='config options Format: --config key=value')
 
@@ -826,6 +837,8 @@ class ObdiagGatherCoreCommand(ObdiagOriginCommand):
         self.parser.add_option('--to', type='string', help="specify the end of the time range. format: 'yyyy-mm-dd hh:mm:ss'")
         self.parser.add_option('--since', type='string', help="Specify time range that from 'n' [d]ays, 'n' [h]ours or 'n' [m]inutes before to now. format: <n><m|h|d>. example: 1h.", default='30m')
         self.parser.add_option('--store_dir', type='string', help='the dir to store gather result, current dir by default.', default='./')
+        self.parser.add_option('--thread_nums', type='int', help='the number of nodes searched and downloaded from at the same time, gather.thread_nums of the inner config by default.')
+        self.parser.add_option('--node_timeout', type='int', help='seconds a node may take to search for core files, a node not done by then is skipped. gather.node_timeout of the inner config (300) by default.')
         self.parser.add_option('-c', type='string', help='obdiag custom config', default=os.path.expanduser('~/.obdiag/config.yml'))
         self.parser.add_option('--config', action="append", type="string", help='config options Format: --config key=value')
 
@@ -860,6 +873,8 @@ class ObdiagDisplaySceneRunCommand(ObdiagOriginCommand):
         self.parser.add_option('--to', type='string', help="specify the end of the time range. format: 'yyyy-mm-dd hh:mm:ss'")
         self.parser.add_option('--since', type='string', help="Specify time range that from 'n' [d]ays, 'n' [h]ours or 'n' [m]inutes. before to now. format: <n> <m|h|d>. example: 1h.", default='30m')
         self.parser.add_option('--env', action="append", type='string', help='env options Format: --env key=value')
+        self.parser.add_option('--watch', type='float', help='refresh the scene every n seconds on the same connection and show the changes and per second rates between two refreshes, until Ctrl-C. example: --watch 1')
+        self.parser.add_option('--watch_count', type='int', help='with --watch, stop after n refreshes', default=0)
         self.parser.add_option('-c', type='string', help='obdiag custom config', default=os.path.expanduser('~/.obdiag/config.yml'))
         self.parser.add_option('--config', action="append", type="string", help='config options Format: --config key=value')
 
@@ -1037,6 +1052,28 @@ class ObdiagAnalyzeMemoryCommand(ObdiagOriginCommand):
             return obdiag.analyze_fuction('analyze_memory', self.opts)
 
 
+class ObdiagAnalyzeCombinedCommand(ObdiagOriginCommand):
+
+    def __init__(self):
+        super(ObdiagAnalyzeCombinedCommand, self).__init__('combined', 'Analyze the errors, the tenant memory and the queues of offline OceanBase log files in one read of the files')
+        self.parser.add_option('--files', action="append", type='string', help="specify files")
+        self.parser.add_option('--log_level', type='string', help="OceanBase logs greater than or equal to this level will be analyze, choices=[DEBUG, TRACE, INFO, WDIAG, WARN, EDIAG, ERROR]")
+        self.parser.add_option('--version', type="string", help='specify the OceanBase version of the log files, analyze memory is skipped without it.')
+        self.parser.add_option('--tenant_id', type='string', help='specify the tenant id of the queue dumps, analyze queue is skipped without it.')
+        self.parser.add_option('--queue', type='int', help="quene size ", default=50)
+        self.parser.add_option('--store_dir', type='string', help='the dir to store gather result, current dir by default.', default='./')
+        self.parser.add_option('-c', type='string', help='obdiag custom config', default=os.path.expanduser('~/.obdiag/config.yml'))
+        self.parser.add_option('--config', action="append", type="string", help='config options Format: --config key=value')
+
+    def init(self, cmd, args):
+        super(ObdiagAnalyzeCombinedCommand, self).init(cmd, args)
+        self.parser.set_usage('%s [options]' % self.prev_cmd)
+        return self
+
+    def _do_command(self, obdiag):
+        return obdiag.analyze_fuction('analyze_combined_offline', self.opts)
+
+
 class ObdiagAnalyzeIndexSpaceCommand(ObdiagOriginCommand):
     def __init__(self):
         super(ObdiagAnalyzeIndexSpaceCommand, self).__init__('index_space', 'Analyze the space of existing or non-existent index and estimate it through the columns included in the index')
@@ -1074,6 +1111,9 @@ class ObdiagAnalyzeSQLCommand(ObdiagOriginCommand):
         self.parser.add_option('--limit', type='string', help="The limit on the number of data rows returned by sql_audit for the tenant.", default=2000)
         self.parser.add_option('--store_dir', type='string', help='parent directory for this run; each execution creates obdiag_analyze_sql_* under it (default: current directory).', default='.')
         self.parser.add_option('--elapsed_time', type='string', help='The minimum threshold for filtering execution time, measured in microseconds.', default=100000)
+        self.parser.add_option('--split_by_server', action='store_true', help='query sql_audit of each server in parallel and merge the results by trace_id', default=False)
+        self.parser.add_option('--time_slice', type='string', help="split the time range into slices queried in parallel. format: <n> <m|h|d>. example: 10m.")
+        self.parser.add_option('--server_timeout', type='string', help='with --split_by_server or --time_slice: seconds to wait for the queries, the result is marked partial after that')
         self.parser.add_option('-c', type='string', help='obdiag custom config', default=os.path.expanduser('~/.obdiag/config.yml'))
         self.parser.add_option('--config', action="append", type="string", help='config options Format: --config key=value')
 
@@ -1225,6 +1265,24 @@ class ObdiagRCARunCommand(ObdiagOriginCommand):
         return obdiag.rca_run(self.opts)
 
 
+class ObdiagRCASweepCommand(ObdiagRCARunCommand):
+
+    def __init__(self):
+        super(ObdiagRCASweepCommand, self).__init__()
+        self.name = 'sweep'
+        self.parser.remove_option('--scene')
+        self.parser.add_option('--scenes', type='string', help="comma separated rca scene names, or 'all'. The argument is required.")
+        self.parser.add_option('--parallel', type='int', help='the number of scenes executed at the same time. default 4', default=4)
+
+    def init(self, cmd, args):
+        super(ObdiagRCASweepCommand, self).init(cmd, args)
+        return self
+
+    def _do_command(self, obdiag):
+        Util.set_option(self.opts, 'env', self.scene_input_param_map)
+        return obdiag.rca_sweep(self.opts)
+
+
 class ObdiagRCAListCommand(ObdiagOriginCommand):
 
     def __init__(self):
@@ -1344,6 +1402,8 @@ class ObdiagToolConfigCheckCommand(ObdiagOriginCommand):
         super(ObdiagToolConfigCheckCommand, self).__init__('config_check', 'obdiag tool config_check. Check if --config parameters are valid')
         self.parser.add_option('-c', type='string', help='obdiag custom config', default=os.path.expanduser('~/.obdiag/config.yml'))
         self.parser.add_option('--config', action="append", type="string", help='config options to check. Format: --config key=value')
+        self.parser.add_option('--preflight', action='store_true', help='probe every host over TCP first and check ssh only on the reachable ones with short timeouts; nodes validated recently with the same config are not checked again', default=False)
+        self.parser.add_option('--probe_timeout', type='float', help='with --preflight: seconds a TCP connect may take. default 2', default=2)
 
     def init(self, cmd, args):
         super(ObdiagToolConfigCheckCommand, self).init(cmd, args)
@@ -1362,6 +1422,10 @@ class ObdiagToolSqlSyntaxCommand(ObdiagOriginCommand):
             'obdiag tool sql_syntax. Validate SQL against a live OceanBase instance using EXPLAIN (no execution of the original statement)',
         )
         self.parser.add_option('--sql', type='string', help='SQL statement to validate (single statement only)')
+        self.parser.add_option('--file', action='append', type='string', help='a SQL file, or a directory searched for *.sql, to validate statement by statement. Can be repeated')
+        self.parser.add_option('--parallel', type='int', help='with --file: the number of connections EXPLAIN runs on. default 4', default=4)
+        self.parser.add_option('--no_prefilter', action='store_true', help='with --file: EXPLAIN the statements the local parser rejects too', default=False)
+        self.parser.add_option('--store_dir', type='string', help='with --file: the directory the JSON report is written to (default: current directory)', default='.')
         self.parser.add_option('--env', action='append', type='string', help='Connection override: --env key=value (host, port, user, password/pwd, database/db)')
         self.parser.add_option('-c', type='string', help='obdiag custom config', default=os.path.expanduser('~/.obdiag/config.yml'))
         self.parser.add_option('--config', action='append', type='string', help='config options Format: --config key=value')
@@ -1433,6 +1497,7 @@ class ObdiagAnalyzeCommand(MajorCommand):
         self.register_command(ObdiagAnalyzeQueueCommand())
         self.register_command(ObdiagAnalyzeIndexSpaceCommand())
         self.register_command(ObdiagAnalyzeMemoryCommand())
+        self.register_command(ObdiagAnalyzeCombinedCommand())
         self.register_command(ObdiagAnalyzeSQLCommand())
         self.register_command(ObdiagAnalyzeSQLReviewCommand())
 
@@ -1443,6 +1508,7 @@ class ObdiagRCACommand(MajorCommand):
         super(ObdiagRCACommand, self).__init__('rca', 'root cause analysis')
         self.register_command(ObdiagRCARunCommand())
         self.register_command(ObdiagRCAListCommand())
+        self.register_command(ObdiagRCASweepCommand())
 
 
 class ObdiagCheckCommand(MajorCommand):
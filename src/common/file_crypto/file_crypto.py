@@ -15,12 +15,54 @@
 @file: file_crypto.py
 @desc:
 """
+import io
 import os
 import base64
+import hashlib
+import struct
+import threading
+from cryptography.exceptions import InvalidTag
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
+# Chunked format (files written by encrypt_file since the streaming support):
+#   header: MAGIC | version(1) | salt(16) | iterations(4) | chunk_size(4) | nonce_prefix(7)
+#   body:   AES-256-GCM(chunk_i), each chunk_size + 16 bytes except the last one
+# the nonce of chunk i is nonce_prefix | i(4) | final flag(1) and the header is the AAD of every chunk,
+# so chunks can neither be reordered nor the file truncated at a chunk boundary.
+# Files without MAGIC are the old single Fernet token and are still decrypted.
+MAGIC = b'OBDIAGEC'
+FORMAT_VERSION = 1
+HEADER_STRUCT = struct.Struct('>8sB16sII7s')
+TAG_SIZE = 16
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+KDF_ITERATIONS = 100000
+
+# derived keys of this process, keyed by a digest of (password, salt, iterations)
+_derived_keys = {}
+_derived_keys_lock = threading.Lock()
+
+
+def _derive_key(password, salt, iterations):
+    if isinstance(password, str):
+        password = password.encode()
+    cache_key = hashlib.sha256(password + b'\0' + salt + b'\0' + str(iterations).encode()).digest()
+    with _derived_keys_lock:
+        key = _derived_keys.get(cache_key)
+    if key is None:
+        kdf = PBKDF2HMAC(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=salt,
+            iterations=iterations,
+        )
+        key = kdf.derive(password)
+        with _derived_keys_lock:
+            _derived_keys[cache_key] = key
+    return key
+
 
 class FileEncryptor:
     def __init__(self, context, stdio=None):
@@ -31,15 +73,98 @@ class FileEncryptor:
             self.stdio = context.stdio
 
     def generate_key_from_password(self, password):
-        """Generate encryption key from password"""
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=self.salt,
-            iterations=100000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
-        return key
+        """Generate encryption key from password (the Fernet key of the old format)"""
+        return base64.urlsafe_b64encode(_derive_key(password, self.salt, KDF_ITERATIONS))
+
+    @staticmethod
+    def _chunk_nonce(nonce_prefix, index, final):
+        return nonce_prefix + struct.pack('>IB', index, 1 if final else 0)
+
+    def encrypt_stream(self, src, dst, password, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Encrypt the readable binary stream src into dst chunk by chunk, memory use is bounded by chunk_size"""
+        salt = os.urandom(16)
+        nonce_prefix = os.urandom(7)
+        header = HEADER_STRUCT.pack(MAGIC, FORMAT_VERSION, salt, KDF_ITERATIONS, chunk_size, nonce_prefix)
+        aesgcm = AESGCM(_derive_key(password, salt, KDF_ITERATIONS))
+        dst.write(header)
+        index = 0
+        chunk = src.read(chunk_size)
+        while True:
+            next_chunk = src.read(chunk_size)
+            final = not next_chunk
+            dst.write(aesgcm.encrypt(self._chunk_nonce(nonce_prefix, index, final), chunk, header))
+            if final:
+                break
+            chunk = next_chunk
+            index += 1
+
+    def _read_header(self, src):
+        header = src.read(HEADER_STRUCT.size)
+        if len(header) < HEADER_STRUCT.size or not header.startswith(MAGIC):
+            return None
+        magic, version, salt, iterations, chunk_size, nonce_prefix = HEADER_STRUCT.unpack(header)
+        if version != FORMAT_VERSION:
+            raise ValueError("unsupported encrypted file version: {0}".format(version))
+        if chunk_size <= 0:
+            raise ValueError("invalid chunk size in encrypted file header: {0}".format(chunk_size))
+        return header, salt, iterations, chunk_size, nonce_prefix
+
+    def _iter_chunks(self, src, password, header_info, start_index=0):
+        """yield (index, plaintext) from start_index, src must be positioned at chunk start_index"""
+        header, salt, iterations, chunk_size, nonce_prefix = header_info
+        aesgcm = AESGCM(_derive_key(password, salt, iterations))
+        index = start_index
+        while True:
+            data = src.read(chunk_size + TAG_SIZE)
+            if not data:
+                raise ValueError("encrypted file is truncated")
+            try:
+                # a full chunk is usually followed by more chunks, try the non-final nonce first
+                final = len(data) < chunk_size + TAG_SIZE
+                try:
+                    plaintext = aesgcm.decrypt(self._chunk_nonce(nonce_prefix, index, final), data, header)
+                except InvalidTag:
+                    if final:
+                        raise
+                    final = True
+                    plaintext = aesgcm.decrypt(self._chunk_nonce(nonce_prefix, index, final), data, header)
+            except InvalidTag:
+                raise ValueError("invalid password or corrupted data at chunk {0}".format(index))
+            yield index, plaintext
+            if final:
+                return
+            index += 1
+
+    def decrypt_stream(self, src, dst, password):
+        """Decrypt the readable binary stream src into dst. Supports both the chunked and the old Fernet format"""
+        header_info = self._read_header(src)
+        if header_info is None:
+            src.seek(0)
+            dst.write(Fernet(self.generate_key_from_password(password)).decrypt(src.read()))
+            return
+        for _, plaintext in self._iter_chunks(src, password, header_info):
+            dst.write(plaintext)
+
+    def read_range(self, encrypted_file_path, password, offset, length):
+        """Read length bytes of plaintext from offset, only the chunks covering the range are decrypted"""
+        encrypted_file_path = os.path.expanduser(encrypted_file_path)
+        with open(encrypted_file_path, 'rb') as src:
+            header_info = self._read_header(src)
+            if header_info is None:
+                src.seek(0)
+                data = Fernet(self.generate_key_from_password(password)).decrypt(src.read())
+                return data[offset : offset + length]
+            chunk_size = header_info[3]
+            start_index = offset // chunk_size
+            src.seek(HEADER_STRUCT.size + start_index * (chunk_size + TAG_SIZE))
+            result = bytearray()
+            skip = offset - start_index * chunk_size
+            for _, plaintext in self._iter_chunks(src, password, header_info, start_index=start_index):
+                result.extend(plaintext[skip:])
+                skip = 0
+                if len(result) >= length:
+                    break
+            return bytes(result[:length])
 
     def encrypt_file(self, file_path, password, save=True):
         """Encrypt file"""
@@ -50,28 +175,27 @@ class FileEncryptor:
                 self.stdio.error(f"Error: File '{file_path}' does not exist")
                 raise FileNotFoundError(f"File '{file_path}' does not exist")
 
-            # Generate key
-            key = self.generate_key_from_password(password)
-            fernet = Fernet(key)
-
-            # Read original file
-            with open(file_path, 'rb') as file:
-                file_data = file.read()
-
-            # Encrypt data
-            encrypted_data = fernet.encrypt(file_data)
+            if not save:
+                with open(file_path, 'rb') as src:
+                    dst = io.BytesIO()
+                    self.encrypt_stream(src, dst, password)
+                return dst.getvalue()
 
             # Save encrypted file
-            if save:
-                encrypted_file_path = file_path + '.encrypted'
+            encrypted_file_path = file_path + '.encrypted'
+            if os.path.exists(encrypted_file_path):
+                self.stdio.error(f"Error: Encrypted file '{encrypted_file_path}' already exists. Please backup it first")
+                raise FileExistsError(f"Encrypted file '{encrypted_file_path}' already exists. Please backup it first")
+            try:
+                with open(file_path, 'rb') as src, open(encrypted_file_path, 'wb') as dst:
+                    self.encrypt_stream(src, dst, password)
+            except Exception:
                 if os.path.exists(encrypted_file_path):
-                    self.stdio.error(f"Error: Encrypted file '{encrypted_file_path}' already exists. Please backup it first")
-                    raise FileExistsError(f"Encrypted file '{encrypted_file_path}' already exists. Please backup it first")
-                with open(encrypted_file_path, 'wb') as file:
-                    file.write(encrypted_data)
+                    os.remove(encrypted_file_path)
+                raise
 
-                self.stdio.print(f"File encrypted successfully: {encrypted_file_path}. Please remember your password")
-            return encrypted_data
+            self.stdio.print(f"File encrypted successfully: {encrypted_file_path}. Please remember your password")
+            return encrypted_file_path
 
         except Exception as e:
             self.stdio.error(f"Encryption failed: {str(e)}")
@@ -91,28 +215,27 @@ class FileEncryptor:
                 self.stdio.error(f"Error: File '{encrypted_file_path}' is not an encrypted file")
                 return False
 
-            # Generate key
-            key = self.generate_key_from_password(password)
-            fernet = Fernet(key)
-
-            # Read encrypted file
-            with open(encrypted_file_path, 'rb') as file:
-                encrypted_data = file.read()
+            if not save:
+                with open(encrypted_file_path, 'rb') as src:
+                    dst = io.BytesIO()
+                    self.decrypt_stream(src, dst, password)
+                return dst.getvalue()
 
-            # Decrypt data
-            decrypted_data = fernet.decrypt(encrypted_data)
-            if save:
-                # Save decrypted file
-                original_file_path = encrypted_file_path[:-10]  # Remove .encrypted suffix
+            # Save decrypted file
+            original_file_path = encrypted_file_path[:-10]  # Remove .encrypted suffix
+            if os.path.exists(original_file_path):
+                self.stdio.error(f"Error: Decrypted file '{original_file_path}' already exists. Please backup it first")
+                raise FileExistsError(f"Decrypted file '{original_file_path}' already exists. Please backup it first")
+            try:
+                with open(encrypted_file_path, 'rb') as src, open(original_file_path, 'wb') as dst:
+                    self.decrypt_stream(src, dst, password)
+            except Exception:
                 if os.path.exists(original_file_path):
-                    self.stdio.error(f"Error: Decrypted file '{original_file_path}' already exists. Please backup it first")
-                    raise FileExistsError(f"Decrypted file '{original_file_path}' already exists. Please backup it first")
-                with open(original_file_path, 'wb') as file:
-                    file.write(decrypted_data)
+                    os.remove(original_file_path)
+                raise
 
-                self.stdio.verbose(f"File decrypted successfully: {original_file_path}")
-
-            return decrypted_data
+            self.stdio.verbose(f"File decrypted successfully: {original_file_path}")
+            return original_file_path
 
         except Exception as e:
             self.stdio.error(f"Decryption failed: {str(e)}")
@@ -121,11 +244,22 @@ class FileEncryptor:
     def check_encrypt_file(self, file_path, encrypted_file_path, password):
         """Check if file is encrypted"""
         try:
-            data = self.decrypt_file(encrypted_file_path, password, save=False)
-            # Read original file
-            with open(file_path, 'rb') as file:
-                file_data = file.read()
-            if str(file_data) == str(data):
+            encrypted_file_path = os.path.expanduser(encrypted_file_path)
+            with open(os.path.expanduser(file_path), 'rb') as file, open(encrypted_file_path, 'rb') as src:
+                header_info = self._read_header(src)
+                if header_info is None:
+                    src.seek(0)
+                    same = Fernet(self.generate_key_from_password(password)).decrypt(src.read()) == file.read()
+                else:
+                    # compare chunk by chunk, the plain file is never fully loaded
+                    same = True
+                    for _, plaintext in self._iter_chunks(src, password, header_info):
+                        if file.read(len(plaintext)) != plaintext:
+                            same = False
+                            break
+                    if same and file.read(1):
+                        same = False
+            if same:
                 self.stdio.print(f"The file, password, and encrypted file maintain consistency.")
                 return True
             else:
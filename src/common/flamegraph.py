@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: flamegraph.py
+@desc: Stack folding of `perf script` output and flame graph SVG rendering in pure python.
+       The folded format is the one of stackcollapse-perf.pl: "comm;root_frame;...;leaf_frame count" per line.
+       FOLD_PERF_SCRIPT_AWK folds on the remote host with awk, so only the folded stacks are downloaded;
+       fold_perf_script does the same in python for packs that still contain the raw perf script text.
+"""
+import collections
+import hashlib
+import re
+from xml.sax.saxutils import escape
+
+# same rules as fold_perf_script, for `perf script | awk "$FOLD_PERF_SCRIPT_AWK"` on the observer host
+FOLD_PERF_SCRIPT_AWK = r'''
+function flush() {
+    if (comm != "") {
+        key = (stack == "") ? comm : comm ";" stack
+        counts[key]++
+    }
+    comm = ""; stack = ""
+}
+/^[ \t]*$/ { flush(); next }
+/^[ \t]/ {
+    if (comm == "") next
+    line = $0
+    sub(/^[ \t]+[0-9a-fA-F]+[ \t]+/, "", line)
+    dso = ""
+    if (match(line, / \([^()]*\)$/)) {
+        dso = substr(line, RSTART + 2, RLENGTH - 3)
+        line = substr(line, 1, RSTART - 1)
+    }
+    sub(/\+0x[0-9a-fA-F]+$/, "", line)
+    if (line == "[unknown]" && dso != "" && dso != "[unknown]") {
+        n = split(dso, parts, "/")
+        line = "[" parts[n] "]"
+    }
+    gsub(/;/, ":", line)
+    stack = (stack == "") ? line : line ";" stack
+    next
+}
+{
+    flush()
+    comm = $0
+    if (match(comm, /[ \t]+[0-9]+(\/[0-9]+)?[ \t]/)) comm = substr(comm, 1, RSTART - 1)
+    gsub(/;/, ":", comm)
+    gsub(/ /, "_", comm)
+}
+END {
+    flush()
+    for (key in counts) print key " " counts[key]
+}
+'''
+
+_ADDRESS_RE = re.compile(r'^[ \t]+[0-9a-fA-F]+[ \t]+')
+_DSO_RE = re.compile(r' \(([^()]*)\)$')
+_OFFSET_RE = re.compile(r'\+0x[0-9a-fA-F]+$')
+_COMM_RE = re.compile(r'[ \t]+[0-9]+(/[0-9]+)?[ \t]')
+
+
+def _frame_name(line):
+    line = _ADDRESS_RE.sub('', line, count=1)
+    dso = ""
+    m = _DSO_RE.search(line)
+    if m:
+        dso = m.group(1)
+        line = line[: m.start()]
+    line = _OFFSET_RE.sub('', line, count=1)
+    if line == "[unknown]" and dso and dso != "[unknown]":
+        line = "[{0}]".format(dso.split("/")[-1])
+    return line.replace(";", ":")
+
+
+def fold_perf_script(lines, counts=None):
+    """
+    Fold the text of `perf script` into a Counter of "comm;root;...;leaf" -> samples.
+    lines may be any iterable of str or bytes lines, e.g. a file object, it is consumed as a stream.
+    """
+    if counts is None:
+        counts = collections.Counter()
+    comm = None
+    stack = []
+
+    def flush():
+        if comm is not None:
+            counts[";".join([comm] + stack[::-1])] += 1
+
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", errors="replace")
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            flush()
+            comm = None
+            stack = []
+        elif line[0] in " \t":
+            if comm is not None:
+                stack.append(_frame_name(line))
+        else:
+            flush()
+            stack = []
+            m = _COMM_RE.search(line)
+            comm = (line[: m.start()] if m else line).replace(";", ":").replace(" ", "_")
+    flush()
+    return counts
+
+
+def read_folded(lines, counts=None):
+    """parse folded stack lines ("stack count") into a Counter, lines may be str or bytes"""
+    if counts is None:
+        counts = collections.Counter()
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", errors="replace")
+        line = line.strip()
+        if not line:
+            continue
+        stack, _, count = line.rpartition(" ")
+        try:
+            counts[stack] += int(count)
+        except ValueError:
+            continue
+    return counts
+
+
+def write_folded(counts, path):
+    with open(path, "w", encoding="utf-8") as f:
+        for stack in sorted(counts):
+            f.write("{0} {1}\n".format(stack, counts[stack]))
+
+
+def merge_folded(counters):
+    merged = collections.Counter()
+    for counts in counters:
+        merged.update(counts)
+    return merged
+
+
+class _Frame(object):
+    __slots__ = ("name", "value", "children")
+
+    def __init__(self, name):
+        self.name = name
+        self.value = 0
+        self.children = {}
+
+
+def _build_tree(counts):
+    root = _Frame("all")
+    for stack, count in counts.items():
+        if count <= 0:
+            continue
+        root.value += count
+        frame = root
+        for name in stack.split(";"):
+            child = frame.children.get(name)
+            if child is None:
+                child = frame.children[name] = _Frame(name)
+            child.value += count
+            frame = child
+    return root
+
+
+def _inclusive_shares(counts):
+    """path -> share of the samples of all stacks passing through path"""
+    total = float(sum(count for count in counts.values() if count > 0)) or 1.0
+    shares = collections.defaultdict(float)
+    for stack, count in counts.items():
+        if count <= 0:
+            continue
+        path = ""
+        for name in stack.split(";"):
+            path = name if not path else path + ";" + name
+            shares[path] += count / total
+    return shares
+
+
+def _hot_color(name):
+    # deterministic per name, like the "hot" palette of flamegraph.pl
+    digest = hashlib.md5(name.encode("utf-8", errors="replace")).digest()
+    v1, v2, v3 = digest[0] / 255.0, digest[1] / 255.0, digest[2] / 255.0
+    return "rgb({0},{1},{2})".format(int(205 + 50 * v3), int(230 * v1), int(55 * v2))
+
+
+def _diff_color(delta, max_delta):
+    if max_delta <= 0 or delta == 0:
+        return "rgb(250,250,250)"
+    k = int(210 * min(1.0, abs(delta) / max_delta))
+    if delta > 0:
+        return "rgb(255,{0},{0})".format(255 - k)
+    return "rgb({0},{0},255)".format(255 - k)
+
+
+def render_flame_svg(counts, title="Flame Graph", base_counts=None, width=1200, frame_height=16, min_width=0.1):
+    """
+    Render folded stacks as a flame graph SVG string. Frame widths follow counts.
+    With base_counts the graph is differential: a frame is red when its share of the samples grew compared to
+    base_counts and blue when it shrank, the stronger the color the larger the change.
+    """
+    root = _build_tree(counts)
+    deltas = None
+    max_delta = 0.0
+    if base_counts is not None:
+        new_shares = _inclusive_shares(counts)
+        base_shares = _inclusive_shares(base_counts)
+        deltas = {path: share - base_shares.get(path, 0.0) for path, share in new_shares.items()}
+        max_delta = max([abs(delta) for delta in deltas.values()] or [0.0])
+
+    xpad = 10
+    top = frame_height * 3
+    depth = 1 + max([stack.count(";") + 1 for stack, count in counts.items() if count > 0] or [0])
+    height = top + depth * frame_height + frame_height * 2
+    total = float(root.value) or 1.0
+    scale = (width - 2 * xpad) / total
+    out = []
+    out.append('<?xml version="1.0" standalone="no"?>\n')
+    out.append('<svg version="1.1" width="{0}" height="{1}" viewBox="0 0 {0} {1}" xmlns="http://www.w3.org/2000/svg">\n'.format(width, height))
+    out.append('<style type="text/css">text {{ font-family: Verdana, sans-serif; font-size: 12px; fill: rgb(0,0,0); }}</style>\n')
+    out.append('<rect x="0" y="0" width="{0}" height="{1}" fill="rgb(245,245,235)"/>\n'.format(width, height))
+    out.append('<text x="{0}" y="{1}" text-anchor="middle" style="font-size:17px">{2}</text>\n'.format(width / 2, frame_height * 1.5, escape(title)))
+
+    # iterative walk: (frame, path, level, x)
+    stack = [(root, "", 0, float(xpad))]
+    while stack:
+        frame, path, level, x = stack.pop()
+        frame_width = frame.value * scale
+        if frame_width < min_width:
+            continue
+        y = height - frame_height * 2 - (level + 1) * frame_height
+        if deltas is not None:
+            delta = deltas.get(path, 0.0) if path else 0.0
+            color = _diff_color(delta, max_delta)
+            info = "{0} ({1} samples, {2:.2f}%, {3:+.2f}%)".format(frame.name, frame.value, 100 * frame.value / total, 100 * delta)
+        else:
+            color = _hot_color(frame.name)
+            info = "{0} ({1} samples, {2:.2f}%)".format(frame.name, frame.value, 100 * frame.value / total)
+        out.append('<g><title>{0}</title><rect x="{1:.1f}" y="{2}" width="{3:.1f}" height="{4}" fill="{5}" rx="2" ry="2"/>'.format(escape(info), x, y, frame_width, frame_height - 1, color))
+        chars = int(frame_width / 7)
+        if chars >= 3:
+            label = frame.name if len(frame.name) <= chars else frame.name[: chars - 2] + ".."
+            out.append('<text x="{0:.1f}" y="{1}">{2}</text>'.format(x + 3, y + frame_height - 4, escape(label)))
+        out.append('</g>\n')
+        child_x = x
+        children = []
+        for name in sorted(frame.children):
+            child = frame.children[name]
+            children.append((child, name if not path else path + ";" + name, level + 1, child_x))
+            child_x += child.value * scale
+        stack.extend(reversed(children))
+    out.append('</svg>\n')
+    return "".join(out)
+
+
+def write_flame_svg(counts, path, title="Flame Graph", base_counts=None):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(render_flame_svg(counts, title=title, base_counts=base_counts))
@@ -0,0 +1,503 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: log_index.py
+@desc: a searchable index of the logs in a gather pack (a dir, a tar/tar.gz or a zip), stored in a sqlite file next to
+       the pack. The lines are kept as zlib blocks with their time range and level counts, the trace ids, ret codes and
+       tenant ids point to the blocks they appear in, so a query only reads the blocks that can match.
+"""
+import fnmatch
+import gzip
+import hashlib
+import heapq
+import json
+import os
+import re
+import sqlite3
+import tarfile
+import time
+import zipfile
+import zlib
+
+INDEX_SUFFIX = ".obdiag_log_index.db"
+INDEX_VERSION = 1
+# a block is flushed once it holds this many bytes of text
+BLOCK_BYTES = 64 * 1024
+READ_CHUNK = 1024 * 1024
+
+LEVEL_SEVERITY = {"DEBUG": 0, "TRACE": 1, "INFO": 2, "WDIAG": 3, "WARN": 3, "EDIAG": 4, "ERROR": 4, "FATAL": 5}
+LEVEL_WARN = 3
+LEVEL_ERROR = 4
+
+_LEVEL_RE = re.compile(r"\] (DEBUG|TRACE|INFO|WDIAG|WARN|EDIAG|ERROR|FATAL)\b")
+_TRACE_RE = re.compile(r"\[(Y[0-9A-Fa-f]+-[0-9A-Fa-f]+(?:-\d+){0,2})\]")
+_RET_RE = re.compile(r"\bret=(-\d+)")
+_TENANT_RE = re.compile(r"\[T(\d+)\]|tenant_id[=:] ?(\d+)")
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE members (id INTEGER PRIMARY KEY, name TEXT, lines INTEGER, bytes INTEGER, ts_min TEXT, ts_max TEXT);
+CREATE TABLE blocks (id INTEGER PRIMARY KEY, member_id INTEGER, first_line INTEGER, lines INTEGER, ts_min TEXT, ts_max TEXT, n_warn INTEGER, n_error INTEGER, data BLOB);
+CREATE TABLE terms (kind TEXT, value TEXT, block_id INTEGER, hits INTEGER);
+"""
+_INDEXES = """
+CREATE INDEX idx_blocks_ts ON blocks (ts_min, ts_max);
+CREATE INDEX idx_terms ON terms (kind, value, block_id);
+"""
+
+
+def index_path(pack_path):
+    return os.path.abspath(pack_path).rstrip(os.sep) + INDEX_SUFFIX
+
+
+def _normalize_time(value):
+    if not value:
+        return None
+    return str(value).strip().replace("T", " ")[:19]
+
+
+def _normalize_trace(value):
+    return str(value).strip().strip("[]") if value else None
+
+
+def parse_line(line, last_ts=None):
+    """(timestamp "YYYY-MM-DD HH:MM:SS", level, {kind: [values]}) of an observer / obproxy log line, a line that
+    does not start with a timestamp (e.g. the rest of a stack) keeps the timestamp of the line before it"""
+    ts = last_ts
+    level = None
+    if line.startswith("[") and line[1:5].isdigit() and line[5:6] == "-":
+        ts = line[1:20]
+        match = _LEVEL_RE.search(line, 20, 80)
+        if match:
+            level = match.group(1)
+    terms = {}
+    if "[Y" in line:
+        traces = _TRACE_RE.findall(line)
+        if traces:
+            terms["trace"] = traces
+    if "ret=" in line:
+        rets = _RET_RE.findall(line)
+        if rets:
+            terms["ret"] = rets
+    if "[T" in line or "tenant_id" in line:
+        tenants = [a or b for a, b in _TENANT_RE.findall(line)]
+        if tenants:
+            terms["tenant"] = tenants
+    return ts, level, terms
+
+
+def _iter_lines(fileobj):
+    pending = b""
+    first = True
+    while True:
+        chunk = fileobj.read(READ_CHUNK)
+        if not chunk:
+            break
+        if first:
+            first = False
+            if b"\x00" in chunk[:8192]:
+                # binary member (a core, a perf data), nothing to index
+                return
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.decode("utf-8", errors="replace").rstrip("\r")
+    if pending:
+        yield pending.decode("utf-8", errors="replace").rstrip("\r")
+
+
+def _expand(name, fileobj):
+    lower = name.lower()
+    if lower.endswith((".tar.gz", ".tgz", ".tar")):
+        with tarfile.open(fileobj=fileobj, mode="r|*") as tar:
+            for member in tar:
+                if member.isfile():
+                    for item in _expand("{0}/{1}".format(name, member.name), tar.extractfile(member)):
+                        yield item
+    elif lower.endswith(".gz"):
+        with gzip.GzipFile(fileobj=fileobj) as f:
+            for item in _expand(name[:-3], f):
+                yield item
+    else:
+        yield name, fileobj
+
+
+def iter_pack_sources(pack_path):
+    """(member name, binary file object) of every file in the pack, archives inside the pack are walked as well"""
+    pack_path = os.path.abspath(pack_path)
+    if os.path.isdir(pack_path):
+        for root, dirs, files in os.walk(pack_path):
+            dirs.sort()
+            for file_name in sorted(files):
+                if file_name.endswith(INDEX_SUFFIX):
+                    continue
+                path = os.path.join(root, file_name)
+                with open(path, "rb") as f:
+                    for item in _iter_file_sources(os.path.relpath(path, pack_path), path, f):
+                        yield item
+    else:
+        with open(pack_path, "rb") as f:
+            for item in _iter_file_sources(os.path.basename(pack_path), pack_path, f):
+                yield item
+
+
+def _iter_file_sources(name, path, f):
+    if name.lower().endswith(".zip"):
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                if info.is_dir() or info.flag_bits & 0x1:
+                    # directories and encrypted members are skipped
+                    continue
+                with zf.open(info) as member:
+                    for item in _expand("{0}/{1}".format(name, info.filename), member):
+                        yield item
+    else:
+        for item in _expand(name, f):
+            yield item
+
+
+def pack_signature(pack_path):
+    pack_path = os.path.abspath(pack_path)
+    entries = []
+    if os.path.isdir(pack_path):
+        for root, dirs, files in os.walk(pack_path):
+            for file_name in files:
+                if file_name.endswith(INDEX_SUFFIX):
+                    continue
+                stat = os.stat(os.path.join(root, file_name))
+                entries.append((os.path.relpath(os.path.join(root, file_name), pack_path), stat.st_size, int(stat.st_mtime)))
+    else:
+        stat = os.stat(pack_path)
+        entries.append((os.path.basename(pack_path), stat.st_size, int(stat.st_mtime)))
+    entries.sort()
+    return hashlib.sha1(json.dumps([INDEX_VERSION, entries]).encode("utf-8")).hexdigest()
+
+
+def _find_all(text, literal, ignore_case):
+    if ignore_case:
+        if not text.isascii():
+            for match in re.finditer(re.escape(literal), text, re.IGNORECASE):
+                yield match.start(), match.end()
+            return
+        text = text.lower()
+        literal = literal.lower()
+    pos = text.find(literal)
+    while pos != -1:
+        yield pos, pos + len(literal)
+        pos = text.find(literal, pos + len(literal))
+
+
+def _iter_block_lines(text, needle=None, ignore_case=False):
+    """(line index, offset, line) of every line of a block, or only of the lines that contain the literal needle"""
+    if needle is None:
+        offset = 0
+        for i, line in enumerate(text.split("\n")):
+            yield i, offset, line
+            offset += len(line) + 1
+        return
+    line_no = 0
+    counted = 0
+    line_end = -1
+    for match_start, match_end in _find_all(text, needle, ignore_case):
+        if match_start <= line_end:
+            # another hit on the line just returned
+            continue
+        start = text.rfind("\n", 0, match_start) + 1
+        line_no += text.count("\n", counted, start)
+        counted = start
+        line_end = text.find("\n", match_end)
+        if line_end == -1:
+            line_end = len(text)
+        yield line_no, start, text[start:line_end]
+
+
+def _previous_ts(text, offset, max_lines=200):
+    # the timestamp of the closest line at or before offset that has one (a stack line belongs to the entry above it)
+    for _ in range(max_lines):
+        if text.startswith("[", offset) and text[offset + 1 : offset + 5].isdigit():
+            return text[offset + 1 : offset + 20]
+        if offset == 0:
+            return None
+        offset = text.rfind("\n", 0, offset - 1) + 1
+    return None
+
+
+def _context(text, start, end, count):
+    if not count:
+        return [], []
+    head = start
+    for _ in range(count):
+        if head == 0:
+            break
+        head = text.rfind("\n", 0, head - 1) + 1
+    tail = end
+    for _ in range(count):
+        if tail >= len(text):
+            break
+        next_end = text.find("\n", tail + 1)
+        tail = len(text) if next_end == -1 else next_end
+    before = text[head:start].split("\n")[:-1] if head < start else []
+    after = text[end + 1 : tail].split("\n") if tail > end else []
+    return before, after
+
+
+class _BlockWriter(object):
+    def __init__(self, db, member_id):
+        self.db = db
+        self.member_id = member_id
+        self.next_line = 1
+        self.reset()
+
+    def reset(self):
+        self.lines = []
+        self.size = 0
+        self.ts_min = None
+        self.ts_max = None
+        self.n_warn = 0
+        self.n_error = 0
+        self.terms = {}
+
+    def add(self, line, ts, level, terms):
+        self.lines.append(line)
+        self.size += len(line) + 1
+        if ts:
+            if self.ts_min is None or ts < self.ts_min:
+                self.ts_min = ts
+            if self.ts_max is None or ts > self.ts_max:
+                self.ts_max = ts
+        severity = LEVEL_SEVERITY.get(level, 0)
+        if severity >= LEVEL_ERROR:
+            self.n_error += 1
+        elif severity >= LEVEL_WARN:
+            self.n_warn += 1
+        for kind, values in terms.items():
+            for value in values:
+                key = (kind, value)
+                self.terms[key] = self.terms.get(key, 0) + 1
+        if self.size >= BLOCK_BYTES:
+            self.flush()
+
+    def flush(self):
+        if not self.lines:
+            return
+        data = zlib.compress("\n".join(self.lines).encode("utf-8"), 6)
+        cursor = self.db.execute(
+            "INSERT INTO blocks (member_id, first_line, lines, ts_min, ts_max, n_warn, n_error, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (self.member_id, self.next_line, len(self.lines), self.ts_min, self.ts_max, self.n_warn, self.n_error, data),
+        )
+        block_id = cursor.lastrowid
+        self.db.executemany("INSERT INTO terms (kind, value, block_id, hits) VALUES (?, ?, ?, ?)", [(kind, value, block_id, hits) for (kind, value), hits in self.terms.items()])
+        self.next_line += len(self.lines)
+        self.reset()
+
+
+class LogPackIndex(object):
+    """
+    index = LogPackIndex(pack_path).open()   # built on the first use, reused while the pack does not change
+    index.search(keyword="ret=-4012", level="WARN", start_time="2024-01-01 10:00:00", limit=20)
+    """
+
+    def __init__(self, pack_path, path=None):
+        self.pack_path = os.path.abspath(pack_path)
+        self.path = path or index_path(pack_path)
+        self.db = None
+        self.built = False
+        self.build_seconds = 0.0
+
+    def open(self, rebuild=False):
+        signature = pack_signature(self.pack_path)
+        if not rebuild and os.path.exists(self.path):
+            try:
+                db = sqlite3.connect(self.path)
+                row = db.execute("SELECT value FROM meta WHERE key = 'signature'").fetchone()
+                if row and row[0] == signature:
+                    self.db = db
+                    return self
+                db.close()
+            except sqlite3.DatabaseError:
+                pass
+        self.build(signature)
+        self.db = sqlite3.connect(self.path)
+        return self
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def build(self, signature=None):
+        start = time.time()
+        temp_path = "{0}.{1}.tmp".format(self.path, os.getpid())
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        db = sqlite3.connect(temp_path)
+        try:
+            db.executescript(_SCHEMA)
+            for name, fileobj in iter_pack_sources(self.pack_path):
+                member_id = db.execute("INSERT INTO members (name) VALUES (?)", (name,)).lastrowid
+                writer = _BlockWriter(db, member_id)
+                last_ts = None
+                ts_min = ts_max = None
+                size = 0
+                for line in _iter_lines(fileobj):
+                    ts, level, terms = parse_line(line, last_ts)
+                    if ts and ts != last_ts:
+                        if ts_min is None or ts < ts_min:
+                            ts_min = ts
+                        if ts_max is None or ts > ts_max:
+                            ts_max = ts
+                        last_ts = ts
+                    size += len(line) + 1
+                    writer.add(line, ts, level, terms)
+                writer.flush()
+                if writer.next_line == 1:
+                    db.execute("DELETE FROM members WHERE id = ?", (member_id,))
+                    continue
+                db.execute("UPDATE members SET lines = ?, bytes = ?, ts_min = ?, ts_max = ? WHERE id = ?", (writer.next_line - 1, size, ts_min, ts_max, member_id))
+            db.executescript(_INDEXES)
+            self.build_seconds = time.time() - start
+            db.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?)",
+                [("signature", signature or pack_signature(self.pack_path)), ("version", str(INDEX_VERSION)), ("pack_path", self.pack_path), ("build_seconds", "{0:.3f}".format(self.build_seconds))],
+            )
+            db.commit()
+        finally:
+            db.close()
+        os.replace(temp_path, self.path)
+        self.built = True
+
+    def summary(self, top=10):
+        db = self.db
+        members = db.execute("SELECT name, lines, bytes, ts_min, ts_max FROM members ORDER BY name").fetchall()
+        levels = db.execute("SELECT COALESCE(SUM(n_warn), 0), COALESCE(SUM(n_error), 0) FROM blocks").fetchone()
+
+        def top_terms(kind):
+            return db.execute("SELECT value, SUM(hits) AS n FROM terms WHERE kind = ? GROUP BY value ORDER BY n DESC LIMIT ?", (kind, top)).fetchall()
+
+        return {
+            "members": [{"name": m[0], "lines": m[1], "bytes": m[2], "from": m[3], "to": m[4]} for m in members],
+            "from": min([m[3] for m in members if m[3]] or [None]),
+            "to": max([m[4] for m in members if m[4]] or [None]),
+            "warn_lines": levels[0],
+            "error_lines": levels[1],
+            "top_ret_codes": top_terms("ret"),
+            "top_tenants": top_terms("tenant"),
+            "trace_count": db.execute("SELECT COUNT(DISTINCT value) FROM terms WHERE kind = 'trace'").fetchone()[0],
+        }
+
+    def _candidate_blocks(self, start_time, end_time, min_severity, terms, member_pattern):
+        sql = "SELECT b.id, m.name, b.first_line, b.data FROM blocks b JOIN members m ON m.id = b.member_id WHERE 1 = 1"
+        args = []
+        if start_time:
+            sql += " AND (b.ts_max IS NULL OR b.ts_max >= ?)"
+            args.append(start_time)
+        if end_time:
+            sql += " AND (b.ts_min IS NULL OR b.ts_min <= ?)"
+            args.append(end_time)
+        if min_severity >= LEVEL_ERROR:
+            sql += " AND b.n_error > 0"
+        elif min_severity >= LEVEL_WARN:
+            sql += " AND (b.n_warn > 0 OR b.n_error > 0)"
+        for kind, value in terms:
+            sql += " AND EXISTS (SELECT 1 FROM terms t WHERE t.block_id = b.id AND t.kind = ? AND t.value = ?)"
+            args.extend([kind, value])
+        sql += " ORDER BY b.id"
+        for row in self.db.execute(sql, args):
+            if member_pattern and not fnmatch.fnmatch(row[1], member_pattern) and not fnmatch.fnmatch(os.path.basename(row[1]), member_pattern):
+                continue
+            yield row
+
+    def search(self, keyword=None, start_time=None, end_time=None, level=None, trace_id=None, ret_code=None, tenant_id=None, member_pattern=None, limit=20, context_lines=0):
+        """
+        the matching lines, ranked by level (FATAL first), then by the number of keyword hits, then by time.
+        :return: {"hits": [{member, line, time, level, text, before, after}], "total": n, "blocks_read": n, "elapsed_ms": f}
+        """
+        start = time.time()
+        start_time = _normalize_time(start_time)
+        end_time = _normalize_time(end_time)
+        min_severity = LEVEL_SEVERITY.get(str(level).upper(), 0) if level else 0
+        terms = []
+        trace_id = _normalize_trace(trace_id)
+        if trace_id:
+            terms.append(("trace", trace_id))
+        if ret_code is not None and str(ret_code) != "":
+            ret_code = str(ret_code).strip()
+            terms.append(("ret", ret_code if ret_code.startswith("-") else "-" + ret_code))
+        if tenant_id is not None and str(tenant_id) != "":
+            terms.append(("tenant", str(tenant_id).strip()))
+        keyword_re = re.compile(re.escape(keyword), re.IGNORECASE) if keyword else None
+        level_re = _LEVEL_RE if min_severity else None
+        # the most selective filter with a literal is searched over the whole block, only its lines are looked at
+        needle = None
+        ignore_case = False
+        if trace_id:
+            needle = trace_id
+        elif keyword:
+            needle, ignore_case = keyword, True
+        elif any(kind == "ret" for kind, value in terms):
+            needle = "ret=" + dict(terms)["ret"]
+        limit = max(1, int(limit))
+        heap = []
+        total = 0
+        blocks_read = 0
+        order = 0
+        for block_id, name, first_line, data in self._candidate_blocks(start_time, end_time, min_severity, terms, member_pattern):
+            blocks_read += 1
+            text = zlib.decompress(data).decode("utf-8")
+            ts = None
+            for i, line_start, line in _iter_block_lines(text, needle, ignore_case):
+                # cheap rejects first (timestamp slice, substrings), the full parse only for the lines left
+                if line.startswith("[") and line[1:5].isdigit():
+                    ts = line[1:20]
+                elif needle is not None:
+                    ts = _previous_ts(text, line_start)
+                if start_time and (ts is None or ts < start_time):
+                    continue
+                if end_time and (ts is None or ts > end_time):
+                    continue
+                if any(value not in line for kind, value in terms):
+                    continue
+                if level_re is not None:
+                    match = level_re.search(line, 20, 80)
+                    if not match or LEVEL_SEVERITY[match.group(1)] < min_severity:
+                        continue
+                keyword_hits = 0
+                if keyword_re is not None:
+                    keyword_hits = len(keyword_re.findall(line))
+                    if not keyword_hits:
+                        continue
+                line_ts, line_level, line_terms = parse_line(line, ts)
+                if any(value not in line_terms.get(kind, ()) for kind, value in terms):
+                    continue
+                severity = LEVEL_SEVERITY.get(line_level, 0)
+                total += 1
+                order += 1
+                # the heap keeps the best `limit` hits: higher level, more keyword hits, earlier line
+                rank = (severity, keyword_hits, -order)
+                if len(heap) >= limit and rank <= heap[0][0]:
+                    continue
+                before, after = _context(text, line_start, line_start + len(line), context_lines)
+                hit = {"member": name, "line": first_line + i, "time": line_ts, "level": line_level, "text": line, "before": before, "after": after}
+                if len(heap) < limit:
+                    heapq.heappush(heap, (rank, order, hit))
+                else:
+                    heapq.heapreplace(heap, (rank, order, hit))
+        hits = [item[2] for item in sorted(heap, key=lambda item: item[0], reverse=True)]
+        return {"hits": hits, "total": total, "blocks_read": blocks_read, "elapsed_ms": (time.time() - start) * 1000}
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: node_runner.py
+@desc: Run one step of a gather on many nodes at once, with a parallelism limit and a deadline.
+"""
+import re
+import threading
+import time
+
+
+def node_key(node):
+    """
+    Name of a node in the results and in the local / remote file names of a gather: its ip plus its home_path
+    (ssh_port without one), so two observers of the same host do not take each other's results or files.
+    """
+    key = str(node.get("ip") or "")
+    suffix = node.get("home_path") or (node.get("ssh_port") and str(node.get("ssh_port")))
+    if suffix:
+        key = "{0}_{1}".format(key, str(suffix).strip("/"))
+    return re.sub(r"[^0-9A-Za-z._-]+", "_", key)
+
+
+class NodeOutcome(object):
+    def __init__(self, item, name):
+        self.item = item
+        self.name = name
+        self.status = "timeout"
+        self.result = None
+        self.error = ""
+        self.elapsed = 0.0
+
+    @property
+    def ok(self):
+        return self.status == "ok"
+
+
+class NodeRunner(object):
+    """
+    Call func(item) for every item on its own daemon thread, at most max_workers at a time.
+    The caller waits until `deadline` (a time.time() value) at most: an item not finished by then is reported
+    as timed out and left behind, so one hung node (e.g. obstack ptracing a busy observer) can not hold the
+    others back. Items still queued at the deadline are not started.
+    on_done(outcome) is called as soon as an item finishes, one call at a time, so results can be shown
+    while the slower items are still running.
+    """
+
+    def __init__(self, stdio, max_workers=None, deadline=None):
+        self.stdio = stdio
+        self.max_workers = max_workers
+        self.deadline = deadline
+
+    def run(self, items, func, name=str, on_done=None):
+        items = list(items)
+        outcomes = [NodeOutcome(item, name(item)) for item in items]
+        if not items:
+            return outcomes
+        sema = threading.BoundedSemaphore(max(1, min(self.max_workers or len(items), len(items))))
+        lock = threading.Lock()
+        done_lock = threading.Lock()
+
+        def work(outcome):
+            with sema:
+                if self.deadline is not None and time.time() >= self.deadline:
+                    with lock:
+                        outcome.error = "not started before the deadline"
+                    return
+                start = time.time()
+                try:
+                    result = func(outcome.item)
+                    with lock:
+                        outcome.status, outcome.result = "ok", result
+                except Exception as e:
+                    self.stdio.verbose("{0}: {1}".format(outcome.name, e))
+                    with lock:
+                        outcome.status, outcome.error = "error", str(e)
+                finally:
+                    with lock:
+                        outcome.elapsed = time.time() - start
+                if on_done is not None:
+                    with done_lock:
+                        try:
+                            on_done(outcome)
+                        except Exception as e:
+                            self.stdio.verbose("{0}: on_done failed: {1}".format(outcome.name, e))
+
+        threads = []
+        for outcome in outcomes:
+            thread = threading.Thread(target=work, args=(outcome,), name="node-{0}".format(outcome.name), daemon=True)
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join(None if self.deadline is None else max(0, self.deadline - time.time()))
+        with lock:
+            # snapshot, a thread left behind must not change what the caller already looked at
+            snapshot = []
+            for outcome in outcomes:
+                copied = NodeOutcome(outcome.item, outcome.name)
+                copied.status, copied.result, copied.error, copied.elapsed = outcome.status, outcome.result, outcome.error, outcome.elapsed
+                if copied.status == "timeout" and not copied.error:
+                    copied.error = "not finished before the deadline"
+                snapshot.append(copied)
+        for outcome in snapshot:
+            if outcome.status == "timeout":
+                self.stdio.warn("{0}: {1}, skip it".format(outcome.name, outcome.error))
+        return snapshot
@@ -15,12 +15,65 @@
 @file: ob_connector.py
 @desc:
 """
+import collections
+import hashlib
 import re
+import threading
+import time
+from contextlib import contextmanager
 
 from prettytable import from_db_cursor
 
 import pymysql as mysql
 
+# idle seconds after which a connection is pinged before use
+HEALTH_CHECK_INTERVAL = 30
+DEFAULT_POOL_SIZE = 8
+# client errors meaning the connection is gone: the statement is retried once on a new connection
+CONNECTION_LOST_ERRORS = (0, 2006, 2013)
+# the session timeouts obdiag runs with (about 100 years, in microseconds)
+SESSION_TIMEOUT_US = 3216672000000000
+# seconds the client waits for a bounded statement after its ob_query_timeout, so the error of the server comes first
+READ_TIMEOUT_MARGIN = 5
+
+
+class QueryMetrics(object):
+    """Latency and row count of the queries run by a connector or a pool"""
+
+    SLOWEST_KEEP = 10
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_time = 0.0
+        self.slowest = []
+        self._lock = threading.Lock()
+
+    def record(self, sql, elapsed, rows, error=False):
+        with self._lock:
+            self.count += 1
+            self.total_time += elapsed
+            if error:
+                self.errors += 1
+            elif rows and rows > 0:
+                self.rows += rows
+            if len(self.slowest) < self.SLOWEST_KEEP or elapsed > self.slowest[-1][0]:
+                self.slowest.append((elapsed, rows, sql))
+                self.slowest.sort(key=lambda item: item[0], reverse=True)
+                del self.slowest[self.SLOWEST_KEEP :]
+
+    def summary(self):
+        with self._lock:
+            return {
+                "count": self.count,
+                "errors": self.errors,
+                "rows": self.rows,
+                "total_time": round(self.total_time, 3),
+                "avg_time": round(self.total_time / self.count, 3) if self.count else 0,
+                "slowest": [{"time": round(elapsed, 3), "rows": rows, "sql": sql} for elapsed, rows, sql in self.slowest],
+            }
+
 
 class OBConnector(object):
     # sql be upper
@@ -36,6 +89,8 @@ class OBConnector(object):
         password=None,
         database=None,
         timeout=30,
+        metrics=None,
+        health_check_interval=HEALTH_CHECK_INTERVAL,
     ):
         self.context = context
         self.ip = str(ip)
@@ -46,6 +101,9 @@ class OBConnector(object):
         self.conn = None
         self.stdio = context.stdio
         self.database = database
+        self.metrics = metrics or QueryMetrics()
+        self.health_check_interval = health_check_interval
+        self._last_active = 0
         self.init()
 
     def init(self):
@@ -77,27 +135,79 @@ class OBConnector(object):
                 connect_timeout=30,
             )
             self.stdio.verbose("connect databse ...")
+            self._last_active = time.time()
         except mysql.Error as e:
             self.stdio.error("connect OB: {0}:{1} with user {2} failed, error:{3}".format(self.ip, self.port, self.username, e))
             return
+        self._init_session()
+
+    def _init_session(self):
         try:
-            ob_trx_timeout = 3216672000000000
-            self.execute_sql("SET SESSION ob_trx_timeout={0};".format(ob_trx_timeout))
+            self.execute_sql("SET SESSION ob_trx_timeout={0};".format(SESSION_TIMEOUT_US))
         except Exception as e:
             self.stdio.warn("set ob_trx_timeout failed, error:{0}".format(e))
         try:
-            ob_query_timeout = 3216672000000000
-            self.execute_sql("SET SESSION ob_query_timeout={0};".format(ob_query_timeout))
+            self.execute_sql("SET SESSION ob_query_timeout={0};".format(SESSION_TIMEOUT_US))
         except Exception as e:
             self.stdio.warn("set ob_query_timeout failed, error:{0}".format(e))
 
-    def execute_sql(self, sql):
+    def set_query_timeout(self, seconds=None):
+        """
+        Bound the next statements of this session to seconds: ob_query_timeout stops them on the server and the socket
+        read timeout on the client. None gives the session back its unbounded timeouts.
+        """
+        self._ensure_connected()
+        if seconds is None:
+            self.execute_sql("SET SESSION ob_query_timeout={0};".format(SESSION_TIMEOUT_US))
+            self.conn._read_timeout = None
+        else:
+            self.execute_sql("SET SESSION ob_query_timeout={0};".format(max(1, int(seconds * 1000000))))
+            self.conn._read_timeout = seconds + READ_TIMEOUT_MARGIN
+
+    def _ensure_connected(self):
+        """connect if needed; ping only when the connection was idle longer than health_check_interval"""
         if self.conn is None:
             self._connect_db()
-        else:
+        elif time.time() - self._last_active > self.health_check_interval:
+            thread_id = self.conn.thread_id()
             self.conn.ping(reconnect=True)
-        cursor = self.conn.cursor()
-        cursor.execute(sql)
+            self._last_active = time.time()
+            if self.conn.thread_id() != thread_id:
+                # reconnected, the session variables are gone
+                self._init_session()
+
+    def _is_connection_lost(self, e):
+        return isinstance(e, (mysql.err.OperationalError, mysql.err.InterfaceError)) and (not e.args or e.args[0] in CONNECTION_LOST_ERRORS)
+
+    def _execute(self, sql, params=None, cursor_class=None):
+        """execute sql on a new cursor and return it, retry once if the connection was lost since the last health check"""
+        self._ensure_connected()
+        start = time.time()
+        for retry in (True, False):
+            cursor = self.conn.cursor(cursor_class) if cursor_class else self.conn.cursor()
+            try:
+                if params:
+                    cursor.execute(sql, params)
+                else:
+                    cursor.execute(sql)
+                break
+            except Exception as e:
+                cursor.close()
+                if retry and self._is_connection_lost(e):
+                    self.stdio.verbose("connection lost, reconnect and retry: {0}".format(e))
+                    self.conn.ping(reconnect=True)
+                    self._init_session()
+                    continue
+                self.metrics.record(sql, time.time() - start, 0, error=True)
+                raise
+        self._last_active = time.time()
+        elapsed = self._last_active - start
+        self.metrics.record(sql, elapsed, cursor.rowcount)
+        self.stdio.verbose("execute sql cost %.3fs, rows %s", elapsed, cursor.rowcount)
+        return cursor
+
+    def execute_sql(self, sql, params=None):
+        cursor = self._execute(sql, params)
         ret = cursor.fetchall()
         cursor.close()
         return ret
@@ -110,55 +220,57 @@ class OBConnector(object):
         :param parameters: A tuple or list of parameters to substitute into the SQL statement.
         :return: A tuple containing a list of column names and a list of rows (each a tuple).
         """
-        if self.conn is None:
-            self._connect_db()
-        else:
-            self.conn.ping(reconnect=True)
-
-        with self.conn.cursor() as cursor:
-            if params:
-                cursor.execute(sql, params)
-            else:
-                cursor.execute(sql)
-
+        with self._execute(sql, params) as cursor:
             column_names = [col[0] for col in cursor.description]
             data = cursor.fetchall()
         return column_names, data
 
-    def execute_sql_return_cursor_dictionary(self, sql):
-        if self.conn is None:
-            self._connect_db()
-        else:
-            self.conn.ping(reconnect=True)
-        cursor = self.conn.cursor(mysql.cursors.DictCursor)
-        cursor.execute(sql)
-        return cursor
+    def execute_sql_return_cursor_dictionary(self, sql, params=None):
+        return self._execute(sql, params, mysql.cursors.DictCursor)
 
-    def execute_sql_return_cursor(self, sql):
-        if self.conn is None:
-            self._connect_db()
-        else:
-            self.conn.ping(reconnect=True)
-        cursor = self.conn.cursor()
-        cursor.execute(sql)
-        return cursor
+    def execute_sql_return_cursor(self, sql, params=None):
+        return self._execute(sql, params)
 
-    def execute_sql_pretty(self, sql):
-        if self.conn is None:
-            self._connect_db()
-        else:
-            self.conn.ping(reconnect=True)
-        cursor = self.conn.cursor()
-        cursor.execute(sql)
+    def iter_sql(self, sql, params=None, dictionary=False, batch_size=1000):
+        """
+        Stream the rows of a large result set with a server side cursor (SSCursor), only batch_size rows are held in memory.
+        The connection can not run other statements until the iteration is finished or the generator is closed.
+
+        :param dictionary: yield dict rows instead of tuples
+        """
+        self._ensure_connected()
+        cursor = self.conn.cursor(mysql.cursors.SSDictCursor if dictionary else mysql.cursors.SSCursor)
+        start = time.time()
+        rows = 0
+        error = False
+        try:
+            if params:
+                cursor.execute(sql, params)
+            else:
+                cursor.execute(sql)
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                for row in batch:
+                    rows += 1
+                    yield row
+        except Exception:
+            error = True
+            raise
+        finally:
+            cursor.close()
+            self._last_active = time.time()
+            self.metrics.record(sql, self._last_active - start, rows, error=error)
+
+    def execute_sql_pretty(self, sql, params=None):
+        cursor = self._execute(sql, params)
         ret = from_db_cursor(cursor)
         cursor.close()
         return ret
 
     def execute_display_cursor(self, business_sql):
-        if self.conn is None:
-            self._connect_db()
-        else:
-            self.conn.ping(reconnect=True)
+        self._ensure_connected()
         cursor = self.conn.cursor()
         try:
             cursor.execute("SET TRANSACTION ISOLATION LEVEL READ COMMITTED")
@@ -182,10 +294,7 @@ class OBConnector(object):
         :param suffix: A string used to identify the current trace session.
         :param business_sql: The actual SQL statement to be explained.
         """
-        if self.conn is None:
-            self._connect_db()
-        else:
-            self.conn.ping(reconnect=True)
+        self._ensure_connected()
         cursor = self.conn.cursor()
         try:
             self.stdio.print("execute dbms_xplan.enable_opt_trace start ...")
@@ -223,15 +332,21 @@ class OBConnector(object):
                 cursor.close()
 
     def callproc(self, procname, args=()):
-        if self.conn is None:
-            self._connect_db()
-        else:
-            self.conn.ping(reconnect=True)
+        self._ensure_connected()
         cursor = self.conn.cursor()
         cursor.callproc(procname, args)
         ret = cursor.fetchall()
+        self._last_active = time.time()
         return ret
 
+    def close(self):
+        if self.conn:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+            self.conn = None
+
     def filter_sql(self, sql):
         sql = sql.strip().upper()
         for sql in self.filter_sql_list:
@@ -239,3 +354,176 @@ class OBConnector(object):
         for filter_sql in self.filter_sql_re_list:
             if re.match(filter_sql, sql):
                 raise Exception('sql is not safe ,not support. sql: {0}'.format(sql))
+
+
+class OBConnectorPool(object):
+    """
+    Thread-safe pool of OBConnector. Connections are opened on demand up to max_size and only pinged when they
+    were idle longer than health_check_interval. The pool also offers the query API of OBConnector, every call
+    borrowing a connection, so it can replace an OBConnector shared by threads for stateless queries.
+    Statements that depend on session state must use one connection: `with pool.connection() as conn: ...`.
+    """
+
+    # the unsafe statements of OBConnector, for filter_sql
+    filter_sql_list = OBConnector.filter_sql_list
+    filter_sql_re_list = OBConnector.filter_sql_re_list
+
+    def __init__(self, context, ip, port, username, password=None, database=None, timeout=30, max_size=DEFAULT_POOL_SIZE, health_check_interval=HEALTH_CHECK_INTERVAL):
+        self.context = context
+        self.stdio = context.stdio
+        self.ip = ip
+        self.port = port
+        self.username = username
+        self.password = password
+        self.database = database
+        self.timeout = timeout
+        self.max_size = max(1, int(max_size))
+        self.health_check_interval = health_check_interval
+        self.metrics = QueryMetrics()
+        self._idle = collections.deque()
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def get_connection(self, timeout=30):
+        """borrow a connection, wait up to timeout seconds when max_size connections are in use"""
+        deadline = time.time() + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise Exception("OBConnectorPool is closed")
+                if self._idle:
+                    # LIFO: the most recently used connection is the least likely to need a health check
+                    return self._idle.pop()
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise Exception("get connection from OBConnectorPool timeout: {0} connections in use".format(self._size))
+                self._cond.wait(remaining)
+        try:
+            return OBConnector(
+                context=self.context,
+                ip=self.ip,
+                port=self.port,
+                username=self.username,
+                password=self.password,
+                database=self.database,
+                timeout=self.timeout,
+                metrics=self.metrics,
+                health_check_interval=self.health_check_interval,
+            )
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def release_connection(self, conn):
+        if conn is None:
+            return
+        with self._cond:
+            if self._closed:
+                conn.close()
+                self._size -= 1
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout=30):
+        conn = self.get_connection(timeout)
+        try:
+            yield conn
+        finally:
+            self.release_connection(conn)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                self._idle.pop().close()
+                self._size -= 1
+            self._cond.notify_all()
+
+    def execute_sql(self, sql, params=None):
+        with self.connection() as conn:
+            return conn.execute_sql(sql, params)
+
+    def execute_sql_return_columns_and_data(self, sql, params=None):
+        with self.connection() as conn:
+            return conn.execute_sql_return_columns_and_data(sql, params)
+
+    def execute_sql_return_cursor_dictionary(self, sql, params=None):
+        # pymysql cursors buffer the whole result, they stay readable after the connection is released
+        with self.connection() as conn:
+            return conn.execute_sql_return_cursor_dictionary(sql, params)
+
+    def execute_sql_return_cursor(self, sql, params=None):
+        with self.connection() as conn:
+            return conn.execute_sql_return_cursor(sql, params)
+
+    def execute_sql_pretty(self, sql, params=None):
+        with self.connection() as conn:
+            return conn.execute_sql_pretty(sql, params)
+
+    def execute_display_cursor(self, business_sql):
+        with self.connection() as conn:
+            return conn.execute_display_cursor(business_sql)
+
+    def execute_enable_opt_trace(self, suffix, business_sql):
+        with self.connection() as conn:
+            return conn.execute_enable_opt_trace(suffix, business_sql)
+
+    def callproc(self, procname, args=()):
+        with self.connection() as conn:
+            return conn.callproc(procname, args)
+
+    def iter_sql(self, sql, params=None, dictionary=False, batch_size=1000):
+        """stream rows with a server side cursor, the connection is held until the iteration ends"""
+        with self.connection() as conn:
+            yield from conn.iter_sql(sql, params, dictionary=dictionary, batch_size=batch_size)
+
+    def filter_sql(self, sql):
+        # only looks at the text, no connection is borrowed for it
+        return OBConnector.filter_sql(self, sql)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_ob_connector_pool(context, ob_cluster, user=None, password=None, database=None, timeout=10000, ip=None, port=None):
+    """
+    The OBConnectorPool of a cluster shared by every handler of this process.
+    By default the sys tenant of ob_cluster is used; the size and health check interval come from obdiag.ob_connector of the inner config.
+    ip/port override the db_host/db_port of ob_cluster, e.g. for a business tenant behind another endpoint.
+    """
+    tenant_sys = ob_cluster.get("tenant_sys") or {}
+    if user is None:
+        user = tenant_sys.get("user")
+        password = tenant_sys.get("password")
+    ip = ip or ob_cluster.get("db_host")
+    port = port or ob_cluster.get("db_port")
+    key = (str(ip), str(port), str(user), hashlib.sha256(str(password).encode()).hexdigest(), database)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool_config = {}
+            inner_config = getattr(context, "inner_config", None)
+            if isinstance(inner_config, dict):
+                pool_config = (inner_config.get("obdiag") or {}).get("ob_connector") or {}
+            pool = OBConnectorPool(
+                context,
+                ip=ip,
+                port=port,
+                username=user,
+                password=password,
+                database=database,
+                timeout=timeout,
+                max_size=pool_config.get("pool_size", DEFAULT_POOL_SIZE),
+                health_check_interval=pool_config.get("health_check_interval", HEALTH_CHECK_INTERVAL),
+            )
+            _pools[key] = pool
+        return pool
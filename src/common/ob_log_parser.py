@@ -272,11 +272,153 @@ OceanbaseLogVarObjDict = {
 
 OceanbaseLogVarCompilePattern = {}
 
+# (site, fields) -> ObLogFieldExtractor, see ObLogParser.get_field_extractor
+OceanbaseLogFieldExtractorCache = {}
+
+# a plain value ends at the next , ) ] } or space, it never starts with { [ ( or "
+_FIELD_PLAIN_VALUE = r'([^,\s)\]}{\[("]*)'
+_FIELD_PLAIN_VALUE_RE = re.compile(_FIELD_PLAIN_VALUE)
+_FIELD_BRACKET_RE = re.compile(r'[{}\[\]()]')
+_FIELD_KEY_PATTERN = {}
+
+
+def _field_key(key):
+    # the key comes first so the regex engine looks for it as a literal, the lookbehind after it keeps a key at a word
+    # boundary only: "used" is not "avg_used"
+    k = re.escape(key)
+    return k + r'(?<![\w.]' + k + r')\s*[=:]\s*'
+
+
+def _field_key_pattern(key):
+    p = _FIELD_KEY_PATTERN.get(key, None)
+    if p is None:
+        p = _FIELD_KEY_PATTERN[key] = re.compile(_field_key(key))
+    return p
+
+
+def _field_pattern(path):
+    # key1={... key2=value: the last key of the path when no bracket comes before it in each object on the way, the
+    # group is empty otherwise and the path is walked by _walk_field
+    p = _FIELD_PLAIN_VALUE
+    for key in reversed(path[1:]):
+        p = r'(?:[{\[(][^{}\[\]()]*?' + _field_key(key) + p + ')?'
+    return re.compile(_field_key(path[0]) + p)
+
+
+def _read_field_value(text, pos):
+    # the value starting at pos: a {...} / [...] / (...) object up to its closing bracket (the rest of the text if it is
+    # not closed), a "..." string without its quotes, or a plain value
+    if pos >= len(text):
+        return ''
+    char = text[pos]
+    if char in '{[(':
+        depth = 0
+        for m in _FIELD_BRACKET_RE.finditer(text, pos):
+            if m.group() in '{[(':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return text[pos : m.end()]
+        return text[pos:].rstrip()
+    if char == '"':
+        end = text.find('"', pos + 1)
+        return text[pos + 1 :] if end < 0 else text[pos + 1 : end]
+    return _FIELD_PLAIN_VALUE_RE.match(text, pos).group(1)
+
+
+def _object_depth(text, start, pos):
+    # the depth of pos in the object opened at start: 1 for its own keys, 0 once it is closed
+    depth = 0
+    for m in _FIELD_BRACKET_RE.finditer(text, start, pos):
+        if m.group() in '{[(':
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return 0
+    return depth
+
+
+def _walk_field(text, pos, path):
+    # the value of path, its first key at pos: every next key is one of the object of the previous key, not of an object
+    # nested in it
+    m = _field_key_pattern(path[0]).match(text, pos)
+    for key in path[1:]:
+        start = m.end()
+        if not text.startswith(('{', '[', '('), start):
+            return None
+        p = _field_key_pattern(key)
+        m = p.search(text, start)
+        while m is not None:
+            depth = _object_depth(text, start, m.start())
+            if depth == 0:
+                return None
+            if depth == 1:
+                break
+            m = p.search(text, m.end())
+        if m is None:
+            return None
+    return _read_field_value(text, m.end())
+
+
+class ObLogFieldExtractor(object):
+    """
+    the fields of the logs printed by one log site, compiled once.
+    site: a substring the log must contain (the function name, the message...), logs without it are skipped before any
+          regex runs. None extracts from every text.
+    fields: keys as printed in the log (key=value or key:value), or [key, name] pairs to rename them like
+            OceanbaseLogVarDict. A '/' walks into an object value: 'conflict_tx_id/txid' is 123 in
+            "conflict_tx_id={txid:123}".
+    extract(line) gives {name: value} with None for the fields not found, or None if the line is not of the site.
+    """
+
+    def __init__(self, site, fields):
+        self.site = site
+        self.fields = []
+        for field in fields:
+            key, name = field if isinstance(field, (list, tuple)) else (field, field)
+            path = key.split('/')
+            self.fields.append((name, _field_pattern(path), path))
+
+    def parse(self, text):
+        d = {}
+        for name, p, path in self.fields:
+            m = p.search(text)
+            if m is None:
+                d[name] = None
+            else:
+                # an object / string value or a key behind a nested object is left to the slow walk
+                d[name] = m.group(1) or _walk_field(text, m.start(), path)
+        return d
+
+    def extract(self, line):
+        if self.site is not None and self.site not in line:
+            return None
+        return self.parse(line)
+
+    def iter_file(self, file_name, encoding=None):
+        """(line, fields) of the lines of the site in file_name, read line by line"""
+        with open(file_name, 'r', encoding=encoding) as f:
+            for line in f:
+                if self.site is None or self.site in line:
+                    yield line, self.parse(line)
+
 
 class ObLogParser:
     compiled_log_pattern = None
     compiled_raw_log_pattern = None
 
+    @staticmethod
+    def get_field_extractor(site, fields):
+        # e.g. get_field_extractor('dump tenant info', ['req_queue:total_size', ['tenant/id', 'tenant_id']])
+        cache_key = (site, tuple(tuple(f) if isinstance(f, list) else f for f in fields))
+        extractor = OceanbaseLogFieldExtractorCache.get(cache_key, None)
+        if extractor is None:
+            extractor = ObLogFieldExtractor(site, fields)
+            OceanbaseLogFieldExtractorCache[cache_key] = extractor
+        return extractor
+
     @staticmethod
     def get_obj_list(list_str):
         # will split with the {}
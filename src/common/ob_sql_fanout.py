@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: ob_sql_fanout.py
+@desc: Run one gv$ query as many small per-server (and optionally per-time-slice) queries over an OBConnectorPool.
+       A filter on svr_ip/svr_port lets the observer answer a gv$ view from one server only, so a slow or
+       overloaded server no longer holds the whole result back and the rows of the others are kept.
+"""
+import datetime
+import json
+import os
+import re
+import threading
+import time
+from decimal import Decimal
+
+from src.common.node_runner import NodeRunner
+
+SERVER_LIST_SQL = "select svr_ip, svr_port from oceanbase.DBA_OB_SERVERS order by svr_ip, svr_port"
+SERVER_LIST_SQL_OB3 = "select svr_ip, svr_port from oceanbase.__all_server order by svr_ip, svr_port"
+
+
+def get_observer_servers(connector, ob_major_version=4):
+    """[(svr_ip, svr_port)] of the cluster, read through the sys tenant"""
+    sql = SERVER_LIST_SQL if int(ob_major_version or 4) >= 4 else SERVER_LIST_SQL_OB3
+    return [(str(row[0]), int(row[1])) for row in connector.execute_sql(sql)]
+
+
+def build_time_slices(from_us, to_us, slice_seconds):
+    """
+    Split [from_us, to_us] (microseconds, both inclusive) into windows of slice_seconds.
+    The windows do not overlap, so `request_time >= start and request_time <= end` never returns a row twice.
+    """
+    from_us = int(from_us)
+    to_us = int(to_us)
+    if not slice_seconds or int(slice_seconds) <= 0 or to_us <= from_us:
+        return [(from_us, to_us)]
+    step = int(slice_seconds) * 1000000
+    slices = []
+    start = from_us
+    while start <= to_us:
+        end = min(start + step - 1, to_us)
+        slices.append((start, end))
+        start = end + 1
+    return slices
+
+
+def add_server_filter(sql, anchor_column, svr_ip, svr_port):
+    """
+    Add `and svr_ip = '..' and svr_port = ..` right after the first `<anchor_column> = '<literal>'` predicate of sql.
+    The anchor must be a predicate of the outermost where clause of the gv$ view being split.
+    """
+    pattern = re.compile(r"(\b{0}\s*=\s*'[^']*')".format(re.escape(anchor_column)), re.IGNORECASE)
+    if not pattern.search(sql):
+        raise ValueError("can not find the predicate on {0} to add the server filter".format(anchor_column))
+    server_filter = " and svr_ip = '{0}' and svr_port = {1}".format(svr_ip, int(svr_port))
+    return pattern.sub(lambda m: m.group(1) + server_filter, sql, count=1)
+
+
+def _sort_value(value):
+    # MySQL puts NULL first in ascending order
+    return (0, 0) if value is None else (1, value)
+
+
+def sort_rows(rows, order_by):
+    """
+    Sort dict rows like `ORDER BY` of SQL.
+    :param order_by: list of column names, a column name may end with ' DESC' / ' ASC'
+    """
+    rows = list(rows)
+    for item in reversed(order_by):
+        parts = item.strip().split()
+        column = parts[0]
+        reverse = len(parts) > 1 and parts[1].upper() == "DESC"
+
+        def key(row, column=column):
+            value = row.get(column)
+            if value is None and column not in row:
+                value = next((v for k, v in row.items() if k.upper() == column.upper()), None)
+            return _sort_value(value)
+
+        rows.sort(key=key, reverse=reverse)
+    return rows
+
+
+class RowsCursor(object):
+    """Cursor over rows already fetched, enough for prettytable.from_db_cursor and the report helpers."""
+
+    def __init__(self, columns, rows, dictionary=False):
+        self.description = [(column, None, None, None, None, None, None) for column in columns]
+        if dictionary:
+            self._rows = [dict(row) for row in rows]
+        else:
+            self._rows = [tuple(row.get(column) for column in columns) for row in rows]
+        self._index = 0
+        self.rowcount = len(self._rows)
+
+    def fetchall(self):
+        rows = self._rows[self._index :]
+        self._index = len(self._rows)
+        return rows
+
+    def fetchone(self):
+        if self._index >= len(self._rows):
+            return None
+        row = self._rows[self._index]
+        self._index += 1
+        return row
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self):
+        return
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return str(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    return str(value)
+
+
+class FanoutTask(object):
+    def __init__(self, sql, svr_ip=None, svr_port=None, time_slice=None):
+        self.sql = sql
+        self.svr_ip = svr_ip
+        self.svr_port = svr_port
+        self.time_slice = time_slice
+
+    @property
+    def name(self):
+        name = "{0}_{1}".format(self.svr_ip, self.svr_port) if self.svr_ip else "all"
+        if self.time_slice:
+            name = "{0}_{1}_{2}".format(name, self.time_slice[0], self.time_slice[1])
+        return name
+
+
+class FanoutResult(object):
+    """Status of every task plus its rows; rows of the tasks that did not finish are not included."""
+
+    def __init__(self):
+        self.status = {}
+        self.columns = []
+        self._rows = {}
+        self._files = {}
+
+    @property
+    def partial(self):
+        return any(status["status"] != "ok" for status in self.status.values())
+
+    def failed_tasks(self):
+        return {name: status for name, status in self.status.items() if status["status"] != "ok"}
+
+    def iter_rows(self):
+        for name, status in self.status.items():
+            if status["status"] != "ok":
+                continue
+            if name in self._files:
+                with open(self._files[name], "r", encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            yield json.loads(line)
+            else:
+                yield from self._rows.get(name, [])
+
+    def rows(self):
+        return list(self.iter_rows())
+
+    def summary(self):
+        return {
+            "tasks": len(self.status),
+            "partial": self.partial,
+            "rows": sum(status["rows"] for status in self.status.values() if status["status"] == "ok"),
+            "failed": {name: "{0}: {1}".format(status["status"], status.get("error", "")) for name, status in self.failed_tasks().items()},
+        }
+
+
+class SqlFanout(object):
+    """
+    Run FanoutTasks concurrently over an OBConnectorPool. Rows are streamed with a server side cursor and,
+    when spill_dir is set, written as JSON lines to one file per task instead of being held in memory.
+    Tasks still running after `timeout` seconds are reported as timed out and their rows are dropped. Every query
+    gets the time left as its ob_query_timeout (and read timeout), so the server stops it too and the connection
+    goes back to the pool; the tasks run on daemon threads (NodeRunner) and never hold the process at exit.
+    """
+
+    def __init__(self, context, pool, max_workers=None, timeout=None, spill_dir=None):
+        self.context = context
+        self.stdio = context.stdio
+        self.pool = pool
+        self.max_workers = max_workers or getattr(pool, "max_size", 4)
+        self.timeout = timeout
+        self.spill_dir = spill_dir
+        self._stop = threading.Event()
+        self._deadline = None
+
+    def _iter_rows(self, task):
+        if self._deadline is None:
+            yield from self.pool.iter_sql(task.sql, dictionary=True)
+            return
+        remaining = self._deadline - time.time()
+        if remaining <= 0:
+            raise TimeoutError("not started in {0}s".format(self.timeout))
+        with self.pool.connection(timeout=min(30, remaining)) as conn:
+            conn.set_query_timeout(max(0.001, self._deadline - time.time()))
+            try:
+                yield from conn.iter_sql(task.sql, dictionary=True)
+            finally:
+                try:
+                    conn.set_query_timeout(None)
+                except Exception as e:
+                    # the next user of the connection reconnects with the default session
+                    self.stdio.verbose("sql fanout task {0}: reset the query timeout failed, close the connection: {1}".format(task.name, e))
+                    conn.close()
+
+    def _run_task(self, task):
+        start = time.time()
+        outcome = {"status": "ok", "rows": 0, "columns": []}
+        rows = []
+        spill_file = None
+        f = None
+        try:
+            if self.spill_dir:
+                os.makedirs(self.spill_dir, exist_ok=True)
+                spill_file = os.path.join(self.spill_dir, "{0}.jsonl".format(task.name))
+                f = open(spill_file, "w", encoding="utf-8")
+            for row in self._iter_rows(task):
+                if self._stop.is_set():
+                    raise TimeoutError("stopped after {0}s".format(self.timeout))
+                if not outcome["columns"]:
+                    outcome["columns"] = list(row.keys())
+                if f is not None:
+                    f.write(json.dumps(row, default=_json_default, ensure_ascii=False))
+                    f.write("\n")
+                else:
+                    rows.append(row)
+                outcome["rows"] += 1
+        except Exception as e:
+            outcome["status"] = "error"
+            outcome["error"] = str(e)
+            self.stdio.verbose("sql fanout task {0} failed: {1}".format(task.name, e))
+        finally:
+            if f is not None:
+                f.close()
+            outcome["elapsed"] = round(time.time() - start, 3)
+        return outcome, rows, spill_file
+
+    def run(self, tasks):
+        result = FanoutResult()
+        if not tasks:
+            return result
+        self._stop.clear()
+        self._deadline = time.time() + self.timeout if self.timeout else None
+        runner = NodeRunner(self.stdio, max_workers=self.max_workers, deadline=self._deadline)
+        outcomes = runner.run(tasks, self._run_task, name=lambda task: task.name)
+        if any(not outcome.ok for outcome in outcomes):
+            # the queries left behind end at their next row or at their ob_query_timeout, the queued ones are not started
+            self._stop.set()
+        for outcome in outcomes:
+            task = outcome.item
+            status = {"svr_ip": task.svr_ip, "svr_port": task.svr_port, "time_slice": task.time_slice, "rows": 0}
+            result.status[task.name] = status
+            if not outcome.ok:
+                status["status"] = "timeout"
+                status["error"] = "not finished in {0}s".format(self.timeout)
+                continue
+            outcome, rows, spill_file = outcome.result
+            status.update(outcome)
+            if status["status"] != "ok":
+                continue
+            if not result.columns and status["columns"]:
+                result.columns = status["columns"]
+            if spill_file:
+                result._files[task.name] = spill_file
+            else:
+                result._rows[task.name] = rows
+        for name, status in result.failed_tasks().items():
+            self.stdio.warn("sql fanout: {0} {1}, {2}. the result is partial".format(name, status["status"], status.get("error", "")))
+        return result
@@ -16,6 +16,9 @@
 # File       : ocp_api.py
 # Description：
 """
+import requests
+from requests.adapters import HTTPAdapter
+
 # login
 login = "/api/v2/iam/login"
 
@@ -35,3 +38,13 @@ cluster_parameters = "/api/v2/ob/clusters/parameterInfo"
 
 # task
 task = "/api/v2/tasks/instances"
+
+
+def new_session(auth, pool_size=10):
+    """a requests session keeping up to pool_size connections to ocp open, shared by the threads of one command"""
+    session = requests.Session()
+    session.auth = auth
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
@@ -34,9 +34,11 @@ class Task:
     STATUS_TASK_FAILED = "FAILED"
     TASK_RETRY_PERMIT = {"Task retry": 3}
 
-    def __init__(self, url, auth, task_id):
+    def __init__(self, url, auth, task_id, session=None):
         self.url = url
         self.auth = auth
+        # requests itself when no session is given, a session reuses its connections to ocp
+        self.session = session or requests
         self.id = task_id
         self.cluster = {}
         self.createTime = ""
@@ -62,15 +64,17 @@ class Task:
 
     def retry(self):
         path = ocp_api.task + "/%s/retry" % self.id
-        requests.post(self.url + path, auth=self.auth)
+        self.session.post(self.url + path, auth=self.auth)
 
     def get(self):
         path = ocp_api.task + "/%s" % self.id
-        response = requests.get(self.url + path, auth=self.auth)
+        response = self.session.get(self.url + path, auth=self.auth)
         self._seri_get(response.json()["data"])
 
-    def wait_done(self, interval=20):
-        """阻塞等待直到task出结果"""
+    def wait_done(self, interval=20, first_interval=1, timeout=None):
+        """阻塞等待直到task出结果, 轮询间隔从 first_interval 秒开始每次翻倍, 最长 interval 秒; timeout 秒后仍未结束则抛出异常"""
+        sleep_time = min(first_interval, interval)
+        deadline = time.time() + timeout if timeout is not None else None
         while True:
             try:
                 self.get()
@@ -87,9 +91,13 @@ class Task:
                     self.retry()
                     self._retry_times += 1
                     logger.warning('task %s failed,but allowed retry %s times, now retry %s time' % (self.name, self._retry_permit_time, self._retry_times))
-                    time.sleep(interval)
+                    sleep_time = min(first_interval, interval)
+                    time.sleep(sleep_time)
                     continue
             else:
-                logger.info("task(%s:%s) not finished yet, now status %s, waiting" % (self.id, self.name, self.status))
-                time.sleep(interval)
+                if deadline is not None and time.time() >= deadline:
+                    raise Exception("task timeout! name:%s id:%s status:%s not finished in %ss" % (self.name, self.id, self.status, timeout))
+                logger.info("task(%s:%s) not finished yet, now status %s, waiting %ss" % (self.id, self.name, self.status, sleep_time))
+                time.sleep(sleep_time if deadline is None else max(0, min(sleep_time, deadline - time.time())))
+                sleep_time = min(sleep_time * 2, interval)
         return self.status
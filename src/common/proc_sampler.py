@@ -0,0 +1,375 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: proc_sampler.py
+@desc: /proc time series sampler for gather sysstat.
+       SAMPLER_SCRIPT is shipped to the node and run there with the python of the node (2.7 or 3), it reads
+       /proc/stat, /proc/meminfo, /proc/diskstats, /proc/net/dev and /proc/<pid>/{stat,io,status} every interval
+       and appends one fixed size record of little endian uint64 per sample, no text is formatted on the node.
+       The file is: SAMPLER_MAGIC, uint32 length of the json meta, the json meta (column names, disks, nics, pids),
+       then the records. decode_samples / write_sample_reports turn it into CSV files and a summary locally.
+"""
+import csv
+import datetime
+import json
+import os
+import struct
+
+import tabulate
+
+SAMPLER_MAGIC = b"OBPROCS1"
+SAMPLER_FILE_NAME = "proc_samples.bin"
+SAMPLER_SCRIPT_NAME = "obdiag_proc_sampler.py"
+
+SAMPLER_SCRIPT = r'''
+import json, os, struct, sys, time
+
+MAGIC = b"OBPROCS1"
+CPU_COLUMNS = ["user", "nice", "system", "idle", "iowait", "irq", "softirq", "steal"]
+MEM_KEYS = ["MemTotal", "MemFree", "MemAvailable", "Buffers", "Cached", "SwapTotal", "SwapFree", "Dirty"]
+DISK_COLUMNS = ["reads", "sectors_read", "ms_reading", "writes", "sectors_written", "ms_writing", "in_flight", "ms_io"]
+NIC_COLUMNS = ["rx_bytes", "rx_packets", "tx_bytes", "tx_packets"]
+PROC_COLUMNS = ["utime", "stime", "threads", "rss_pages", "read_bytes", "write_bytes", "voluntary_cs", "nonvoluntary_cs"]
+
+
+def read(path):
+    try:
+        f = open(path, "rb")
+        try:
+            return f.read().decode("ascii", "replace")
+        finally:
+            f.close()
+    except (IOError, OSError):
+        return ""
+
+
+def cpu_values():
+    values = [0] * (len(CPU_COLUMNS) + 3)
+    for line in read("/proc/stat").splitlines():
+        parts = line.split()
+        if not parts:
+            continue
+        if parts[0] == "cpu":
+            for i, value in enumerate(parts[1 : len(CPU_COLUMNS) + 1]):
+                values[i] = int(value)
+        elif parts[0] == "ctxt":
+            values[len(CPU_COLUMNS)] = int(parts[1])
+        elif parts[0] == "procs_running":
+            values[len(CPU_COLUMNS) + 1] = int(parts[1])
+        elif parts[0] == "procs_blocked":
+            values[len(CPU_COLUMNS) + 2] = int(parts[1])
+    return values
+
+
+def mem_values():
+    found = {}
+    for line in read("/proc/meminfo").splitlines():
+        key, _, rest = line.partition(":")
+        if key in MEM_KEYS:
+            found[key] = int(rest.split()[0])
+    return [found.get(key, 0) for key in MEM_KEYS]
+
+
+def list_disks():
+    disks = []
+    for line in read("/proc/diskstats").splitlines():
+        parts = line.split()
+        if len(parts) < 14:
+            continue
+        name = parts[2]
+        if name.startswith("loop") or name.startswith("ram") or name.startswith("sr"):
+            continue
+        # whole devices only, their partitions are counted in them already
+        if os.path.isdir("/sys/block/" + name.replace("/", "!")):
+            disks.append(name)
+    return disks
+
+
+def disk_values(disks):
+    found = {}
+    for line in read("/proc/diskstats").splitlines():
+        parts = line.split()
+        if len(parts) >= 14 and parts[2] in disks:
+            found[parts[2]] = [int(parts[i]) for i in (3, 5, 6, 7, 9, 10, 11, 12)]
+    values = []
+    for disk in disks:
+        values.extend(found.get(disk, [0] * len(DISK_COLUMNS)))
+    return values
+
+
+def list_nics():
+    nics = []
+    for line in read("/proc/net/dev").splitlines()[2:]:
+        name = line.split(":", 1)[0].strip()
+        if name and name != "lo":
+            nics.append(name)
+    return nics
+
+
+def nic_values(nics):
+    found = {}
+    for line in read("/proc/net/dev").splitlines()[2:]:
+        name, _, rest = line.partition(":")
+        name = name.strip()
+        if name in nics:
+            parts = rest.split()
+            found[name] = [int(parts[0]), int(parts[1]), int(parts[8]), int(parts[9])]
+    values = []
+    for nic in nics:
+        values.extend(found.get(nic, [0] * len(NIC_COLUMNS)))
+    return values
+
+
+def proc_values(pid):
+    values = [0] * len(PROC_COLUMNS)
+    stat = read("/proc/%s/stat" % pid)
+    if stat:
+        parts = stat[stat.rfind(")") + 2 :].split()
+        values[0], values[1], values[2], values[3] = int(parts[11]), int(parts[12]), int(parts[17]), max(0, int(parts[21]))
+    for line in read("/proc/%s/io" % pid).splitlines():
+        key, _, rest = line.partition(":")
+        if key == "read_bytes":
+            values[4] = int(rest)
+        elif key == "write_bytes":
+            values[5] = int(rest)
+    for line in read("/proc/%s/status" % pid).splitlines():
+        key, _, rest = line.partition(":")
+        if key == "voluntary_ctxt_switches":
+            values[6] = int(rest)
+        elif key == "nonvoluntary_ctxt_switches":
+            values[7] = int(rest)
+    return values
+
+
+def self_cpu():
+    times = os.times()
+    return [int(times[0] * 1000000), int(times[1] * 1000000)]
+
+
+def main():
+    args = dict(zip(sys.argv[1::2], sys.argv[2::2]))
+    interval = float(args.get("--interval", "1"))
+    duration = float(args.get("--duration", "10"))
+    pids = [pid for pid in args.get("--pid", "").split(",") if pid.strip()]
+    out = args["--out"]
+    disks = list_disks()
+    nics = list_nics()
+    columns = ["ts_us", "cost_us", "sampler_utime_us", "sampler_stime_us"]
+    columns += ["cpu." + name for name in CPU_COLUMNS] + ["cpu.ctxt", "cpu.procs_running", "cpu.procs_blocked"]
+    columns += ["mem." + key for key in MEM_KEYS]
+    for disk in disks:
+        columns += ["disk.%s.%s" % (disk, name) for name in DISK_COLUMNS]
+    for nic in nics:
+        columns += ["net.%s.%s" % (nic, name) for name in NIC_COLUMNS]
+    for pid in pids:
+        columns += ["proc.%s.%s" % (pid, name) for name in PROC_COLUMNS]
+    meta = {
+        "version": 1,
+        "interval": interval,
+        "duration": duration,
+        "clk_tck": os.sysconf("SC_CLK_TCK"),
+        "page_size": os.sysconf("SC_PAGE_SIZE"),
+        "cpu_count": os.sysconf("SC_NPROCESSORS_ONLN"),
+        "disks": disks,
+        "nics": nics,
+        "pids": pids,
+        "columns": columns,
+    }
+    record = struct.Struct("<%dQ" % len(columns))
+    meta_bytes = json.dumps(meta).encode("utf-8")
+    f = open(out, "wb")
+    try:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(meta_bytes)))
+        f.write(meta_bytes)
+        start = time.time()
+        next_at = start
+        while True:
+            begin = time.time()
+            values = cpu_values() + mem_values() + disk_values(disks) + nic_values(nics)
+            for pid in pids:
+                values += proc_values(pid)
+            cost = int((time.time() - begin) * 1000000)
+            f.write(record.pack(*([int(begin * 1000000), cost] + self_cpu() + [max(0, v) for v in values])))
+            next_at += interval
+            now = time.time()
+            if next_at - start > duration:
+                break
+            if next_at > now:
+                time.sleep(next_at - now)
+    finally:
+        f.close()
+
+
+main()
+'''
+
+CPU_COLUMNS = ["user", "nice", "system", "idle", "iowait", "irq", "softirq", "steal"]
+MEM_KEYS = ["MemTotal", "MemFree", "MemAvailable", "Buffers", "Cached", "SwapTotal", "SwapFree", "Dirty"]
+
+
+def decode_samples(data):
+    """-> (meta, [row dict]) of the bytes of a sampler file; a record cut off at the end is ignored"""
+    if not data.startswith(SAMPLER_MAGIC):
+        raise ValueError("not a proc sampler file")
+    offset = len(SAMPLER_MAGIC)
+    (meta_len,) = struct.unpack_from("<I", data, offset)
+    offset += 4
+    meta = json.loads(data[offset : offset + meta_len].decode("utf-8"))
+    offset += meta_len
+    columns = meta["columns"]
+    record = struct.Struct("<{0}Q".format(len(columns)))
+    rows = []
+    while offset + record.size <= len(data):
+        rows.append(dict(zip(columns, record.unpack_from(data, offset))))
+        offset += record.size
+    meta["record_size"] = record.size
+    return meta, rows
+
+
+def _time_str(ts_us):
+    return datetime.datetime.fromtimestamp(ts_us / 1000000.0).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+
+def _delta(cur, prev, key):
+    return max(0, cur[key] - prev[key])
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))]
+
+
+def _write_csv(path, header, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def write_sample_reports(meta, rows, out_dir, data_size=None):
+    """
+    Write cpu.csv, mem.csv, disk.csv, net.csv, process.csv (rates between two samples) and summary.txt
+    into out_dir, returns the summary text.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    clk_tck = float(meta.get("clk_tck") or 100)
+    page_size = int(meta.get("page_size") or 4096)
+    series = {}
+
+    def add(metric, value):
+        series.setdefault(metric, []).append(value)
+
+    cpu_rows, mem_rows, disk_rows, net_rows, proc_rows = [], [], [], [], []
+    for prev, cur in zip(rows, rows[1:]):
+        seconds = (cur["ts_us"] - prev["ts_us"]) / 1000000.0
+        if seconds <= 0:
+            continue
+        at = _time_str(cur["ts_us"])
+        ticks = {name: _delta(cur, prev, "cpu." + name) for name in CPU_COLUMNS}
+        total = float(sum(ticks.values())) or 1.0
+        pcts = [round(100 * ticks[name] / total, 2) for name in CPU_COLUMNS]
+        cpu_rows.append([at] + pcts + [round(_delta(cur, prev, "cpu.ctxt") / seconds, 1), cur["cpu.procs_running"], cur["cpu.procs_blocked"]])
+        add("cpu util %", round(100 - 100 * (ticks["idle"] + ticks["iowait"]) / total, 2))
+        add("cpu iowait %", round(100 * ticks["iowait"] / total, 2))
+        add("procs blocked", cur["cpu.procs_blocked"])
+        mem_rows.append([at] + [round(cur["mem." + key] / 1024.0, 1) for key in MEM_KEYS])
+        add("mem available MB", round(cur["mem.MemAvailable"] / 1024.0, 1))
+        for disk in meta.get("disks", []):
+            key = "disk.{0}.".format(disk)
+            reads, writes = _delta(cur, prev, key + "reads"), _delta(cur, prev, key + "writes")
+            r_await = _delta(cur, prev, key + "ms_reading") / float(reads) if reads else 0
+            w_await = _delta(cur, prev, key + "ms_writing") / float(writes) if writes else 0
+            util = min(100.0, 100 * _delta(cur, prev, key + "ms_io") / (seconds * 1000))
+            disk_rows.append(
+                [
+                    at,
+                    disk,
+                    round(reads / seconds, 1),
+                    round(writes / seconds, 1),
+                    round(_delta(cur, prev, key + "sectors_read") * 512 / 1024.0 / seconds, 1),
+                    round(_delta(cur, prev, key + "sectors_written") * 512 / 1024.0 / seconds, 1),
+                    round(r_await, 2),
+                    round(w_await, 2),
+                    round(util, 1),
+                    cur[key + "in_flight"],
+                ]
+            )
+            add("disk {0} util %".format(disk), round(util, 1))
+            add("disk {0} w_await ms".format(disk), round(w_await, 2))
+        for nic in meta.get("nics", []):
+            key = "net.{0}.".format(nic)
+            rx, tx = _delta(cur, prev, key + "rx_bytes") / 1024.0 / seconds, _delta(cur, prev, key + "tx_bytes") / 1024.0 / seconds
+            net_rows.append([at, nic, round(rx, 1), round(tx, 1), round(_delta(cur, prev, key + "rx_packets") / seconds, 1), round(_delta(cur, prev, key + "tx_packets") / seconds, 1)])
+            add("net {0} rx kB/s".format(nic), round(rx, 1))
+            add("net {0} tx kB/s".format(nic), round(tx, 1))
+        for pid in meta.get("pids", []):
+            key = "proc.{0}.".format(pid)
+            cpu_pct = 100 * (_delta(cur, prev, key + "utime") + _delta(cur, prev, key + "stime")) / clk_tck / seconds
+            rss_mb = cur[key + "rss_pages"] * page_size / 1024.0 / 1024.0
+            proc_rows.append(
+                [
+                    at,
+                    pid,
+                    round(cpu_pct, 1),
+                    cur[key + "threads"],
+                    round(rss_mb, 1),
+                    round(_delta(cur, prev, key + "read_bytes") / 1024.0 / seconds, 1),
+                    round(_delta(cur, prev, key + "write_bytes") / 1024.0 / seconds, 1),
+                    round(_delta(cur, prev, key + "voluntary_cs") / seconds, 1),
+                    round(_delta(cur, prev, key + "nonvoluntary_cs") / seconds, 1),
+                ]
+            )
+            add("observer {0} cpu %".format(pid), round(cpu_pct, 1))
+            add("observer {0} rss MB".format(pid), round(rss_mb, 1))
+
+    _write_csv(os.path.join(out_dir, "cpu.csv"), ["time"] + ["{0}%".format(name) for name in CPU_COLUMNS] + ["ctxt/s", "procs_running", "procs_blocked"], cpu_rows)
+    _write_csv(os.path.join(out_dir, "mem.csv"), ["time"] + ["{0}(MB)".format(key) for key in MEM_KEYS], mem_rows)
+    _write_csv(os.path.join(out_dir, "disk.csv"), ["time", "disk", "r/s", "w/s", "rkB/s", "wkB/s", "r_await(ms)", "w_await(ms)", "util%", "in_flight"], disk_rows)
+    _write_csv(os.path.join(out_dir, "net.csv"), ["time", "nic", "rxkB/s", "txkB/s", "rxpck/s", "txpck/s"], net_rows)
+    _write_csv(os.path.join(out_dir, "process.csv"), ["time", "pid", "cpu%", "threads", "rss(MB)", "read kB/s", "write kB/s", "cswch/s", "nvcswch/s"], proc_rows)
+
+    metric_rows = []
+    for metric, values in series.items():
+        metric_rows.append([metric, min(values), round(sum(values) / len(values), 2), _percentile(values, 95), max(values)])
+    overhead = sampler_overhead(meta, rows, data_size)
+    overhead_rows = [[key, value] for key, value in overhead.items()]
+    summary = "Samples: {0}, configured interval: {1}s\n".format(len(rows), meta.get("interval"))
+    summary += tabulate.tabulate(metric_rows, headers=["Metric", "Min", "Avg", "P95", "Max"], tablefmt="grid", showindex=False)
+    summary += "\nSampler overhead:\n" + tabulate.tabulate(overhead_rows, headers=["Item", "Value"], tablefmt="grid", showindex=False)
+    with open(os.path.join(out_dir, "summary.txt"), "w", encoding="utf-8") as f:
+        f.write(summary + "\n")
+    return summary
+
+
+def sampler_overhead(meta, rows, data_size=None):
+    """what the sampler cost on the node: its own cpu time, the time spent reading /proc and the timing jitter"""
+    overhead = {"samples": len(rows)}
+    if len(rows) < 2:
+        return overhead
+    wall = (rows[-1]["ts_us"] - rows[0]["ts_us"]) / 1000000.0 or 1.0
+    cpu_us = (rows[-1]["sampler_utime_us"] + rows[-1]["sampler_stime_us"]) - (rows[0]["sampler_utime_us"] + rows[0]["sampler_stime_us"])
+    intervals = [(cur["ts_us"] - prev["ts_us"]) / 1000.0 for prev, cur in zip(rows, rows[1:])]
+    costs = [row["cost_us"] / 1000.0 for row in rows]
+    overhead["sampler cpu % of one core"] = round(100 * cpu_us / 1000000.0 / wall, 3)
+    overhead["read cost per sample avg ms"] = round(sum(costs) / len(costs), 3)
+    overhead["read cost per sample max ms"] = round(max(costs), 3)
+    overhead["interval avg ms"] = round(sum(intervals) / len(intervals), 2)
+    overhead["interval max ms"] = round(max(intervals), 2)
+    overhead["bytes per sample"] = meta.get("record_size")
+    if data_size is not None:
+        overhead["file size bytes"] = data_size
+    return overhead
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: report_builder.py
+@desc: Buffered writer for reports assembled from many small fragments.
+"""
+import os
+import threading
+
+from jinja2 import Environment
+
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+_jinja_env = Environment()
+
+
+class ReportBuilder(object):
+    """
+    Keeps the report file open while it is built, fragments go through one large write buffer instead of an
+    open/append/close per fragment. The file is opened on the first write, so an empty report leaves no file.
+    Use it as a context manager or call close(); readers of the file must wait until then.
+    """
+
+    def __init__(self, path, mode='a', encoding='utf-8', buffer_size=DEFAULT_BUFFER_SIZE):
+        self.path = path
+        self.mode = mode
+        self.encoding = encoding
+        self.buffer_size = buffer_size
+        self.bytes_written = 0
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, self.mode, encoding=self.encoding, buffering=self.buffer_size)
+        return self._file
+
+    def write(self, s):
+        if not s:
+            return
+        with self._lock:
+            self._open().write(s)
+            self.bytes_written += len(s)
+
+    def write_template(self, template, **kwargs):
+        """
+        Render a jinja2 template (a Template or its source) into the report chunk by chunk with generate(),
+        the rendered text is never held in memory as a whole.
+        """
+        if isinstance(template, str):
+            template = _jinja_env.from_string(template)
+        for chunk in template.generate(**kwargs):
+            self.write(chunk)
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: sql_fingerprint.py
+@desc: split SQL text into statements and reduce a statement to its fingerprint (literals replaced by ?, comments and
+       case dropped), one regex tokenizer for both so a file of thousands of statements is read in one pass
+"""
+import hashlib
+import re
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<ws>\s+)
+    |(?P<hint>/\*\+.*?\*/)
+    |(?P<comment>/\*.*?\*/|--(?=\s|$)[^\n]*|\#[^\n]*)
+    |(?P<str>'(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.|"")*")
+    |(?P<ident>`(?:[^`]|``)*`)
+    |(?P<num>0[xX][0-9a-fA-F]+|\d+(?:\.\d*)?(?:[eE][-+]?\d+)?|\.\d+(?:[eE][-+]?\d+)?)
+    |(?P<semi>;)
+    |(?P<word>[^\s'"`;/\#\-(),=<>!]+|.)
+    """,
+    re.S | re.X,
+)
+# a sign right after one of these belongs to the number that follows: "in (1, -2)" is "in (?+)"
+_SIGN_CONTEXT = {None, "(", ",", "=", "<", ">", "<=", ">=", "<>", "!="}
+_LIST_RE = re.compile(r"\( \?(?: , \?)* \)")
+_ROWS_RE = re.compile(r"\(\?\+\)(?: , \(\?\+\))+")
+
+
+def tokenize(text):
+    """(kind, text) pairs, kind is one of ws, hint, comment, str, ident, num, semi, word"""
+    for match in _TOKEN_RE.finditer(text):
+        yield match.lastgroup, match.group()
+
+
+def split_statements(text):
+    """
+    the statements of text as (line, sql) pairs, line is where the statement starts (1-based).
+    Statements end at a semicolon outside quotes and comments; comment-only pieces are skipped.
+    """
+    statements = []
+    line = 1
+    start = None
+    start_line = 0
+    pos = 0
+    for kind, value in tokenize(text):
+        if kind == "semi":
+            if start is not None:
+                statements.append((start_line, text[start:pos].strip()))
+                start = None
+        elif start is None and kind not in ("ws", "comment"):
+            start, start_line = pos, line
+        line += value.count("\n")
+        pos += len(value)
+    if start is not None:
+        statements.append((start_line, text[start:].strip()))
+    return statements
+
+
+def fingerprint(sql):
+    """
+    the statement with every literal replaced by ?, comments dropped, bare identifiers and keywords lower-cased and
+    IN-lists / VALUES rows folded, so "SELECT * FROM t WHERE id IN (1, 2)" and "select * from T where id in (3)"
+    share one fingerprint. Hints and backquoted identifiers are kept, they decide whether a statement is valid.
+    """
+    parts = []
+    for kind, value in tokenize(sql):
+        if kind in ("ws", "comment", "semi"):
+            continue
+        if kind in ("str", "num"):
+            if parts and parts[-1] in ("-", "+") and (parts[-2] if len(parts) > 1 else None) in _SIGN_CONTEXT:
+                parts.pop()
+            parts.append("?")
+        elif kind == "ident":
+            # kept quoted and as written: `order` is a column, order a syntax error, and table names may be case sensitive
+            parts.append(value)
+        elif kind == "hint":
+            parts.append(" ".join(value.split()).lower())
+        else:
+            value = value.lower()
+            # "<" followed by "=" come as two tokens
+            if parts and value == "=" and parts[-1] in ("<", ">", "!"):
+                value = parts.pop() + value
+            elif parts and value == ">" and parts[-1] == "<":
+                value = parts.pop() + value
+            parts.append(value)
+    text = " ".join(parts)
+    text = _LIST_RE.sub("(?+)", text)
+    return _ROWS_RE.sub("(?+)", text)
+
+
+def fingerprint_id(fp):
+    return hashlib.md5(fp.encode("utf-8")).hexdigest()[:16]
@@ -41,6 +41,9 @@ class SsherClient(SafeStdio):
     def upload(self, remote_path, local_path):
         raise Exception("the client type is not support upload")
 
+    def open_file(self, remote_path):
+        raise Exception("the client type is not support open_file")
+
     def ssh_invoke_shell_switch_user(self, new_user, cmd, time_out):
         raise Exception("the client type is not support ssh invoke shell switch user")
 
@@ -17,9 +17,13 @@
 """
 import os
 import select
+import shlex
+import shutil
 import tarfile
 import tempfile
-from tempfile import TemporaryFile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.common.constant import const
 from src.common.ssh_client.base import SsherClient
 from kubernetes import client, config
 from kubernetes.stream import stream
@@ -44,6 +48,13 @@ class KubernetesClient(SsherClient):
             self.client = client.CoreV1Api()
         except Exception as e:
             raise Exception("KubernetesClient load_kube_config error. Please check the config. {0}".format(e))
+        ssh_client_config = {}
+        if isinstance(self.inner_config_manager, dict):
+            ssh_client_config = (self.inner_config_manager.get("obdiag") or {}).get("ssh_client") or {}
+        # gzip the tar stream inside the pod, fall back to plain tar if the container has no gzip
+        self.transfer_compress = bool(ssh_client_config.get("kubernetes_transfer_compress", True))
+        # seconds without any data on the websocket before a transfer is aborted
+        self.transfer_timeout = int(ssh_client_config.get("kubernetes_transfer_timeout", 180))
 
     def exec_cmd(self, cmd):
         exec_command = ['/bin/sh', '-c', cmd]
@@ -61,34 +72,56 @@ class KubernetesClient(SsherClient):
     def download(self, remote_path, local_path):
         return self.__download_file_from_pod(self.namespace, self.pod_name, self.container_name, remote_path, local_path)
 
+    def download_files(self, file_list, max_workers=4):
+        """
+        download several files of this pod in parallel, each over its own exec stream
+        :param file_list: list of (remote_path, local_path)
+        :return: dict of remote_path -> True or the exception of the transfer
+        """
+        return parallel_download([(self, remote_path, local_path) for remote_path, local_path in file_list], max_workers=max_workers, stdio=self.stdio)
+
     def __download_file_from_pod(self, namespace, pod_name, container_name, file_path, local_path):
-        dir = os.path.dirname(file_path)
-        bname = os.path.basename(file_path)
-        exec_command = ['/bin/sh', '-c', f'cd {dir}; tar cf - {bname}']
+        if self.transfer_compress:
+            try:
+                return self.__stream_tar_from_pod(namespace, pod_name, container_name, file_path, local_path, compress=True)
+            except tarfile.ReadError as e:
+                self.stdio.verbose("KubernetesClient download {0} with gzip failed, retry without compression: {1}".format(file_path, e))
+        return self.__stream_tar_from_pod(namespace, pod_name, container_name, file_path, local_path, compress=False)
 
-        with TemporaryFile() as tar_buffer:
-            exec_stream = stream(self.client.connect_get_namespaced_pod_exec, pod_name, namespace, command=exec_command, stderr=True, stdin=True, stdout=True, tty=False, _preload_content=False, container=container_name)
-            # Copy file to stream
+    def __stream_tar_from_pod(self, namespace, pod_name, container_name, file_path, local_path, compress):
+        """
+        read the `tar cf -` output of the pod straight from the websocket and extract it on the fly,
+        nothing is buffered on the local disk except the target file itself.
+        """
+        dir = os.path.dirname(file_path) or "."
+        bname = os.path.basename(file_path)
+        tar_cmd = "tar czf - {0}" if compress else "tar cf - {0}"
+        exec_command = ['/bin/sh', '-c', 'cd {0} && {1}'.format(shlex.quote(dir), tar_cmd.format(shlex.quote(bname)))]
+        exec_stream = stream(self.client.connect_get_namespaced_pod_exec, pod_name, namespace, command=exec_command, stderr=True, stdin=True, stdout=True, tty=False, _preload_content=False, container=container_name)
+        reader = WSStdoutReader(WSFileManager(exec_stream), timeout=self.transfer_timeout)
+        local_dir = os.path.dirname(local_path)
+        found = False
+        try:
             try:
-                reader = WSFileManager(exec_stream)
-                while True:
-                    out, err, closed = reader.read_bytes()
-                    if out:
-                        tar_buffer.write(out)
-                    elif err:
-                        self.stdio.error("Error copying file {0}".format(err.decode("utf-8", errors='ignore')))
-                    if closed:
-                        break
-                exec_stream.close()
-                tar_buffer.flush()
-                tar_buffer.seek(0)
-                with tarfile.open(fileobj=tar_buffer, mode='r:') as tar:
-                    member = tar.getmember(bname)
-                    local_path = os.path.dirname(local_path)
-                    tar.extract(member, path=local_path)
-                return True
-            except Exception as e:
-                raise e
+                with tarfile.open(fileobj=reader, mode='r|gz' if compress else 'r|') as tar:
+                    for member in tar:
+                        if member.name == bname and member.isfile():
+                            # the member may be renamed on the local side, so write it to local_path directly
+                            with tar.extractfile(member) as src, open(local_path, 'wb') as dst:
+                                shutil.copyfileobj(src, dst, WSStdoutReader.CHUNK_SIZE)
+                        else:
+                            tar.extract(member, path=local_dir)
+                        found = True
+            except tarfile.ReadError as e:
+                raise tarfile.ReadError("{0}. stderr: {1}".format(e, reader.stderr_text()))
+        finally:
+            exec_stream.close()
+        if reader.stderr_text():
+            self.stdio.error("Error copying file {0}".format(reader.stderr_text()))
+        if not found:
+            raise Exception("KubernetesClient download {0} from pod {1} failed: {2}".format(file_path, pod_name, reader.stderr_text() or "file not found"))
+        self.stdio.verbose("KubernetesClient download {0} to {1}, received {2}".format(file_path, local_path, self.translate_byte(reader.received_bytes)))
+        return True
 
     def upload(self, remote_path, local_path):
         return self.__upload_file_to_pod(self.namespace, self.pod_name, self.container_name, local_path, remote_path)
@@ -176,7 +209,7 @@ class WSFileManager:
         """
         self.ws_client = ws_client
 
-    def read_bytes(self, timeout=0):
+    def read_bytes(self, timeout=1):
         """
         Read slice of bytes from stream
 
@@ -206,3 +239,83 @@ class WSFileManager:
                                 elif channel == STDERR_CHANNEL:
                                     stderr_bytes = data
         return stdout_bytes, stderr_bytes, not self.ws_client._connected
+
+
+class WSStdoutReader:
+    """
+    Blocking file-like reader over the stdout channel of a K8s exec stream, for tarfile stream mode.
+    Waits on the socket with select instead of polling, and gives up after `timeout` seconds without data.
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, ws_file_manager, timeout=180, poll_interval=1):
+        self.ws_file_manager = ws_file_manager
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.received_bytes = 0
+        self._buffer = bytearray()
+        self._stderr = []
+        self._closed = False
+
+    def read(self, size=-1):
+        while not self._closed and (size < 0 or len(self._buffer) < size):
+            if not self._fill():
+                break
+        if size < 0 or size >= len(self._buffer):
+            data = bytes(self._buffer)
+            self._buffer.clear()
+        else:
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+        return data
+
+    def _fill(self):
+        """wait for the next frame. Returns False once the stream is closed"""
+        deadline = time.time() + self.timeout
+        while True:
+            out, err, closed = self.ws_file_manager.read_bytes(timeout=self.poll_interval)
+            if err:
+                self._stderr.append(err)
+            if out:
+                self._buffer.extend(out)
+                self.received_bytes += len(out)
+                return True
+            if closed:
+                self._closed = True
+                return False
+            if err:
+                deadline = time.time() + self.timeout
+            elif time.time() > deadline:
+                raise TimeoutError("no data received from pod in {0}s".format(self.timeout))
+
+    def stderr_text(self):
+        return b"".join(self._stderr).decode("utf-8", errors='ignore').strip()
+
+
+def parallel_download(tasks, max_workers=const.GATHER_THREADS_LIMIT, stdio=None):
+    """
+    run several downloads at once, e.g. the same log file from many pods or many files from one pod.
+    :param tasks: list of (client, remote_path, local_path), client is any client with download()
+    :return: dict of remote_path (or (client name, remote_path) when several clients are used) -> True or the exception
+    """
+    results = {}
+    if not tasks:
+        return results
+    multi_client = len(set(id(task[0]) for task in tasks)) > 1
+
+    def _download(task):
+        ssh_client, remote_path, local_path = task
+        try:
+            return ssh_client.download(remote_path, local_path)
+        except Exception as e:
+            if stdio is not None:
+                stdio.warn("download {0} to {1} failed: {2}".format(remote_path, local_path, e))
+            return e
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks)))) as executor:
+        futures = [(task, executor.submit(_download, task)) for task in tasks]
+        for task, future in futures:
+            key = (task[0].get_name(), task[1]) if multi_client else task[1]
+            results[key] = future.result()
+    return results
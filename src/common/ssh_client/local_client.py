@@ -55,6 +55,9 @@ class LocalClient(SsherClient):
         except Exception as e:
             self.stdio.warn("download file from localhost, remote_path=[{0}], local_path=[{1}], error=[{2}]".format(remote_path, local_path, str(e)))
 
+    def open_file(self, remote_path):
+        return open(remote_path, 'rb')
+
     def upload(self, remote_path, local_path):
         try:
             shutil.copy(local_path, remote_path)
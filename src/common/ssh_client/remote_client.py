@@ -48,6 +48,9 @@ class RemoteClient(SsherClient):
         self.password = self.node.get("ssh_password")
         self.key_file = self.node.get("ssh_key_file")
         self.key_file = os.path.expanduser(self.key_file)
+        # ssh_connect_timeout bounds the tcp connect, banner and auth of the connection, unset waits as long as paramiko does
+        connect_timeout = self.node.get("ssh_connect_timeout")
+        self._connect_kwargs = dict(timeout=connect_timeout, banner_timeout=connect_timeout, auth_timeout=connect_timeout) if connect_timeout else {}
         self._ssh_fd = None
         self._sftp_client = None
         # remote_client_sudo
@@ -67,11 +70,11 @@ class RemoteClient(SsherClient):
                 else:
                     self._ssh_fd.load_system_host_keys()
                 self._ssh_fd.set_missing_host_key_policy(paramiko.client.AutoAddPolicy())
-                self._ssh_fd.connect(hostname=self.host_ip, username=self.username, key_filename=self.key_file, port=self.ssh_port, disabled_algorithms=self._disabled_rsa_algorithms)
+                self._ssh_fd.connect(hostname=self.host_ip, username=self.username, key_filename=self.key_file, port=self.ssh_port, disabled_algorithms=self._disabled_rsa_algorithms, **self._connect_kwargs)
             except AuthenticationException:
                 self.password = input("Authentication failed, Input {0}@{1} password:\n".format(self.username, self.host_ip))
                 self.need_password = True
-                self._ssh_fd.connect(hostname=self.host_ip, username=self.username, password=self.password, port=self.ssh_port, disabled_algorithms=self._disabled_rsa_algorithms)
+                self._ssh_fd.connect(hostname=self.host_ip, username=self.username, password=self.password, port=self.ssh_port, disabled_algorithms=self._disabled_rsa_algorithms, **self._connect_kwargs)
             except Exception as e:
                 raise OBDIAGSSHConnException("ssh {0} port {1} failed, exception:{2}".format(self.host_ip, self.ssh_port, e))
         else:
@@ -82,7 +85,7 @@ class RemoteClient(SsherClient):
                 self._ssh_fd.load_system_host_keys()
             self._ssh_fd.set_missing_host_key_policy(paramiko.client.AutoAddPolicy())
             self.need_password = True
-            self._ssh_fd.connect(hostname=self.host_ip, username=self.username, password=self.password, port=self.ssh_port, disabled_algorithms=self._disabled_rsa_algorithms)
+            self._ssh_fd.connect(hostname=self.host_ip, username=self.username, password=self.password, port=self.ssh_port, disabled_algorithms=self._disabled_rsa_algorithms, **self._connect_kwargs)
 
     def exec_cmd(self, cmd):
         stdin, stdout, stderr = None, None, None
@@ -156,6 +159,21 @@ class RemoteClient(SsherClient):
         self._sftp_client.get(remote_path, local_path)
         self._sftp_client.close()
 
+    def open_file(self, remote_path):
+        # a file object read over sftp, the sftp session is closed with it
+        sftp_client = paramiko.SFTPClient.from_transport(self._ssh_fd.get_transport())
+        self.stdio.verbose('Open {0}:{1}'.format(self.host_ip, remote_path))
+        remote_file = sftp_client.open(remote_path, 'rb')
+        remote_file.prefetch()
+        close = remote_file.close
+
+        def close_all():
+            close()
+            sftp_client.close()
+
+        remote_file.close = close_all
+        return remote_file
+
     def progress_bar(self, transferred, to_be_transferred, suffix=''):
         if self.stdio.silent:
             return
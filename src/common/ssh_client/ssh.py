@@ -19,6 +19,8 @@ import os
 import re
 import socket
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.common.constant import const
 from src.common.ssh_client.docker_client import DockerClient
 from src.common.ssh_client.kubernetes_client import KubernetesClient
 from src.common.ssh_client.local_client import LocalClient
@@ -32,6 +34,32 @@ class TimeoutException(Exception):
     pass
 
 
+_local_ip_list = None
+_local_ip_lock = threading.Lock()
+
+
+def get_local_ip_list(stdio=None):
+    """
+    get the ip list of this host. Resolved once per process, because getaddrinfo on the
+    hostname may be slow (DNS) and every SshClient needs it to detect local nodes.
+    """
+    global _local_ip_list
+    with _local_ip_lock:
+        if _local_ip_list is None:
+            local_ip_list = []
+            try:
+                hostname = socket.gethostname()
+                addresses = socket.getaddrinfo(hostname, None)
+                for address in addresses:
+                    local_ip_list.append(address[4][0])
+            except Exception as e:
+                if stdio is not None:
+                    stdio.warn("get local ip warn: {} . Set local_ip Is 127.0.0.1".format(e))
+            local_ip_list.append('127.0.0.1')
+            _local_ip_list = list(set(local_ip_list))
+        return list(_local_ip_list)
+
+
 class SshClient(SafeStdio):
     # some not safe command will be filter
     filter_cmd_list = ["rm -rf /", ":(){:|:&};:", "reboot", "shutdown"]
@@ -54,17 +82,7 @@ class SshClient(SafeStdio):
             self.cmd_exec_timeout = 180
 
     def local_ip(self):
-        local_ip_list = []
-        try:
-            hostname = socket.gethostname()
-            addresses = socket.getaddrinfo(hostname, None)
-            for address in addresses:
-                local_ip_list.append(address[4][0])
-        except Exception as e:
-            if self.stdio is not None:
-                self.stdio.warn("get local ip warn: {} . Set local_ip Is 127.0.0.1".format(e))
-        local_ip_list.append('127.0.0.1')
-        return list(set(local_ip_list))
+        return get_local_ip_list(self.stdio)
 
     def init(self):
         try:
@@ -163,9 +181,33 @@ class SshClient(SafeStdio):
             pass
         return self.client.download(remote_path, local_path)
 
+    def download_files(self, file_list, max_workers=4):
+        """
+        download several files of the node, at once where the client can (one exec stream per file on a pod)
+        :param file_list: list of (remote_path, local_path)
+        :return: dict of remote_path -> True or the exception of the transfer
+        """
+        for _, local_path in file_list:
+            os.makedirs(os.path.dirname(local_path) or ".", exist_ok=True)
+        if isinstance(self.client, KubernetesClient):
+            return self.client.download_files(file_list, max_workers=max_workers)
+        results = {}
+        for remote_path, local_path in file_list:
+            try:
+                self.client.download(remote_path, local_path)
+                results[remote_path] = True
+            except Exception as e:
+                self.stdio.warn("download {0} to {1} failed: {2}".format(remote_path, local_path, e))
+                results[remote_path] = e
+        return results
+
     def upload(self, remote_path, local_path):
         return self.client.upload(remote_path, local_path)
 
+    def open_file(self, remote_path):
+        """a readable binary stream of a file on the node, without downloading it first"""
+        return self.client.open_file(remote_path)
+
     def ssh_invoke_shell_switch_user(self, new_user, cmd, time_out):
         return self.client.ssh_invoke_shell_switch_user(new_user, cmd, time_out)
 
@@ -196,3 +238,102 @@ class SshClient(SafeStdio):
             if re.match(filter_cmd, cmd):
                 self.stdio.error("cmd is not safe: {}".format(cmd))
                 raise Exception("cmd is not safe: {}".format(cmd))
+
+
+class LazySshClient(object):
+    """
+    Stand-in for SshClient that opens the connection on first use.
+    Attribute access is forwarded to the real SshClient, so callers can keep using node["ssher"].exec_cmd(...).
+    If the node belongs to a LazySshClientGroup, the first use starts connecting the whole group in parallel.
+    A connection error is raised on every use of this node, not when the stand-in is built.
+    """
+
+    def __init__(self, context, node, group=None):
+        self._context = context
+        self._node = node
+        self._group = group
+        self._client = None
+        self._error = None
+        self._lock = threading.Lock()
+
+    @property
+    def node(self):
+        return self._node
+
+    @property
+    def connected(self):
+        return self._client is not None
+
+    def connect(self):
+        with self._lock:
+            if self._client is None and self._error is None:
+                try:
+                    self._client = SshClient(self._context, self._node)
+                except Exception as e:
+                    self._error = e
+        if self._error is not None:
+            raise self._error
+        return self._client
+
+    def try_connect(self):
+        try:
+            self.connect()
+            return True
+        except Exception:
+            return False
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        # a copied node shares the connection instead of duplicating it
+        return self
+
+    def __getattr__(self, name):
+        # keep copy/pickle and other dunder probes from opening a connection
+        if name.startswith("__"):
+            raise AttributeError(name)
+        if self._client is None and self._group is not None:
+            self._group.connect_all()
+        return getattr(self.connect(), name)
+
+
+class LazySshClientGroup(object):
+    """
+    A set of LazySshClient. On the first use of any member, every member starts connecting
+    in a background pool, so unreachable hosts cost one ssh timeout in total instead of one each.
+    """
+
+    def __init__(self, context, max_workers=const.SSH_CONNECT_THREADS_LIMIT):
+        self.context = context
+        self.stdio = context.stdio if context is not None else None
+        self.max_workers = max(1, max_workers)
+        self.clients = []
+        self._started = False
+        self._lock = threading.Lock()
+
+    def add(self, node):
+        client = LazySshClient(self.context, node, group=self)
+        self.clients.append(client)
+        return client
+
+    def connect_all(self, wait=False):
+        """
+        Start connecting all members that are not connected yet.
+        :param wait: block until every member is connected or failed
+        """
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        pending = [client for client in self.clients if not client.connected]
+        if not pending:
+            return
+        if self.stdio is not None:
+            self.stdio.verbose("connect {0} nodes in parallel".format(len(pending)))
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending)))
+        futures = [executor.submit(client.try_connect) for client in pending]
+        executor.shutdown(wait=False)
+        if wait:
+            for future in futures:
+                future.result()
@@ -13,10 +13,14 @@
 
 from __future__ import absolute_import, division, print_function
 
+import atexit
 import os
 import signal
 import sys
 import fcntl
+import queue
+import threading
+import time
 import traceback
 import inspect2
 import six
@@ -363,10 +367,127 @@ class MsgLevel(object):
     NOTSET = 0
 
 
+def format_log_msg(msg, args):
+    """%-style formatting like logging, with a fallback to str.format for '{}' style messages"""
+    msg = str(msg)
+    if not args:
+        return msg
+    try:
+        return msg % args
+    except (TypeError, ValueError, KeyError):
+        if '{' in msg:
+            return msg.format(*args)
+        raise
+
+
+class BatchedTimedRotatingFileHandler(handlers.TimedRotatingFileHandler):
+    """
+    TimedRotatingFileHandler that flushes once per batch instead of once per record,
+    and counts the bytes and records it wrote.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(BatchedTimedRotatingFileHandler, self).__init__(*args, **kwargs)
+        self.batching = False
+        self.bytes_written = 0
+        self.records_written = 0
+
+    def format(self, record):
+        text = super(BatchedTimedRotatingFileHandler, self).format(record)
+        self.bytes_written += len(text.encode('utf-8', errors='replace')) + len(self.terminator)
+        self.records_written += 1
+        return text
+
+    def flush(self):
+        if not self.batching:
+            super(BatchedTimedRotatingFileHandler, self).flush()
+
+
+class AsyncLogWriter(object):
+    """
+    Writes the trace log on a background thread. Callers only enqueue (time, level, msg, args);
+    formatting, line splitting and file I/O happen on the writer thread, in batches.
+    """
+
+    BATCH_SIZE = 512
+
+    def __init__(self, logger):
+        self.logger = logger
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        # sys.exit() from anywhere still gets the queued records on disk
+        atexit.register(self.flush)
+
+    def _ensure_started(self):
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid:
+            return
+        with self._lock:
+            # a forked child does not inherit the writer thread, start a new one
+            if self._thread is None or self._pid != pid:
+                self._queue = queue.Queue()
+                self._pid = pid
+                self._thread = threading.Thread(target=self._run, name='obdiag-log-writer', daemon=True)
+                self._thread.start()
+
+    def submit(self, levelno, msg, args):
+        self._ensure_started()
+        self._queue.put((time.time(), levelno, msg, args))
+
+    def flush(self):
+        """block until every submitted record is written"""
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            self._queue.join()
+
+    def _run(self):
+        log_queue = self._queue
+        while True:
+            batch = [log_queue.get()]
+            try:
+                while len(batch) < self.BATCH_SIZE:
+                    batch.append(log_queue.get_nowait())
+            except queue.Empty:
+                pass
+            try:
+                self._write(batch)
+            except Exception:
+                pass
+            finally:
+                for _ in batch:
+                    log_queue.task_done()
+
+    def _write(self, batch):
+        log_handlers = self.logger.handlers
+        for handler in log_handlers:
+            handler.batching = True
+        try:
+            for created, levelno, msg, args in batch:
+                if not self.logger.isEnabledFor(levelno):
+                    continue
+                try:
+                    text = format_log_msg(msg, args)
+                except Exception:
+                    text = '%s %r' % (msg, args)
+                for line in text.split('\n'):
+                    record = self.logger.makeRecord(self.logger.name, levelno, '(unknown file)', 0, line, None, None)
+                    # keep the time of the call, not of the write
+                    record.created = created
+                    record.msecs = (created - int(created)) * 1000
+                    self.logger.handle(record)
+        finally:
+            for handler in log_handlers:
+                handler.batching = False
+                handler.flush()
+
+
 class IO(object):
 
     WIDTH = 64
     VERBOSE_LEVEL = 0
+    # write the trace log on a background thread
+    ASYNC_LOG = True
     WARNING_PREV = FormtatText.warning('[WARN]')
     ERROR_PREV = FormtatText.error('[ERROR]')
     SUGGEST_PREV = FormtatText.suggest('[SUGGEST]')
@@ -380,6 +501,7 @@ class IO(object):
         self._trace_id = None
         self._log_name = 'default'
         self._trace_logger = None
+        self._log_writer = None
         self._log_cache = [] if use_cache else None
         self._root_io = root_io
         self.track_limit = track_limit
@@ -450,6 +572,7 @@ class IO(object):
             if trace_id:
                 self._trace_id = trace_id
             self._trace_logger = None
+            self._log_writer = None
             return True
         return False
 
@@ -457,7 +580,7 @@ class IO(object):
         state = {}
         for key in self.__dict__:
             state[key] = self.__dict__[key]
-        for key in ['_trace_logger', 'input_stream', 'sync_obj', '_out_obj', '_err_obj', '_cur_out_obj', '_cur_err_obj', '_before_critical']:
+        for key in ['_trace_logger', '_log_writer', 'input_stream', 'sync_obj', '_out_obj', '_err_obj', '_cur_out_obj', '_cur_err_obj', '_before_critical']:
             state[key] = None
         return state
 
@@ -467,14 +590,39 @@ class IO(object):
             return self._root_io.trace_logger
         if self.log_path and self._trace_logger is None:
             self._trace_logger = Logger(self.log_name)
-            handler = handlers.TimedRotatingFileHandler(self.log_path, when='midnight', interval=1, backupCount=30)
+            handler = BatchedTimedRotatingFileHandler(self.log_path, when='midnight', interval=1, backupCount=30)
             if self.trace_id:
                 handler.setFormatter(logging.Formatter("[%%(asctime)s.%%(msecs)03d] [%s] [%%(levelname)s] %%(message)s" % self.trace_id, "%Y-%m-%d %H:%M:%S"))
             else:
                 handler.setFormatter(logging.Formatter("[%%(asctime)s.%%(msecs)03d] [%%(levelname)s] %%(message)s", "%Y-%m-%d %H:%M:%S"))
             self._trace_logger.addHandler(handler)
+            self._log_writer = AsyncLogWriter(self._trace_logger) if self.ASYNC_LOG else None
         return self._trace_logger
 
+    @property
+    def log_writer(self):
+        if self._root_io:
+            return self._root_io.log_writer
+        return self._log_writer
+
+    def get_log_stats(self):
+        """bytes and records written by each trace log handler, e.g. {'/root/.obdiag/log/obdiag.log': {'bytes': 1024, 'records': 10}}"""
+        if self._root_io:
+            return self._root_io.get_log_stats()
+        stats = {}
+        if self._trace_logger is None:
+            return stats
+        self.flush_log_writer()
+        for handler in self._trace_logger.handlers:
+            name = getattr(handler, 'baseFilename', None) or handler.get_name() or type(handler).__name__
+            stats[name] = {'bytes': getattr(handler, 'bytes_written', 0), 'records': getattr(handler, 'records_written', 0)}
+        return stats
+
+    def flush_log_writer(self):
+        log_writer = self.log_writer
+        if log_writer is not None:
+            log_writer.flush()
+
     @property
     def trace_id(self):
         if self._root_io:
@@ -745,9 +893,7 @@ class IO(object):
             return False
 
     def _format(self, msg, *args):
-        if args:
-            msg = msg % args
-        return msg
+        return format_log_msg(msg, args)
 
     def _print(self, msg_lv, msg, *args, **kwargs):
         if msg_lv < self.msg_lv:
@@ -784,22 +930,28 @@ class IO(object):
     def _cache_log(self, levelno, msg, *args, **kwargs):
         if self.trace_logger:
             log_cache = self.log_cache
-            lines = str(msg).split('\n')
-            for line in lines:
-                if log_cache is None:
-                    self._log(levelno, line, *args, **kwargs)
-                else:
-                    log_cache.append((levelno, line, args, kwargs))
+            if log_cache is None:
+                self._log(levelno, msg, *args, **kwargs)
+            else:
+                log_cache.append((levelno, msg, args, kwargs))
 
     def _flush_log(self):
         if not self._root_io and self.trace_logger and self._log_cache:
-            for levelno, line, args, kwargs in self._log_cache:
-                self.trace_logger.log(levelno, line, *args, **kwargs)
+            for levelno, msg, args, kwargs in self._log_cache:
+                self._log(levelno, msg, *args, **kwargs)
             self._log_cache = []
+        if not self._root_io:
+            self.flush_log_writer()
 
     def _log(self, levelno, msg, *args, **kwargs):
         if self.trace_logger:
-            self.trace_logger.log(levelno, msg, *args, **kwargs)
+            log_writer = self.log_writer
+            if log_writer is not None:
+                # formatting is left to the writer thread
+                log_writer.submit(levelno, msg, args)
+                return
+            for line in format_log_msg(msg, args).split('\n'):
+                self.trace_logger.log(levelno, line, **kwargs)
 
     def _flush_cache(self):
         if not self._root_io:
@@ -830,8 +982,14 @@ class IO(object):
             self.exit(code)
 
     def verbose(self, msg, *args, **kwargs):
+        """
+        verbose(fmt, *args) formats only when the message is emitted, e.g. stdio.verbose("read file %s, %d lines", name, n).
+        With the async trace log, that happens on the log writer thread.
+        """
         if self.level > self.VERBOSE_LEVEL:
-            self.log(MsgLevel.VERBOSE, '%s %s' % (self._verbose_prefix, msg), *args, **kwargs)
+            if self.trace_logger is None:
+                return
+            self.log(MsgLevel.VERBOSE, self._verbose_prefix + ' %s', _LazyMsg(msg, args), **kwargs)
             return
         self._print(MsgLevel.VERBOSE, '%s %s' % (self._verbose_prefix, msg), *args, **kwargs)
 
@@ -891,6 +1049,19 @@ class IO(object):
             print_stack(''.join(lines))
 
 
+class _LazyMsg(object):
+    """message and its args, formatted on str()"""
+
+    __slots__ = ('msg', 'args')
+
+    def __init__(self, msg, args):
+        self.msg = msg
+        self.args = args
+
+    def __str__(self):
+        return format_log_msg(self.msg, self.args)
+
+
 class _Empty(object):
     pass
 
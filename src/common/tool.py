@@ -43,6 +43,8 @@ import lzma
 import pymysql as mysql
 import shutil
 import tarfile
+import tempfile
+import zipfile
 import os
 
 # Cross-platform zip compression support
@@ -762,6 +764,79 @@ class FileUtil(object):
 
         return True
 
+    @staticmethod
+    def tar_stream_to_zip(fileobj, output_zip, password, stdio, temp_dir=None):
+        """
+        build the zip straight from a tar stream (a local file or a file opened over sftp), the tar is never extracted.
+        members compressed already (.gz) are stored as they are instead of being deflated a second time.
+        pyminizip and pyzipper only add files from disk to an encrypted zip, for them every member is written once to temp_dir.
+        """
+
+        def copy_member(member, source, target):
+            # a stream cut short (a dropped sftp session) only gives a short read, not an error
+            copied = 0
+            while True:
+                chunk = source.read(1024 * 1024)
+                if not chunk:
+                    break
+                target.write(chunk)
+                copied += len(chunk)
+            if copied != member.size:
+                raise tarfile.ReadError("unexpected end of data in {0}: {1} of {2} bytes".format(member.name, copied, member.size))
+
+        spool_dir = tempfile.mkdtemp(prefix="obdiag_zip_", dir=temp_dir)
+        try:
+            files_to_compress = []
+            base_paths = []
+            zf = None
+            if not password:
+                zf = zipfile.ZipFile(output_zip, 'w', compression=zipfile.ZIP_DEFLATED, allowZip64=True)
+            elif _USE_PYZIPPER:
+                zf = pyzipper.AESZipFile(output_zip, 'w', compression=pyzipper.ZIP_DEFLATED, encryption=pyzipper.WZ_AES)
+                zf.setpassword(password.encode('utf-8'))
+            try:
+                with tarfile.open(fileobj=fileobj, mode='r|*') as tar:
+                    for member in tar:
+                        if not member.isfile():
+                            continue
+                        compress_type = zipfile.ZIP_STORED if member.name.endswith(".gz") else zipfile.ZIP_DEFLATED
+                        source = tar.extractfile(member)
+                        if not password:
+                            # zip has no timestamps before 1980
+                            zinfo = zipfile.ZipInfo(member.name, date_time=max(time.localtime(member.mtime)[:6], (1980, 1, 1, 0, 0, 0)))
+                            zinfo.compress_type = compress_type
+                            zinfo.file_size = member.size
+                            with zf.open(zinfo, 'w', force_zip64=member.size > 0x7FFFFFFF) as target:
+                                copy_member(member, source, target)
+                            continue
+                        spool_path = os.path.join(spool_dir, str(len(files_to_compress)), os.path.basename(member.name))
+                        os.makedirs(os.path.dirname(spool_path))
+                        with open(spool_path, 'wb') as target:
+                            copy_member(member, source, target)
+                        if zf is not None:
+                            zf.write(spool_path, member.name, compress_type=compress_type)
+                            os.remove(spool_path)
+                        else:
+                            files_to_compress.append(spool_path)
+                            base_paths.append(os.path.dirname(member.name))
+            finally:
+                if zf is not None:
+                    zf.close()
+            if files_to_compress:
+                # one level for the whole zip: store when every member is compressed already
+                level = 0 if all(path.endswith(".gz") for path in files_to_compress) else 5
+                pyminizip.compress_multiple(files_to_compress, base_paths, output_zip, password, level)
+            stdio.verbose("tar stream compressed into {0} {1}".format("encrypted" if password else "unencrypted", output_zip))
+        except tarfile.TarError as te:
+            stdio.exception("tar file error: {0}".format(te))
+            return False
+        except Exception as e:
+            stdio.exception("an error occurred: {0}".format(e))
+            return False
+        finally:
+            shutil.rmtree(spool_dir, ignore_errors=True)
+        return True
+
 
 class YamlLoader(YAML):
 
@@ -78,6 +78,7 @@ Tool selection for gather operations:
 
 After a gather completes, if the user asks to **analyze / 分析 / 解读** logs (including OBProxy ``obproxy_diagnosis`` etc.):
 - Prefer **file_list** (with a glob **pattern** if needed) and **file_read** under the **existing** gather output directory (e.g. ``obdiag_gather_pack_*``) to locate and read relevant diagnosis / log files, then summarize in natural language.
+- For questions over the logs of a pack (time range, level, keyword, trace id, ret code, tenant), use **log_search** on the pack directory or archive: call it once with only ``pack_path`` for an overview, then with filters. It reads .tar.gz / .zip packs without unpacking and keeps its index next to the pack for later sessions.
 - Do **not** call ``gather_obproxy_log`` again unless the user explicitly wants a **new** collection (different time range, re-pull from nodes, or narrower scope because the previous pack is missing).
 - ``analyze_log`` is **only** for OceanBase **cluster observer-node log analysis** (``obdiag analyze log`` scopes: observer, election, rootservice, all — all cluster-side, not OBProxy/**OMS**). For OBProxy use file tools after ``gather_obproxy_log``; for **OMS** use file tools after ``gather_oms_log`` — not ``analyze_log``.
 
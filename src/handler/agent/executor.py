@@ -65,6 +65,7 @@ OBDIAG_TOOL_SUMMARY_ZH: Dict[str, str] = {
     "file_read": "读取本地文本文件",
     "file_write": "写入或追加本地文件",
     "file_list": "列出目录内容",
+    "log_search": "检索采集包日志（索引）",
     "run_shell": "执行本地 Shell（需审批）",
     "generate_config": "生成 obdiag 集群配置",
     "query_oceanbase_knowledge_base": "查询 OceanBase 知识库",
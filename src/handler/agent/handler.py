@@ -50,6 +50,7 @@ from src.handler.agent.config import (
     resolve_cluster_config_path,
 )
 from src.handler.agent.models import AgentConfig, AgentDependencies, read_obcluster_config
+from src.handler.agent.session_journal import SESSION_JOURNAL_SUFFIX, SessionJournal
 
 SESSIONS_DIR = os.path.expanduser("~/.obdiag/sessions")
 
@@ -112,6 +113,8 @@ MAX_HISTORY_MESSAGES = 20
 MAX_HISTORY_WHEN_RESUMED = 10
 
 # Session file: v1 wraps messages + cumulative RunUsage; legacy file is a raw JSON array of messages.
+# New sessions are written as an append-only journal (<id>.jsonl, see session_journal.py); v1 / legacy files are
+# still resumed and continue in a journal.
 _SESSION_FILE_VERSION = 1
 
 # Max characters of tool arguments shown on the terminal (agent UI).
@@ -611,6 +614,7 @@ class AiAgentHandler:
         self._deps: Optional[AgentDependencies] = None
         self._history: List[Any] = []
         self._session_id: Optional[str] = None
+        self._journal: Optional[SessionJournal] = None
         # Cumulative LLM usage for this session (pydantic-ai RunUsage); persisted in v1 session files.
         self._cumulative_usage = RunUsage()
         self._last_turn_usage = RunUsage()
@@ -641,26 +645,25 @@ class AiAgentHandler:
     def _session_path(self, session_id: str) -> str:
         return os.path.join(SESSIONS_DIR, f"{session_id}.json")
 
+    def _journal_path(self, session_id: str) -> str:
+        return os.path.join(SESSIONS_DIR, f"{session_id}{SESSION_JOURNAL_SUFFIX}")
+
     def _generate_session_id(self) -> str:
         return time.strftime("%Y%m%d_%H%M%S")
 
     def _save_session(self):
-        """Save current history (and cumulative usage) to disk."""
+        """Append the messages added since the last save (and cumulative usage) to the session journal."""
         if not self._history:
             return
         self._ensure_sessions_dir()
         if not self._session_id:
             self._session_id = self._generate_session_id()
-        path = self._session_path(self._session_id)
+        path = self._journal_path(self._session_id)
         try:
-            messages_val = json.loads(ModelMessagesTypeAdapter.dump_json(self._history).decode("utf-8"))
-            envelope = {
-                "v": _SESSION_FILE_VERSION,
-                "messages": messages_val,
-                "usage": _run_usage_to_dict(self._cumulative_usage),
-            }
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(envelope, f, ensure_ascii=False, separators=(",", ":"))
+            if self._journal is None or self._journal.path != path:
+                self._journal = SessionJournal(path)
+            written = self._journal.save(self._history, _run_usage_to_dict(self._cumulative_usage))
+            self.stdio.verbose(f"Session {self._session_id}: {written} bytes appended to {path}")
             self._session_save_warned = False
         except Exception as e:
             self.stdio.verbose(f"Failed to save session: {e}")
@@ -669,16 +672,26 @@ class AiAgentHandler:
                 self._session_save_warned = True
 
     def _load_session(self, session_id: str) -> bool:
-        """Load history from a saved session. Returns True on success."""
+        """Load the tail of the history from a saved session. Returns True on success."""
+        journal_path = self._journal_path(session_id)
         path = self._session_path(session_id)
-        if not os.path.exists(path):
+        if not os.path.exists(journal_path) and not os.path.exists(path):
             self.stdio.print(f"Session not found: {session_id}\n")
             return False
         try:
-            with open(path, "rb") as f:
-                data = f.read()
-            loaded, usage = _load_session_messages_and_usage(data)
+            journal = SessionJournal(journal_path)
+            if os.path.exists(journal_path):
+                # read a few more than kept so the safe truncation can still pair tool calls with their returns
+                loaded, usage_dict = journal.read_tail(2 * MAX_HISTORY_WHEN_RESUMED)
+                usage = _run_usage_from_dict(usage_dict)
+            else:
+                with open(path, "rb") as f:
+                    data = f.read()
+                loaded, usage = _load_session_messages_and_usage(data)
+                usage_dict = None
             self._history = _truncate_history_safe(loaded, MAX_HISTORY_WHEN_RESUMED)
+            journal.attach(self._history, usage_dict)
+            self._journal = journal
             self._cumulative_usage = usage
             self._last_turn_usage = RunUsage()
             self._last_turn_peak_input_tokens = 0
@@ -691,17 +704,18 @@ class AiAgentHandler:
     def _list_sessions(self):
         """List saved sessions."""
         self._ensure_sessions_dir()
-        files = sorted(
-            [f for f in os.listdir(SESSIONS_DIR) if f.endswith(".json")],
-            reverse=True,
-        )
-        if not files:
+        sessions: Dict[str, str] = {}
+        for f in os.listdir(SESSIONS_DIR):
+            for suffix in (".json", SESSION_JOURNAL_SUFFIX):
+                # a v1 session resumed once goes on in a journal with the same id, the journal wins
+                if f.endswith(suffix) and (suffix == SESSION_JOURNAL_SUFFIX or f.removesuffix(suffix) not in sessions):
+                    sessions[f.removesuffix(suffix)] = f
+        if not sessions:
             self.stdio.print("No saved sessions.\n")
             return
         self.stdio.print("\nSaved sessions:\n")
-        for f in files[:20]:
-            sid = f.removesuffix(".json")
-            path = os.path.join(SESSIONS_DIR, f)
+        for sid in sorted(sessions, reverse=True)[:20]:
+            path = os.path.join(SESSIONS_DIR, sessions[sid])
             size = os.path.getsize(path)
             self.stdio.print(f"  {sid}  ({size} bytes)")
         self.stdio.print(f"\nResume with: obdiag agent --resume <session_id>\n")
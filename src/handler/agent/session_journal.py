@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: session_journal.py
+@desc: append-only agent session file (JSONL). A save appends only the messages added since the previous save and the
+       cumulative usage; resume reads the file from its end and validates only the last messages.
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic_ai.messages import ModelMessagesTypeAdapter
+
+SESSION_JOURNAL_VERSION = 2
+SESSION_JOURNAL_SUFFIX = ".jsonl"
+# the journal is rewritten with only the live history once it is this big and twice its size after the last rewrite
+SESSION_JOURNAL_COMPACT_BYTES = 4 * 1024 * 1024
+
+# one record per line: {"t":"h",...} header, {"t":"m","m":<message>}, {"t":"u","u":<usage>}, {"t":"r"} history replaced
+_MESSAGE_PREFIX = b'{"t":"m","m":'
+_RESET_RECORD = b'{"t":"r"}\n'
+_TAIL_CHUNK = 64 * 1024
+
+
+def _drop_torn_tail(path: str) -> int:
+    """cut the file back to its last newline, a save that did not finish leaves a torn line there; returns the size"""
+    with open(path, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        end = size
+        while end > 0:
+            step = min(_TAIL_CHUNK, end)
+            f.seek(end - step)
+            chunk = f.read(step)
+            if end == size and chunk.endswith(b"\n"):
+                return size
+            newline = chunk.rfind(b"\n")
+            if newline >= 0:
+                end = end - step + newline + 1
+                break
+            end -= step
+        f.truncate(end)
+        return end
+
+
+def _message_bytes(messages: List[Any]) -> List[bytes]:
+    # every message is dumped on its own (the array brackets stripped), a save only serializes the new ones
+    return [ModelMessagesTypeAdapter.dump_json([msg])[1:-1] for msg in messages]
+
+
+class SessionJournal(object):
+    def __init__(self, path: str):
+        self.path = path
+        # the last message object written, the next save appends what follows it in the history
+        self._last_message: Any = None
+        self._last_usage: Optional[Dict[str, Any]] = None
+        self._base_size = 0
+
+    def attach(self, history: List[Any], usage: Optional[Dict[str, Any]] = None) -> None:
+        """the history was loaded from this journal: the next save only appends the messages added after it"""
+        self._last_message = history[-1] if history else None
+        self._last_usage = usage
+        self._base_size = _drop_torn_tail(self.path) if os.path.exists(self.path) else 0
+
+    def _new_messages(self, history: List[Any]) -> Optional[List[Any]]:
+        if self._last_message is None:
+            return None
+        for i in range(len(history) - 1, -1, -1):
+            msg = history[i]
+            if msg is self._last_message or msg == self._last_message:
+                return history[i + 1 :]
+        # the history was replaced (compact, truncated past the last saved message)
+        return None
+
+    def save(self, history: List[Any], usage: Dict[str, Any]) -> int:
+        """append the messages of history not in the journal yet and the usage if it changed, returns the bytes written"""
+        if not history:
+            return 0
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        torn = False
+        if size:
+            # appending after a torn line would glue the next record onto it and break every later resume
+            repaired = _drop_torn_tail(self.path)
+            torn = repaired != size
+            size = repaired
+        exists = size > 0
+        # the torn line may hold messages this journal counts as written: write the whole history after a reset
+        new = self._new_messages(history) if exists and not torn else None
+        chunks: List[bytes] = []
+        if not exists:
+            chunks.append(json.dumps({"t": "h", "v": SESSION_JOURNAL_VERSION, "created": time.strftime("%Y-%m-%d %H:%M:%S")}).encode("utf-8") + b"\n")
+        if new is None:
+            if exists:
+                chunks.append(_RESET_RECORD)
+            new = history
+        for data in _message_bytes(new):
+            chunks.append(_MESSAGE_PREFIX + data + b"}\n")
+        if usage != self._last_usage:
+            chunks.append(json.dumps({"t": "u", "u": usage}, separators=(",", ":")).encode("utf-8") + b"\n")
+        written = sum(len(chunk) for chunk in chunks)
+        if written:
+            with open(self.path, "ab") as f:
+                f.write(b"".join(chunks))
+        self._last_message = history[-1]
+        self._last_usage = usage
+        size = os.path.getsize(self.path)
+        if size > SESSION_JOURNAL_COMPACT_BYTES and size > 2 * self._base_size:
+            self.compact(history, usage)
+        return written
+
+    def compact(self, history: List[Any], usage: Dict[str, Any]) -> None:
+        """rewrite the journal with only the live history"""
+        tmp_path = "{0}.tmp".format(self.path)
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps({"t": "h", "v": SESSION_JOURNAL_VERSION, "created": time.strftime("%Y-%m-%d %H:%M:%S"), "compacted": True}).encode("utf-8") + b"\n")
+            for data in _message_bytes(history):
+                f.write(_MESSAGE_PREFIX + data + b"}\n")
+            f.write(json.dumps({"t": "u", "u": usage}, separators=(",", ":")).encode("utf-8") + b"\n")
+        os.replace(tmp_path, self.path)
+        self._base_size = os.path.getsize(self.path)
+        self._last_message = history[-1] if history else None
+        self._last_usage = usage
+
+    def read_tail(self, max_messages: int) -> Tuple[List[Any], Optional[Dict[str, Any]]]:
+        """the last max_messages messages (after the last reset) and the last usage, read backwards from the end"""
+        messages: List[bytes] = []
+        usage: Optional[Dict[str, Any]] = None
+        messages_done = max_messages <= 0
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            rest = None
+            while pos > 0:
+                step = min(_TAIL_CHUNK, pos)
+                pos -= step
+                f.seek(pos)
+                lines = (f.read(step) + (rest or b"")).split(b"\n")
+                if rest is None:
+                    # a save writes whole lines, anything after the last newline is a save that did not finish
+                    lines.pop()
+                # the first piece may be the end of a line that starts in the previous chunk
+                rest = lines.pop(0) if pos > 0 else b""
+                for line in reversed(lines):
+                    if not line:
+                        continue
+                    if line.startswith(_MESSAGE_PREFIX):
+                        if not messages_done:
+                            messages.append(line[len(_MESSAGE_PREFIX) : -1])
+                            messages_done = len(messages) >= max_messages
+                    else:
+                        record = json.loads(line)
+                        kind = record.get("t")
+                        if kind == "u" and usage is None:
+                            usage = record.get("u") or {}
+                        elif kind == "r":
+                            # the messages before a reset were replaced, only the usage is still to be found
+                            messages_done = True
+                        elif kind == "h":
+                            pos = 0
+                            break
+                    if messages_done and usage is not None:
+                        pos = 0
+                        break
+        messages.reverse()
+        if not messages:
+            return [], usage
+        try:
+            loaded = list(ModelMessagesTypeAdapter.validate_json(b"[" + b",".join(messages) + b"]"))
+        except ValueError:
+            # a journal written before torn lines were cut holds a record glued onto one, keep the messages after it
+            loaded = []
+            for data in messages:
+                try:
+                    loaded.extend(ModelMessagesTypeAdapter.validate_json(b"[" + data + b"]"))
+                except ValueError:
+                    loaded = []
+        return loaded, usage
@@ -16,6 +16,7 @@
 @desc: File operation toolset for obdiag agent
 """
 
+import fnmatch
 import glob as glob_module
 import os
 import subprocess
@@ -23,6 +24,7 @@ from typing import Literal, Optional
 
 from pydantic_ai import FunctionToolset, RunContext
 
+from src.common.log_index import LogPackIndex, index_path
 from src.handler.agent.models import AgentDependencies
 from src.handler.agent.tool_output_limits import DEFAULT_TOOL_OUTPUT_CHARS, truncate_for_agent
 
@@ -281,6 +283,112 @@ def file_list(
         return f"Directory listing failed: {e}"
 
 
+@file_toolset.tool
+def log_search(
+    ctx: RunContext[AgentDependencies],
+    pack_path: str,
+    keyword: Optional[str] = None,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    level: Optional[Literal["DEBUG", "TRACE", "INFO", "WDIAG", "WARN", "EDIAG", "ERROR", "FATAL"]] = None,
+    trace_id: Optional[str] = None,
+    ret_code: Optional[str] = None,
+    tenant_id: Optional[str] = None,
+    file_pattern: Optional[str] = None,
+    limit: int = 20,
+    context_lines: int = 0,
+    rebuild: bool = False,
+    max_output_chars: int = DEFAULT_TOOL_OUTPUT_CHARS,
+) -> str:
+    """
+    Search the logs of a gather pack (a pack directory, .tar/.tar.gz or unencrypted .zip; archives inside are read too).
+
+    The first call builds an index of the pack and stores it next to it (``<pack>.obdiag_log_index.db``); later calls,
+    also in later sessions, reuse it while the pack is unchanged and answer in milliseconds. Prefer this over
+    ``file_read`` / ``run_shell`` grep for observer / obproxy logs.
+
+    Call it with only ``pack_path`` first for an overview (files, time range, WARN/ERROR counts, top ret codes and
+    tenants), then narrow down. All filters are combined (AND). Hits are ranked by level (FATAL first), then keyword
+    hits, then time.
+
+    Args:
+        pack_path: Gather pack directory or archive
+        keyword: Case-insensitive substring the line must contain
+        start_time: "YYYY-MM-DD HH:MM:SS", lines before it are skipped
+        end_time: "YYYY-MM-DD HH:MM:SS", lines after it are skipped
+        level: Minimum log level, e.g. "WARN" returns WARN, ERROR and FATAL lines
+        trace_id: Trace id such as "Y4C360B9E1F4D-0005F9A76E9E66B2-0-0"
+        ret_code: Error code such as "-4012"
+        tenant_id: Tenant id such as "1002"
+        file_pattern: Glob on the file name inside the pack, e.g. "*observer.log*"
+        limit: Max lines returned (default 20)
+        context_lines: Lines shown before and after every hit (default 0)
+        rebuild: Rebuild the index even if the pack looks unchanged
+        max_output_chars: Hard cap on the returned string
+    """
+    deps = ctx.deps
+    try:
+        abs_path = os.path.abspath(pack_path)
+        deny = _check_path_allowed(abs_path) or _check_path_allowed(index_path(abs_path), write=True)
+        if deny:
+            return f"Error: {deny}"
+        if not os.path.exists(abs_path):
+            return f"Error: Pack not found: {abs_path}"
+
+        with LogPackIndex(abs_path).open(rebuild=rebuild) as index:
+            head = f"Index: {index.path}" + (f" (built in {index.build_seconds:.1f}s)" if index.built else " (reused)")
+            filters = (keyword, start_time, end_time, level, trace_id, ret_code, tenant_id)
+            if all(value is None or value == "" for value in filters):
+                summary = index.summary()
+                lines = [
+                    head,
+                    f"Time range: {summary['from']} ~ {summary['to']}",
+                    f"WARN lines: {summary['warn_lines']}, ERROR/FATAL lines: {summary['error_lines']}, distinct trace ids: {summary['trace_count']}",
+                    "Top ret codes: " + (", ".join(f"{value} x{n}" for value, n in summary["top_ret_codes"]) or "-"),
+                    "Top tenants: " + (", ".join(f"{value} x{n}" for value, n in summary["top_tenants"]) or "-"),
+                    f"Files ({len(summary['members'])}):",
+                ]
+                for member in summary["members"]:
+                    if file_pattern and not fnmatch.fnmatch(member["name"], file_pattern):
+                        continue
+                    lines.append(f"  {member['name']}  {member['lines']} lines, {member['bytes']} bytes, {member['from']} ~ {member['to']}")
+                return truncate_for_agent("\n".join(lines), limit=max_output_chars, label="log_search")
+
+            result = index.search(
+                keyword=keyword,
+                start_time=start_time,
+                end_time=end_time,
+                level=level,
+                trace_id=trace_id,
+                ret_code=ret_code,
+                tenant_id=tenant_id,
+                member_pattern=file_pattern,
+                limit=limit,
+                context_lines=max(0, int(context_lines)),
+            )
+        lines = [
+            head,
+            f"Matched lines: {result['total']}, returned: {len(result['hits'])}, blocks read: {result['blocks_read']}, took {result['elapsed_ms']:.1f} ms",
+        ]
+        for hit in result["hits"]:
+            lines.append("")
+            lines.append(f"== {hit['member']}:{hit['line']}")
+            lines.extend(f"   {line}" for line in hit["before"])
+            lines.append(f"=> {hit['text']}")
+            lines.extend(f"   {line}" for line in hit["after"])
+        if result["total"] > len(result["hits"]):
+            lines.append("")
+            lines.append("More lines matched; narrow the time range / level / keyword, or raise limit.")
+        if deps.stdio:
+            deps.stdio.verbose(f"log_search: {abs_path} matched={result['total']} took={result['elapsed_ms']:.1f}ms")
+        return truncate_for_agent("\n".join(lines), limit=max_output_chars, label="log_search")
+
+    except PermissionError as e:
+        return f"Permission denied: {e}"
+    except Exception as e:
+        return f"Log search failed: {e}"
+
+
 @file_toolset.tool(requires_approval=True, retries=1)
 def run_shell(
     ctx: RunContext[AgentDependencies],
@@ -296,7 +404,8 @@ def run_shell(
     - Zip: ``unzip -l x.zip``, ``unzip -q x.zip -d ./out``
     - Sample large logs: ``head -n 200 path``, ``grep -E 'ERROR|WARN' path | head``
 
-    Prefer ``file_list`` / ``file_read`` for small plain text files. Do not run destructive or unrelated commands.
+    Prefer ``file_list`` / ``file_read`` for small plain text files and ``log_search`` for the logs of a pack.
+    Do not run destructive or unrelated commands.
 
     Args:
         command: Shell command string (executed with ``shell=True``)
@@ -72,7 +72,8 @@ _OBPROXY_GATHER_ANALYSIS_FOLLOWUP = (
     "**Next (same agent run):** If the user asked to 分析/解读/看看日志内容, or implied it after collection, "
     "do **not** stop here. Call **file_list** on the directory printed above (e.g. path containing "
     "`obdiag_gather_pack_`). If you see **.tar.gz / .zip**, use **run_shell** (user approval) to unpack or "
-    "`tar -t` / `unzip -l`, then **file_read** plain log files; then summarize. "
+    "`tar -t` / `unzip -l`, then **file_read** plain log files, or call **log_search** on the pack for filtered, "
+    "ranked lines without unpacking; then summarize. "
     "OBProxy logs are not handled by `analyze_log`."
 )
 
@@ -80,7 +81,8 @@ _OMS_GATHER_ANALYSIS_FOLLOWUP = (
     "\n\n---\n"
     "**Next (same agent run):** If the user asked to 分析/解读/看看 OMS or Ghana / CDC logs after collection, "
     "do **not** stop here. Call **file_list** on the pack directory from stdout (`obdiag_gather_pack_*`). "
-    "For **.tar.gz / .zip**, use **run_shell** (user approval) to list/unpack, then **file_read** plain logs; then summarize. "
+    "For **.tar.gz / .zip**, use **log_search** on the pack (no unpack needed), or **run_shell** (user approval) to "
+    "list/unpack, then **file_read** plain logs; then summarize. "
     "OMS / CDC logs are **not** handled by `analyze_log` (that is observer-side only)."
 )
 
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: analyze_combined.py
+@desc: analyze log, memory and queue of offline observer logs in one read of the files
+"""
+import os
+
+import tabulate
+
+from src.common.ob_log_level import OBLogLevel
+from src.common.result_type import ObdiagResult
+from src.common.tool import DirectoryUtil, FileUtil, TimeUtils, Util
+from src.handler.analyzer.analyze_log import ObLogErrorConsumer
+from src.handler.analyzer.analyze_memory import MemoryDumpConsumer
+from src.handler.analyzer.analyze_queue import QueueStatConsumer
+from src.handler.analyzer.log_parser.record_engine import LogRecordEngine
+from src.handler.meta.ob_error import OB_RET_DICT
+
+
+class AnalyzeCombinedHandler(object):
+    def __init__(self, context):
+        super(AnalyzeCombinedHandler, self).__init__()
+        self.context = context
+        self.stdio = context.stdio
+        self.analyze_files_list = []
+        self.gather_pack_dir = os.path.abspath("./")
+        self.log_level = OBLogLevel.WARN
+        self.version = None
+        self.tenant_id = None
+        self.queue = 50
+
+    def init_option(self):
+        options = self.context.options
+        files_option = Util.get_option(options, 'files')
+        store_dir_option = Util.get_option(options, 'store_dir')
+        log_level_option = Util.get_option(options, 'log_level')
+        version_option = Util.get_option(options, 'version')
+        tenant_id_option = Util.get_option(options, 'tenant_id')
+        queue_option = Util.get_option(options, 'queue')
+        if not files_option:
+            self.stdio.error('the option --files is required')
+            return False
+        self.analyze_files_list = files_option
+        if store_dir_option is not None:
+            if not os.path.exists(os.path.abspath(store_dir_option)):
+                self.stdio.warn('args --store_dir [{0}] incorrect: No such directory, Now create it'.format(os.path.abspath(store_dir_option)))
+                os.makedirs(os.path.abspath(store_dir_option))
+            self.gather_pack_dir = os.path.abspath(store_dir_option)
+        if log_level_option:
+            self.log_level = OBLogLevel().get_log_level(log_level_option)
+        # the memory dump markers depend on the version, the queue dumps are per tenant: each part runs only when it can
+        if version_option:
+            self.version = version_option
+        else:
+            self.stdio.warn('the option --version is not specified, skip analyze memory')
+        if tenant_id_option:
+            self.tenant_id = tenant_id_option.strip()
+        else:
+            self.stdio.warn('the option --tenant_id is not specified, skip analyze queue')
+        if queue_option is not None:
+            self.queue = int(queue_option)
+        return True
+
+    def handle(self):
+        if not self.init_option():
+            self.stdio.error('init option failed')
+            return ObdiagResult(ObdiagResult.INPUT_ERROR_CODE, error_data="init option failed")
+        log_list = self.__get_log_name_list()
+        if len(log_list) == 0:
+            self.stdio.error('No files found in {0}'.format(self.analyze_files_list))
+            return ObdiagResult(ObdiagResult.INPUT_ERROR_CODE, error_data="No files found")
+        self.stdio.print(FileUtil.show_file_list_tabulate('127.0.0.1', log_list, self.stdio))
+        engine = LogRecordEngine(self.stdio)
+        errors = engine.register(ObLogErrorConsumer(self.stdio, self.log_level, by_tenant=False))
+        memory = engine.register(MemoryDumpConsumer(self.version, self.stdio)) if self.version else None
+        queues = engine.register(QueueStatConsumer(self.tenant_id)) if self.tenant_id else None
+        self.stdio.start_loading('analyze log start')
+        stats = engine.run(log_list)
+        self.stdio.stop_loading('analyze log sucess')
+        results = ["\nAnalyze OceanBase Log Summary:\n", self.__get_error_summary(errors, log_list)]
+        if memory is not None:
+            results.extend(["\nAnalyze OceanBase Memory Summary:\n", self.__get_memory_summary(memory, log_list)])
+        if queues is not None:
+            results.extend(["\nAnalyze OceanBase Queue Summary (tenant_id: {0}):\n".format(self.tenant_id), self.__get_queue_summary(queues, log_list)])
+        summary = "\n".join(results)
+        self.stdio.print(summary)
+        local_store_parent_dir = os.path.join(self.gather_pack_dir, "obdiag_analyze_pack_{0}".format(TimeUtils.timestamp_to_filename_time(TimeUtils.get_current_us_timestamp())))
+        DirectoryUtil.mkdir(path=local_store_parent_dir, stdio=self.stdio)
+        result_file = os.path.join(local_store_parent_dir, "result_summary.txt")
+        with open(result_file, 'w', encoding='utf-8') as f:
+            f.write(summary)
+        self.stdio.print("\nFor more details, please run cmd \033[32m' cat {0} '\033[0m\n".format(result_file))
+        return ObdiagResult(ObdiagResult.SUCCESS_CODE, data={"result": summary, "store_dir": local_store_parent_dir, "stats": stats})
+
+    def __get_log_name_list(self):
+        log_name_list = []
+        for path in self.analyze_files_list:
+            if os.path.isfile(path):
+                log_name_list.append(path)
+            elif os.path.isdir(path):
+                log_name_list.extend(sorted(FileUtil.find_all_file(path)))
+        self.stdio.verbose("get log list {0}".format(log_name_list))
+        return log_name_list
+
+    def __get_error_summary(self, consumer, log_list):
+        merged = {}
+        for file_name in log_list:
+            error_dict, _ = consumer.result(file_name)
+            for ret_code, error in error_dict.items():
+                total = merged.get(ret_code)
+                if total is None:
+                    merged[ret_code] = {"count": error["count"], "first_found_time": error["first_found_time"], "last_found_time": error["last_found_time"]}
+                    continue
+                total["count"] += error["count"]
+                total["first_found_time"] = min(total["first_found_time"], error["first_found_time"])
+                total["last_found_time"] = max(total["last_found_time"], error["last_found_time"])
+        table = []
+        for ret_code, error in sorted(merged.items(), key=lambda item: -item[1]["count"]):
+            if ret_code == "CRASH_ERROR":
+                message = consumer.crash_error
+            elif ret_code in OB_RET_DICT:
+                message = OB_RET_DICT[ret_code][1]
+            else:
+                continue
+            table.append([ret_code, message, error["count"], error["first_found_time"], error["last_found_time"]])
+        return tabulate.tabulate(table, headers=["ErrorCode", "Message", "Count", "First Found Time", "Last Found Time"], tablefmt="grid", showindex=False)
+
+    def __get_memory_summary(self, consumer, log_list):
+        tenants = {}
+        for file_name in log_list:
+            for sample_time, tenant_dict in consumer.result(file_name).items():
+                for tenant_id, tenant_info in tenant_dict.items():
+                    samples, max_hold, max_hold_time = tenants.get(tenant_id, (0, -1, None))
+                    hold = int(tenant_info.get('hold', 0))
+                    if hold > max_hold:
+                        max_hold, max_hold_time = hold, sample_time
+                    tenants[tenant_id] = (samples + 1, max_hold, max_hold_time)
+        table = [[tenant_id, samples, round(max_hold / 1024 / 1024), max_hold_time] for tenant_id, (samples, max_hold, max_hold_time) in sorted(tenants.items())]
+        return tabulate.tabulate(table, headers=["Tenant Id", "Samples", "Max Hold(MB)", "Max Hold Time"], tablefmt="grid", showindex=False)
+
+    def __get_queue_summary(self, consumer, log_list):
+        samples = 0
+        over_queue_limit = 0
+        max_queue = 0
+        for file_name in log_list:
+            for row in consumer.result(file_name):
+                samples += 1
+                for key, value in row.items():
+                    # 'NA' where the dump line has no such queue
+                    if 'queue' not in key or not value.isdigit():
+                        continue
+                    value = int(value)
+                    if value > self.queue:
+                        over_queue_limit += 1
+                    max_queue = max(max_queue, value)
+        table = [[samples, self.queue, over_queue_limit, max_queue, 'yes' if max_queue > self.queue else 'no']]
+        return tabulate.tabulate(table, headers=["Samples", "Queue Limit", "Over Queue Limit Count", "Max Queue", "Is Queue"], tablefmt="grid", showindex=False)
@@ -30,6 +30,7 @@ from src.common.constant import const
 from src.common.command import download_file
 from src.common.ob_log_level import OBLogLevel
 from src.handler.meta.ob_error import OB_RET_DICT
+from src.handler.analyzer.log_parser.record_engine import LogRecordConsumer, LogRecordEngine
 from src.common.tool import Util
 from src.common.tool import DirectoryUtil
 from src.common.tool import FileUtil
@@ -254,14 +255,9 @@ class AnalyzeLogHandler(BaseShellHandler):
             node_name = self.__parse_node_name_from_gather_dir(name)
             log_files = [f for f in os.listdir(node_dir) if os.path.isfile(os.path.join(node_dir, f))]
             node_results = []
-            for log_f in sorted(log_files):
-                full_path = os.path.join(node_dir, log_f)
-                try:
-                    file_result, tenant_result = self.__parse_log_lines(full_path)
-                    node_results.append(file_result)
-                    tenant_results_list.append(tenant_result)
-                except Exception as e:
-                    self.stdio.verbose("parse log file {0} failed: {1}".format(full_path, e))
+            for file_result, tenant_result in self.__parse_log_files([os.path.join(node_dir, log_f) for log_f in sorted(log_files)]):
+                node_results.append(file_result)
+                tenant_results_list.append(tenant_result)
             analyze_tuples.append((node_name, False, "", node_results))
 
         self.stdio.stop_loading("succeed")
@@ -336,10 +332,11 @@ class AnalyzeLogHandler(BaseShellHandler):
         self.stdio.print(FileUtil.show_file_list_tabulate("127.0.0.1", log_list, self.stdio))
         self.stdio.start_loading("analyze log start")
         tenant_results_list = []
+        analyze_log_full_paths = []
         for log_name in log_list:
             self.__pharse_offline_log_file(log_name=log_name, local_store_dir=local_store_dir)
-            analyze_log_full_path = "{0}/{1}".format(local_store_dir, str(log_name).strip(".").replace("/", "_"))
-            file_result, tenant_result = self.__parse_log_lines(analyze_log_full_path)
+            analyze_log_full_paths.append("{0}/{1}".format(local_store_dir, str(log_name).strip(".").replace("/", "_")))
+        for file_result, tenant_result in self.__parse_log_files(analyze_log_full_paths):
             node_results.append(file_result)
             tenant_results_list.append(tenant_result)
         self.stdio.stop_loading("succeed")
@@ -376,195 +373,16 @@ class AnalyzeLogHandler(BaseShellHandler):
         else:
             download_file(local_client, log_name, local_store_path, self.stdio)
 
-    def __get_tenant_from_log_line(self, log_line):
+    def __parse_log_files(self, file_full_paths):
         """
-        Extract tenant identifier from OceanBase observer log line.
-        Tries tname= (tenant name) first, then tenant_id= (numeric).
-        :param log_line: raw log line
-        :return: tenant string, or "_unknown_" when not found
-        """
-        if not log_line:
-            return "_unknown_"
-        # tname=tenant_name (common in OB log)
-        tname_pattern = r"tname=([^,\s)\]]+)"
-        tname_match = re.search(tname_pattern, log_line)
-        if tname_match:
-            return tname_match.group(1).strip()
-        # tenant_id=123 or tenant_id:123
-        tid_pattern = r"tenant_id[=:](\d+)"
-        tid_match = re.search(tid_pattern, log_line, re.IGNORECASE)
-        if tid_match:
-            return "tenant_id:" + tid_match.group(1)
-        return "_unknown_"
-
-    def __get_observer_ret_code(self, log_line):
-        """
-        Get the ret code from the observer log
-        :param log_line
-        :return: ret_code
-        """
-        prefix = "ret=-"
-        idx = log_line.find(prefix)
-        if idx < 0:
-            return ""
-        start = idx + len(prefix)
-        if start >= len(log_line):
-            return ""
-        end = start
-        while end < len(log_line):
-            c = log_line[end]
-            if c < '0' or c > '9':
-                break
-            end = end + 1
-        return "-" + log_line[start:end]
-
-    def __parse_log_lines(self, file_full_path):
-        """
-        Process the observer's log line by line.
-        :param file_full_path
-        :return: (error_dict, tenant_error_dict). tenant_error_dict is {} when by_tenant is False.
-                 tenant_error_dict[tenant][ret_code] = {file_name, count, first_found_time, last_found_time, trace_id_list}
-        """
-        error_dict = {}
-        tenant_error_dict = {}
-        self.crash_error = ""
-        self.stdio.verbose("start parse log {0}".format(file_full_path))
-        with open(file_full_path, 'r', encoding='utf8', errors='ignore') as file:
-            line_num = 0
-            for line in file:
-                line_num = line_num + 1
-                line = line.strip()
-                if line:
-                    ## CRASH ERROR log
-                    if line.find("CRASH ERROR") != -1:
-                        ret_code = "CRASH_ERROR"
-                        line_time = ""
-                        trace_id = ""
-                        ## extract tname
-                        tname_pattern = r"tname=([^,]+)"
-                        tname_match = re.search(tname_pattern, line)
-                        if tname_match:
-                            error = tname_match.group(1)
-                            if error != self.crash_error and self.crash_error != '':
-                                self.crash_error = "{0},{1}".format(self.crash_error, error)
-                            else:
-                                self.crash_error = "{0}{1}".format("crash thread:", error)
-                            self.stdio.print("crash_error:{0}".format(self.crash_error))
-                        if error_dict.get(ret_code) is None:
-                            error_dict[ret_code] = {"file_name": file_full_path, "count": 1, "first_found_time": line_time, "last_found_time": line_time, "trace_id_list": {trace_id} if len(trace_id) > 0 else {}}
-                        else:
-                            count = error_dict[ret_code]["count"] + 1
-                            error_dict[ret_code] = {"file_name": file_full_path, "count": count, "first_found_time": line_time, "last_found_time": line_time, "trace_id_list": trace_id}
-                        if self.by_tenant:
-                            tenant = self.__get_tenant_from_log_line(line)
-                            self.__merge_tenant_error(tenant_error_dict, tenant, ret_code, file_full_path, line_time, line_time, trace_id)
-                        continue
-                    line_time = self.__get_time_from_ob_log_line(line)
-                    if len(line_time) == 0:
-                        continue
-                    real_level = self.__get_log_level(line)
-                    if real_level < self.log_level:
-                        continue
-                    ret_code = self.__get_observer_ret_code(line)
-                    if len(ret_code) > 1:
-                        trace_id = self.__get_trace_id(line)
-                        if trace_id is None:
-                            continue
-                        if error_dict.get(ret_code) is None:
-                            error_dict[ret_code] = {"file_name": file_full_path, "count": 1, "first_found_time": line_time, "last_found_time": line_time, "trace_id_list": {trace_id} if len(trace_id) > 0 else {}}
-                        else:
-                            count = error_dict[ret_code]["count"] + 1
-                            first_found_time = error_dict[ret_code]["first_found_time"] if error_dict[ret_code]["first_found_time"] < line_time else line_time
-                            last_found_time = error_dict[ret_code]["last_found_time"] if error_dict[ret_code]["last_found_time"] > line_time else line_time
-                            trace_id_list = list(error_dict[ret_code]["trace_id_list"])
-                            if not (trace_id in trace_id_list):
-                                trace_id_list.append(trace_id)
-                            error_dict[ret_code] = {"file_name": file_full_path, "count": count, "first_found_time": first_found_time, "last_found_time": last_found_time, "trace_id_list": trace_id_list}
-                        if self.by_tenant:
-                            tenant = self.__get_tenant_from_log_line(line)
-                            self.__merge_tenant_error(tenant_error_dict, tenant, ret_code, file_full_path, line_time, line_time, trace_id)
-        self.stdio.verbose("complete parse log {0}".format(file_full_path))
-        return (error_dict, tenant_error_dict)
-
-    def __merge_tenant_error(self, tenant_error_dict, tenant, ret_code, file_name, line_time_first, line_time_last, trace_id):
-        """Merge one error occurrence into tenant_error_dict[tenant][ret_code]."""
-        # Filter by tenant_id if specified
-        if self.tenant_id_filter is not None:
-            # Support both tenant name and tenant_id:xxx format
-            if tenant == "_unknown_":
-                return  # Skip unknown tenants when filter is specified
-            # Check if tenant matches filter (exact match or tenant_id:xxx format)
-            filter_match = False
-            if tenant == self.tenant_id_filter:
-                filter_match = True
-            elif self.tenant_id_filter.startswith("tenant_id:"):
-                # Filter format: tenant_id:123, match against tenant_id:xxx
-                if tenant.startswith("tenant_id:") and tenant == self.tenant_id_filter:
-                    filter_match = True
-            elif tenant.startswith("tenant_id:"):
-                # Extract numeric ID from tenant (tenant_id:123) and compare with filter (could be "123" or "tenant_id:123")
-                tenant_id_num = tenant.replace("tenant_id:", "")
-                if tenant_id_num == self.tenant_id_filter or self.tenant_id_filter == "tenant_id:" + tenant_id_num:
-                    filter_match = True
-            if not filter_match:
-                return  # Skip this tenant if it doesn't match filter
-
-        if tenant not in tenant_error_dict:
-            tenant_error_dict[tenant] = {}
-        if ret_code not in tenant_error_dict[tenant]:
-            tenant_error_dict[tenant][ret_code] = {
-                "file_name": file_name,
-                "count": 0,
-                "first_found_time": line_time_first,
-                "last_found_time": line_time_last,
-                "trace_id_list": [],
-            }
-        rec = tenant_error_dict[tenant][ret_code]
-        rec["count"] += 1
-        if rec["first_found_time"] > line_time_first or not rec["first_found_time"]:
-            rec["first_found_time"] = line_time_first
-        if rec["last_found_time"] < line_time_last:
-            rec["last_found_time"] = line_time_last
-        if trace_id and trace_id not in rec["trace_id_list"]:
-            rec["trace_id_list"].append(trace_id)
-
-    def __get_time_from_ob_log_line(self, log_line):
-        """
-        Get the time from the observer's log line
-        :param log_line
-        :return: time_str
-        """
-        time_str = ""
-        if len(log_line) >= 28:
-            time_str = log_line[1 : log_line.find(']')]
-        return time_str
-
-    def __get_trace_id(self, log_line):
-        """
-        Get the trace_id from the observer's log line
-        :param log_line
-        :return: trace_id
-        """
-        pattern = re.compile(r'\[Y(.*?)\]')
-        find = pattern.search(log_line)
-        if find and find.group(1):
-            return find.group(1).strip('[').strip(']')
-
-    def __get_log_level(self, log_line):
-        """
-        Get the log level from the observer's log line
-        :param log_line
-        :return: log level
+        Process the observer's logs record by record, all files in one LogRecordEngine pass.
+        :return: [(error_dict, tenant_error_dict)] in the order of file_full_paths
         """
-        level_lits = ["DEBUG ", "TRACE ", "INFO ", "WDIAG ", "WARN ", "EDIAG ", "ERROR ", "FATAL "]
-        length = len(log_line)
-        if length > 38:
-            length = 38
-        for level in level_lits:
-            idx = log_line[:length].find(level)
-            if idx != -1:
-                return OBLogLevel().get_log_level(level.rstrip())
-        return 0
+        engine = LogRecordEngine(self.stdio)
+        consumer = engine.register(ObLogErrorConsumer(self.stdio, self.log_level, by_tenant=self.by_tenant, tenant_id_filter=self.tenant_id_filter))
+        engine.run(file_full_paths)
+        self.crash_error = consumer.crash_error
+        return [consumer.result(file_full_path) for file_full_path in file_full_paths]
 
     def __get_overall_summary(self, node_summary_tuples, is_files=False):
         """
@@ -704,3 +522,211 @@ class AnalyzeLogHandler(BaseShellHandler):
                 )
         summary_list.sort(key=lambda x: (x[0], x[1], x[3]), reverse=False)
         return title, field_names, summary_list
+
+
+class ObLogErrorConsumer(LogRecordConsumer):
+    """
+    LogRecordEngine consumer of analyze log: the ret codes (and CRASH ERROR) of every file, by tenant when by_tenant.
+    result(file_name) is (error_dict, tenant_error_dict) of the file,
+    tenant_error_dict[tenant][ret_code] = {file_name, count, first_found_time, last_found_time, trace_id_list}
+    """
+
+    needles = ("ret=-", "CRASH ERROR")
+    level_list = [(level, OBLogLevel().get_log_level(level.rstrip())) for level in ("DEBUG ", "TRACE ", "INFO ", "WDIAG ", "WARN ", "EDIAG ", "ERROR ", "FATAL ")]
+    tname_pattern = re.compile(r"tname=([^,\s)\]]+)")
+    tid_pattern = re.compile(r"tenant_id[=:](\d+)", re.IGNORECASE)
+    ret_code_pattern = re.compile(r"ret=-(\d*)")
+    trace_id_pattern = re.compile(r'\[Y(.*?)\]')
+
+    def __init__(self, stdio, log_level, by_tenant=True, tenant_id_filter=None):
+        self.stdio = stdio
+        self.log_level = log_level
+        self.by_tenant = by_tenant
+        self.tenant_id_filter = tenant_id_filter
+        self.crash_error = ""
+        self.results = {}
+        self.error_dict = {}
+        self.tenant_error_dict = {}
+        self.file_name = None
+        self.trace_ids = {}
+        self.tenant_trace_ids = {}
+
+    def begin_file(self, file_name):
+        self.stdio.verbose("start parse log %s", file_name)
+        self.file_name = file_name
+        self.error_dict = {}
+        self.tenant_error_dict = {}
+        self.trace_ids = {}
+        self.tenant_trace_ids = {}
+        self.results[file_name] = (self.error_dict, self.tenant_error_dict)
+
+    def end_file(self, file_name):
+        self.stdio.verbose("complete parse log %s", file_name)
+
+    def result(self, file_name):
+        return self.results.get(file_name, ({}, {}))
+
+    def consume(self, record):
+        error_dict = self.error_dict
+        file_full_path = self.file_name
+        ## CRASH ERROR log, the crash dump may span the lines of the record
+        crash_in_header = False
+        for line_no, line in enumerate(record.lines() if b"CRASH ERROR" in record.data else ()):
+            if line.find("CRASH ERROR") == -1:
+                continue
+            line = line.strip()
+            crash_in_header = crash_in_header or line_no == 0
+            ret_code = "CRASH_ERROR"
+            line_time = ""
+            trace_id = ""
+            ## extract tname
+            tname_pattern = r"tname=([^,]+)"
+            tname_match = re.search(tname_pattern, line)
+            if tname_match:
+                error = tname_match.group(1)
+                if error != self.crash_error and self.crash_error != '':
+                    self.crash_error = "{0},{1}".format(self.crash_error, error)
+                else:
+                    self.crash_error = "{0}{1}".format("crash thread:", error)
+                self.stdio.print("crash_error:{0}".format(self.crash_error))
+            if error_dict.get(ret_code) is None:
+                error_dict[ret_code] = {"file_name": file_full_path, "count": 1, "first_found_time": line_time, "last_found_time": line_time, "trace_id_list": {trace_id} if len(trace_id) > 0 else {}}
+            else:
+                count = error_dict[ret_code]["count"] + 1
+                error_dict[ret_code] = {"file_name": file_full_path, "count": count, "first_found_time": line_time, "last_found_time": line_time, "trace_id_list": trace_id}
+            if self.by_tenant:
+                tenant = self._get_tenant_from_log_line(line)
+                self._merge_tenant_error(self.tenant_error_dict, tenant, ret_code, file_full_path, line_time, line_time, trace_id)
+        if crash_in_header:
+            return
+        # the ret code of a record is the one of its header line, the lines after it are its payload
+        line = record.first_line.strip()
+        line_time = record.time_str
+        if not line_time:
+            return
+        real_level = self._get_log_level(line)
+        if real_level < self.log_level:
+            return
+        ret_code = self._get_observer_ret_code(line)
+        if len(ret_code) > 1:
+            trace_id = self._get_trace_id(line)
+            if trace_id is None:
+                return
+            error = error_dict.get(ret_code)
+            if error is None:
+                error_dict[ret_code] = {"file_name": file_full_path, "count": 1, "first_found_time": line_time, "last_found_time": line_time, "trace_id_list": {trace_id} if len(trace_id) > 0 else {}}
+            else:
+                error["count"] += 1
+                if not error["first_found_time"] < line_time:
+                    error["first_found_time"] = line_time
+                if not error["last_found_time"] > line_time:
+                    error["last_found_time"] = line_time
+                # updated in place with a set beside it, copying and scanning the list for every line is quadratic
+                trace_id_list = error["trace_id_list"]
+                if not isinstance(trace_id_list, list):
+                    trace_id_list = error["trace_id_list"] = list(trace_id_list)
+                    self.trace_ids[ret_code] = set(trace_id_list)
+                seen = self.trace_ids[ret_code]
+                if trace_id not in seen:
+                    seen.add(trace_id)
+                    trace_id_list.append(trace_id)
+            if self.by_tenant:
+                tenant = self._get_tenant_from_log_line(line)
+                self._merge_tenant_error(self.tenant_error_dict, tenant, ret_code, file_full_path, line_time, line_time, trace_id)
+
+    def _get_tenant_from_log_line(self, log_line):
+        """
+        Extract tenant identifier from OceanBase observer log line.
+        Tries tname= (tenant name) first, then tenant_id= (numeric).
+        :param log_line: raw log line
+        :return: tenant string, or "_unknown_" when not found
+        """
+        if not log_line:
+            return "_unknown_"
+        # tname=tenant_name (common in OB log)
+        tname_match = self.tname_pattern.search(log_line)
+        if tname_match:
+            return tname_match.group(1).strip()
+        # tenant_id=123 or tenant_id:123
+        tid_match = self.tid_pattern.search(log_line)
+        if tid_match:
+            return "tenant_id:" + tid_match.group(1)
+        return "_unknown_"
+
+    def _get_observer_ret_code(self, log_line):
+        """
+        Get the ret code from the observer log
+        :param log_line
+        :return: ret_code
+        """
+        match = self.ret_code_pattern.search(log_line)
+        if match is None:
+            return ""
+        return "-" + match.group(1)
+
+    def _merge_tenant_error(self, tenant_error_dict, tenant, ret_code, file_name, line_time_first, line_time_last, trace_id):
+        """Merge one error occurrence into tenant_error_dict[tenant][ret_code]."""
+        # Filter by tenant_id if specified
+        if self.tenant_id_filter is not None:
+            # Support both tenant name and tenant_id:xxx format
+            if tenant == "_unknown_":
+                return  # Skip unknown tenants when filter is specified
+            # Check if tenant matches filter (exact match or tenant_id:xxx format)
+            filter_match = False
+            if tenant == self.tenant_id_filter:
+                filter_match = True
+            elif self.tenant_id_filter.startswith("tenant_id:"):
+                # Filter format: tenant_id:123, match against tenant_id:xxx
+                if tenant.startswith("tenant_id:") and tenant == self.tenant_id_filter:
+                    filter_match = True
+            elif tenant.startswith("tenant_id:"):
+                # Extract numeric ID from tenant (tenant_id:123) and compare with filter (could be "123" or "tenant_id:123")
+                tenant_id_num = tenant.replace("tenant_id:", "")
+                if tenant_id_num == self.tenant_id_filter or self.tenant_id_filter == "tenant_id:" + tenant_id_num:
+                    filter_match = True
+            if not filter_match:
+                return  # Skip this tenant if it doesn't match filter
+
+        if tenant not in tenant_error_dict:
+            tenant_error_dict[tenant] = {}
+        if ret_code not in tenant_error_dict[tenant]:
+            tenant_error_dict[tenant][ret_code] = {
+                "file_name": file_name,
+                "count": 0,
+                "first_found_time": line_time_first,
+                "last_found_time": line_time_last,
+                "trace_id_list": [],
+            }
+        rec = tenant_error_dict[tenant][ret_code]
+        rec["count"] += 1
+        if rec["first_found_time"] > line_time_first or not rec["first_found_time"]:
+            rec["first_found_time"] = line_time_first
+        if rec["last_found_time"] < line_time_last:
+            rec["last_found_time"] = line_time_last
+        if trace_id:
+            seen = self.tenant_trace_ids.setdefault((tenant, ret_code), set())
+            if trace_id not in seen:
+                seen.add(trace_id)
+                rec["trace_id_list"].append(trace_id)
+
+    def _get_trace_id(self, log_line):
+        """
+        Get the trace_id from the observer's log line
+        :param log_line
+        :return: trace_id
+        """
+        find = self.trace_id_pattern.search(log_line)
+        if find and find.group(1):
+            return find.group(1).strip('[').strip(']')
+
+    def _get_log_level(self, log_line):
+        """
+        Get the log level from the observer's log line
+        :param log_line
+        :return: log level
+        """
+        head = log_line[:38]
+        for level, value in self.level_list:
+            if head.find(level) != -1:
+                return value
+        return 0
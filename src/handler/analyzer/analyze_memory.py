@@ -16,6 +16,7 @@
 @desc:
 """
 import os
+import re
 import time
 import plotly.graph_objects as go
 import plotly.io as pio
@@ -32,6 +33,7 @@ from src.common.command import download_file, get_logfile_name_list, mkdir, dele
 from src.common.command import SshClient
 from src.common.ssh_client.local_client import LocalClient
 from src.common.result_type import ObdiagResult
+from src.handler.analyzer.log_parser.record_engine import LogRecordConsumer, LogRecordEngine
 
 
 class AnalyzeMemoryHandler(object):
@@ -217,23 +219,28 @@ class AnalyzeMemoryHandler(object):
         self.stdio.print(FileUtil.show_file_list_tabulate(remote_ip, log_list, self.stdio))
         self.stdio.print("analyze log. Please wait a moment...")
         self.stdio.start_loading("analyze memory start")
+        download_list = []
         for log_name in log_list:
             if self.directly_analyze_files:
                 self.__pharse_offline_log_file(ssh_client, log_name=log_name, local_store_dir=local_store_dir)
                 analyze_log_full_path = "{0}/{1}".format(local_store_dir, str(log_name).strip(".").replace("/", "_"))
             else:
-                self.__pharse_log_file(ssh_client, node=node, log_name=log_name, gather_path=gather_dir_full_path, local_store_dir=local_store_dir)
+                download_list.append(self.__pharse_log_file(ssh_client, node=node, log_name=log_name, gather_path=gather_dir_full_path, local_store_dir=local_store_dir))
                 analyze_log_full_path = "{0}/{1}".format(local_store_dir, log_name)
             self.stdio.verbose("local file storage path: {0}".format(analyze_log_full_path))
+        # the log files of a pod come over one exec stream each, all at once
+        for remote_path, result in ssh_client.download_files(download_list).items():
+            if isinstance(result, Exception):
+                self.stdio.error("Download File {0} Failed error: {1}".format(remote_path, result))
 
         tenant_memory_info_dict = dict()
+        analyze_log_full_paths = []
         for log_name in log_list:
-            memory_info = dict()
             if self.directly_analyze_files:
-                analyze_log_full_path = "{0}/{1}".format(local_store_dir, str(log_name).strip(".").replace("/", "_"))
+                analyze_log_full_paths.append("{0}/{1}".format(local_store_dir, str(log_name).strip(".").replace("/", "_")))
             else:
-                analyze_log_full_path = "{0}/{1}".format(local_store_dir, log_name)
-            self.__parse_log_lines(analyze_log_full_path, memory_info)
+                analyze_log_full_paths.append("{0}/{1}".format(local_store_dir, log_name))
+        for analyze_log_full_path, memory_info in zip(analyze_log_full_paths, self.__parse_log_files(analyze_log_full_paths)):
             for sample_time in memory_info:
                 for tenant in memory_info[sample_time]:
                     if tenant in tenant_memory_info_dict:
@@ -609,6 +616,10 @@ class AnalyzeMemoryHandler(object):
         return log_name_list
 
     def __pharse_log_file(self, ssh_client, node, log_name, gather_path, local_store_dir):
+        """
+        grep or copy log_name into gather_path on the node where needed
+        :return: (remote_path, local_path) of the file to download
+        """
         home_path = node.get("home_path")
         log_path = os.path.join(home_path, "log")
         local_store_path = "{0}/{1}".format(local_store_dir, log_name)
@@ -617,7 +628,6 @@ class AnalyzeMemoryHandler(object):
             self.stdio.verbose("grep files, run cmd = [{0}]".format(grep_cmd))
             ssh_client.exec_cmd(grep_cmd)
             log_full_path = "{gather_path}/{log_name}".format(log_name=log_name, gather_path=gather_path)
-            download_file(ssh_client, log_full_path, local_store_path, self.stdio)
         else:
             real_time_logs = ["observer.log", "rootservice.log", "election.log", "trace.log", "observer.log.wf", "rootservice.log.wf", "election.log.wf", "trace.log.wf"]
             if log_name in real_time_logs:
@@ -625,10 +635,9 @@ class AnalyzeMemoryHandler(object):
                 self.stdio.verbose("copy files, run cmd = [{0}]".format(cp_cmd))
                 ssh_client.exec_cmd(cp_cmd)
                 log_full_path = "{gather_path}/{log_name}".format(log_name=log_name, gather_path=gather_path)
-                download_file(ssh_client, log_full_path, local_store_path, self.stdio)
             else:
                 log_full_path = "{log_dir}/{log_name}".format(log_name=log_name, log_dir=log_path)
-                download_file(ssh_client, log_full_path, local_store_path, self.stdio)
+        return log_full_path, local_store_path
 
     def __pharse_offline_log_file(self, ssh_client, log_name, local_store_dir):
         """
@@ -645,35 +654,251 @@ class AnalyzeMemoryHandler(object):
         else:
             download_file(ssh_client, log_name, local_store_path, self.stdio)
 
-    def __parse_memory_label(self, file_full_path):
-        ssh_client = LocalClient(context=self.context, node={"ssh_type": "local"})
+    def __parse_log_files(self, file_full_paths):
+        """
+        Process the observer's logs line by line, all files in one LogRecordEngine pass
+        :return: [memory_dict] in the order of file_full_paths
+        """
+        engine = LogRecordEngine(self.stdio)
+        consumer = engine.register(MemoryDumpConsumer(self.version, self.stdio, warn_no_dump=self.directly_analyze_files))
+        engine.run(file_full_paths)
+        return [consumer.result(file_full_path) for file_full_path in file_full_paths]
+
+    @staticmethod
+    def __get_overall_summary(node_summary_tuple):
+        """
+        generate overall summary from all node summary tuples
+        :param node_summary_tuple: (node, is_err, err_msg, size, consume_time, node_summary) for each node
+        :return: a string indicating the overall summary
+        """
+        summary_tab = []
+        field_names = ["Node", "Status"]
+        field_names.append("Time")
+        field_names.append("ResultPath")
+        for tup in node_summary_tuple:
+            node = tup[0]
+            is_err = tup[2]
+            consume_time = tup[3]
+            pack_path = tup[4] if not is_err else None
+            summary_tab.append((node, "Error:" + tup[2] if is_err else "Completed", "{0} s".format(consume_time), pack_path))
+        return "\nAnalyze Ob Log Summary:\n" + tabulate.tabulate(summary_tab, headers=field_names, tablefmt="grid", showindex=False)
+
+
+class MemoryDumpConsumer(LogRecordConsumer):
+    """
+    LogRecordEngine consumer of analyze memory: the tenant memory dumps of every file,
+    result(file_name) is {sample_time: {tenant_id: {hold, cache_hold, ..., ctx_info}}}.
+    Only the lines from a dump's begin marker to its end marker (CHUNK_MGR) are parsed, the markers depend on the version.
+    """
+
+    def __init__(self, version, stdio, warn_no_dump=False):
+        self.version = version
+        self.stdio = stdio
+        self.warn_no_dump = warn_no_dump
+        # begin_literal is in every line begin_pattern matches, most records are skipped on it alone
         if self.version >= '4.3':
-            grep_cmd = 'grep -n "memory_dump.*statistics" ' + file_full_path
+            self.begin_literal, self.begin_pattern = "memory_dump", re.compile(r"memory_dump.*statistics")
         elif self.version >= '4.2.5.3' and self.version < '4.3':
-            grep_cmd = 'grep -n "Run print tenant memory usage task" ' + file_full_path
+            self.begin_literal, self.begin_pattern = "Run print tenant memory usage task", re.compile(r"Run print tenant memory usage task")
         elif self.version >= '4.0' and self.version < '4.2.5.3':
-            grep_cmd = 'grep -n "runTimerTask.*MemDumpTimer" ' + file_full_path
+            self.begin_literal, self.begin_pattern = "runTimerTask", re.compile(r"runTimerTask.*MemDumpTimer")
         else:
-            grep_cmd = 'grep -n "Run print tenant memstore usage task" ' + file_full_path
-        memory_begin_str = ssh_client.exec_cmd(grep_cmd)
-        memory_begin_list = memory_begin_str.split('\n')
-        memory_print_line_list = []
-        for row in memory_begin_list:
-            try:
-                print_begin_line = row.split(':')[0]
-                if print_begin_line:
-                    print_begin_line = int(print_begin_line)
-                    memory_print_line_list.append(print_begin_line)
-            except ValueError:
+            self.begin_literal, self.begin_pattern = "Run print tenant memstore usage task", re.compile(r"Run print tenant memstore usage task")
+        self.begin_literal_bytes = self.begin_literal.encode("utf-8")
+        # a line holding none of these changes nothing in _parse_line
+        self.needles = ("[MEMORY]", "MemDump", "MemoryDump", "ob_tenant_ctx_allocator", "CHUNK_MGR", "Run print tenant memory usage task", "Run print tenant memstore usage task", self.begin_literal)
+        self.results = {}
+
+    def begin_file(self, file_name):
+        self.stdio.verbose("start parse log {0}".format(file_name))
+        self.file_name = file_name
+        self.memory_dict = dict()
+        self.results[file_name] = self.memory_dict
+        # a line is parsed once the begin marker of the dump waited for (the consumed-th one) is seen
+        self.begins_seen = 0
+        self.consumed = 1
+        self.failed = False
+        self.memory_print_time = None
+        self.in_parse_ctx = False
+        self.ctx_name = None
+        self.in_parse_module = False
+        self.ctx_info = None
+        self.tenant_dict = None
+        self.hold_bytes = None
+        self.used_bytes = None
+        self.idle_size = None
+        self.free_size = None
+        self.wash_related_chunks = None
+        self.washed_blocks = None
+        self.washed_size = None
+        self.mod_block_cnt = None
+        self.mod_chunk_cnt = None
+
+    def end_file(self, file_name):
+        if self.begins_seen == 0 and self.warn_no_dump:
+            self.stdio.warn('failed to get memory information. Please confirm that the file:{0} and version:{1} you are passing are consistent'.format(file_name, self.version))
+        self.stdio.verbose("complete parse log {0}".format(file_name))
+
+    def result(self, file_name):
+        return self.results.get(file_name, dict())
+
+    def consume(self, record):
+        if self.failed:
+            return
+        has_begin = self.begin_literal_bytes in record.data
+        if not has_begin and self.begins_seen < self.consumed:
+            # between two dumps
+            return
+        for line in record.lines():
+            if self.failed:
+                return
+            if has_begin and self.begin_literal in line and self.begin_pattern.search(line):
+                self.begins_seen += 1
+            if self.begins_seen < self.consumed:
                 continue
+            try:
+                self._parse_line(line.strip())
             except Exception as e:
-                self.stdio.warn('parse memory label failed, error: {0}'.format(e))
-                continue
-        if len(memory_print_line_list) == 0 and self.directly_analyze_files:
-            self.stdio.warn('failed to get memory information. Please confirm that the file:{0} and version:{1} you are passing are consistent'.format(file_full_path, self.version))
-        return sorted(memory_print_line_list)
+                self.failed = True
+                self.stdio.exception('parse log failed, error: {0}'.format(e))
 
-    def __convert_string_bytes_2_int_bytes(self, string_bytes):
+    def _parse_line(self, line):
+        if self.version >= '4.3':
+            if 'MemoryDump' in line and 'statistics' in line:
+                time_str = self._get_time_from_ob_log_line(line)
+                self.memory_print_time = time_str.split('.')[0]
+                self.memory_dict[self.memory_print_time] = dict()
+        elif self.version > '4.0' and self.version < '4.2.5.3':
+            if 'runTimerTask' in line and 'MemDumpTimer' in line:
+                time_str = self._get_time_from_ob_log_line(line)
+                self.memory_print_time = time_str.split('.')[0]
+                self.memory_dict[self.memory_print_time] = dict()
+        elif self.version >= '4.2.5.3' and self.version < '4.3':
+            if 'Run print tenant memory usage task' in line:
+                time_str = self._get_time_from_ob_log_line(line)
+                self.memory_print_time = time_str.split('.')[0]
+                self.memory_dict[self.memory_print_time] = dict()
+        else:
+            if 'Run print tenant memstore usage task' in line:
+                time_str = self._get_time_from_ob_log_line(line)
+                self.memory_print_time = time_str.split('.')[0]
+                self.memory_dict[self.memory_print_time] = dict()
+        if self.version >= '4.3':
+            if 'print_tenant_usage' in line and 'ServerGTimer' in line and 'CHUNK_MGR' in line:
+                self.consumed += 1
+        elif self.version >= '4.0' and self.version < '4.3':
+            if 'print_tenant_usage' in line and 'MemDumpTimer' in line and 'CHUNK_MGR' in line:
+                self.consumed += 1
+        else:
+            if 'CHUNK_MGR' in line:
+                self.consumed += 1
+        if '[MEMORY]' in line or 'MemDump' in line or 'ob_tenant_ctx_allocator' in line:
+            if '[MEMORY] tenant:' in line:
+                tenant_id = line.split('tenant:')[1].split(',')[0].strip()
+                self.tenant_dict = dict()  # 为每个租户创建独立的字典
+                # Initialize ctx_info as empty list to avoid KeyError later
+                self.tenant_dict['ctx_info'] = []
+                if 'rpc_' in line:
+                    self.hold_bytes = line.split('hold:')[1].split('rpc_')[0].strip()
+                    rpc_hold_bytes = line.split('rpc_hold:')[1].split('cache_hold')[0].strip()
+                    self.tenant_dict['rpc_hold'] = self._convert_string_bytes_2_int_bytes(rpc_hold_bytes)
+                else:
+                    self.hold_bytes = line.split('hold:')[1].split('cache_')[0].strip()
+                cache_hold_bytes = line.split('cache_hold:')[1].split('cache_used')[0].strip()
+                cache_used_bytes = line.split('cache_used:')[1].split('cache_item_count')[0].strip()
+                cache_item_count = line.split('cache_item_count:')[1].strip()
+                self.tenant_dict['hold'] = self._convert_string_bytes_2_int_bytes(self.hold_bytes)
+                self.tenant_dict['cache_hold'] = self._convert_string_bytes_2_int_bytes(cache_hold_bytes)
+                self.tenant_dict['cache_used'] = self._convert_string_bytes_2_int_bytes(cache_used_bytes)
+                self.tenant_dict['cache_item_count'] = self._convert_string_bytes_2_int_bytes(cache_item_count)
+                self.memory_dict[self.memory_print_time][tenant_id] = self.tenant_dict
+                return
+            if '[MEMORY] tenant_id=' in line:
+                if self.version > '4.0':
+                    if not self.in_parse_ctx:
+                        self.in_parse_ctx = True
+                    self.ctx_name = line.split('ctx_id=')[1].split('hold')[0].strip()
+                    self.hold_bytes = self._convert_string_bytes_2_int_bytes(line.split('hold=')[1].split('used')[0].strip())
+                    self.used_bytes = self._convert_string_bytes_2_int_bytes(line.split('used=')[1].split('limit')[0].strip())
+                    return
+                else:
+                    if not self.in_parse_ctx:
+                        self.in_parse_ctx = True
+                    self.ctx_name = line.split('ctx_id=')[1].split('hold')[0].strip()
+                    self.hold_bytes = self._convert_string_bytes_2_int_bytes(line.split('hold=')[1].split('used')[0].strip())
+                    self.used_bytes = self._convert_string_bytes_2_int_bytes(line.split('used=')[1].split('limit')[0].strip())
+                    if self.in_parse_ctx:
+                        self.ctx_info = dict()
+                        self.ctx_info['ctx_name'] = self.ctx_name
+                        self.ctx_info['hold_bytes'] = self.hold_bytes
+                        self.ctx_info['used_bytes'] = self.used_bytes
+                    return
+            if '[MEMORY] idle_size=' in line:
+                if self.in_parse_ctx:
+                    self.idle_size = self._convert_string_bytes_2_int_bytes(line.split('idle_size=')[1].split('free_size')[0].strip())
+                    self.free_size = self._convert_string_bytes_2_int_bytes(line.split('free_size=')[1].strip())
+                    return
+            if '[MEMORY] wash_related_chunks=' in line:
+                if self.in_parse_ctx:
+                    self.wash_related_chunks = self._convert_string_bytes_2_int_bytes(line.split('wash_related_chunks=')[1].split('washed_blocks')[0].strip())
+                    self.washed_blocks = self._convert_string_bytes_2_int_bytes(line.split('washed_blocks=')[1].split('washed_size')[0].strip())
+                    self.washed_size = self._convert_string_bytes_2_int_bytes(line.split('washed_size=')[1].strip())
+                    self.ctx_info = dict()
+                    self.ctx_info['ctx_name'] = self.ctx_name
+                    self.ctx_info['hold_bytes'] = self.hold_bytes
+                    self.ctx_info['used_bytes'] = self.used_bytes
+                    self.ctx_info['idle_size'] = self.idle_size
+                    self.ctx_info['free_size'] = self.free_size
+                    self.ctx_info['wash_related_chunks'] = self.wash_related_chunks
+                    self.ctx_info['washed_blocks'] = self.washed_blocks
+                    self.ctx_info['washed_size'] = self.washed_size
+                    return
+            if '[MEMORY] hold=' in line:
+                if not self.in_parse_module:
+                    self.in_parse_module = True
+                if "mod=" not in line:
+                    return
+                mod_name = line.split('mod=')[1].strip()
+                if mod_name == 'SUMMARY':
+                    mod_hold_bytes = self._convert_string_bytes_2_int_bytes(line.split('hold=')[1].split('used')[0].strip())
+                    mod_used_bytes = self._convert_string_bytes_2_int_bytes(line.split('used=')[1].split('count')[0].strip())
+                    mod_used_block_cnt = self._convert_string_bytes_2_int_bytes(line.split('count=')[1].split('avg_used')[0].strip())
+                    mod_avg_used_bytes = self._convert_string_bytes_2_int_bytes(line.split('avg_used=')[1].split('mod')[0].strip())
+                else:
+                    mod_hold_bytes = self._convert_string_bytes_2_int_bytes(line.split('hold=')[1].split('used')[0].strip())
+                    mod_used_bytes = self._convert_string_bytes_2_int_bytes(line.split('used=')[1].split('count')[0].strip())
+                    mod_used_block_cnt = self._convert_string_bytes_2_int_bytes(line.split('count=')[1].split('avg_used')[0].strip())
+                    if self.version > '4.0':
+                        mod_avg_used_bytes = self._convert_string_bytes_2_int_bytes(line.split('avg_used=')[1].split('block_cnt')[0].strip())
+                        self.mod_block_cnt = self._convert_string_bytes_2_int_bytes(line.split('block_cnt=')[1].split('chunk_cnt')[0].strip())
+                        self.mod_chunk_cnt = self._convert_string_bytes_2_int_bytes(line.split('chunk_cnt=')[1].split('mod')[0].strip())
+                    else:
+                        mod_avg_used_bytes = self._convert_string_bytes_2_int_bytes(line.split('avg_used=')[1].split('mod')[0].strip())
+                mod_info = dict()
+                mod_info['mod_name'] = mod_name
+                mod_info['mod_hold_bytes'] = mod_hold_bytes
+                mod_info['mod_used_bytes'] = mod_used_bytes
+                mod_info['mod_used_block_cnt'] = mod_used_block_cnt
+                mod_info['mod_avg_used_bytes'] = mod_avg_used_bytes
+                if self.version > '4.0' and self.version < '4.3':
+                    mod_info['mod_block_cnt'] = self.mod_block_cnt
+                    mod_info['mod_chunk_cnt'] = self.mod_chunk_cnt
+                if 'mod_info' in self.ctx_info:
+                    self.ctx_info['mod_info'].append(mod_info)
+                else:
+                    self.ctx_info['mod_info'] = []
+                    self.ctx_info['mod_info'].append(mod_info)
+            if '[MEMORY] hold=' not in line and self.in_parse_module:
+                self.in_parse_module = False
+            if not self.in_parse_module and self.in_parse_ctx:
+                self.in_parse_ctx = False
+                if 'ctx_info' in self.tenant_dict:
+                    self.tenant_dict['ctx_info'].append(self.ctx_info)
+                else:
+                    self.tenant_dict['ctx_info'] = []
+                    self.tenant_dict['ctx_info'].append(self.ctx_info)
+
+    def _convert_string_bytes_2_int_bytes(self, string_bytes):
         if ',' in string_bytes:
             bytes_list = string_bytes.split(',')
             string_bytes_no_comma = ''.join(bytes_list)
@@ -682,182 +907,7 @@ class AnalyzeMemoryHandler(object):
             bytes_int = int(string_bytes)
         return bytes_int
 
-    def __parse_log_lines(self, file_full_path, memory_dict):
-        """
-        Process the observer's log line by line
-        :param file_full_path
-        :return:
-        """
-        self.stdio.verbose("start parse log {0}".format(file_full_path))
-        memory_print_line_list = self.__parse_memory_label(file_full_path)
-        if memory_print_line_list:
-            with open(file_full_path, 'r', encoding='utf8', errors='replace') as file:
-                line_num = 0
-                memory_print_begin_line = memory_print_line_list[0]
-                memory_print_line_list.remove(memory_print_begin_line)
-                try:
-                    in_parse_ctx = False
-                    ctx_name = None
-                    in_parse_module = False
-                    ctx_info = None
-                    for line in file:
-                        line_num = line_num + 1
-                        line = line.strip()
-                        if line_num < memory_print_begin_line:
-                            continue
-                        else:
-                            if self.version >= '4.3':
-                                if 'MemoryDump' in line and 'statistics' in line:
-                                    time_str = self.__get_time_from_ob_log_line(line)
-                                    memory_print_time = time_str.split('.')[0]
-                                    memory_dict[memory_print_time] = dict()
-                            elif self.version > '4.0' and self.version < '4.2.5.3':
-                                if 'runTimerTask' in line and 'MemDumpTimer' in line:
-                                    time_str = self.__get_time_from_ob_log_line(line)
-                                    memory_print_time = time_str.split('.')[0]
-                                    memory_dict[memory_print_time] = dict()
-                            elif self.version >= '4.2.5.3' and self.version < '4.3':
-                                if 'Run print tenant memory usage task' in line:
-                                    time_str = self.__get_time_from_ob_log_line(line)
-                                    memory_print_time = time_str.split('.')[0]
-                                    memory_dict[memory_print_time] = dict()
-                            else:
-                                if 'Run print tenant memstore usage task' in line:
-                                    time_str = self.__get_time_from_ob_log_line(line)
-                                    memory_print_time = time_str.split('.')[0]
-                                    memory_dict[memory_print_time] = dict()
-                            if self.version >= '4.3':
-                                if 'print_tenant_usage' in line and 'ServerGTimer' in line and 'CHUNK_MGR' in line:
-                                    if memory_print_line_list:
-                                        memory_print_begin_line = memory_print_line_list[0]
-                                        memory_print_line_list.remove(memory_print_begin_line)
-                                    else:
-                                        break
-                            elif self.version >= '4.0' and self.version < '4.3':
-                                if 'print_tenant_usage' in line and 'MemDumpTimer' in line and 'CHUNK_MGR' in line:
-                                    if memory_print_line_list:
-                                        memory_print_begin_line = memory_print_line_list[0]
-                                        memory_print_line_list.remove(memory_print_begin_line)
-                                    else:
-                                        break
-                            else:
-                                if 'CHUNK_MGR' in line:
-                                    if memory_print_line_list:
-                                        memory_print_begin_line = memory_print_line_list[0]
-                                        memory_print_line_list.remove(memory_print_begin_line)
-                                    else:
-                                        break
-                            if '[MEMORY]' in line or 'MemDump' in line or 'ob_tenant_ctx_allocator' in line:
-                                if '[MEMORY] tenant:' in line:
-                                    tenant_id = line.split('tenant:')[1].split(',')[0].strip()
-                                    tenant_dict = dict()  # 为每个租户创建独立的字典
-                                    # Initialize ctx_info as empty list to avoid KeyError later
-                                    tenant_dict['ctx_info'] = []
-                                    if 'rpc_' in line:
-                                        hold_bytes = line.split('hold:')[1].split('rpc_')[0].strip()
-                                        rpc_hold_bytes = line.split('rpc_hold:')[1].split('cache_hold')[0].strip()
-                                        tenant_dict['rpc_hold'] = self.__convert_string_bytes_2_int_bytes(rpc_hold_bytes)
-                                    else:
-                                        hold_bytes = line.split('hold:')[1].split('cache_')[0].strip()
-                                    cache_hold_bytes = line.split('cache_hold:')[1].split('cache_used')[0].strip()
-                                    cache_used_bytes = line.split('cache_used:')[1].split('cache_item_count')[0].strip()
-                                    cache_item_count = line.split('cache_item_count:')[1].strip()
-                                    tenant_dict['hold'] = self.__convert_string_bytes_2_int_bytes(hold_bytes)
-                                    tenant_dict['cache_hold'] = self.__convert_string_bytes_2_int_bytes(cache_hold_bytes)
-                                    tenant_dict['cache_used'] = self.__convert_string_bytes_2_int_bytes(cache_used_bytes)
-                                    tenant_dict['cache_item_count'] = self.__convert_string_bytes_2_int_bytes(cache_item_count)
-                                    memory_dict[memory_print_time][tenant_id] = tenant_dict
-                                    continue
-                                if '[MEMORY] tenant_id=' in line:
-                                    if self.version > '4.0':
-                                        if not in_parse_ctx:
-                                            in_parse_ctx = True
-                                        ctx_name = line.split('ctx_id=')[1].split('hold')[0].strip()
-                                        hold_bytes = self.__convert_string_bytes_2_int_bytes(line.split('hold=')[1].split('used')[0].strip())
-                                        used_bytes = self.__convert_string_bytes_2_int_bytes(line.split('used=')[1].split('limit')[0].strip())
-                                        continue
-                                    else:
-                                        if not in_parse_ctx:
-                                            in_parse_ctx = True
-                                        ctx_name = line.split('ctx_id=')[1].split('hold')[0].strip()
-                                        hold_bytes = self.__convert_string_bytes_2_int_bytes(line.split('hold=')[1].split('used')[0].strip())
-                                        used_bytes = self.__convert_string_bytes_2_int_bytes(line.split('used=')[1].split('limit')[0].strip())
-                                        if in_parse_ctx:
-                                            ctx_info = dict()
-                                            ctx_info['ctx_name'] = ctx_name
-                                            ctx_info['hold_bytes'] = hold_bytes
-                                            ctx_info['used_bytes'] = used_bytes
-                                        continue
-                                if '[MEMORY] idle_size=' in line:
-                                    if in_parse_ctx:
-                                        idle_size = self.__convert_string_bytes_2_int_bytes(line.split('idle_size=')[1].split('free_size')[0].strip())
-                                        free_size = self.__convert_string_bytes_2_int_bytes(line.split('free_size=')[1].strip())
-                                        continue
-                                if '[MEMORY] wash_related_chunks=' in line:
-                                    if in_parse_ctx:
-                                        wash_related_chunks = self.__convert_string_bytes_2_int_bytes(line.split('wash_related_chunks=')[1].split('washed_blocks')[0].strip())
-                                        washed_blocks = self.__convert_string_bytes_2_int_bytes(line.split('washed_blocks=')[1].split('washed_size')[0].strip())
-                                        washed_size = self.__convert_string_bytes_2_int_bytes(line.split('washed_size=')[1].strip())
-                                        ctx_info = dict()
-                                        ctx_info['ctx_name'] = ctx_name
-                                        ctx_info['hold_bytes'] = hold_bytes
-                                        ctx_info['used_bytes'] = used_bytes
-                                        ctx_info['idle_size'] = idle_size
-                                        ctx_info['free_size'] = free_size
-                                        ctx_info['wash_related_chunks'] = wash_related_chunks
-                                        ctx_info['washed_blocks'] = washed_blocks
-                                        ctx_info['washed_size'] = washed_size
-                                        continue
-                                if '[MEMORY] hold=' in line:
-                                    if not in_parse_module:
-                                        in_parse_module = True
-                                    if "mod=" not in line:
-                                        continue
-                                    mod_name = line.split('mod=')[1].strip()
-                                    if mod_name == 'SUMMARY':
-                                        mod_hold_bytes = self.__convert_string_bytes_2_int_bytes(line.split('hold=')[1].split('used')[0].strip())
-                                        mod_used_bytes = self.__convert_string_bytes_2_int_bytes(line.split('used=')[1].split('count')[0].strip())
-                                        mod_used_block_cnt = self.__convert_string_bytes_2_int_bytes(line.split('count=')[1].split('avg_used')[0].strip())
-                                        mod_avg_used_bytes = self.__convert_string_bytes_2_int_bytes(line.split('avg_used=')[1].split('mod')[0].strip())
-                                    else:
-                                        mod_hold_bytes = self.__convert_string_bytes_2_int_bytes(line.split('hold=')[1].split('used')[0].strip())
-                                        mod_used_bytes = self.__convert_string_bytes_2_int_bytes(line.split('used=')[1].split('count')[0].strip())
-                                        mod_used_block_cnt = self.__convert_string_bytes_2_int_bytes(line.split('count=')[1].split('avg_used')[0].strip())
-                                        if self.version > '4.0':
-                                            mod_avg_used_bytes = self.__convert_string_bytes_2_int_bytes(line.split('avg_used=')[1].split('block_cnt')[0].strip())
-                                            mod_block_cnt = self.__convert_string_bytes_2_int_bytes(line.split('block_cnt=')[1].split('chunk_cnt')[0].strip())
-                                            mod_chunk_cnt = self.__convert_string_bytes_2_int_bytes(line.split('chunk_cnt=')[1].split('mod')[0].strip())
-                                        else:
-                                            mod_avg_used_bytes = self.__convert_string_bytes_2_int_bytes(line.split('avg_used=')[1].split('mod')[0].strip())
-                                    mod_info = dict()
-                                    mod_info['mod_name'] = mod_name
-                                    mod_info['mod_hold_bytes'] = mod_hold_bytes
-                                    mod_info['mod_used_bytes'] = mod_used_bytes
-                                    mod_info['mod_used_block_cnt'] = mod_used_block_cnt
-                                    mod_info['mod_avg_used_bytes'] = mod_avg_used_bytes
-                                    if self.version > '4.0' and self.version < '4.3':
-                                        mod_info['mod_block_cnt'] = mod_block_cnt
-                                        mod_info['mod_chunk_cnt'] = mod_chunk_cnt
-                                    if 'mod_info' in ctx_info:
-                                        ctx_info['mod_info'].append(mod_info)
-                                    else:
-                                        ctx_info['mod_info'] = []
-                                        ctx_info['mod_info'].append(mod_info)
-                                if '[MEMORY] hold=' not in line and in_parse_module:
-                                    in_parse_module = False
-                                if not in_parse_module and in_parse_ctx:
-                                    in_parse_ctx = False
-                                    if 'ctx_info' in tenant_dict:
-                                        tenant_dict['ctx_info'].append(ctx_info)
-                                    else:
-                                        tenant_dict['ctx_info'] = []
-                                        tenant_dict['ctx_info'].append(ctx_info)
-                except Exception as e:
-                    self.stdio.exception('parse log failed, error: {0}'.format(e))
-        self.stdio.verbose("complete parse log {0}".format(file_full_path))
-        return
-
-    def __get_time_from_ob_log_line(self, log_line):
+    def _get_time_from_ob_log_line(self, log_line):
         """
         Get the time from the observer's log line
         :param log_line
@@ -867,22 +917,3 @@ class AnalyzeMemoryHandler(object):
         if len(log_line) >= 28:
             time_str = log_line[1 : log_line.find(']')]
         return time_str
-
-    @staticmethod
-    def __get_overall_summary(node_summary_tuple):
-        """
-        generate overall summary from all node summary tuples
-        :param node_summary_tuple: (node, is_err, err_msg, size, consume_time, node_summary) for each node
-        :return: a string indicating the overall summary
-        """
-        summary_tab = []
-        field_names = ["Node", "Status"]
-        field_names.append("Time")
-        field_names.append("ResultPath")
-        for tup in node_summary_tuple:
-            node = tup[0]
-            is_err = tup[2]
-            consume_time = tup[3]
-            pack_path = tup[4] if not is_err else None
-            summary_tab.append((node, "Error:" + tup[2] if is_err else "Completed", "{0} s".format(consume_time), pack_path))
-        return "\nAnalyze Ob Log Summary:\n" + tabulate.tabulate(summary_tab, headers=field_names, tablefmt="grid", showindex=False)
@@ -34,6 +34,7 @@ from src.common.tool import FileUtil
 from src.common.tool import TimeUtils
 from src.common.result_type import ObdiagResult
 from src.common.ob_connector import OBConnector
+from src.handler.analyzer.log_parser.record_engine import LogRecordConsumer, LogRecordEngine
 import re
 
 
@@ -354,46 +355,10 @@ class AnalyzeQueueHandler(BaseShellHandler):
         """
         Process the observer's log line by line
         """
-        log_lines = []
-        with open(file_full_path, 'r', encoding='utf8', errors='ignore') as file:
-            for line in file:
-                log_lines.append(line.strip())
-        pattern_timestamp = r'\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d+)\]'
-        pattern_req_queue = r'req_queue:total_size=(\d+)'
-        pattern_multi_level_queue = r'multi_level_queue:total_size=(\d+)'
-        pattern_group_id = r'group_id = (\d+),queue_size = (\d+)'
-
-        # get group_id
-        all_group_ids = set()
-        for log in log_lines:
-            matches = re.findall(pattern_group_id, log)
-            for match in matches:
-                all_group_ids.add(int(match[0]))
-
-        results = []
-        group_id_columns = {f'group_id_{gid}_queue_size': 'NA' for gid in all_group_ids}
-
-        for log in log_lines:
-            timestamp = re.search(pattern_timestamp, log).group(1)
-            req_queue_size = re.search(pattern_req_queue, log).group(1) if re.search(pattern_req_queue, log) else 'NA'
-            multi_level_queue_size = re.search(pattern_multi_level_queue, log).group(1) if re.search(pattern_multi_level_queue, log) else 'NA'
-
-            group_info = {}
-            matches = re.findall(pattern_group_id, log)
-            for match in matches:
-                group_id, queue_size = match
-                group_info[f'group_id_{group_id}_queue_size'] = queue_size
-
-            result = {
-                'timestamp': timestamp,
-                'req_queue_total_size': req_queue_size,
-                'multi_level_queue_total_size': multi_level_queue_size,
-                **group_info,
-                **{k: 'NA' for k in group_id_columns if k not in group_info},
-            }
-
-            results.append(result)
-        return results
+        engine = LogRecordEngine(self.stdio)
+        consumer = engine.register(QueueStatConsumer(self.tenant_id))
+        engine.run([file_full_path])
+        return consumer.result(file_full_path)
 
     def __write_to_csv(self, local_store_parent_dir, data):
         try:
@@ -410,3 +375,66 @@ class AnalyzeQueueHandler(BaseShellHandler):
             self.stdio.exception(f"ValueError: {ve}")
         except Exception as e:
             self.stdio.exception(f"an unexpected error occurred: {e}")
+
+
+class QueueStatConsumer(LogRecordConsumer):
+    """
+    LogRecordEngine consumer of analyze queue: one row per dump line with its req_queue / multi_level_queue total size
+    and the queue size of every group_id seen in the file ('NA' where the line has none).
+    Without tenant_id every line of the file is taken for a dump line (the file was grepped already).
+    """
+
+    pattern_timestamp = re.compile(r'\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d+)\]')
+    pattern_req_queue = re.compile(r'req_queue:total_size=(\d+)')
+    pattern_multi_level_queue = re.compile(r'multi_level_queue:total_size=(\d+)')
+    pattern_group_id = re.compile(r'group_id = (\d+),queue_size = (\d+)')
+
+    def __init__(self, tenant_id=None):
+        # with tenant_id only the dump lines of the tenant count, so the consumer can share a pass over an observer.log
+        self.dump_pattern = None
+        if tenant_id is not None:
+            self.dump_pattern = "dump tenant info(tenant={{id:{0},".format(tenant_id)
+            self.needles = (self.dump_pattern,)
+        self.results = {}
+        self.rows = []
+        self.all_group_ids = set()
+
+    def begin_file(self, file_name):
+        self.rows = []
+        self.all_group_ids = set()
+
+    def consume(self, record):
+        for log in record.lines():
+            if self.dump_pattern is not None and self.dump_pattern not in log:
+                continue
+            log = log.strip()
+            match = self.pattern_timestamp.search(log)
+            if not match:
+                continue
+            req_queue = self.pattern_req_queue.search(log)
+            multi_level_queue = self.pattern_multi_level_queue.search(log)
+            group_info = {}
+            for group_id, queue_size in self.pattern_group_id.findall(log):
+                self.all_group_ids.add(int(group_id))
+                group_info[f'group_id_{group_id}_queue_size'] = queue_size
+            self.rows.append((match.group(1), req_queue.group(1) if req_queue else 'NA', multi_level_queue.group(1) if multi_level_queue else 'NA', group_info))
+
+    def end_file(self, file_name):
+        # the group_id columns are known once the whole file is read
+        group_id_columns = {f'group_id_{gid}_queue_size': 'NA' for gid in self.all_group_ids}
+        results = []
+        for timestamp, req_queue_size, multi_level_queue_size, group_info in self.rows:
+            results.append(
+                {
+                    'timestamp': timestamp,
+                    'req_queue_total_size': req_queue_size,
+                    'multi_level_queue_total_size': multi_level_queue_size,
+                    **group_info,
+                    **{k: 'NA' for k in group_id_columns if k not in group_info},
+                }
+            )
+        self.results[file_name] = results
+        self.rows = []
+
+    def result(self, file_name):
+        return self.results.get(file_name, [])
@@ -21,12 +21,14 @@ import json
 from decimal import Decimal
 import time
 import os
+import shutil
 from tabulate import tabulate
 from src.common.constant import const
 from src.common.tool import StringUtils, Util
 from src.common.tool import TimeUtils
 from src.common.tool import DirectoryUtil
-from src.common.ob_connector import OBConnector
+from src.common.ob_connector import OBConnector, get_ob_connector_pool
+from src.common.ob_sql_fanout import FanoutTask, SqlFanout, add_server_filter, build_time_slices, get_observer_servers
 from src.handler.meta.sql_meta import GlobalSqlMeta
 from src.handler.meta.html_meta import GlobalHtmlMeta
 from src.common.tool import FileUtil
@@ -39,6 +41,56 @@ from src.common.result_type import ObdiagResult
 
 
 class AnalyzeSQLHandler(object):
+    # merging the rows of one trace_id read from several servers / time slices: these columns are added up,
+    # requestTime is min(), SQL_AUDIT_ONE_ROW_KEYS come from the slowest row and the others are max()
+    SQL_AUDIT_SUM_KEYS = (
+        'returnRows',
+        'affectedRows',
+        'partitionCount',
+        'event0WaitTimeUs',
+        'event1WaitTimeUs',
+        'event2WaitTimeUs',
+        'event3WaitTimeUs',
+        'totalWaitTimeMicro',
+        'totalWaits',
+        'rpcCount',
+        'cpuTime',
+        'netTime',
+        'netWaitTime',
+        'queueTime',
+        'decodeTime',
+        'getPlanTime',
+        'executeTime',
+        'applicationWaitTime',
+        'concurrencyWaitTime',
+        'userIoWaitTime',
+        'scheduleTime',
+        'rowCacheHit',
+        'bloomFilterCacheHit',
+        'blockCacheHit',
+        'diskReads',
+        'retryCount',
+        'memstoreReadRowCount',
+        'ssstoreReadRowCount',
+    )
+    # codes, flags and where the request ran: they can not be added up, and svrIp / svrPort / planId must stay the ones
+    # of a single row for the plan explain
+    SQL_AUDIT_ONE_ROW_KEYS = (
+        'svrIp',
+        'svrPort',
+        'requestId',
+        'clientIp',
+        'planId',
+        'querySql',
+        'retCode',
+        'planType',
+        'isInnerSql',
+        'isExecutorRpc',
+        'isHitPlan',
+        'tableScan',
+        'consistencyLevel',
+    )
+
     def __init__(self, context):
         super(AnalyzeSQLHandler, self).__init__()
         self.context = context
@@ -60,6 +112,10 @@ class AnalyzeSQLHandler(object):
         self.output_type = 'html'
         self.level = 'notice'
         self.ob_version = '4.0.0.0'
+        self.split_by_server = False
+        self.time_slice_seconds = 0
+        self.server_timeout = None
+        self.partial_tenants = {}
         self.sql_audit_keys = [
             'svrIp',
             'svrPort',
@@ -236,6 +292,23 @@ class AnalyzeSQLHandler(object):
             except (TypeError, ValueError):
                 self.stdio.error('Invalid --elapsed_time: must be a non-negative integer (microseconds)')
                 return False
+        self.split_by_server = bool(Util.get_option(options, 'split_by_server'))
+        time_slice_option = Util.get_option(options, 'time_slice')
+        if time_slice_option:
+            try:
+                self.time_slice_seconds = TimeUtils.parse_time_length_to_sec(time_slice_option.strip())
+            except Exception:
+                self.stdio.error("Invalid --time_slice: format <n> <m|h|d>, e.g. 10m")
+                return False
+        server_timeout_option = Util.get_option(options, 'server_timeout')
+        if server_timeout_option is not None:
+            try:
+                self.server_timeout = int(server_timeout_option)
+                if self.server_timeout < 1:
+                    raise ValueError()
+            except (TypeError, ValueError):
+                self.stdio.error('Invalid --server_timeout: must be a positive integer (seconds)')
+                return False
         if from_option is not None and to_option is not None:
             try:
                 from_timestamp = TimeUtils.parse_time_str(from_option)
@@ -361,17 +434,23 @@ class AnalyzeSQLHandler(object):
 
         return None
 
-    def __select_sql_audit(self, tenant_name):
+    def __sql_audit_sql(self, tenant_name, from_timestamp, to_timestamp):
         sql = str(GlobalSqlMeta().get_value(key="get_sql_audit_ob4_for_sql_review"))
         replacements = {
             "##REPLACE_TENANT_NAME##": tenant_name,
-            "##REPLACE_REQUEST_FROM_TIME##": str(self.from_timestamp),
-            "##REPLACE_REQUEST_TO_TIME##": str(self.to_timestamp),
+            "##REPLACE_REQUEST_FROM_TIME##": str(from_timestamp),
+            "##REPLACE_REQUEST_TO_TIME##": str(to_timestamp),
             "##REPLACE_ELAPSED_TIME##": str(self.elapsed_time),
             "##REPLACE_LIMIT##": str(self.sql_audit_limit),
         }
         for old, new in replacements.items():
             sql = sql.replace(old, new)
+        return sql
+
+    def __select_sql_audit(self, tenant_name):
+        if self.split_by_server or self.time_slice_seconds:
+            return self.__select_sql_audit_fanout(tenant_name)
+        sql = self.__sql_audit_sql(tenant_name, self.from_timestamp, self.to_timestamp)
         self.stdio.verbose("excute SQL: {0}".format(sql))
         columns, rows = self.db_connector.execute_sql_return_columns_and_data(sql)
         result = []
@@ -380,6 +459,73 @@ class AnalyzeSQLHandler(object):
         self.stdio.print("excute select sql_audit SQL complete, the length of raw result is {0}".format(len(result)))
         return result
 
+    def __get_db_pool(self):
+        if self.db_user:
+            host = self.tenant_db_host or self.ob_cluster.get("db_host")
+            port = self.tenant_db_port if self.tenant_db_port is not None else self.ob_cluster.get("db_port")
+            pwd = self.db_password if self.db_password is not None else ''
+            return get_ob_connector_pool(self.context, self.ob_cluster, user=self.db_user, password=pwd, timeout=100, ip=host, port=port)
+        return get_ob_connector_pool(self.context, self.ob_cluster, timeout=100)
+
+    def __select_sql_audit_fanout(self, tenant_name):
+        """
+        Query sql_audit per server and per time slice in parallel, the rows of each query are spilled to disk
+        and merged by trace_id afterwards with the aggregate functions of the review sql.
+        Servers that do not answer in --server_timeout seconds are skipped and the tenant is marked partial.
+        """
+        servers = [(None, None)]
+        if self.split_by_server:
+            servers = get_observer_servers(self.sys_connector, self.ob_version.split('.')[0]) or servers
+        tasks = []
+        for time_slice in build_time_slices(self.from_timestamp, self.to_timestamp, self.time_slice_seconds):
+            sql = self.__sql_audit_sql(tenant_name, time_slice[0], time_slice[1])
+            for svr_ip, svr_port in servers:
+                task_sql = add_server_filter(sql, "tenant_name", svr_ip, svr_port) if svr_ip else sql
+                tasks.append(FanoutTask(task_sql, svr_ip=svr_ip, svr_port=svr_port, time_slice=time_slice if self.time_slice_seconds else None))
+        self.stdio.verbose("select tenant:{0} sql_audit with {1} queries on {2} servers".format(tenant_name, len(tasks), len(servers)))
+        spill_dir = os.path.join(self.pack_dir, "sql_audit_{0}".format(tenant_name))
+        fanout_result = SqlFanout(self.context, self.__get_db_pool(), timeout=self.server_timeout, spill_dir=spill_dir).run(tasks)
+        merged = {}
+        try:
+            for row in fanout_result.iter_rows():
+                key = row.get('traceId')
+                if key in merged:
+                    self.__merge_sql_audit_row(merged[key], row)
+                else:
+                    merged[key] = row
+        finally:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+        if fanout_result.partial:
+            self.partial_tenants[tenant_name] = fanout_result.summary()["failed"]
+            self.stdio.warn("select tenant:{0} sql_audit is partial, {1} of {2} queries did not finish".format(tenant_name, len(fanout_result.failed_tasks()), len(tasks)))
+        result = sorted(merged.values(), key=lambda item: item.get('elapsedTime') or 0, reverse=True)[: self.sql_audit_limit]
+        self.stdio.print("excute select sql_audit SQL complete, the length of raw result is {0}".format(len(result)))
+        return result
+
+    def __merge_sql_audit_row(self, target, row):
+        try:
+            slowest = (row.get('elapsedTime') or 0) > (target.get('elapsedTime') or 0)
+        except TypeError:
+            slowest = False
+        for key, value in row.items():
+            old = target.get(key)
+            if value is None:
+                continue
+            if old is None or (slowest and key in self.SQL_AUDIT_ONE_ROW_KEYS):
+                target[key] = value
+                continue
+            if key in self.SQL_AUDIT_ONE_ROW_KEYS:
+                continue
+            try:
+                if key in self.SQL_AUDIT_SUM_KEYS:
+                    target[key] = old + value
+                elif key == 'requestTime':
+                    target[key] = min(old, value)
+                else:
+                    target[key] = max(old, value)
+            except TypeError:
+                continue
+
     def __get_plan_cache_plan_explain(self, data):
         try:
             meta = SysTenantMeta(self.sys_connector, self.stdio, self.ob_version)
@@ -532,12 +678,32 @@ class AnalyzeSQLHandler(object):
             </div>
             {cluster_info}
             """
+            + self.__generate_partial_html()
             + all_sql_entries_html
         )
         full_html += GlobalHtmlMeta().get_value(key="html_footer_temple")
         self.stdio.print('generate html result complete')
         return full_html
 
+    def __generate_partial_html(self):
+        if not self.partial_tenants:
+            return ""
+        items = ""
+        for tenant_name, failed in self.partial_tenants.items():
+            for name, reason in failed.items():
+                items += "<p>Tenant[{0}] {1}: {2}</p>".format(html.escape(str(tenant_name)), html.escape(name), html.escape(reason))
+        return f"""
+            <div id="collapsibleSection">
+            <h3 class="header">Partial Result</h3>
+            <div class="content">
+                <pre class="markdown-code-block">
+                <p>The sql_audit of the queries below did not finish, the result does not include their rows.</p>
+                {items}
+                </pre>
+            </div>
+            </div>
+            """
+
     def __json_serializer(self, obj):
         """Custom JSON serializer for datetime, Decimal, etc."""
         if isinstance(obj, datetime.datetime):
@@ -594,6 +760,8 @@ class AnalyzeSQLHandler(object):
             "violationCounts": {"total": total, "critical": critical, "warn": warn, "notice": notice, "ok": ok},
             "tenants": tenants_json,
         }
+        if self.partial_tenants:
+            output["partialTenants"] = self.partial_tenants
         return json.dumps(output, ensure_ascii=False, indent=2, default=self.__json_serializer)
 
     def __print_cluster_gather_store_dir(self, cluster_data):
@@ -604,6 +772,8 @@ class AnalyzeSQLHandler(object):
 
     def __build_success_result_data(self, cluster_data):
         data = {"store_dir": self.pack_dir, "result_file": os.path.abspath(self.local_store_path)}
+        if self.partial_tenants:
+            data["partial"] = self.partial_tenants
         if isinstance(cluster_data, ObdiagResult) and cluster_data.data:
             cg = cluster_data.data.get("store_dir")
             if cg:
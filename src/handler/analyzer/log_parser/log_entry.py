@@ -15,9 +15,22 @@
 @file: log_entry.py
 @desc:
 """
+import re
 import time
 from src.common.tool import TimeUtils
 
+_LEVEL_RE = re.compile(r"\] (DEBUG|TRACE|INFO|WDIAG|WARN|EDIAG|ERROR|FATAL)\b")
+# "(ob_server.cpp:100) [1234][T1001_Occam][T1001][Y...-0-0] [lt=5]", the thread id follows the source location
+_THREAD_RE = re.compile(r"\) \[(\d+)\]")
+_TRACE_RE = re.compile(r"\[(Y[0-9A-Fa-f]+-[0-9A-Fa-f]+(?:-\d+){0,2})\]")
+_TENANT_RE = re.compile(r"\]\[T(\d+)\]")
+_RET_RE = re.compile(r"\bret=(-\d+)")
+_UNPARSED = object()
+# a newline followed by a line is_record_start accepts: more than 28 bytes with its own newline
+_RECORD_START_LEN = 30
+_RECORD_BREAK_RE = re.compile(rb"\n(?=\[[^\n]{4}-[^\n]{2}-[^\n]{19}.)", re.S)
+_READ_BLOCK_SIZE = 1024 * 1024
+
 
 def find_field_end(data, end_chs=",)}({|][", start=0, end=-1):
     if len(data) == 0:
@@ -281,3 +294,213 @@ class LogEntry(object):
             line_offset = reader_io.tell()
             line_idx += 1
         return success_log_entries, irregular_logs, n_read, log_entry_begin_offset
+
+
+def is_record_start(line):
+    """a line opening a log record: "[yyyy-mm-dd hh:mm:ss.uuuuuu] ...", str or bytes"""
+    if isinstance(line, bytes):
+        return len(line) > 28 and line[0:1] == b'[' and line[5:6] == b"-" and line[8:9] == b"-"
+    return len(line) > 28 and line[0] == '[' and line[5] == "-" and line[8] == "-"
+
+
+class LogRecord(object):
+    """
+    One log record: a line starting with a timestamp and the lines after it up to the next one (a stack, a memory
+    dump), as LogEntry assembles them. Unlike LogEntry nothing is parsed up front: the header fields are read from
+    the first line on first use, so a consumer that only looks for a substring pays for none of them.
+    """
+
+    __slots__ = ("file_name", "offset", "line_no", "data", "encoding", "_text", "_first_line", "_time_str", "_level", "_thread_id", "_trace_id", "_tenant_id", "_ret", "_timestamp_us")
+
+    def __init__(self, file_name, offset, line_no, data, encoding="utf-8"):
+        self.file_name = file_name
+        # byte offset of the record in the file, iter_log_records can resume from it
+        self.offset = offset
+        # 1-based number of the first line of the record
+        self.line_no = line_no
+        # the raw lines of the record, without the trailing newline; text decodes them on first use
+        self.data = data
+        self.encoding = encoding
+        self._text = None
+        self._first_line = None
+        self._time_str = _UNPARSED
+        self._level = _UNPARSED
+        self._thread_id = None
+        self._trace_id = None
+        self._tenant_id = None
+        self._ret = _UNPARSED
+        self._timestamp_us = None
+
+    @property
+    def text(self):
+        """the lines of the record joined by "\n" """
+        if self._text is None:
+            self._text = self.data.decode(self.encoding, errors="replace")
+        return self._text
+
+    @property
+    def first_line(self):
+        if self._first_line is None:
+            text = self.text
+            idx = text.find("\n")
+            self._first_line = text if idx == -1 else text[:idx]
+        return self._first_line
+
+    def lines(self):
+        return self.text.split("\n")
+
+    def _parse_header(self):
+        line = self.first_line
+        if not is_record_start(line):
+            # the lines before the first record of a file, e.g. a file cut in the middle of a record
+            self._time_str = None
+            return
+        self._time_str = line[1 : line.find("]")]
+
+    def _parse_fields(self):
+        # level, thread, tenant and trace, only for the consumers asking for one of them
+        self._level = self._thread_id = self._tenant_id = self._trace_id = None
+        if not self.time_str:
+            return
+        line = self.first_line
+        match = _LEVEL_RE.search(line, 20, 80)
+        if match:
+            self._level = match.group(1)
+        match = _THREAD_RE.search(line)
+        if match:
+            self._thread_id = int(match.group(1))
+            tail = match.end()
+            match = _TENANT_RE.search(line, tail)
+            if match:
+                self._tenant_id = match.group(1)
+            match = _TRACE_RE.search(line, tail)
+            if match:
+                self._trace_id = match.group(1)
+
+    @property
+    def time_str(self):
+        """ "yyyy-mm-dd hh:mm:ss.uuuuuu", None for the lines before the first record of a file"""
+        if self._time_str is _UNPARSED:
+            self._parse_header()
+        return self._time_str
+
+    @property
+    def timestamp_us(self):
+        if self._timestamp_us is None:
+            self._timestamp_us = TimeUtils.datetime_to_timestamp(self.time_str) if self.time_str else 0
+        return self._timestamp_us
+
+    @property
+    def level(self):
+        if self._level is _UNPARSED:
+            self._parse_fields()
+        return self._level
+
+    @property
+    def thread_id(self):
+        if self._level is _UNPARSED:
+            self._parse_fields()
+        return self._thread_id
+
+    @property
+    def trace_id(self):
+        if self._level is _UNPARSED:
+            self._parse_fields()
+        return self._trace_id
+
+    @property
+    def tenant_id(self):
+        if self._level is _UNPARSED:
+            self._parse_fields()
+        return self._tenant_id
+
+    @property
+    def ret(self):
+        """the first "ret=-N" of the first line, e.g. "-4012", or None"""
+        if self._ret is _UNPARSED:
+            line = self.first_line
+            match = _RET_RE.search(line) if "ret=" in line else None
+            self._ret = match.group(1) if match else None
+        return self._ret
+
+
+def _last_record_break(buf, lo, end=None):
+    """index of the newline before the last record start of buf[lo:end], -1 if there is none"""
+    end = len(buf) if end is None else end
+    while True:
+        idx = buf.rfind(b"\n[", lo, end)
+        if idx < 0 or _RECORD_BREAK_RE.match(buf, idx):
+            return idx
+        end = idx + 1
+
+
+def _record_spans(body, needles):
+    """(begin, end) of the records of body, only of those containing one of needles when needles"""
+    if not needles:
+        begin = 0
+        for match in _RECORD_BREAK_RE.finditer(body):
+            yield begin, match.start()
+            begin = match.start() + 1
+        if begin < len(body):
+            yield begin, len(body)
+        return
+    # jump from needle to needle, a record no needle is in is never looked at.
+    # next_hits keeps the next position of every needle, a needle is searched again only once the cursor passed it
+    size = len(body)
+    next_hits = [body.find(needle) for needle in needles]
+    cursor = 0
+    while cursor < size:
+        hit = -1
+        for i, needle in enumerate(needles):
+            idx = next_hits[i]
+            if 0 <= idx < cursor:
+                idx = next_hits[i] = body.find(needle, cursor)
+            if idx >= 0 and (hit < 0 or idx < hit):
+                hit = idx
+        if hit < 0:
+            return
+        idx = _last_record_break(body, cursor, hit + 1)
+        begin = idx + 1 if idx >= 0 else cursor
+        match = _RECORD_BREAK_RE.search(body, hit)
+        end = match.start() if match else len(body)
+        yield begin, end
+        cursor = end + 1
+
+
+def iter_log_records(fileobj, file_name=None, start_offset=0, start_line=1, encoding="utf-8", needles=None):
+    """
+    the LogRecords of a binary file object, one at a time.
+    Reading may be resumed later from the offset (and line_no) of a record.
+    needles (bytes): only the records containing one of them are built, the others are skipped by bytes.find
+    """
+    if start_offset:
+        fileobj.seek(start_offset)
+    # the file is read in blocks, every block is cut after its last complete record
+    buf = bytearray()
+    offset = start_offset
+    line_no = start_line
+    while True:
+        block = fileobj.read(_READ_BLOCK_SIZE)
+        if block:
+            lo = max(0, len(buf) - _RECORD_START_LEN)
+            buf += block
+            cut = _last_record_break(buf, lo)
+            if cut < 0:
+                continue
+            body = bytes(buf[: cut + 1])
+            del buf[: cut + 1]
+        else:
+            body = bytes(buf)
+            buf = None
+            if not body:
+                break
+        cursor, cursor_line = 0, line_no
+        for begin, end in _record_spans(body, needles):
+            cursor_line += body.count(b"\n", cursor, begin)
+            data = body[begin:end]
+            yield LogRecord(file_name, offset + begin, cursor_line, data.rstrip(b"\r\n"), encoding)
+            cursor = begin
+        offset += len(body)
+        line_no += body.count(b"\n")
+        if buf is None:
+            break
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: record_engine.py
+@desc: read observer / obproxy logs once and hand every multi-line record to all the registered consumers, e.g.
+           engine = LogRecordEngine(stdio)
+           errors = engine.register(ObLogErrorConsumer(...))
+           queues = engine.register(QueueStatConsumer())
+           engine.run(files)
+       analyzes the errors and the queue dumps of the same files in one read.
+"""
+import gzip
+import re
+import time
+from abc import ABC, abstractmethod
+
+from src.handler.analyzer.log_parser.log_entry import iter_log_records
+
+
+def _needle_pattern(needles):
+    # one regex over the raw bytes of a record instead of a loop over the needles
+    if needles is None:
+        return None
+    return re.compile(b"|".join(re.escape(needle.encode("utf-8")) for needle in needles))
+
+
+class LogRecordConsumer(ABC):
+    """
+    A consumer of LogRecordEngine.
+    needles: consume() only gets the records containing one of these substrings (str, checked on the raw bytes of the
+             record before it is decoded), None gets every record.
+    done: set it once the consumer needs no more records, the engine stops reading when every consumer is done.
+    """
+
+    needles = None
+    done = False
+
+    def begin_file(self, file_name):
+        pass
+
+    @abstractmethod
+    def consume(self, record):
+        pass
+
+    def end_file(self, file_name):
+        pass
+
+
+class FirstMatchConsumer(LogRecordConsumer):
+    """the first record containing needle, e.g. the first "fatal error" of the gathered logs"""
+
+    def __init__(self, needle):
+        self.needles = (needle,)
+        self.match = None
+
+    def consume(self, record):
+        self.match = record
+        self.done = True
+
+
+class FieldExtractConsumer(LogRecordConsumer):
+    """
+    the fields of the records of one log site, e.g.
+        FieldExtractConsumer(ObLogParser.get_field_extractor('dump tenant info', ['req_queue:total_size', ['tenant/id', 'tenant_id']]))
+    rows are (record, fields) pairs, limit stops the consumer after that many rows.
+    """
+
+    def __init__(self, extractor, limit=None):
+        self.extractor = extractor
+        self.needles = (extractor.site,) if extractor.site is not None else None
+        self.limit = limit
+        self.rows = []
+
+    def consume(self, record):
+        fields = self.extractor.extract(record.text)
+        if fields is None:
+            return
+        self.rows.append((record, fields))
+        if self.limit is not None and len(self.rows) >= self.limit:
+            self.done = True
+
+
+class LogRecordEngine(object):
+    def __init__(self, stdio=None):
+        self.stdio = stdio
+        self.consumers = []
+        self.stats = {"files": 0, "bytes": 0, "records": 0, "time": 0.0}
+
+    def register(self, consumer):
+        self.consumers.append(consumer)
+        return consumer
+
+    def run(self, files):
+        """read every file once (.gz too) and dispatch its records, returns the stats of the run"""
+        start = time.time()
+        for file_name in files:
+            if self.consumers and all(consumer.done for consumer in self.consumers):
+                break
+            self.run_file(file_name)
+        self.stats["time"] = round(self.stats["time"] + time.time() - start, 3)
+        self._verbose("log record engine: {0} records of {1} files ({2} bytes) for {3} consumers in {4}s".format(self.stats["records"], self.stats["files"], self.stats["bytes"], len(self.consumers), self.stats["time"]))
+        return self.stats
+
+    def run_file(self, file_name):
+        consumers = [consumer for consumer in self.consumers if not consumer.done]
+        for consumer in consumers:
+            consumer.begin_file(file_name)
+        active = [(consumer, _needle_pattern(consumer.needles)) for consumer in consumers]
+        # when every consumer has needles the records none of them is in are not even built
+        needles = None
+        if consumers and all(consumer.needles is not None for consumer in consumers):
+            needles = tuple(set(needle.encode("utf-8") for consumer in consumers for needle in consumer.needles))
+        opener = gzip.open if file_name.endswith(".gz") else open
+        records = 0
+        size = 0
+        try:
+            with opener(file_name, "rb") as f:
+                for record in iter_log_records(f, file_name, needles=needles):
+                    records += 1
+                    data = record.data
+                    for item in active:
+                        consumer, pattern = item
+                        if pattern is not None and pattern.search(data) is None:
+                            continue
+                        try:
+                            consumer.consume(record)
+                        except Exception as e:
+                            # one broken consumer must not cost the others their pass over the file
+                            self._warn("{0} failed on {1} line {2}, skip the rest of the file for it: {3}".format(type(consumer).__name__, file_name, record.line_no, e))
+                            active = [other for other in active if other is not item]
+                            continue
+                        if consumer.done:
+                            active = [other for other in active if other is not item]
+                    if not active:
+                        break
+                size = f.tell()
+        except Exception as e:
+            self._warn("read {0} failed: {1}".format(file_name, e))
+        finally:
+            self.stats["files"] += 1
+            self.stats["records"] += records
+            self.stats["bytes"] += size
+            for consumer in consumers:
+                try:
+                    consumer.end_file(file_name)
+                except Exception as e:
+                    self._warn("{0} failed at the end of {1}: {2}".format(type(consumer).__name__, file_name, e))
+
+    def _verbose(self, msg):
+        if self.stdio is not None:
+            self.stdio.verbose(msg)
+
+    def _warn(self, msg):
+        if self.stdio is not None:
+            self.stdio.warn(msg)
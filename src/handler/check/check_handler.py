@@ -20,7 +20,6 @@ This module provides:
 - CheckOBConnectorPool: Connection pool for OceanBase database connections used by tasks
 """
 import os
-import queue
 import traceback
 import re
 import oyaml as yaml
@@ -28,7 +27,8 @@ import datetime
 from concurrent.futures import ProcessPoolExecutor, as_completed
 import signal
 
-from src.common.ob_connector import OBConnector
+from src.common.ob_connector import OBConnectorPool
+from src.common.stdio import format_log_msg
 from src.common.scene import get_version_by_type
 from src.common.command import get_obproxy_full_version
 from src.common.ssh_client.ssh_connection_manager import SSHConnectionManager
@@ -140,17 +140,24 @@ class _WorkerIO:
     def __init__(self):
         self._messages = []
 
+    @staticmethod
+    def _format(msg, args):
+        try:
+            return format_log_msg(msg, args)
+        except Exception:
+            return str(msg)
+
     def warn(self, msg, *args, **kwargs):
-        self._messages.append(('warn', str(msg)))
+        self._messages.append(('warn', self._format(msg, args)))
 
     def error(self, msg, *args, **kwargs):
-        self._messages.append(('error', str(msg)))
+        self._messages.append(('error', self._format(msg, args)))
 
     def verbose(self, msg, *args, **kwargs):
-        self._messages.append(('verbose', str(msg)))
+        self._messages.append(('verbose', self._format(msg, args)))
 
     def print(self, msg, *args, **kwargs):
-        self._messages.append(('print', str(msg)))
+        self._messages.append(('print', self._format(msg, args)))
 
     def __getattr__(self, item):
         return lambda *a, **kw: None
@@ -935,6 +942,7 @@ class CheckOBConnectorPool:
 
     Used by check tasks to avoid creating a new connection per task.
     Tasks get/release connections via get_connection/release_connection.
+    Backed by OBConnectorPool, connections are opened on first use.
     """
 
     def __init__(self, context, max_size, cluster):
@@ -946,30 +954,22 @@ class CheckOBConnectorPool:
         """
         self.max_size = max_size
         self.cluster = cluster
-        self.connections = queue.Queue(maxsize=max_size)
         self.stdio = context.stdio
-        try:
-            for _ in range(max_size):
-                conn = OBConnector(
-                    context=context,
-                    ip=self.cluster.get("db_host"),
-                    port=self.cluster.get("db_port"),
-                    username=self.cluster.get("tenant_sys", {}).get("user"),
-                    password=self.cluster.get("tenant_sys", {}).get("password"),
-                    timeout=10000,
-                )
-                self.connections.put(conn)
-            self.stdio.verbose("CheckOBConnectorPool init success")
-        except Exception as e:
-            self.stdio.error("CheckOBConnectorPool init fail: {0}".format(e))
+        self.pool = OBConnectorPool(
+            context,
+            ip=self.cluster.get("db_host"),
+            port=self.cluster.get("db_port"),
+            username=self.cluster.get("tenant_sys", {}).get("user"),
+            password=self.cluster.get("tenant_sys", {}).get("password"),
+            timeout=10000,
+            max_size=max_size,
+        )
+        self.stdio.verbose("CheckOBConnectorPool init success")
 
     def get_connection(self):
-        """Get a connection from the pool. Raises queue.Empty after 30s if pool is exhausted."""
+        """Get a connection from the pool. Returns None after 30s if pool is exhausted."""
         try:
-            return self.connections.get(timeout=30)
-        except queue.Empty:
-            self.stdio.error("get_connection timed out: pool exhausted or connection not released")
-            return None
+            return self.pool.get_connection(timeout=30)
         except Exception as e:
             self.stdio.error("get connection fail: {0}".format(e))
             return None
@@ -978,6 +978,6 @@ class CheckOBConnectorPool:
         """Release a connection back to the pool."""
         if conn is not None:
             try:
-                self.connections.put(conn)
+                self.pool.release_connection(conn)
             except Exception:
                 pass
@@ -27,7 +27,9 @@ from src.common.tool import StringUtils
 from src.common.scene import get_version_by_type
 from src.common.tool import Util
 from src.common.tool import TimeUtils
-from src.common.ob_connector import OBConnector
+from src.common.ob_connector import get_ob_connector_pool
+from src.common.constant import const
+from src.handler.display.watch import SceneWatcher
 
 
 class DisplaySceneHandler(SafeStdio):
@@ -47,6 +49,8 @@ class DisplaySceneHandler(SafeStdio):
         self.variables = {}
         self.is_inner = is_inner
         self.temp_dir = '/tmp'
+        self.watch_interval = None
+        self.watch_count = 0
         if self.context.get_variable("display_timestamp", None):
             self.display_timestamp = self.context.get_variable("display_timestamp")
         else:
@@ -54,7 +58,8 @@ class DisplaySceneHandler(SafeStdio):
 
     def init_config(self):
         self.cluster = self.context.cluster_config
-        self.sys_connector = OBConnector(context=self.context, ip=self.cluster.get("db_host"), port=self.cluster.get("db_port"), username=self.cluster.get("tenant_sys").get("user"), password=self.cluster.get("tenant_sys").get("password"), timeout=100)
+        # a pool, the nodes of a scene run their sql steps at the same time
+        self.sys_connector = get_ob_connector_pool(self.context, self.cluster, timeout=100)
         self.obproxy_nodes = self.context.obproxy_config['servers']
         self.ob_nodes = self.context.cluster_config['servers']
         new_nodes = Util.get_nodes_list(self.context, self.ob_nodes, self.stdio)
@@ -72,6 +77,8 @@ class DisplaySceneHandler(SafeStdio):
         self.context.set_variable('temp_dir', self.temp_dir)
         self.__init_variables()
         self.__init_task_names()
+        if self.watch_interval:
+            return self.watch()
         data = self.execute()
         return ObdiagResult(ObdiagResult.SUCCESS_CODE, data={"display_data": data})
 
@@ -92,30 +99,51 @@ class DisplaySceneHandler(SafeStdio):
         except Exception as e:
             self.stdio.error("Internal error :{0}".format(e))
 
+    def watch(self):
+        # the scenes and the connection are built once, every refresh only runs the queries again
+        if self.code_tasks:
+            self.stdio.warn("watch only refreshes yaml scenes, skip {0}".format(",".join(self.code_tasks)))
+        scenes = []
+        for task_name, task_data in self.yaml_tasks.items():
+            scene = self.__build_yaml_scene(task_name, task_data)
+            if isinstance(scene, ObdiagResult):
+                return scene
+            scenes.append((task_name, scene))
+        if not scenes:
+            return ObdiagResult(ObdiagResult.INPUT_ERROR_CODE, error_data="no yaml scene to watch")
+        watcher = SceneWatcher(self.context, scenes, self.watch_interval, count=self.watch_count, max_interval=const.DISPLAY_WATCH_MAX_INTERVAL)
+        data = watcher.run()
+        return ObdiagResult(ObdiagResult.SUCCESS_CODE, data={"display_data": data})
+
     def __init_db_connector(self):
-        self.db_connector = OBConnector(context=self.context, ip=self.db_conn.get("host"), port=self.db_conn.get("port"), username=self.db_conn.get("user"), password=self.db_conn.get("password"), database=self.db_conn.get("database"), timeout=100)
+        self.db_connector = get_ob_connector_pool(
+            self.context, self.cluster, user=self.db_conn.get("user"), password=self.db_conn.get("password"), database=self.db_conn.get("database"), timeout=100, ip=self.db_conn.get("host"), port=self.db_conn.get("port")
+        )
+
+    def __build_yaml_scene(self, task_name, task_data):
+        task_type = self.__get_task_type(task_name)
+        version = get_version_by_type(self.context, task_type)
+        if not version:
+            self.stdio.error("can't get version")
+            return ObdiagResult(ObdiagResult.SERVER_ERROR_CODE, error_data="can't get version")
+        match = re.search(r'\d+(\.\d+){2}(?:\.\d+)?', version)
+        if not match:
+            self.stdio.error("get cluster.version failed")
+            return ObdiagResult(ObdiagResult.SERVER_ERROR_CODE, error_data="get cluster.version failed")
+        self.cluster["version"] = match.group(0)
+        return SceneBase(context=self.context, scene=task_data["task"], env=self.env, scene_variable_dict=self.variables, task_type=task_type, db_connector=self.db_connector)
 
     # execute yaml task
     def __execute_yaml_task_one(self, task_name, task_data):
         try:
             self.stdio.print("execute tasks: {0}".format(task_name))
-            task_type = self.__get_task_type(task_name)
-            version = get_version_by_type(self.context, task_type)
-            if version:
-                match = re.search(r'\d+(\.\d+){2}(?:\.\d+)?', version)
-                if match:
-                    self.cluster["version"] = match.group(0)
-                else:
-                    self.stdio.error("get cluster.version failed")
-                    return ObdiagResult(ObdiagResult.SERVER_ERROR_CODE, error_data="get cluster.version failed")
-                task = SceneBase(context=self.context, scene=task_data["task"], env=self.env, scene_variable_dict=self.variables, task_type=task_type, db_connector=self.db_connector)
-                self.stdio.verbose("{0} execute!".format(task_name))
-                data = task.execute()
-                self.stdio.verbose("execute tasks end : {0}".format(task_name))
-                return str(data)
-            else:
-                self.stdio.error("can't get version")
-                return ObdiagResult(ObdiagResult.SERVER_ERROR_CODE, error_data="can't get version")
+            task = self.__build_yaml_scene(task_name, task_data)
+            if isinstance(task, ObdiagResult):
+                return task
+            self.stdio.verbose("{0} execute!".format(task_name))
+            data = task.execute()
+            self.stdio.verbose("execute tasks end : {0}".format(task_name))
+            return str(data)
         except Exception as e:
             self.stdio.error("__execute_yaml_task_one Exception : {0}".format(e))
             return ObdiagResult(ObdiagResult.SERVER_ERROR_CODE, error_data="__execute_yaml_task_one Exception : {0}".format(e))
@@ -186,6 +214,14 @@ class DisplaySceneHandler(SafeStdio):
         env_option = Util.get_option(options, 'env')
         scene_option = Util.get_option(options, 'scene')
         temp_dir_option = Util.get_option(options, 'temp_dir')
+        watch_option = Util.get_option(options, 'watch')
+        watch_count_option = Util.get_option(options, 'watch_count')
+        if watch_option is not None:
+            if watch_option <= 0:
+                self.stdio.error("args --watch must be greater than 0, got {0}".format(watch_option))
+                return False
+            self.watch_interval = watch_option
+            self.watch_count = watch_count_option or 0
         if from_option is not None and to_option is not None:
             try:
                 from_timestamp = TimeUtils.parse_time_str(from_option)
@@ -15,6 +15,11 @@
 @file: base.py
 @desc:
 """
+import threading
+
+from src.common.constant import const
+from src.common.node_runner import NodeRunner
+from src.common.ob_connector import OBConnectorPool
 from src.common.stdio import SafeStdio
 from src.common.scene import filter_by_version
 from src.handler.display.step.base import Base
@@ -58,37 +63,115 @@ class SceneBase(SafeStdio):
         except Exception as e:
             raise Exception("execute failed, error: {0}".format(e))
 
+    def compile(self):
+        """pick the steps of the matching version once, a watched scene keeps them for every refresh"""
+        if getattr(self, "_steps", None) is None:
+            steps_nu = filter_by_version(self.scene, self.cluster, self.stdio)
+            self._steps = self.scene[steps_nu]["steps"] if steps_nu >= 0 else []
+        return self._steps
+
+    def collect(self):
+        """
+        Run the sql steps of a yaml scene on its nodes and return the tables instead of printing them:
+        [(step key, title, columns, rows)], the key is stable between two calls so the results can be compared.
+        """
+        if self.mode != "yaml":
+            raise Exception("only yaml scenes can be collected")
+        nodes = []
+        if self.task_type in ("observer", "other"):
+            nodes.extend(self.ob_nodes)
+        if self.task_type in ("obproxy", "other"):
+            nodes.extend(self.obproxy_nodes)
+        steps = self.compile()
+
+        def collect_node(item):
+            node_number, node = item
+            variables = dict(self.scene_variable_dict)
+            frames = []
+            for nu, step in enumerate(steps, start=1):
+                result = Base(self.context, step, node, self.cluster, variables, self.env, node_number, self.db_connector).query()
+                if result is None:
+                    continue
+                title, columns, rows = result
+                key = "step {0}".format(nu) if step.get("global") else "step {0} on {1}".format(nu, node.get("ip"))
+                frames.append((key, title, columns, rows))
+            return frames
+
+        frames = []
+        for outcome in self.__run_nodes(nodes, collect_node):
+            if not outcome.ok:
+                raise Exception("{0}: {1}".format(outcome.name, outcome.error))
+            frames.extend(outcome.result)
+        return frames
+
+    def __run_nodes(self, nodes, func, on_done=None):
+        # every node on its own thread: a pool gives each of them a connection, a single connection is shared behind a lock
+        if not isinstance(self.db_connector, (OBConnectorPool, SharedConnector)):
+            self.db_connector = SharedConnector(self.db_connector)
+        items = list(enumerate(nodes, start=1))
+        runner = NodeRunner(self.stdio, max_workers=const.DISPLAY_MAX_PARALLEL_NODES)
+        return runner.run(items, func, name=lambda item: item[1].get("ip") or item[1].get("container_name") or str(item[0]), on_done=on_done)
+
     def __execute_yaml_mode(self, nodes):
-        steps_nu = filter_by_version(self.scene, self.cluster, self.stdio)
-        if steps_nu < 0:
+        steps = self.compile()
+        if not steps:
             self.stdio.verbose("Unadapted by version. SKIP")
             return "Unadapted by version.SKIP"
-        self.stdio.verbose("filter_by_version is return {0}".format(steps_nu))
         if len(nodes) == 0:
             self.stdio.warn("node is not exist")
             return
-        node_number = 0
-        data = ""
-        for node in nodes:
-            # self.stdio.print("run scene excute yaml mode in node: {0} start".format(StringUtils.node_cut_passwd_for_log(node['ip'], self.stdio)))
-            steps = self.scene[steps_nu]
-            nu = 1
-            node_number = node_number + 1
-            for step in steps["steps"]:
+        if len(self.cluster) == 0:
+            self.stdio.error("cluster is not exist")
+            return
+
+        def execute_node(item):
+            node_number, node = item
+            variables = dict(self.scene_variable_dict)
+            texts = []
+            for nu, step in enumerate(steps, start=1):
+                self.stdio.verbose("node {0} step nu: {1}".format(node_number, nu))
                 try:
-                    self.stdio.verbose("step nu: {0}".format(nu))
-                    if len(self.cluster) == 0:
-                        self.stdio.error("cluster is not exist")
-                        return
-                    step_run = Base(self.context, step, node, self.cluster, self.scene_variable_dict, self.env, node_number, self.db_connector)
-                    self.stdio.verbose("step nu: {0} initted, to execute".format(nu))
-                    data = "{0}\n{1}".format(data, step_run.execute())
-                    self.scene_variable_dict = step_run.update_task_variable_dict()
+                    step_run = Base(self.context, step, node, self.cluster, variables, self.env, node_number, self.db_connector)
+                    text = step_run.render()
+                    variables = step_run.update_task_variable_dict()
                 except Exception as e:
                     self.stdio.error("SceneBase execute Exception: {0}".format(e))
-                    return
-                self.stdio.verbose("step nu: {0} execute end ".format(nu))
-                nu = nu + 1
-            # self.stdio.print("run scene excute yaml mode in node: {0} end".format(StringUtils.node_cut_passwd_for_log(node['ip'], self.stdio)))
+                    break
+                if text is not None:
+                    texts.append(text)
+            return texts
+
+        # a node is printed once it and all the nodes before it are done, so the output keeps the node order
+        # while the first nodes show up without waiting for the slowest one
+        finished = {}
+        printed = []
+
+        def on_done(outcome):
+            finished[outcome.item[0]] = outcome
+            while len(printed) + 1 in finished:
+                done = finished[len(printed) + 1]
+                if not done.ok:
+                    self.stdio.error("SceneBase execute on {0} failed: {1}".format(done.name, done.error))
+                texts = done.result or []
+                for text in texts:
+                    self.stdio.print(text)
+                printed.append("\n".join(texts))
+
+        self.__run_nodes(nodes, execute_node, on_done=on_done)
         self.stdio.verbose("run scene excute yaml mode in node")
-        return data
+        return "".join("\n{0}".format(text) for text in printed if text)
+
+
+class SharedConnector(object):
+    """one db connection used by the steps of several nodes at the same time, the statements run one after another"""
+
+    def __init__(self, connector):
+        self._connector = connector
+        self._lock = threading.Lock()
+
+    def execute_sql_return_columns_and_data(self, sql, params=None):
+        with self._lock:
+            return self._connector.execute_sql_return_columns_and_data(sql, params)
+
+    def __getattr__(self, name):
+        return getattr(self._connector, name)
@@ -18,6 +18,7 @@
 from src.common.ssh_client.ssh import SshClient
 from src.common.stdio import SafeStdio
 from src.handler.display.step.sql import StepSQLHandler
+from src.handler.display.step.ssh import SshHandler
 
 
 class Base(SafeStdio):
@@ -58,6 +59,10 @@ class Base(SafeStdio):
                     handler = StepSQLHandler(self.context, self.step, self.cluster, self.task_variable_dict, self.env, self.db_connector)
                     data = handler.execute()
                     return data
+                elif self.step["type"] == "ssh":
+                    data = SshHandler(self.context, self.step, self.node, None, self.task_variable_dict).execute()
+                    self.stdio.print(data)
+                    return data
                 else:
                     self.stdio.error("the type not support: {0}".format(self.step["type"]))
         except Exception as e:
@@ -68,5 +73,37 @@ class Base(SafeStdio):
                 self.stdio.error("[{0}:{1}] {2}]".format(self.node.get("ssh_type") or "", self.node.get("container_name") or self.task_variable_dict.get("remote_ip") or "", e))
             self.stdio.error("StepBase handler.execute fail, error: {0}".format(e))
 
+    def render(self):
+        """-> the text of the step without printing it, the nodes of a scene are rendered in parallel and printed in order"""
+        if "ip" in self.node:
+            self.task_variable_dict["remote_ip"] = self.node["ip"]
+        self.task_variable_dict["remote_home_path"] = self.node.get("home_path")
+        if (self.node_number > 1) and self.step.get("global") and (self.step.get("global") is True):
+            return None
+        if self.step.get("type") == "ssh":
+            return SshHandler(self.context, self.step, self.node, None, self.task_variable_dict).execute()
+        try:
+            result = self.query()
+        except Exception as e:
+            # a failing step is logged and skipped, the next steps of the node still run
+            self.stdio.error("StepSQLHandler execute Exception: {0}".format(e).strip())
+            self.stdio.error("[cluster:{0}] {1}]".format(self.cluster.get("ob_cluster_name") or self.cluster.get("obproxy_cluster_name") or "(Please set ob_cluster_name or obproxy_cluster_name)", e))
+            return None
+        if result is None:
+            return None
+        return StepSQLHandler.format_result(*result)
+
+    def query(self):
+        """-> (title, columns, rows) of a sql step without printing; None for a skipped global step on the other nodes"""
+        if "ip" in self.node:
+            self.task_variable_dict["remote_ip"] = self.node["ip"]
+        self.task_variable_dict["remote_home_path"] = self.node.get("home_path")
+        if (self.node_number > 1) and self.step.get("global") and (self.step.get("global") is True):
+            return None
+        if self.step.get("type") != "sql":
+            raise Exception("the type not support: {0}".format(self.step.get("type")))
+        handler = StepSQLHandler(self.context, self.step, self.cluster, self.task_variable_dict, self.env, self.db_connector)
+        return handler.query()
+
     def update_task_variable_dict(self):
         return self.task_variable_dict
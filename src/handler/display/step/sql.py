@@ -42,38 +42,53 @@ class StepSQLHandler(SafeStdio):
 
     def execute(self):
         try:
-            data = ""
-            if "sql" not in self.step:
-                self.stdio.error("StepSQLHandler execute sql is not set")
+            result = self.query()
+            if result is None:
                 return
-            sql = StringUtils.build_sql_on_expr_by_dict(self.step["sql"], self.task_variable_dict)
-            params = StringUtils.extract_parameters(sql)
-            for param in params:
-                values = self.env.get(param)
-                if values is None or len(values) == 0:
-                    self.stdio.print("the values of param %s is None", param)
-                    return
-            sql = StringUtils.replace_parameters(sql, self.env)
-            self.stdio.verbose("StepSQLHandler execute: {0}".format(sql))
-            columns, data = self.db_connector.execute_sql_return_columns_and_data(sql)
-            if data is None or len(data) == 0:
-                self.stdio.verbose("excute sql: {0},  result is None".format(sql))
-            table = PrettyTable(columns)
-            for row in data:
-                table.add_row(row)
-            for column in columns:
-                table.align[column] = 'l'
-            title = self.step.get("tittle")
-            if title is not None:
-                title = StringUtils.replace_parameters(title, self.env)
-                formatted_title = f"\n[obdiag display]: {title} "
-                self.stdio.print(formatted_title)
-                data = "{0}\n{1}".format(data, formatted_title)
-            self.stdio.print(table)
-            data = "{0}\n{1}".format(data, table)
+            data = self.format_result(*result)
+            self.stdio.print(data)
             return data
         except Exception as e:
             self.stdio.error("StepSQLHandler execute Exception: {0}".format(e).strip())
 
+    def query(self):
+        """-> (title, columns, rows) of the step without printing, None when the step can not run"""
+        if "sql" not in self.step:
+            self.stdio.error("StepSQLHandler execute sql is not set")
+            return
+        sql = StringUtils.build_sql_on_expr_by_dict(self.step["sql"], self.task_variable_dict)
+        params = StringUtils.extract_parameters(sql)
+        for param in params:
+            values = self.env.get(param)
+            if values is None or len(values) == 0:
+                self.stdio.print("the values of param %s is None", param)
+                return
+        sql = StringUtils.replace_parameters(sql, self.env)
+        self.stdio.verbose("StepSQLHandler execute: {0}".format(sql))
+        columns, data = self.db_connector.execute_sql_return_columns_and_data(sql)
+        if data is None or len(data) == 0:
+            self.stdio.verbose("excute sql: {0},  result is None".format(sql))
+            data = []
+        title = self.step.get("tittle")
+        if title is not None:
+            title = StringUtils.replace_parameters(title, self.env)
+        return title, columns, data
+
+    @classmethod
+    def format_result(cls, title, columns, rows):
+        data = ""
+        if title is not None:
+            data = "\n[obdiag display]: {0} ".format(title)
+        return "{0}\n{1}".format(data, cls.build_table(columns, rows))
+
+    @staticmethod
+    def build_table(columns, rows):
+        table = PrettyTable(columns)
+        for row in rows:
+            table.add_row(row)
+        for column in columns:
+            table.align[column] = 'l'
+        return table
+
     def update_step_variable_dict(self):
         return self.task_variable_dict
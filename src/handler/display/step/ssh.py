@@ -37,7 +37,7 @@ class SshHandler(SafeStdio):
             self.stdio.error("SshHandler init fail. Please check the NODES conf. node: {0}. Exception : {1} .".format(node, e))
         self.task_variable_dict = task_variable_dict
         self.parameter = []
-        self.report_file_path = os.path.join(self.report_path, "shell_result.txt")
+        self.report_file_path = os.path.join(self.report_path, "shell_result.txt") if self.report_path else None
 
     def execute(self):
         try:
@@ -63,6 +63,8 @@ class SshHandler(SafeStdio):
         return self.task_variable_dict
 
     def report(self, command, data):
+        if not self.report_file_path:
+            return
         try:
             with open(self.report_file_path, 'a', encoding='utf-8') as f:
                 f.write('\n\n' + '[' + self.node.get("ip") + '] shell > ' + command + '\n')
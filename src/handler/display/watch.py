@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: watch.py
+@desc: display scene run --watch: re-run the compiled scenes on one connection and show what changed between refreshes
+"""
+import datetime
+import decimal
+import time
+
+from src.common.stdio import SafeStdio
+from src.handler.display.step.sql import StepSQLHandler
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float, decimal.Decimal)):
+        return float(value)
+    return None
+
+
+def _is_key_column(column, value):
+    # text cells and ids identify a row, times (NOW() in a lot of scenes) change on every refresh
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.timedelta)):
+        return False
+    if _number(value) is None:
+        return True
+    name = str(column).lower()
+    return name.endswith("id")
+
+
+def row_keys(columns, rows):
+    """a key per row made of its key columns, rows with the same key are told apart by their position"""
+    keys = []
+    seen = {}
+    for row in rows:
+        key = tuple(value for column, value in zip(columns, row) if _is_key_column(column, value))
+        seen[key] = seen.get(key, 0) + 1
+        keys.append(key + (seen[key],))
+    return keys
+
+
+def diff_rows(columns, prev_rows, rows, seconds):
+    """
+    the rows with every numeric cell that moved since the previous refresh shown as "value (+delta, rate/s)",
+    e.g. the counters of gv$sysstat become per second rates
+    """
+    if prev_rows is None or seconds <= 0:
+        return [list(row) for row in rows]
+    prev = dict(zip(row_keys(columns, prev_rows), prev_rows))
+    result = []
+    for key, row in zip(row_keys(columns, rows), rows):
+        old = prev.get(key)
+        cells = []
+        for i, value in enumerate(row):
+            cur_number = _number(value)
+            old_number = _number(old[i]) if old is not None and i < len(old) else None
+            if cur_number is None or old_number is None or cur_number == old_number or _is_key_column(columns[i], value):
+                cells.append(value)
+                continue
+            delta = cur_number - old_number
+            cells.append("{0} ({1:+g}, {2:+.4g}/s)".format(value, delta, delta / seconds))
+        result.append(cells)
+    return result
+
+
+class ScreenRenderer(object):
+    """redraw only the lines that changed since the last frame when the output is a terminal, print every frame otherwise"""
+
+    def __init__(self, stdio, tty):
+        self.stdio = stdio
+        self.tty = tty
+        self.lines = None
+
+    def render(self, lines):
+        if not self.tty:
+            self.stdio.print("\n".join(lines))
+            return
+        if self.lines is None:
+            out = "\033[H\033[2J" + "\n".join(lines)
+        else:
+            out = ""
+            for row, line in enumerate(lines, start=1):
+                if row > len(self.lines) or self.lines[row - 1] != line:
+                    out += "\033[{0};1H{1}\033[K".format(row, line)
+            out += "\033[{0};1H\033[J".format(len(lines) + 1)
+        self.lines = list(lines)
+        self.stdio.print(out)
+
+
+class SceneWatcher(SafeStdio):
+    """
+    :param scenes: [(task name, SceneBase)], compiled once and queried on every refresh
+    :param interval: seconds between two refreshes; a refresh slower than the interval doubles it (up to max_interval),
+                     once the refreshes are fast again it goes back step by step
+    :param count: number of refreshes, 0 runs until Ctrl-C
+    """
+
+    def __init__(self, context, scenes, interval, count=0, max_interval=60, tty=None):
+        self.context = context
+        self.stdio = context.stdio
+        self.scenes = scenes
+        self.base_interval = interval
+        self.interval = interval
+        self.max_interval = max(interval, max_interval)
+        self.count = count
+        self.renderer = ScreenRenderer(self.stdio, self.stdio.isatty() if tty is None else tty)
+        self.previous = {}
+        self.previous_at = None
+        self.text = ""
+
+    def adapt(self, elapsed):
+        if elapsed > self.interval:
+            self.interval = min(self.max_interval, max(self.interval * 2, elapsed))
+        elif elapsed < self.interval / 2 and self.interval > self.base_interval:
+            self.interval = max(self.base_interval, self.interval / 2)
+        return self.interval
+
+    def refresh(self, number):
+        started = time.time()
+        seconds = started - self.previous_at if self.previous_at else 0
+        body = []
+        for task_name, scene in self.scenes:
+            body.append("== {0}".format(task_name))
+            try:
+                frames = scene.collect()
+            except Exception as e:
+                body.append("refresh failed: {0}".format(e))
+                continue
+            for key, title, columns, rows in frames:
+                frame_key = (task_name, key)
+                shown = diff_rows(columns, self.previous.get(frame_key), rows, seconds)
+                self.previous[frame_key] = rows
+                body.append("[obdiag display]: {0}".format(title or key))
+                body.extend(str(StepSQLHandler.build_table(columns, shown)).splitlines())
+        elapsed = time.time() - started
+        self.previous_at = started
+        backed_off = ", backed off from {0}s".format(self.base_interval) if self.interval > self.base_interval else ""
+        header = [
+            "obdiag display watch #{0} at {1}, refresh every {2:.3g}s{3}, took {4:.2f}s{5}. Ctrl-C to stop".format(
+                number, datetime.datetime.fromtimestamp(started).strftime("%Y-%m-%d %H:%M:%S"), self.interval, backed_off, elapsed, ", changes per {0:.2f}s".format(seconds) if seconds else ""
+            ),
+            "",
+        ]
+        lines = header + body
+        self.renderer.render(lines)
+        self.text = "\n".join(lines)
+        return elapsed
+
+    def run(self):
+        number = 0
+        try:
+            while True:
+                number += 1
+                elapsed = self.refresh(number)
+                if self.count and number >= self.count:
+                    break
+                self.adapt(elapsed)
+                time.sleep(max(0, self.interval - elapsed))
+        except KeyboardInterrupt:
+            self.stdio.print("\nwatch stopped after {0} refreshes".format(number))
+        return self.text
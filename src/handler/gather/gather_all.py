@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: gather_all.py
+@desc: gather all: sysstat, obstack, perf and the observer / obproxy logs scheduled concurrently into one pack
+"""
+import copy
+import datetime
+import json
+import os
+
+import tabulate
+
+from src.common.collector_scheduler import Collector, CollectorScheduler
+from src.common.result_type import ObdiagResult
+from src.common.tool import DirectoryUtil, TimeUtils, Util
+from src.handler.gather.gather_component_log import GatherComponentLogHandler
+from src.handler.gather.gather_obstack2 import GatherObstack2Handler
+from src.handler.gather.gather_perf import GatherPerfHandler
+from src.handler.gather.gather_sysstat import GatherOsInfoHandler
+
+
+class GatherAllHandler(object):
+    # per-node demand of each collector; perf waits for obstack so the stacks are not taken under perf load
+    COLLECTORS = [
+        # name, cpu, io, ssh, depends_on
+        ("sysstat", 1, 0, 1, ()),
+        ("obstack", 1, 0, 1, ()),
+        ("perf", 2, 0, 1, ("obstack",)),
+        ("observer_log", 1, 1, 1, ()),
+        ("obproxy_log", 1, 1, 1, ()),
+    ]
+    DEFAULT_BUDGET = {"cpu": 2, "io": 1, "ssh": 4}
+
+    def __init__(self, context):
+        self.context = context
+        self.stdio = context.stdio
+        self.options = context.options
+        if self.context.get_variable("gather_timestamp", None):
+            self.gather_timestamp = self.context.get_variable("gather_timestamp")
+        else:
+            self.gather_timestamp = TimeUtils.get_current_us_timestamp()
+        self.budget = dict(self.DEFAULT_BUDGET)
+        all_config = ((self.context.inner_config or {}).get("gather") or {}).get("all") or {}
+        for resource in self.budget:
+            if all_config.get("{0}_per_node".format(resource)):
+                self.budget[resource] = int(all_config["{0}_per_node".format(resource)])
+
+    def handle(self):
+        store_dir = Util.get_option(self.options, 'store_dir') or './'
+        pack_dir = os.path.join(os.path.abspath(os.path.expanduser(store_dir)), "obdiag_gather_pack_{0}".format(TimeUtils.timestamp_to_filename_time(self.gather_timestamp)))
+        DirectoryUtil.mkdir(path=pack_dir, stdio=self.stdio)
+        self.stdio.verbose("Use {0} as pack dir.".format(pack_dir))
+        collectors = self.__build_collectors(pack_dir)
+        self.stdio.print("gather all: {0} collectors, per node budget cpu={1} io={2} ssh={3}".format(len(collectors), self.budget["cpu"], self.budget["io"], self.budget["ssh"]))
+        records = CollectorScheduler(self.stdio, self.budget).run(collectors)
+        manifest = self.__build_manifest(pack_dir, collectors, records)
+        manifest_path = os.path.join(pack_dir, "manifest.json")
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2, default=str)
+        self.stdio.print(self.__get_overall_summary(manifest))
+        self.stdio.print("For the timing of every collector and node, please run cmd \033[32m' cat {0} '\033[0m\n".format(manifest_path))
+        return ObdiagResult(ObdiagResult.SUCCESS_CODE, data={"store_dir": pack_dir, "manifest": manifest_path})
+
+    def __sub_context(self, store_dir):
+        # every collector gets its own stdio and its own sub dir of the pack, as the tasks of gather log do
+        sub_context = copy.copy(self.context)
+        sub_context.stdio = self.stdio.sub_io()
+        sub_context.options = copy.copy(self.options)
+        setattr(sub_context.options, 'store_dir', store_dir)
+        return sub_context
+
+    def __log_handler(self, sub_context, target, store_dir):
+        handler = GatherComponentLogHandler()
+        handler.init(
+            sub_context,
+            target=target,
+            from_option=Util.get_option(self.options, 'from'),
+            to_option=Util.get_option(self.options, 'to'),
+            since=Util.get_option(self.options, 'since'),
+            grep=Util.get_option(self.options, 'grep'),
+            store_dir=store_dir,
+            temp_dir=Util.get_option(self.options, 'temp_dir'),
+            redact=Util.get_option(self.options, 'redact'),
+            recent_count=Util.get_option(self.options, 'recent_count'),
+            is_scene=True,
+        )
+        return handler
+
+    def __build_collectors(self, pack_dir):
+        observer_nodes = [node.get("ip") for node in (self.context.cluster_config or {}).get("servers") or []]
+        obproxy_nodes = [node.get("ip") for node in ((getattr(self.context, "obproxy_config", None) or {}).get("servers") or [])]
+        nodes_of = {
+            "sysstat": observer_nodes,
+            "obstack": observer_nodes,
+            "perf": observer_nodes + obproxy_nodes,
+            "observer_log": observer_nodes,
+            "obproxy_log": obproxy_nodes,
+        }
+        self.handlers = {}
+        collectors = []
+        for name, cpu, io, ssh, depends_on in self.COLLECTORS:
+            if not nodes_of[name]:
+                self.stdio.verbose("gather all: no node for {0}, skip it".format(name))
+                continue
+            store_dir = os.path.join(pack_dir, name)
+            DirectoryUtil.mkdir(path=store_dir, stdio=self.stdio)
+            sub_context = self.__sub_context(store_dir)
+            if name == "sysstat":
+                handler = GatherOsInfoHandler(sub_context, gather_pack_dir=store_dir, is_scene=True)
+            elif name == "obstack":
+                handler = GatherObstack2Handler(sub_context, gather_pack_dir=store_dir, is_scene=True)
+            elif name == "perf":
+                handler = GatherPerfHandler(sub_context, gather_pack_dir=store_dir, is_scene=True)
+            else:
+                handler = self.__log_handler(sub_context, name[: -len("_log")], store_dir)
+            self.handlers[name] = handler
+            collectors.append(Collector(name, handler.handle, nodes_of[name], cpu=cpu, io=io, ssh=ssh, depends_on=[dep for dep in depends_on if nodes_of[dep]]))
+        return collectors
+
+    def __node_details(self, name):
+        details = []
+        handler = self.handlers.get(name)
+        for tup in getattr(handler, "gather_tuples", None) or []:
+            if isinstance(tup, dict):
+                details.append({"node": tup.get("node"), "status": tup.get("success"), "time": tup.get("consume_time"), "size": tup.get("file_size"), "info": tup.get("info")})
+            else:
+                details.append({"node": tup[0], "status": "Error: {0}".format(tup[2]) if tup[2] else "Completed", "time": tup[4], "size": tup[3], "info": tup[5]})
+        return details
+
+    def __build_manifest(self, pack_dir, collectors, records):
+        manifest = {"gather_timestamp": self.gather_timestamp, "pack_dir": pack_dir, "budget_per_node": self.budget, "collectors": []}
+        for collector in collectors:
+            record = records[collector.name]
+            result = record.result
+            status = record.status
+            if status == "ok" and isinstance(result, ObdiagResult) and not result.is_success():
+                status = "failed"
+            manifest["collectors"].append(
+                {
+                    "name": collector.name,
+                    "status": status,
+                    "error": record.error or (result.error_data if isinstance(result, ObdiagResult) and not result.is_success() else ""),
+                    "depends_on": collector.depends_on,
+                    "demand_per_node": collector.demand,
+                    "start": datetime.datetime.fromtimestamp(record.start).strftime("%Y-%m-%d %H:%M:%S.%f") if record.start else None,
+                    "end": datetime.datetime.fromtimestamp(record.end).strftime("%Y-%m-%d %H:%M:%S.%f") if record.end else None,
+                    "waited_seconds": round(record.waited, 3),
+                    "elapsed_seconds": round(record.elapsed, 3),
+                    "store_dir": os.path.join(pack_dir, collector.name),
+                    "nodes": self.__node_details(collector.name),
+                }
+            )
+        return manifest
+
+    @staticmethod
+    def __get_overall_summary(manifest):
+        summary_tab = []
+        for item in manifest["collectors"]:
+            status = "Completed" if item["status"] == "ok" else "Error:{0}".format(item["error"] or item["status"])
+            summary_tab.append((item["name"], status, len(item["nodes"]), "{0:.1f} s".format(item["waited_seconds"]), "{0:.1f} s".format(item["elapsed_seconds"]), item["store_dir"]))
+        return "\nGather All Summary:\n" + tabulate.tabulate(summary_tab, headers=["Collector", "Status", "Nodes", "Waited", "Time", "PackPath"], tablefmt="grid", showindex=False)
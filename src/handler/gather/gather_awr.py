@@ -21,6 +21,7 @@ import time
 import datetime
 import tabulate
 import requests
+from src.common.constant import const
 from src.common.exception import OBDIAGFormatException
 from src.common.tool import DirectoryUtil
 from src.common.tool import FileUtil
@@ -28,6 +29,7 @@ from src.common.tool import Util
 from src.common.tool import TimeUtils
 from src.common.ocp import ocp_api
 from src.common.ocp import ocp_task
+from src.common.node_runner import NodeRunner
 from src.common.result_type import ObdiagResult
 
 
@@ -62,41 +64,47 @@ class GatherAwrHandler(object):
         pack_dir_this_command = os.path.join(self.gather_pack_dir, "obdiag_gather_pack_{0}".format(TimeUtils.timestamp_to_filename_time(self.gather_timestamp)))
         self.stdio.verbose("Use {0} as pack dir.".format(pack_dir_this_command))
         DirectoryUtil.mkdir(path=pack_dir_this_command, stdio=self.stdio)
-        gather_tuples = []
-        gather_pack_path_dict = {}
+        jobs = self.__build_jobs()
+        self.session = ocp_api.new_session(self.auth, pool_size=max(1, min(len(jobs), self.thread_nums)) + 1)
+        self.snapshots_cache = {}
+        self.snapshots_lock = threading.Lock()
 
-        def handle_awr_from_ocp(ocp_url, cluster_name):
+        def handle_awr_from_ocp(job):
             """
-            handler awr from ocp
-            :param args: ocp url, ob cluster name, command args
-            :return:
+            generate, wait for and download the awr report of one cluster and one time range
+            :param job: (cluster name, cluster id, from time, to time)
+            :return: a gather tuple (name, is_err, err_msg, size, consume_time, pack_path)
             """
+            cluster_name, cluster_id, from_time_str, to_time_str = job
             st = time.time()
             # step 1: generate awr report
-            self.stdio.start_loading('generate awr report')
-            report_name = self.__generate_awr_report()
-            if report_name:
-                self.stdio.stop_loading('generate awr report sucess')
-            else:
-                self.stdio.stop_loading('generate awr failed')
-                return
+            report_name = self.__generate_awr_report(cluster_name, cluster_id, from_time_str, to_time_str)
+            if not report_name:
+                return (cluster_name, True, "generate awr report failed", 0, int(time.time() - st), "")
 
             # step 2: get awr report_id
-            report_id = self.__get_awr_report_id(report_name)
+            report_id = self.__get_awr_report_id(cluster_id, report_name)
+            if not report_id:
+                return (cluster_name, True, "awr report {0} not found".format(report_name), 0, int(time.time() - st), "")
 
             # step 3: hand gather report from ocp
-            resp = self.__download_report(pack_dir_this_command, report_name, report_id)
-            if resp["skip"]:
-                return
+            resp = self.__download_report(pack_dir_this_command, cluster_name, cluster_id, report_name, report_id)
             if resp["error"]:
-                gather_tuples.append((ocp_url, True, resp["error_msg"], 0, int(time.time() - st), "Error:{0}".format(resp["error_msg"]), ""))
-                return
-            gather_pack_path_dict[(cluster_name, ocp_url)] = resp["gather_pack_path"]
-            gather_tuples.append((cluster_name, False, "", os.path.getsize(resp["gather_pack_path"]), int(time.time() - st), resp["gather_pack_path"]))
+                return (cluster_name, True, resp["error_msg"], 0, int(time.time() - st), "Error:{0}".format(resp["error_msg"]))
+            return (cluster_name, False, "", os.path.getsize(resp["gather_pack_path"]), int(time.time() - st), resp["gather_pack_path"])
 
-        ocp_threads = [threading.Thread(None, handle_awr_from_ocp(self.ocp_url, self.cluster_name), args=())]
-        list(map(lambda x: x.start(), ocp_threads))
-        list(map(lambda x: x.join(), ocp_threads))
+        self.stdio.start_loading('generate and download {0} awr report(s)'.format(len(jobs)))
+        try:
+            outcomes = NodeRunner(self.stdio, max_workers=self.thread_nums).run(jobs, handle_awr_from_ocp, name=lambda job: "{0} {1}~{2}".format(job[0], job[2], job[3]))
+        finally:
+            self.stdio.stop_loading('succeed')
+            self.session.close()
+        gather_tuples = []
+        for outcome in outcomes:
+            if outcome.ok:
+                gather_tuples.append(outcome.result)
+            else:
+                gather_tuples.append((outcome.item[0], True, outcome.error, 0, int(outcome.elapsed), "Error:{0}".format(outcome.error)))
         summary_tuples = self.__get_overall_summary(gather_tuples)
         self.stdio.print(summary_tuples)
         # 将汇总结果持久化记录到文件中
@@ -105,7 +113,20 @@ class GatherAwrHandler(object):
         # return gather_tuples, gather_pack_path_dict
         return ObdiagResult(ObdiagResult.SUCCESS_CODE, data={"store_dir": pack_dir_this_command})
 
-    def __download_report(self, store_path, name, report_id):
+    def __build_jobs(self):
+        """one report per cluster, or per cluster and --report_span sized piece of the time range"""
+        ranges = [(self.from_time_str, self.to_time_str)]
+        if self.report_span:
+            ranges = []
+            from_dt = datetime.datetime.strptime(self.from_time_str, "%Y-%m-%d %H:%M:%S")
+            to_dt = datetime.datetime.strptime(self.to_time_str, "%Y-%m-%d %H:%M:%S")
+            while from_dt < to_dt:
+                end_dt = min(to_dt, from_dt + datetime.timedelta(seconds=self.report_span))
+                ranges.append((from_dt.strftime("%Y-%m-%d %H:%M:%S"), end_dt.strftime("%Y-%m-%d %H:%M:%S")))
+                from_dt = end_dt
+        return [(cluster_name, cluster_id, from_time_str, to_time_str) for cluster_name, cluster_id in self.clusters for from_time_str, to_time_str in ranges]
+
+    def __download_report(self, store_path, cluster_name, cluster_id, name, report_id):
         """
         the handler for one ocp
         :param args: command args
@@ -117,81 +138,101 @@ class GatherAwrHandler(object):
             "error": False,
         }
 
-        self.stdio.verbose("Sending Status Request to cluster {0} ...".format(self.cluster_name))
+        self.stdio.verbose("Sending Status Request to cluster {0} ...".format(cluster_name))
 
-        path = ocp_api.cluster + "/%s/performance/workload/reports/%s" % (self.cluster_id, report_id)
+        path = ocp_api.cluster + "/%s/performance/workload/reports/%s" % (cluster_id, report_id)
         save_path = os.path.join(store_path, name + ".html")
-        self.stdio.start_loading('download AWR report')
-        pack_path = self.download(self.ocp_url + path, save_path, self.auth)
-        self.stdio.stop_loading('download AWR report')
-        self.stdio.verbose("cluster {0} response. analysing...".format(self.cluster_name))
+        try:
+            pack_path = self.download(self.ocp_url + path, save_path, self.auth)
+        except requests.exceptions.RequestException as e:
+            resp["error"] = True
+            resp["error_msg"] = "download awr report {0} failed: {1}".format(name, e)
+            return resp
+        self.stdio.verbose("cluster {0} response. analysing...".format(cluster_name))
 
         resp["gather_pack_path"] = pack_path
-        if resp["error"]:
-            return resp
         return resp
 
     def download(self, url, as_file_path, auth, timeout=300):
-        with open(as_file_path, "wb") as write_fd:
-            write_fd.write(requests.get(url, auth=auth, timeout=timeout).content)
+        # streamed to the file, a large report is never held in memory
+        session = getattr(self, "session", None) or requests
+        try:
+            with session.get(url, auth=auth, timeout=timeout, stream=True) as response:
+                response.raise_for_status()
+                with open(as_file_path, "wb") as write_fd:
+                    for chunk in response.iter_content(chunk_size=1024 * 1024):
+                        write_fd.write(chunk)
+        except Exception:
+            # a report cut off in the middle is not left behind as if it was complete
+            if os.path.exists(as_file_path):
+                os.remove(as_file_path)
+            raise
         return as_file_path
 
-    def __generate_awr_report(self):
+    def __generate_awr_report(self, cluster_name, cluster_id, from_time_str, to_time_str):
         """
         call OCP API to generate awr report
         :param args: command args
         :return: awr report name
         """
-        snapshot_list = self.__get_snapshot_list()
+        snapshot_list = self.__get_snapshot_list(cluster_id, from_time_str, to_time_str)
         if len(snapshot_list) <= 1:
-            self.stdio.warn("AWR report at least need 2 snapshot, cluster now only have %s, please adjusted to --from/to or --since", len(snapshot_list))
+            self.stdio.warn("AWR report at least need 2 snapshot, cluster {0} only have {1} in {2}~{3}, please adjusted to --from/to or --since".format(cluster_name, len(snapshot_list), from_time_str, to_time_str))
             return None
         else:
             start_sid, start_time = snapshot_list[0]
             end_sid, end_time = snapshot_list[-1]
 
-        path = ocp_api.cluster + "/%s/performance/workload/reports" % self.cluster_id
+        path = ocp_api.cluster + "/%s/performance/workload/reports" % cluster_id
 
         start_time = datetime.datetime.strptime(TimeUtils.trans_datetime_utc_to_local(start_time.split(".")[0]), "%Y-%m-%d %H:%M:%S")
         end_time = datetime.datetime.strptime(TimeUtils.trans_datetime_utc_to_local(end_time.split(".")[0]), "%Y-%m-%d %H:%M:%S")
-        params = {"name": "OBAWR_obcluster_%s_%s_%s" % (self.cluster_name, start_time.strftime("%Y%m%d%H%M%S"), end_time.strftime("%Y%m%d%H%M%S")), "startSnapshotId": start_sid, "endSnapshotId": end_sid}
+        params = {"name": "OBAWR_obcluster_%s_%s_%s" % (cluster_name, start_time.strftime("%Y%m%d%H%M%S"), end_time.strftime("%Y%m%d%H%M%S")), "startSnapshotId": start_sid, "endSnapshotId": end_sid}
 
-        response = requests.post(self.ocp_url + path, auth=self.auth, data=params)
+        response = self.session.post(self.ocp_url + path, auth=self.auth, data=params)
 
         task_instance_id = response.json()["data"]["taskInstanceId"]
-        task_instance = ocp_task.Task(self.ocp_url, self.auth, task_instance_id)
+        task_instance = ocp_task.Task(self.ocp_url, self.auth, task_instance_id, session=self.session)
         # 生成awr报告是触发了一个任务，需要等待任务完成
-        ocp_task.Task.wait_done(task_instance)
+        task_instance.wait_done(timeout=const.AWR_REPORT_TASK_TIMEOUT)
         return response.json()["data"]["name"]
 
-    def __get_snapshot_list(self):
+    def __get_snapshots(self, cluster_id):
+        # the snapshots of a cluster are fetched once for all the time ranges of the cluster
+        with self.snapshots_lock:
+            if cluster_id not in self.snapshots_cache:
+                path = ocp_api.cluster + "/%s/performance/workload/snapshots" % cluster_id
+                response = self.session.get(self.ocp_url + path, auth=self.auth)
+                # Validate the response status code
+                response.raise_for_status()
+                body = response.json()
+                if "data" not in body or "contents" not in body["data"]:
+                    raise ValueError("Invalid response structure. Missing 'data' or 'contents' key.")
+                self.snapshots_cache[cluster_id] = body["data"]["contents"]
+            return self.snapshots_cache[cluster_id]
+
+    def __get_snapshot_list(self, cluster_id, from_time_str, to_time_str):
         """
         Retrieves the snapshot list from the OCP (OpenShift Container Platform).
         :return: A list containing snapshot IDs and their corresponding timestamps.
         """
         snapshot_id_list = []
-        path = ocp_api.cluster + "/%s/performance/workload/snapshots" % self.cluster_id
         try:
-            response = requests.get(self.ocp_url + path, auth=self.auth)
-            # Validate the response status code
-            response.raise_for_status()
-            from_datetime_timestamp = TimeUtils.datetime_to_timestamp(self.from_time_str)
-            to_datetime_timestamp = TimeUtils.datetime_to_timestamp(self.to_time_str)
+            contents = self.__get_snapshots(cluster_id)
+            from_datetime_timestamp = TimeUtils.datetime_to_timestamp(from_time_str)
+            to_datetime_timestamp = TimeUtils.datetime_to_timestamp(to_time_str)
 
             # If the user-specified time interval is less than one hour,
             # adjust the times to ensure snapshots can be retrieved.
-            if from_datetime_timestamp + 3 * 3600000000 >= to_datetime_timestamp:
+            if from_datetime_timestamp + 3 * 3600000000 >= to_datetime_timestamp and not self.report_span:
                 # Round the start time to the nearest hour
-                from_datetime_timestamp = TimeUtils.datetime_to_timestamp(TimeUtils.get_time_rounding(dt=TimeUtils.parse_time_str(self.from_time_str), step=0, rounding_level="hour"))
+                from_datetime_timestamp = TimeUtils.datetime_to_timestamp(TimeUtils.get_time_rounding(dt=TimeUtils.parse_time_str(from_time_str), step=0, rounding_level="hour"))
 
                 # Set the end time to one hour and three minutes after the rounded start time
                 # (the three-minute offset ensures snapshots can be obtained)
                 to_datetime_timestamp = from_datetime_timestamp + 3 * 3600000000 + 3 * 60000000
 
-            if "data" not in response.json() or "contents" not in response.json()["data"]:
-                raise ValueError("Invalid response structure. Missing 'data' or 'contents' key.")
-
-            for info in response.json()["data"]["contents"]:
+            for info in contents:
                 try:
                     snapshot_time = TimeUtils.datetime_to_timestamp(TimeUtils.trans_datetime_utc_to_local(str(info["snapshotTime"]).split(".")[0]))
                     if from_datetime_timestamp <= snapshot_time <= to_datetime_timestamp:
@@ -201,24 +242,31 @@ class GatherAwrHandler(object):
                     continue
                 except Exception:
                     continue
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             self.stdio.error(f"Failed to fetch snapshot list from OCP: {e}")
             return []
         self.stdio.verbose(f"Retrieved snapshot list: {snapshot_id_list}")
         return snapshot_id_list
 
-    def __get_awr_report_id(self, report_name):
+    def __get_awr_report_id(self, cluster_id, report_name):
         """
         get awr report from ocp
         :param args: awr report name
         :return: int
         """
-        path = ocp_api.cluster + "/%s/performance/workload/reports" % self.cluster_id
-        response = requests.get(self.ocp_url + path, auth=self.auth)
-        for info in response.json()["data"]["contents"]:
-            if info["name"] == report_name:
-                return info["id"]
-        return 0
+        path = ocp_api.cluster + "/%s/performance/workload/reports" % cluster_id
+        # the report may show up in the list a moment after its task is done
+        sleep_time = 0.5
+        deadline = time.time() + 30
+        while True:
+            response = self.session.get(self.ocp_url + path, auth=self.auth)
+            for info in response.json()["data"]["contents"]:
+                if info["name"] == report_name:
+                    return info["id"]
+            if time.time() + sleep_time > deadline:
+                return 0
+            time.sleep(sleep_time)
+            sleep_time = min(sleep_time * 2, 8)
 
     def init_option(self):
         options = self.context.options
@@ -238,6 +286,27 @@ class GatherAwrHandler(object):
         else:
             self.stdio.error("--cluster_id option need provided")
             return False
+        # several clusters as --cluster_name a,b --cluster_id 1,2
+        cluster_names = [name.strip() for name in str(self.cluster_name).split(",") if name.strip()]
+        cluster_ids = [cluster_id.strip() for cluster_id in str(self.cluster_id).split(",") if cluster_id.strip()]
+        if len(cluster_names) != len(cluster_ids):
+            self.stdio.error("--cluster_name and --cluster_id must list the same number of clusters")
+            return False
+        self.clusters = list(zip(cluster_names, cluster_ids))
+        report_span_option = Util.get_option(options, 'report_span')
+        self.report_span = None
+        if report_span_option:
+            try:
+                self.report_span = TimeUtils.parse_time_length_to_sec(report_span_option)
+            except ValueError:
+                self.stdio.error("Error: the format of report_span must be 'n'<m|h|d>")
+                return False
+            if self.report_span < 3600:
+                self.stdio.warn('The --report_span needs at least 1h to hold 2 snapshots, adjusted to 1h.')
+                self.report_span = 3600
+        thread_nums_option = Util.get_option(options, 'thread_nums')
+        gather_config = (self.context.inner_config or {}).get("gather") or {}
+        self.thread_nums = int(thread_nums_option or gather_config.get("thread_nums") or 3)
         if from_option is not None and to_option is not None:
             try:
                 self.from_time_str = from_option
@@ -21,6 +21,7 @@ import os
 import shutil
 import tarfile
 import threading
+import time
 import traceback
 
 from prettytable import PrettyTable
@@ -378,7 +379,11 @@ class GatherComponentLogHandler(BaseShellHandler):
 
         def handle_from_node(task):
             with pool_sema:
-                task.handle()
+                st = time.time()
+                try:
+                    task.handle()
+                finally:
+                    task.get_result()["consume_time"] = int(time.time() - st)
 
         for task in tasks:
             file_thread = threading.Thread(target=handle_from_node, args=(task,))
@@ -418,11 +423,11 @@ class GatherComponentLogHandler(BaseShellHandler):
         summary_tb = PrettyTable()
         summary_tb.title = "Gather {0} Log Summary on {1}".format(self.target, datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
         self.stdio.verbose("node_summary_tuple: {0}".format(node_summary_tuple))
-        summary_tb.field_names = ["Node", "Status", "Size", "info"]
+        summary_tb.field_names = ["Node", "Status", "Size", "Shipped/Full", "info"]
 
         try:
             for tup in node_summary_tuple:
-                summary_tb.add_row([tup["node"], tup["success"], tup["file_size"], tup["info"]])
+                summary_tb.add_row([tup["node"], tup["success"], tup["file_size"], tup.get("shipped") or "-", tup["info"]])
         except Exception as e:
             self.stdio.verbose(traceback.format_exc())
             self.stdio.error("gather log __get_overall_summary failed: {0}".format(str(e)))
@@ -442,7 +447,7 @@ class GatherComponentLogHandler(BaseShellHandler):
 
             try:
                 file_path = tup["file_path"]
-                self.stdio.verbose("open file {0}".format(tup["file_path"]))
+                self.stdio.verbose("open file %s", file_path)
                 extract_path = os.path.dirname(file_path)
 
                 with tarfile.open(file_path, 'r:gz') as tar:
@@ -457,7 +462,7 @@ class GatherComponentLogHandler(BaseShellHandler):
 
                     tar.extractall(path=extract_path, members=safe_members)
                     extracted_files = [m.name for m in safe_members]
-                    self.stdio.verbose("extracted_files: {0}".format(extracted_files))
+                    self.stdio.verbose("extracted_files: %s", extracted_files)
                     extracted_files_new = [os.path.join(self.store_dir, f) for f in extracted_files]
                     all_files[file_path] = extracted_files_new
 
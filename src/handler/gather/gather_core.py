@@ -23,6 +23,7 @@ import tabulate
 from src.common.tool import TimeUtils
 from src.common.command import download_file
 from src.common.constant import const
+from src.common.node_runner import NodeRunner, node_key
 from src.common.command import SshClient
 from src.handler.base_shell_handler import BaseShellHandler
 from src.common.tool import TimeUtils
@@ -40,6 +41,8 @@ class GatherCoreHandler(BaseShellHandler):
         self.local_stored_path = gather_pack_dir
         self.is_scene = is_scene
         self.config_path = const.DEFAULT_CONFIG_PATH
+        self.thread_nums = 3
+        self.node_timeout = 300
         if self.context.get_variable("gather_timestamp", None):
             self.gather_timestamp = self.context.get_variable("gather_timestamp")
         else:
@@ -57,6 +60,9 @@ class GatherCoreHandler(BaseShellHandler):
             basic_config = self.inner_config['obdiag']['basic']
             self.file_number_limit = int(basic_config["file_number_limit"])
             self.config_path = basic_config['config_path']
+            gather_config = self.inner_config.get('gather') or {}
+            self.thread_nums = int(gather_config.get('thread_nums') or self.thread_nums)
+            self.node_timeout = int(gather_config.get('node_timeout') or self.node_timeout)
         return True
 
     def init_option(self):
@@ -80,6 +86,19 @@ class GatherCoreHandler(BaseShellHandler):
             self.to_time = (now_time + datetime.timedelta(minutes=1)).strftime('%Y-%m-%d %H:%M:%S')
             self.from_time = (now_time - datetime.timedelta(seconds=TimeUtils.parse_time_length_to_sec(self.since))).strftime('%Y-%m-%d %H:%M:%S')
 
+        thread_nums_option = Util.get_option(options, 'thread_nums')
+        node_timeout_option = Util.get_option(options, 'node_timeout')
+        try:
+            if thread_nums_option is not None:
+                self.thread_nums = int(thread_nums_option)
+            if node_timeout_option is not None:
+                self.node_timeout = int(node_timeout_option)
+        except ValueError:
+            self.stdio.error("args --thread_nums and --node_timeout must be integers")
+            return False
+        if self.thread_nums <= 0:
+            self.stdio.error("args --thread_nums must be greater than 0")
+            return False
         return True
 
     def handle(self):
@@ -94,27 +113,17 @@ class GatherCoreHandler(BaseShellHandler):
         else:
             pack_dir_this_command = os.path.join(self.local_stored_path, "obdiag_gather_pack_{0}".format(TimeUtils.timestamp_to_filename_time(self.gather_timestamp)))
         self.stdio.verbose("Use {0} as pack dir.".format(pack_dir_this_command))
-        gather_tuples = []
-
-        def handle_from_node(node):
-            st = time.time()
-            resp = self.__handle_from_node(pack_dir_this_command, node)
-            file_size = ""
-            if len(resp["error"]) == 0:
-                file_size = os.path.getsize(resp["gather_pack_path"])
-            gather_tuples.append((node.get("ip"), False, resp["error"], file_size, int(time.time() - st), resp["gather_pack_path"]))
-
-        exec_tag = False
+        nodes = []
         for node in self.nodes:
             if node.get("ssh_type") == "docker" or node.get("ssh_type") == "kubernetes":
                 self.stdio.warn("Skip gather from node {0} because it is a docker or kubernetes node".format(node.get("ip")))
                 continue
-            handle_from_node(node)
-            exec_tag = True
-        if not exec_tag:
+            nodes.append(node)
+        if not nodes:
             self.stdio.verbose("No node to gather from, skip")
             return ObdiagResult(ObdiagResult.SUCCESS_CODE, data={"store_dir": pack_dir_this_command})
 
+        gather_tuples = self.__handle_nodes(pack_dir_this_command, nodes)
         summary_tuples = self.__get_overall_summary(gather_tuples)
         self.stdio.print(summary_tuples)
         # Persist the summary results to a file
@@ -123,20 +132,55 @@ class GatherCoreHandler(BaseShellHandler):
         self.stdio.print(last_info)
         return ObdiagResult(ObdiagResult.SUCCESS_CODE, data={"store_dir": pack_dir_this_command})
 
-    def __handle_from_node(self, local_stored_path, node):
-        resp = {"skip": False, "error": "", "gather_pack_path": ""}
+    def __handle_nodes(self, local_stored_path, nodes):
+        """
+        Look for core files on all nodes concurrently (at most thread_nums at a time, each node within
+        node_timeout), ask for the confirmation of each node in turn, then download the confirmed ones
+        concurrently. The downloads themselves have no deadline, core files are large.
+        """
+        st = time.time()
+        DirectoryUtil.mkdir(path=local_stored_path, stdio=self.stdio)
+        deadline = st + self.node_timeout if self.node_timeout else None
+        results = {}
+        found = []
+        for outcome in NodeRunner(self.stdio, self.thread_nums, deadline).run(nodes, self.__discover_node, node_key):
+            if not outcome.ok:
+                results[outcome.name] = (outcome.error, "", local_stored_path)
+            elif not outcome.result["core_files_info"]:
+                results[outcome.name] = ("No core files found within time range: {0} to {1}".format(self.from_time, self.to_time), "", local_stored_path)
+            else:
+                found.append(outcome.result)
+
+        confirmed = []
+        for found_node in found:
+            # Show core files info and get user confirmation
+            if self.__show_core_files_and_confirm(found_node["core_files_info"], found_node["key"]):
+                confirmed.append(found_node)
+            else:
+                results[found_node["key"]] = ("User cancelled the download", "", local_stored_path)
+
+        for outcome in NodeRunner(self.stdio, self.thread_nums).run(
+            confirmed, lambda found_node: self.__download_core_files(found_node["ssh_client"], found_node["core_files_info"], local_stored_path, found_node["key"]), lambda found_node: found_node["key"]
+        ):
+            if outcome.ok and outcome.result:
+                results[outcome.name] = ("", sum(os.path.getsize(path) for path in outcome.result), local_stored_path)
+            else:
+                results[outcome.name] = (outcome.error or "Failed to download core files from {0}".format(outcome.name), "", local_stored_path)
+
+        gather_tuples = []
+        for node in nodes:
+            error, file_size, pack_path = results.get(node_key(node), ("gather failed", "", local_stored_path))
+            gather_tuples.append((node_key(node), False, error, file_size, int(time.time() - st), pack_path))
+        return gather_tuples
+
+    def __discover_node(self, node):
         remote_ip = node.get("ip")
         remote_user = node.get("ssh_username")
         self.stdio.verbose("Sending Collect Core Command to node {0} ...".format(remote_ip))
-        DirectoryUtil.mkdir(path=local_stored_path, stdio=self.stdio)
-
-        ssh_client = None
         try:
             ssh_client = SshClient(self.context, node)
         except Exception:
             self.stdio.exception("ssh {0}@{1}: failed, Please check the node conf.".format(remote_user, remote_ip))
-            resp["skip"] = True
-            resp["error"] = "Please check the node conf."
             raise Exception("Please check the node conf.")
 
         # Check if observer process exists
@@ -153,27 +197,7 @@ class GatherCoreHandler(BaseShellHandler):
 
         # Get core file pattern and search for core files with time filter
         core_files_info = self.__find_core_files_with_info(ssh_client, node.get("home_path"))
-        if not core_files_info:
-            resp["error"] = "No core files found within time range: {0} to {1}".format(self.from_time, self.to_time)
-            resp["gather_pack_path"] = "{0}".format(local_stored_path)
-            return resp
-
-        # Show core files info and get user confirmation
-        if not self.__show_core_files_and_confirm(core_files_info, remote_ip):
-            resp["error"] = "User cancelled the download"
-            resp["gather_pack_path"] = "{0}".format(local_stored_path)
-            return resp
-
-        # Download core files directly
-        downloaded_files = self.__download_core_files(ssh_client, core_files_info, local_stored_path, remote_ip)
-        if not downloaded_files:
-            resp["error"] = "Failed to download core files from {0}".format(remote_ip)
-            resp["gather_pack_path"] = "{0}".format(local_stored_path)
-            return resp
-
-        resp["error"] = ""
-        resp["gather_pack_path"] = local_stored_path
-        return resp
+        return {"ip": remote_ip, "key": node_key(node), "ssh_client": ssh_client, "core_files_info": core_files_info}
 
     def __check_observer_process(self, ssh_client):
         """Check if observer process is running"""
@@ -395,14 +419,14 @@ class GatherCoreHandler(BaseShellHandler):
             return False
             self.stdio.print("Please enter 'y' or 'n'")
 
-    def __download_core_files(self, ssh_client, core_files_info, local_stored_path, remote_ip):
+    def __download_core_files(self, ssh_client, core_files_info, local_stored_path, key):
         """Download core files directly from remote to local"""
         downloaded_files = []
 
         for i, file_info in enumerate(core_files_info, 1):
             remote_path = file_info['path']
             filename = os.path.basename(remote_path)
-            local_path = os.path.join(local_stored_path, f"{remote_ip}_{filename}")
+            local_path = os.path.join(local_stored_path, f"{key}_{filename}")
 
             self.stdio.print("Downloading file {0}/{1}: {2} ({3:.2f} MB)".format(i, len(core_files_info), filename, file_info['size'] / (1024 * 1024)))
 
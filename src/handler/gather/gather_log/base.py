@@ -39,6 +39,30 @@ class BaseGatherLogOnNode(ABC):
     DEFAULT_FILE_NUMBER_LIMIT = 20
     DEFAULT_FILE_SIZE_LIMIT = 2 * 1024 * 1024 * 1024  # 2GB
 
+    # Lines of the component start with [yyyy-mm-dd hh:mm:ss.ffffff], so only the part of a file inside
+    # [from, to] is cut out on the node instead of shipping the whole file
+    TRIM_BY_TIME = True
+    # The node binary searches the byte offsets of from and to in the file, every probe reads TRIM_PROBE_BYTES
+    # after the offset and looks at the first complete line. Then only that range goes through an exact time
+    # filter and the grep pipeline. Files not starting with a timestamp are extracted whole. No '&&' in the
+    # script: the sudo mode of the ssh client rewrites it.
+    TRIM_PROBE_BYTES = 65536
+    TRIM_SCRIPT = r"""f="{source}"; out="{target}"; from="{from_time}"; to="{to_time}"; step={probe_bytes}
+size=$(wc -c < "$f")
+probe() {{ tail -c +$(($1 + 1)) "$f" 2>/dev/null | head -c $step 2>/dev/null | awk -v skip="$1" -v t="$2" '/^\[[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9] [0-9][0-9]:[0-9][0-9]:[0-9][0-9]/ {{ if (NR > 1 || skip == 0) {{ ts = substr($0, 2, 19); print (ts < t ? "lt" : (ts == t ? "eq" : "gt")); found = 1; exit }} }} END {{ if (!found) print "none" }}'; }}
+if [ "$(probe 0 "$from")" != none ]; then
+  lo=0; hi=$size
+  while [ $((hi - lo)) -gt $step ]; do mid=$(((lo + hi) / 2)); case $(probe $mid "$from") in lt) lo=$mid ;; *) hi=$mid ;; esac; done
+  start=$lo; hi=$size
+  while [ $((hi - lo)) -gt $step ]; do mid=$(((lo + hi) / 2)); case $(probe $mid "$to") in gt) hi=$mid ;; *) lo=$mid ;; esac; done
+  end=$((hi + step)); if [ $end -gt $size ]; then end=$size; fi
+  tail -c +$((start + 1)) "$f" 2>/dev/null | head -c $((end - start)) 2>/dev/null | awk -v from="$from" -v to="$to" '/^\[[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9] [0-9][0-9]:[0-9][0-9]:[0-9][0-9]/ {{ ts = substr($0, 2, 19); if (ts > to) exit; keep = (ts >= from) }} keep'{grep} > "$out"
+else
+  cat "$f"{grep} > "$out"
+fi
+echo "obdiag_trim $size $(wc -c < "$out")"
+"""
+
     def __init__(self, context, node, config):
         self.context = context
         self.ssh_client = None
@@ -57,7 +81,9 @@ class BaseGatherLogOnNode(ABC):
         self.recent_count = self._parse_recent_count(config.get("recent_count", 0))
 
         self.log_path = self._get_log_path()
-        self.gather_tuple = {"node": "", "success": "Fail", "info": "", "file_size": 0, "file_path": ""}
+        self.gather_tuple = {"node": "", "success": "Fail", "info": "", "file_size": 0, "file_path": "", "shipped": ""}
+        self.full_bytes = 0
+        self.shipped_bytes = 0
 
     @abstractmethod
     def _get_log_path(self) -> str:
@@ -160,15 +186,43 @@ class BaseGatherLogOnNode(ABC):
                 continue
 
             # For normal files
-            if not grep_options:
-                log_grep_cmd = "cp -a {0} {1}".format(source_log_name, target_log_name)
+            self._extract_log(source_log_name, target_log_name, grep_options)
+        self._update_shipped()
+
+    def _extract_log(self, source_log_name, target_log_name, grep_options):
+        """Copy or grep one plain log file into the temp directory, trimmed to [from, to] when possible"""
+        if self._should_trim():
+            grep_pipeline = "".join([" | grep -e '{0}'".format(opt) for opt in grep_options])
+            script = self.TRIM_SCRIPT.format(source=source_log_name, target=target_log_name, from_time=self.from_time_str, to_time=self.to_time_str, probe_bytes=self.TRIM_PROBE_BYTES, grep=grep_pipeline)
+            # one sh -c per file: the search runs next to the file, and a sudo prefix still covers the whole script.
+            # exec_cmd returns stderr instead of stdout when there is any, so stderr is dropped to keep the stats line
+            log_grep_cmd = "sh -c '{0}' 2>/dev/null".format(script.replace("'", "'\"'\"'"))
+            self.stdio.verbose("trim files, source = [{0}], target = [{1}], range = [{2}, {3}]".format(source_log_name, target_log_name, self.from_time_str, self.to_time_str))
+            output = self.ssh_client.exec_cmd(log_grep_cmd) or ""
+            match = re.search(r"obdiag_trim (\d+) (\d+)", output)
+            if match:
+                self.full_bytes += int(match.group(1))
+                self.shipped_bytes += int(match.group(2))
+                self.stdio.verbose("trim files, {0}: ship {1} of {2} bytes".format(source_log_name, match.group(2), match.group(1)))
             else:
-                # Build correct grep pipeline: cat file | grep -e 'p1' | grep -e 'p2' > target
-                grep_pipeline = " | ".join(["grep -e '{0}'".format(opt) for opt in grep_options])
-                log_grep_cmd = "cat {0} | {1} > {2}".format(source_log_name, grep_pipeline, target_log_name)
-
-            self.stdio.verbose("grep files, run cmd = [{0}]".format(log_grep_cmd))
-            self.ssh_client.exec_cmd(log_grep_cmd)
+                self.stdio.verbose("trim files, {0}: unexpected output {1}".format(source_log_name, output))
+            return
+        if not grep_options:
+            log_grep_cmd = "cp -a '{0}' '{1}'".format(source_log_name, target_log_name)
+        else:
+            # Build correct grep pipeline: cat file | grep -e 'p1' | grep -e 'p2' > target
+            grep_pipeline = " | ".join(["grep -e '{0}'".format(opt) for opt in grep_options])
+            log_grep_cmd = "cat '{0}' | {1} > '{2}'".format(source_log_name, grep_pipeline, target_log_name)
+        self.stdio.verbose("grep files, run cmd = [{0}]".format(log_grep_cmd))
+        self.ssh_client.exec_cmd(log_grep_cmd)
+
+    def _should_trim(self) -> bool:
+        # --recent_count asks for whole files
+        return self.TRIM_BY_TIME and self.recent_count <= 0 and bool(self.from_time_str) and bool(self.to_time_str)
+
+    def _update_shipped(self):
+        if self.full_bytes:
+            self.gather_tuple["shipped"] = "{0} / {1} ({2:.1f}%)".format(FileUtil.size_format(num=self.shipped_bytes, output_str=True), FileUtil.size_format(num=self.full_bytes, output_str=True), 100.0 * self.shipped_bytes / self.full_bytes)
 
     def _build_grep_options(self) -> list:
         """Build grep options list"""
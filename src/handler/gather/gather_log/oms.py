@@ -114,6 +114,8 @@ class OmsGatherLogOnNode(BaseGatherLogOnNode):
     """
 
     TARGET_NAME = "oms"
+    # OMS logs come in several line formats, they are shipped as whole files
+    TRIM_BY_TIME = False
 
     # Log scopes based on actual OMS log structure
     LOG_SCOPES = {
@@ -531,14 +533,8 @@ class OmsGatherLogOnNode(BaseGatherLogOnNode):
                 continue
 
             # For normal files
-            if not grep_options:
-                cmd = "cp -a '{0}' '{1}'".format(source_log_name, target_log_name)
-            else:
-                grep_pipeline = " | ".join(["grep -e '{0}'".format(opt) for opt in grep_options])
-                cmd = "cat '{0}' | {1} > '{2}'".format(source_log_name, grep_pipeline, target_log_name)
-
-            self.stdio.verbose("grep files: {0}".format(cmd))
-            self.ssh_client.exec_cmd(cmd)
+            self._extract_log(source_log_name, target_log_name, grep_options)
+        self._update_shipped()
 
     def _is_current_log_file(self, file_name) -> bool:
         """Check if file is a current log file (no timestamp suffix)."""
@@ -16,6 +16,7 @@
 @desc:
 """
 import os
+import tempfile
 import time
 import datetime
 
@@ -24,7 +25,7 @@ from src.common.exception import OBDIAGFormatException
 from src.common.constant import const
 from src.common.command import SshClient, is_empty_dir
 from src.handler.base_shell_handler import BaseShellHandler
-from src.common.command import download_file, rm_rf_file, get_file_size, get_observer_version, tar_gz_dir
+from src.common.command import download_file, rm_rf_file, get_file_size, get_observer_version, upload_file
 from src.common.tool import TimeUtils
 from src.common.tool import StringUtils
 from src.common.tool import Util
@@ -35,6 +36,37 @@ from src.common.result_type import ObdiagResult
 
 
 class GatherObAdminHandler(BaseShellHandler):
+    # run on the node: dump the given clog/slog files with up to $1 ob_admin at a time under nice, every dump and its
+    # ob_admin.log are gzipped while they are written. No '&&' in it: the sudo mode of the ssh client rewrites it.
+    DUMP_SCRIPT_NAME = "obdiag_obadmin_dump.sh"
+    DUMP_SCRIPT = r"""#!/bin/sh
+# usage: sh obdiag_obadmin_dump.sh <parallel> <home_path> <log_dir> <clog|slog> <out_dir> <file>...
+parallel=$1
+home=$2
+log_dir=$3
+mode=$4
+out=$5
+shift 5
+export LD_LIBRARY_PATH=$home/lib
+if [ "$mode" = "slog" ]; then
+    tool="slog_tool -f"
+else
+    tool="clog_tool dump_all"
+fi
+for f in "$@"; do
+    echo "$f"
+done | xargs -P "$parallel" -I {} sh -c '
+    mkdir -p "$0/{}.d"
+    cd "$0/{}.d" || exit 1
+    nice -n 19 "$1/bin/ob_admin" $2 "$3/{}" 2>&1 | gzip -1 > "$0/{}.dump.gz"
+    if [ -f ob_admin.log ]; then
+        gzip -1 -c ob_admin.log > "$0/{}.ob_admin.log.gz"
+    fi
+    cd "$0"
+    rm -rf "$0/{}.d"
+' "$out" "$home" "$tool" "$log_dir"
+"""
+
     def __init__(self, context, gather_pack_dir='./', is_scene=False):
         super(GatherObAdminHandler, self).__init__()
         self.context = context
@@ -62,10 +94,17 @@ class GatherObAdminHandler(BaseShellHandler):
         self.ob_admin_mode = 'clog'
         if self.context.get_variable("gather_obadmin_mode", None):
             self.ob_admin_mode = self.context.get_variable("gather_obadmin_mode")
+        self.dump_parallel = const.GATHER_OBADMIN_DUMP_PARALLEL_DEFAULT
+        self.dump_cpu_ratio = const.GATHER_OBADMIN_DUMP_CPU_RATIO_DEFAULT
         if self.inner_config is None:
             self.file_number_limit = 20
             self.file_size_limit = 2 * 1024 * 1024 * 1024
         else:
+            obadmin_config = (self.inner_config.get("gather") or {}).get("obadmin") or {}
+            if obadmin_config.get("dump_parallel"):
+                self.dump_parallel = int(obadmin_config["dump_parallel"])
+            if obadmin_config.get("dump_cpu_ratio"):
+                self.dump_cpu_ratio = float(obadmin_config["dump_cpu_ratio"])
             basic_config = self.inner_config['obdiag']['basic']
             self.file_number_limit = int(basic_config["file_number_limit"])
             self.file_size_limit = int(FileUtil.size(basic_config["file_size_limit"]))
@@ -155,7 +194,7 @@ class GatherObAdminHandler(BaseShellHandler):
         return ObdiagResult(ObdiagResult.SUCCESS_CODE, data={"store_dir": pack_dir_this_command})
 
     def __handle_from_node(self, local_stored_path, node):
-        resp = {"skip": False, "error": "", "gather_pack_path": ""}
+        resp = {"skip": False, "error": "", "gather_pack_path": "", "zip_password": ""}
         remote_ip = node.get("ip") if self.is_ssh else NetUtils.get_inner_ip()
         remote_user = node.get("ssh_username")
         self.stdio.verbose("Sending Collect Shell Command to node {0} ...".format(remote_ip))
@@ -165,9 +204,7 @@ class GatherObAdminHandler(BaseShellHandler):
             remote_dir_name = "slog_{0}_{1}".format(remote_ip, now_time)
         else:
             remote_dir_name = "clog_{0}_{1}".format(remote_ip, now_time)
-        remote_dir_full_path = "/tmp/{0}".format(remote_dir_name)
-        ssh_failed = False
-        ssh_client = None
+        remote_dir_full_path = "{0}/{1}".format(self.gather_ob_log_temporary_dir, remote_dir_name)
         try:
             ssh_client = SshClient(self.context, node)
         except Exception:
@@ -175,38 +212,75 @@ class GatherObAdminHandler(BaseShellHandler):
             resp["skip"] = True
             resp["error"] = "Please check the node conf."
             return resp
-        if not ssh_failed:
-            mkdir_cmd = "mkdir -p {0}".format(remote_dir_full_path)
-            ssh_client.exec_cmd(mkdir_cmd)
-            ob_version = get_observer_version(self.context)
-            if (ob_version != "" and not StringUtils.compare_versions_lower(ob_version, const.MAX_OB_VERSION_SUPPORT_GATHER_OBADMIN, self.stdio)) or ob_version == "":
-                self.stdio.verbose("This version {0} does not support gather clog/slog . The max supported version less than {1}".format(ob_version, const.MAX_OB_VERSION_SUPPORT_GATHER_OBADMIN))
-                resp["error"] = "{0} not support gather clog/slog".format(ob_version)
-                resp["gather_pack_path"] = "{0}".format(local_stored_path)
-                resp["zip_password"] = ""
-                return resp
-            log_list, resp = self.__handle_log_list(ssh_client, remote_ip, resp)
-            for slog in log_list:
-                self.__gather_log_info(ssh_client, node, slog, remote_dir_full_path)
-
-            self.__mv_log(ssh_client, remote_dir_full_path)
-            if is_empty_dir(ssh_client, "/tmp/{0}".format(remote_dir_name), self.stdio):
-                resp["error"] = "gather failed, folder is empty"
-                resp["zip_password"] = ""
-            else:
-                resp = self.__handle_zip_file(remote_ip, ssh_client, resp, remote_dir_name)
-                rm_rf_file(ssh_client, remote_dir_full_path, self.stdio)
+        ob_version = get_observer_version(self.context)
+        if (ob_version != "" and not StringUtils.compare_versions_lower(ob_version, const.MAX_OB_VERSION_SUPPORT_GATHER_OBADMIN, self.stdio)) or ob_version == "":
+            self.stdio.verbose("This version {0} does not support gather clog/slog . The max supported version less than {1}".format(ob_version, const.MAX_OB_VERSION_SUPPORT_GATHER_OBADMIN))
+            resp["error"] = "{0} not support gather clog/slog".format(ob_version)
+            resp["gather_pack_path"] = "{0}".format(local_stored_path)
+            return resp
+        log_list, resp = self.__handle_log_list(ssh_client, node, resp)
+        if resp["skip"]:
+            return resp
+        ssh_client.exec_cmd("mkdir -p {0}".format(remote_dir_full_path))
+        self.__dump_logs(ssh_client, node, log_list, remote_dir_full_path)
+        if is_empty_dir(ssh_client, remote_dir_full_path, self.stdio):
+            resp["error"] = "gather failed, folder is empty"
+        else:
+            resp = self.__handle_zip_file(ssh_client, resp, remote_dir_name, local_stored_path)
+        rm_rf_file(ssh_client, remote_dir_full_path, self.stdio)
         return resp
 
+    def __get_dump_parallel(self, ssh_client, file_count):
+        """
+        the number of ob_admin run at the same time on the node: dump_cpu_ratio of its cores, no more than the cores
+        left idle by the observer (by the 1 minute load average), no more than dump_parallel and at least one
+        """
+        cpus, load = 1, 0.0
+        try:
+            out = ssh_client.exec_cmd("getconf _NPROCESSORS_ONLN; cat /proc/loadavg").split()
+            cpus = max(1, int(out[0]))
+            load = float(out[1])
+        except Exception as e:
+            self.stdio.verbose("get the cpu count and load of {0} failed, dump one file at a time: {1}".format(ssh_client.get_name(), e))
+        budget = min(int(cpus * self.dump_cpu_ratio), int(cpus - load))
+        parallel = max(1, min(budget, self.dump_parallel, file_count))
+        self.stdio.verbose("node {0}: {1} cpus, load {2}, dump {3} files with {4} ob_admin at a time".format(ssh_client.get_name(), cpus, load, file_count, parallel))
+        return parallel
+
+    def __dump_logs(self, ssh_client, node, log_list, remote_dir):
+        if self.ob_admin_mode == "slog":
+            log_dir = os.path.join(node.get("data_dir"), "slog")
+        else:
+            log_dir = os.path.join(node.get("data_dir"), "clog")
+        parallel = self.__get_dump_parallel(ssh_client, len(log_list))
+        local_script = tempfile.NamedTemporaryFile(mode="w", suffix=".sh", delete=False)
+        try:
+            local_script.write(self.DUMP_SCRIPT)
+            local_script.close()
+            remote_script = "{0}/{1}".format(remote_dir, self.DUMP_SCRIPT_NAME)
+            upload_file(ssh_client, local_script.name, remote_script, self.stdio)
+        finally:
+            os.remove(local_script.name)
+        cmd = "sh {script} {parallel} {home_path} {log_dir} {mode} {remote_dir} {files}; rm -f {script}".format(
+            script=remote_script, parallel=parallel, home_path=node.get("home_path"), log_dir=log_dir, mode=self.ob_admin_mode, remote_dir=remote_dir, files=" ".join(log_list)
+        )
+        self.stdio.verbose("gather obadmin info, run cmd = [{0}]".format(cmd))
+        self.stdio.start_loading("dump {0} {1} files on {2} with {3} ob_admin".format(len(log_list), self.ob_admin_mode, ssh_client.get_name(), parallel))
+        try:
+            # every round of the parallel dump gets the timeout of one command
+            ssh_client.exec_cmd(cmd, timeout=ssh_client.cmd_exec_timeout * ((len(log_list) + parallel - 1) // parallel))
+        finally:
+            self.stdio.stop_loading("succeed")
+
     def __handle_log_list(self, ssh, node, resp):
         log_list = self.__get_log_name(ssh, node)
-        if len(log_list) > 20:
-            self.stdio.warn("{0} The number of log files is {1}, out of range (0,20], " "Please adjust the query limit".format(node.get("ip"), len(log_list)))
+        if len(log_list) > self.file_number_limit:
+            self.stdio.warn("{0} The number of log files is {1}, out of range (0,{2}], " "Please adjust the query limit".format(node.get("ip"), len(log_list), self.file_number_limit))
             resp["skip"] = (True,)
-            resp["error"] = "Too many files {0} > 20".format(len(log_list))
+            resp["error"] = "Too many files {0} > {1}".format(len(log_list), self.file_number_limit)
             return log_list, resp
         elif len(log_list) <= 0:
-            self.stdio.warn("{0} The number of log files is {1}, out of range (0,20], " "Please adjust the query limit".format(node.get("ip"), len(log_list)))
+            self.stdio.warn("{0} The number of log files is {1}, out of range (0,{2}], " "Please adjust the query limit".format(node.get("ip"), len(log_list), self.file_number_limit))
             resp["skip"] = (True,)
             resp["error"] = "No files found"
             return log_list, resp
@@ -214,38 +288,56 @@ class GatherObAdminHandler(BaseShellHandler):
 
     def __handle_zip_file(self, ssh_client, resp, gather_dir_name, pack_dir_this_command):
         zip_password = ""
-        gather_dir_full_path = "{0}/{1}".format(self.gather_ob_log_temporary_dir, gather_dir_name)
         if self.zip_encrypt:
             zip_password = Util.gen_password(16)
-        tar_gz_dir(ssh_client, self.gather_ob_log_temporary_dir, gather_dir_name, self.stdio)
-        gather_package_dir = "{0}.tar.gz".format(gather_dir_full_path)
+        # the dumps are gzipped already, the tar only bundles them
+        gather_package_dir = "{0}/{1}.tar".format(self.gather_ob_log_temporary_dir, gather_dir_name)
+        ssh_client.exec_cmd("tar -cf {0} -C {1} {2}".format(gather_package_dir, self.gather_ob_log_temporary_dir, gather_dir_name))
         gather_log_file_size = get_file_size(ssh_client, gather_package_dir, self.stdio)
         self.stdio.print(FileUtil.show_file_size_tabulate(ssh_client, gather_log_file_size, self.stdio))
         local_path = ""
         if int(gather_log_file_size) < self.file_size_limit:
-            local_store_tar_gz_file = pack_dir_this_command + "/{0}.tar.gz".format(gather_dir_name)
-            download_file(ssh_client, gather_package_dir, local_store_tar_gz_file, self.stdio)
             local_path = pack_dir_this_command + "/{0}.zip".format(gather_dir_name)
-            FileUtil.tar_gz_to_zip(pack_dir_this_command, local_store_tar_gz_file, local_path, zip_password, self.stdio)
-            resp["error"] = ""
-            resp["zip_password"] = zip_password
+            if self.__tar_to_zip(ssh_client, gather_package_dir, local_path, zip_password, pack_dir_this_command):
+                resp["error"] = ""
+                resp["zip_password"] = zip_password
+            else:
+                resp["error"] = "build zip failed"
+                resp["zip_password"] = ""
         else:
             resp["error"] = "File too large"
             resp["zip_password"] = ""
         rm_rf_file(ssh_client, gather_package_dir, self.stdio)
         resp["gather_pack_path"] = local_path
 
-        self.stdio.verbose("Collect pack gathered from node {0}: stored in {1}".format(ssh_client.get_name(), gather_package_dir))
+        self.stdio.verbose("Collect pack gathered from node {0}: stored in {1}".format(ssh_client.get_name(), local_path))
         return resp
 
+    def __tar_to_zip(self, ssh_client, remote_tar, local_zip, zip_password, pack_dir_this_command):
+        # read the tar from the node while the zip is written, download it first for the clients that can not stream
+        try:
+            remote_file = ssh_client.open_file(remote_tar)
+        except Exception as e:
+            self.stdio.verbose("stream {0} from {1} failed, download it: {2}".format(remote_tar, ssh_client.get_name(), e))
+            local_tar = os.path.join(pack_dir_this_command, os.path.basename(remote_tar))
+            download_file(ssh_client, remote_tar, local_tar, self.stdio)
+            try:
+                with open(local_tar, "rb") as f:
+                    return FileUtil.tar_stream_to_zip(f, local_zip, zip_password, self.stdio, temp_dir=pack_dir_this_command)
+            finally:
+                if os.path.exists(local_tar):
+                    os.remove(local_tar)
+        with remote_file:
+            return FileUtil.tar_stream_to_zip(remote_file, local_zip, zip_password, self.stdio, temp_dir=pack_dir_this_command)
+
     def __get_log_name(self, ssh_client, node):
         """
         通过传入的from to的时间来过滤一遍slog文件列表，提取出文件创建的时间
         :param ssh_client:
         :return: list
         """
-        slog_dir = os.path.join(node.get("data_dir"), "/slog")
-        clog_dir = os.path.join(node.get("data_dir"), "/clog")
+        slog_dir = os.path.join(node.get("data_dir"), "slog")
+        clog_dir = os.path.join(node.get("data_dir"), "clog")
         if self.ob_admin_mode == "slog":
             get_log = "ls -l SLOG_DIR --time-style '+.%Y%m%d%H%M%S' | awk '{print $7,$6}'".replace("SLOG_DIR", slog_dir)
         else:
@@ -269,29 +361,6 @@ class GatherObAdminHandler(BaseShellHandler):
             self.stdio.warn("No found the qualified log file on Server [{0}]".format(ssh_client.get_name()))
         return log_name_list
 
-    def __gather_log_info(self, ssh_client, node, log_name, remote_dir):
-        home_path = node.get("home_path")
-        obadmin_install_dir = os.path.join(home_path, "/bin")
-        if self.ob_admin_mode == "slog":
-            cmd = "export LD_LIBRARY_PATH={ob_install_dir}/lib && cd {store_dir} && {obadmin_dir}/ob_admin slog_tool -f {slog_name}".format(ob_install_dir=home_path, store_dir=remote_dir, obadmin_dir=obadmin_install_dir, slog_name=log_name)
-        else:
-            cmd = "export LD_LIBRARY_PATH={ob_install_dir}/lib && cd {store_dir} && {obadmin_dir}/ob_admin clog_tool dump_all {clog_name}".format(
-                ob_install_dir=home_path,
-                store_dir=remote_dir,
-                obadmin_dir=obadmin_install_dir,
-                clog_name=log_name,
-            )
-        self.stdio.verbose("gather obadmin info, run cmd = [{0}]".format(cmd))
-        ssh_client.exec_cmd(cmd)
-
-    def __mv_log(self, ssh_client, remote_dir):
-        if self.ob_admin_mode == "slog":
-            cmd = "cd {remote_dir} && mv ob_admin.log ob_admin_slog.log".format(remote_dir=remote_dir)
-        else:
-            cmd = "cd {remote_dir} && mv ob_admin.log ob_admin_clog.log".format(remote_dir=remote_dir)
-        self.stdio.verbose("mv log info, run cmd = [{0}]".format(cmd))
-        ssh_client.exec_cmd(cmd)
-
     @staticmethod
     def __get_overall_summary(node_summary_tuple, mode, is_zip_encrypt):
         summary_tab = []
@@ -17,6 +17,7 @@
 """
 import os
 import sys
+import threading
 import time
 import datetime
 
@@ -24,6 +25,7 @@ import tabulate
 
 from src.common.command import download_file, is_empty_dir, is_support_arch, get_observer_version, get_observer_pid, mkdir, get_file_size, delete_file_force, is_empty_file, upload_file
 from src.common.constant import const
+from src.common.node_runner import NodeRunner, node_key
 from src.common.command import SshClient
 from src.handler.base_shell_handler import BaseShellHandler
 from src.common.tool import TimeUtils
@@ -43,6 +45,9 @@ class GatherObstack2Handler(BaseShellHandler):
         self.remote_stored_path = None
         self.is_scene = is_scene
         self.config_path = const.DEFAULT_CONFIG_PATH
+        self.gather_tuples = []
+        self.thread_nums = 3
+        self.node_timeout = 300
         if self.context.get_variable("gather_timestamp", None):
             self.gather_timestamp = self.context.get_variable("gather_timestamp")
         else:
@@ -62,6 +67,9 @@ class GatherObstack2Handler(BaseShellHandler):
             self.file_number_limit = int(basic_config["file_number_limit"])
             self.file_size_limit = int(FileUtil.size(basic_config["file_size_limit"]))
             self.config_path = basic_config['config_path']
+            gather_config = self.inner_config.get('gather') or {}
+            self.thread_nums = int(gather_config.get('thread_nums') or self.thread_nums)
+            self.node_timeout = int(gather_config.get('node_timeout') or self.node_timeout)
         return True
 
     def init_option(self):
@@ -72,6 +80,23 @@ class GatherObstack2Handler(BaseShellHandler):
                 self.stdio.warn('args --store_dir [{0}] incorrect: No such directory, Now create it'.format(os.path.abspath(store_dir_option)))
                 os.makedirs(os.path.abspath(store_dir_option))
             self.local_stored_path = os.path.abspath(store_dir_option)
+        return self.init_parallel_option()
+
+    def init_parallel_option(self):
+        options = self.context.options
+        thread_nums_option = Util.get_option(options, 'thread_nums')
+        node_timeout_option = Util.get_option(options, 'node_timeout')
+        try:
+            if thread_nums_option is not None:
+                self.thread_nums = int(thread_nums_option)
+            if node_timeout_option is not None:
+                self.node_timeout = int(node_timeout_option)
+        except ValueError:
+            self.stdio.error("args --thread_nums and --node_timeout must be integers")
+            return False
+        if self.thread_nums <= 0:
+            self.stdio.error("args --thread_nums must be greater than 0")
+            return False
         return True
 
     def handle(self):
@@ -86,62 +111,108 @@ class GatherObstack2Handler(BaseShellHandler):
         else:
             pack_dir_this_command = os.path.join(self.local_stored_path, "obdiag_gather_pack_{0}".format(TimeUtils.timestamp_to_filename_time(self.gather_timestamp)))
         self.stdio.verbose("Use {0} as pack dir.".format(pack_dir_this_command))
-        gather_tuples = []
-
-        def handle_from_node(node):
-            st = time.time()
-            resp = self.__handle_from_node(pack_dir_this_command, node)
-            file_size = ""
-            if len(resp["error"]) == 0:
-                file_size = os.path.getsize(resp["gather_pack_path"])
-            gather_tuples.append((node.get("ip"), False, resp["error"], file_size, int(time.time() - st), resp["gather_pack_path"]))
-
-        exec_tag = False
+        nodes = []
         for node in self.nodes:
             if node.get("ssh_type") == "docker" or node.get("ssh_type") == "kubernetes":
                 self.stdio.warn("Skip gather from node {0} because it is a docker or kubernetes node".format(node.get("ip")))
                 continue
-            handle_from_node(node)
-            exec_tag = True
-        if not exec_tag:
+            nodes.append(node)
+        if not nodes:
             self.stdio.verbose("No node to gather from, skip")
             return ObdiagResult(ObdiagResult.SUCCESS_CODE, data={"store_dir": pack_dir_this_command})
 
+        gather_tuples = self.gather_tuples = self.__handle_nodes(pack_dir_this_command, nodes)
         summary_tuples = self.__get_overall_summary(gather_tuples)
         self.stdio.print(summary_tuples)
         # Persist the summary results to a file
         FileUtil.write_append(os.path.join(pack_dir_this_command, "result_summary.txt"), summary_tuples)
         return ObdiagResult(ObdiagResult.SUCCESS_CODE, data={"store_dir": pack_dir_this_command})
 
-    def __handle_from_node(self, local_stored_path, node):
-        resp = {"skip": False, "error": "", "gather_pack_path": ""}
+    def __handle_nodes(self, local_stored_path, nodes):
+        """
+        Gather the stacks of all nodes concurrently in three steps: prepare (ssh, install obstack, find the
+        observer pids) at most thread_nums nodes at a time, then obstack on every prepared node at the same
+        moment, then pack and download at most thread_nums at a time. Nodes not prepared within
+        OBSTACK_SYNC_PREPARE_TIMEOUT are left out so they do not hold the others back, and a node whose stack is
+        not downloaded within node_timeout after the start is dropped.
+        """
+        st = time.time()
+        prepare_timeout = min(self.node_timeout, const.OBSTACK_SYNC_PREPARE_TIMEOUT) if self.node_timeout else const.OBSTACK_SYNC_PREPARE_TIMEOUT
+        DirectoryUtil.mkdir(path=local_stored_path, stdio=self.stdio)
+        self.ob_version = get_observer_version(self.context)
+        errors = {}
+        start_times = {}
+
+        self.stdio.start_loading('gather obstack info on {0} nodes'.format(len(nodes)))
+        try:
+            prepared = []
+            for outcome in NodeRunner(self.stdio, self.thread_nums, st + prepare_timeout).run(nodes, self.__prepare_node, node_key):
+                if outcome.ok and not outcome.result.get("error"):
+                    prepared.append(outcome.result)
+                else:
+                    errors[outcome.name] = outcome.error if not outcome.ok else outcome.result["error"]
+
+            sync = {"start_at": None}
+
+            def set_start_time():
+                sync["start_at"] = time.time() + const.OBSTACK_SYNC_START_DELAY
+
+            barrier = threading.Barrier(len(prepared), action=set_start_time) if prepared else None
+            deadline = time.time() + self.node_timeout if self.node_timeout else None
+            captured = []
+            for outcome in NodeRunner(self.stdio, len(prepared), deadline).run(prepared, lambda prep: self.__capture_node(prep, barrier, sync, start_times), lambda prep: prep["key"]):
+                if outcome.ok:
+                    captured.append(outcome.item)
+                else:
+                    errors[outcome.name] = outcome.error
+
+            packs = {}
+            for outcome in NodeRunner(self.stdio, self.thread_nums, deadline).run(captured, lambda prep: self.__pack_node(local_stored_path, prep), lambda prep: prep["key"]):
+                if outcome.ok and not outcome.result.get("error"):
+                    packs[outcome.name] = outcome.result
+                else:
+                    errors[outcome.name] = outcome.error if not outcome.ok else outcome.result["error"]
+        finally:
+            self.stdio.stop_loading('succeed')
+        if len(start_times) > 1:
+            skew = (max(start_times.values()) - min(start_times.values())) * 1000
+            self.stdio.print("obstack started on {0} nodes within {1:.0f} ms".format(len(start_times), skew))
+
+        gather_tuples = []
+        for node in nodes:
+            key = node_key(node)
+            if key in packs:
+                pack_path = packs[key]["gather_pack_path"]
+                gather_tuples.append((key, False, "", os.path.getsize(pack_path), int(packs[key]["finished_at"] - st), pack_path))
+            else:
+                gather_tuples.append((key, False, errors.get(key, "gather failed"), "", int(time.time() - st), ""))
+        return gather_tuples
+
+    def __prepare_node(self, node):
+        prep = {"ip": node.get("ip"), "key": node_key(node), "node": node, "error": ""}
         remote_ip = node.get("ip")
         remote_user = node.get("ssh_username")
         self.stdio.verbose("Sending Collect Shell Command to node {0} ...".format(remote_ip))
-        DirectoryUtil.mkdir(path=local_stored_path, stdio=self.stdio)
         now_time = datetime.datetime.now().strftime('%Y%m%d%H%M%S')
-        remote_dir_name = "obstack2_{0}_{1}".format(remote_ip.replace(":", "_"), now_time)
-        remote_dir_full_path = "/tmp/{0}".format(remote_dir_name)
-        ssh_client = None
+        remote_dir_name = "obstack2_{0}_{1}".format(prep["key"], now_time)
+        prep["remote_dir_name"] = remote_dir_name
         try:
             ssh_client = SshClient(self.context, node)
         except Exception:
             self.stdio.exception("ssh {0}@{1}: failed, Please check the node conf.".format(remote_user, remote_ip))
-            resp["skip"] = True
-            resp["error"] = "Please check the node conf."
             raise Exception("Please check the node conf.")
+        prep["ssh_client"] = ssh_client
 
         if not is_support_arch(ssh_client):
-            resp["error"] = "remote server {0} arch not support gather obstack".format(ssh_client.get_name())
-            return resp
-        mkdir(ssh_client, remote_dir_full_path)
+            prep["error"] = "remote server {0} arch not support gather obstack".format(ssh_client.get_name())
+            return prep
+        mkdir(ssh_client, "/tmp/{0}".format(remote_dir_name))
         # install and chmod obstack2
-        ob_version = get_observer_version(self.context)
+        ob_version = self.ob_version
         if not StringUtils.compare_versions_greater(ob_version, const.MIN_OB_VERSION_SUPPORT_GATHER_OBSTACK):
             self.stdio.verbose("This version {0} does not support gather obstack . The minimum supported version is {1}".format(ob_version, const.MIN_OB_VERSION_SUPPORT_GATHER_OBSTACK))
-            resp["error"] = "{0} not support gather obstack".format(ob_version)
-            resp["gather_pack_path"] = "{0}".format(local_stored_path)
-            return resp
+            prep["error"] = "{0} not support gather obstack".format(ob_version)
+            return prep
         is_need_install_obstack = self.__is_obstack_exists(ssh_client)
         if is_need_install_obstack:
             self.stdio.verbose("There is no obstack2 on the host {0}. It needs to be installed. " "Please wait a moment ...".format(remote_ip))
@@ -163,27 +234,40 @@ class GatherObstack2Handler(BaseShellHandler):
             libtinfo_info = ssh_client.exec_cmd("ldconfig -p | grep libtinfo.so.5")
             if not libtinfo_info:
                 self.stdio.warn("node:{0} libtinfo.so.5 not found, obstack need it".format(ssh_client.get_name()))
-                resp["error"] = "node:{0} libtinfo.so.5 not found, obstack need it".format(ssh_client.get_name())
-                return resp
+                prep["error"] = "node:{0} libtinfo.so.5 not found, obstack need it".format(ssh_client.get_name())
+                return prep
             upload_file(ssh_client, obstack2_local_stored_full_path, const.OBSTACK2_DEFAULT_INSTALL_PATH, self.context.stdio)
             self.stdio.verbose("Installation of obstack2 is completed and gather begins ...")
 
         self.__chmod_obstack2(ssh_client)
-        # get observer_pid
-        observer_pid_list = get_observer_pid(ssh_client, node.get("home_path"), self.stdio)
-        # gather obstack2 info
-        for observer_pid in observer_pid_list:
-            user = self.__get_observer_execute_user(ssh_client, observer_pid)
-            self.__gather_obstack2_info(ssh_client, user, observer_pid, remote_dir_name, node)
+        # get observer_pid and the user running it, so that obstack itself starts right away
+        prep["pids"] = [(observer_pid, self.__get_observer_execute_user(ssh_client, observer_pid)) for observer_pid in get_observer_pid(ssh_client, node.get("home_path"), self.stdio)]
+        return prep
+
+    def __capture_node(self, prep, barrier, sync, start_times):
+        try:
+            barrier.wait(timeout=const.OBSTACK_SYNC_PREPARE_TIMEOUT)
+        except threading.BrokenBarrierError:
+            self.stdio.verbose("obstack barrier broken, {0} starts without waiting for the other nodes".format(prep["ip"]))
+        start_at = sync["start_at"]
+        if start_at and start_at > time.time():
+            time.sleep(start_at - time.time())
+        start_times[prep["key"]] = time.time()
+        for observer_pid, user in prep["pids"]:
+            self.__gather_obstack2_info(prep["ssh_client"], user, observer_pid, prep["remote_dir_name"], prep["node"])
+
+    def __pack_node(self, local_stored_path, prep):
+        resp = {"skip": False, "error": "", "gather_pack_path": ""}
+        ssh_client = prep["ssh_client"]
+        remote_ip = prep["ip"]
+        remote_dir_name = prep["remote_dir_name"]
+        remote_dir_full_path = "/tmp/{0}".format(remote_dir_name)
+        for observer_pid, _ in prep["pids"]:
             try:
-                self.stdio.start_loading('gather obstack info')
                 self.is_ready(ssh_client, observer_pid, remote_dir_name)
-                self.stdio.stop_loading('gather obstack info sucess')
             except Exception:
-                self.stdio.stop_loading('gather info failed')
                 self.stdio.error("Gather obstack info on the host {0} observer pid {1}".format(remote_ip, observer_pid))
                 delete_file_force(ssh_client, "/tmp/{dir_name}/observer_{pid}_obstack.txt".format(dir_name=remote_dir_name, pid=observer_pid), self.stdio)
-                pass
         if is_empty_dir(ssh_client, "/tmp/{0}".format(remote_dir_name), self.stdio):
             resp["error"] = "gather failed, folder is empty"
             return resp
@@ -201,6 +285,7 @@ class GatherObstack2Handler(BaseShellHandler):
             resp["error"] = "File too large"
         delete_file_force(ssh_client, remote_tar_full_path, self.stdio)
         resp["gather_pack_path"] = "{0}/{1}.tar.gz".format(local_stored_path, remote_dir_name)
+        resp["finished_at"] = time.time()
         return resp
 
     @Util.retry(10, 5)
@@ -13,21 +13,23 @@
 """
 @time: 2023/01/12
 @file: gather_perf.py
-@desc: Gather perf data and optionally generate flame graph SVG (see github.com/oceanbase/obdiag/issues/95).
+@desc: Gather perf data and generate flame graph SVG, merged and differential ones across nodes (see github.com/oceanbase/obdiag/issues/95).
 """
+import collections
 import os
-import shutil
-import subprocess
-import sys
 import tarfile
+import threading
 import time
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 import tabulate
 
 from src.common.command import get_observer_pid, get_obproxy_pid, mkdir, get_file_size, download_file, delete_file_force, is_empty_file
 from src.common.command import SshClient
 from src.common.constant import const
+from src.common.node_runner import node_key
+from src.common.flamegraph import FOLD_PERF_SCRIPT_AWK, fold_perf_script, merge_folded, read_folded, write_flame_svg, write_folded
 from src.handler.base_shell_handler import BaseShellHandler
 from src.common.tool import Util
 from src.common.tool import DirectoryUtil
@@ -49,6 +51,14 @@ class GatherPerfHandler(BaseShellHandler):
         self.is_scene = is_scene
         self.scope = "all"
         self.config_path = const.DEFAULT_CONFIG_PATH
+        self.gather_tuples = []
+        self.concurrent = False
+        self.download_thread_nums = 3
+        self.diff_node = None
+        self.diff_base = None
+        # node_key of the node ("(obproxy)" appended for an obproxy) -> folded stacks of its flame capture, for the merged and differential flame graphs
+        self.flame_profiles = {}
+        self.flame_lock = threading.Lock()
         if self.context.get_variable("gather_timestamp", None):
             self.gather_timestamp = self.context.get_variable("gather_timestamp")
         else:
@@ -68,6 +78,7 @@ class GatherPerfHandler(BaseShellHandler):
             self.file_number_limit = int(basic_config["file_number_limit"])
             self.file_size_limit = int(FileUtil.size(basic_config["file_size_limit"]))
             self.config_path = basic_config['config_path']
+            self.download_thread_nums = max(1, int((self.inner_config.get('gather') or {}).get('thread_nums') or 3))
         return True
 
     def init_option(self):
@@ -95,6 +106,12 @@ class GatherPerfHandler(BaseShellHandler):
                 os.makedirs(os.path.abspath(store_dir_option))
             self.local_stored_path = os.path.abspath(store_dir_option)
         self.scope_option = Util.get_option(options, 'scope')
+        self.concurrent = bool(Util.get_option(options, 'concurrent')) or bool(self.context.get_variable("gather_perf_concurrent", None))
+        self.diff_node = Util.get_option(options, 'diff_node')
+        self.diff_base = Util.get_option(options, 'diff_base')
+        if self.diff_base and not os.path.exists(os.path.abspath(os.path.expanduser(self.diff_base))):
+            self.stdio.error('args --diff_base [{0}] incorrect: No such file or directory'.format(self.diff_base))
+            return False
         return True
 
     def handle(self):
@@ -109,7 +126,7 @@ class GatherPerfHandler(BaseShellHandler):
         else:
             pack_dir_this_command = os.path.join(self.local_stored_path, "obdiag_gather_pack_{0}".format(TimeUtils.timestamp_to_filename_time(self.gather_timestamp)))
         self.stdio.verbose("Use {0} as pack dir.".format(pack_dir_this_command))
-        gather_tuples = []
+        gather_tuples = self.gather_tuples = []
 
         def handle_from_node(node):
             st = time.time()
@@ -117,10 +134,12 @@ class GatherPerfHandler(BaseShellHandler):
             file_size = ""
             if len(resp["error"]) == 0:
                 file_size = os.path.getsize(resp["gather_pack_path"])
-            gather_tuples.append((node.get("ip"), False, resp["error"], file_size, int(time.time() - st), resp["gather_pack_path"]))
+            gather_tuples.append((node_key(node), False, resp["error"], file_size, int(time.time() - st), resp["gather_pack_path"]))
 
         exec_tag = False
-        if self.is_ssh:
+        if self.is_ssh and self.concurrent:
+            exec_tag = self.__handle_concurrent(pack_dir_this_command, gather_tuples)
+        elif self.is_ssh:
             for node in self.nodes:
                 if node.get("ssh_type") == "docker" or node.get("ssh_type") == "kubernetes":
                     self.stdio.warn("Skip gather from node {0} because it is a docker or kubernetes node".format(node.get("ip")))
@@ -141,7 +160,7 @@ class GatherPerfHandler(BaseShellHandler):
                     file_size = ""
                     if len(resp["error"]) == 0:
                         file_size = os.path.getsize(resp["gather_pack_path"])
-                    gather_tuples.append((node.get("ip") + "(obproxy)", False, resp["error"], file_size, int(time.time() - st), resp["gather_pack_path"]))
+                    gather_tuples.append((node_key(node) + "(obproxy)", False, resp["error"], file_size, int(time.time() - st), resp["gather_pack_path"]))
                     exec_tag = True
         else:
             local_ip = NetUtils.get_inner_ip(self.stdio)
@@ -153,6 +172,7 @@ class GatherPerfHandler(BaseShellHandler):
             self.stdio.verbose("No node to gather from, skip")
             return ObdiagResult(ObdiagResult.SUCCESS_CODE, data={"store_dir": pack_dir_this_command})
 
+        self.__report_flame_profiles(pack_dir_this_command)
         summary_tuples = self.__get_overall_summary(gather_tuples)
         self.stdio.print(summary_tuples)
         # Persist the summary results to a file
@@ -166,7 +186,7 @@ class GatherPerfHandler(BaseShellHandler):
         self.stdio.verbose("Sending Collect Shell Command to node {0} ...".format(remote_ip))
         DirectoryUtil.mkdir(path=local_stored_path, stdio=self.stdio)
         now_time = datetime.datetime.now().strftime('%Y%m%d%H%M%S')
-        remote_dir_name = "perf_{0}_{1}".format(node.get("ip").replace(":", "_"), now_time)
+        remote_dir_name = "perf_{0}_{1}".format(node_key(node), now_time)
         remote_dir_full_path = "/tmp/{0}".format(remote_dir_name)
         ssh_failed = False
         ssh_client = None
@@ -204,7 +224,7 @@ class GatherPerfHandler(BaseShellHandler):
             if int(file_size) < self.file_size_limit:
                 local_file_path = "{0}/{1}.tar.gz".format(local_stored_path, remote_dir_name)
                 download_file(ssh_client, remote_tar_full_path, local_file_path, self.stdio)
-                self.__generate_flame_graph_svg(local_file_path, remote_dir_name, local_stored_path)
+                self.__generate_flame_graph_svg(local_file_path, remote_dir_name, local_stored_path, node_key(node))
                 resp["error"] = ""
             else:
                 resp["error"] = "File too large"
@@ -220,7 +240,7 @@ class GatherPerfHandler(BaseShellHandler):
         self.stdio.verbose("Sending Collect OBProxy Perf Shell Command to node {0} ...".format(remote_ip))
         DirectoryUtil.mkdir(path=local_stored_path, stdio=self.stdio)
         now_time = datetime.datetime.now().strftime('%Y%m%d%H%M%S')
-        remote_dir_name = "perf_obproxy_{0}_{1}".format(node.get("ip").replace(":", "_"), now_time)
+        remote_dir_name = "perf_obproxy_{0}_{1}".format(node_key(node), now_time)
         remote_dir_full_path = "/tmp/{0}".format(remote_dir_name)
         ssh_failed = False
         ssh_client = None
@@ -259,7 +279,7 @@ class GatherPerfHandler(BaseShellHandler):
             if int(file_size) < self.file_size_limit:
                 local_file_path = "{0}/{1}.tar.gz".format(local_stored_path, remote_dir_name)
                 download_file(ssh_client, remote_tar_full_path, local_file_path, self.stdio)
-                self.__generate_flame_graph_svg(local_file_path, remote_dir_name, local_stored_path)
+                self.__generate_flame_graph_svg(local_file_path, remote_dir_name, local_stored_path, node_key(node) + "(obproxy)")
                 resp["error"] = ""
             else:
                 resp["error"] = "File too large"
@@ -267,89 +287,251 @@ class GatherPerfHandler(BaseShellHandler):
             resp["gather_pack_path"] = "{0}/{1}.tar.gz".format(local_stored_path, remote_dir_name)
         return resp
 
-    def __get_flamegraph_scripts(self):
+    def __capture_targets(self):
+        targets = []
+        for node in self.nodes:
+            if node.get("ssh_type") == "docker" or node.get("ssh_type") == "kubernetes":
+                self.stdio.warn("Skip gather from node {0} because it is a docker or kubernetes node".format(node.get("ip")))
+                continue
+            targets.append((node, "observer"))
+        obproxy_config = getattr(self.context, 'obproxy_config', None)
+        obproxy_nodes = obproxy_config.get("servers") if obproxy_config else None
+        if obproxy_nodes:
+            obproxy_nodes = Util.get_nodes_list(self.context, obproxy_nodes, self.stdio) or obproxy_nodes
+            for node in obproxy_nodes:
+                if node.get("ssh_type") == "docker" or node.get("ssh_type") == "kubernetes":
+                    self.stdio.warn("Skip gather obproxy perf from node {0} because it is a docker or kubernetes node".format(node.get("ip")))
+                    continue
+                targets.append((node, "obproxy"))
+        return targets
+
+    def __handle_concurrent(self, local_stored_path, gather_tuples):
         """
-        Get stackcollapse-perf.pl and flamegraph.pl paths from const (dependencies/bin/).
-        Returns (stackcollapse_pl, flamegraph_pl) or (None, None) if not found.
+        Capture perf on every node at the same time: all nodes are prepared (ssh, pid, perf check) in parallel,
+        wait on a barrier and start one perf record session each at a common start time. The sample and flame
+        outputs are both generated from that session, downloads are limited to gather.thread_nums at a time.
         """
-        # Get obdiag installation directory (similar to gather_obstack2.py)
-        if getattr(sys, 'frozen', False):
-            # PyInstaller packaged environment
-            absPath = os.path.dirname(sys.executable)
-        else:
-            # Development environment
-            absPath = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+        targets = self.__capture_targets()
+        if not targets:
+            return False
+        DirectoryUtil.mkdir(path=local_stored_path, stdio=self.stdio)
+        sync = {"start_at": None}
+
+        def set_start_time():
+            # runs once when every node is prepared; leave a little time for the threads to wake up
+            sync["start_at"] = time.time() + const.PERF_SYNC_START_DELAY
+
+        barrier = threading.Barrier(len(targets), action=set_start_time)
+        download_sema = threading.BoundedSemaphore(value=self.download_thread_nums)
+        start_times = {}
+        self.stdio.start_loading("gather perf on {0} nodes concurrently".format(len(targets)))
+        try:
+            with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+                futures = [executor.submit(self.__capture_from_node, node, kind, local_stored_path, barrier, sync, download_sema, start_times) for node, kind in targets]
+                for future in futures:
+                    gather_tuples.append(future.result())
+        finally:
+            self.stdio.stop_loading("succeed")
+        if start_times:
+            skew = (max(start_times.values()) - min(start_times.values())) * 1000
+            self.stdio.print("perf record started on {0} nodes within {1:.0f} ms".format(len(start_times), skew))
+        return True
+
+    def __capture_from_node(self, node, kind, local_stored_path, barrier, sync, download_sema, start_times):
+        st = time.time()
+        name = node_key(node) if kind == "observer" else node_key(node) + "(obproxy)"
+        now_time = datetime.datetime.now().strftime('%Y%m%d%H%M%S')
+        remote_dir_name = "perf_{0}{1}_{2}".format("" if kind == "observer" else "obproxy_", node_key(node), now_time)
+        remote_dir_full_path = "/tmp/{0}".format(remote_dir_name)
+        ssh_client = None
+        pid_list = []
+        error = ""
+        try:
+            try:
+                ssh_client = SshClient(self.context, node)
+                mkdir(ssh_client, remote_dir_full_path, self.stdio)
+                if kind == "observer":
+                    pid_list = get_observer_pid(ssh_client, node.get("home_path"), self.stdio)
+                else:
+                    pid_list = get_obproxy_pid(ssh_client, node.get("home_path") or const.OBPROXY_INSTALL_DIR_DEFAULT, self.stdio)
+                if len(pid_list) == 0:
+                    error = "can't find {0}".format(kind)
+                elif not self.__perf_checker(ssh_client):
+                    error = "perf is not installed"
+            except Exception as e:
+                self.stdio.verbose("prepare perf on {0} failed: {1}".format(name, e))
+                error = "Please check the node conf."
+        finally:
+            # every node reaches the barrier, also the failed ones, so the others are not held back
+            try:
+                barrier.wait(timeout=const.PERF_SYNC_PREPARE_TIMEOUT)
+            except threading.BrokenBarrierError:
+                self.stdio.verbose("perf barrier broken, {0} starts without waiting for the other nodes".format(name))
+        if error:
+            return (name, True, error, "", int(time.time() - st), "")
+        start_at = sync["start_at"]
+        if start_at and start_at > time.time():
+            time.sleep(start_at - time.time())
+        start_times[name] = time.time()
+        try:
+            self.__gather_perf_session(ssh_client, remote_dir_full_path, pid_list)
+            for pid in pid_list:
+                self.__gather_top(ssh_client, remote_dir_full_path, pid)
+            ssh_client.exec_cmd("cd /tmp && tar -czf {0}.tar.gz {0}/*".format(remote_dir_name))
+            remote_tar_full_path = "{0}.tar.gz".format(remote_dir_full_path)
+            file_size = get_file_size(ssh_client, remote_tar_full_path, self.stdio)
+            local_file_path = "{0}/{1}.tar.gz".format(local_stored_path, remote_dir_name)
+            if int(file_size) < self.file_size_limit:
+                with download_sema:
+                    download_file(ssh_client, remote_tar_full_path, local_file_path, self.stdio)
+                delete_file_force(ssh_client, remote_tar_full_path, self.stdio)
+                self.__generate_flame_graph_svg(local_file_path, remote_dir_name, local_stored_path, name)
+            else:
+                delete_file_force(ssh_client, remote_tar_full_path, self.stdio)
+                return (name, True, "File too large", "", int(time.time() - st), "")
+            return (name, False, "", os.path.getsize(local_file_path), int(time.time() - st), local_file_path)
+        except Exception as e:
+            self.stdio.error("gather perf on server [{0}] failed: {1}".format(name, e))
+            return (name, True, str(e), "", int(time.time() - st), "")
 
-        # Build absolute paths based on installation directory
-        # Remove leading './' from relative paths
-        stackcollapse_rel_path = const.FLAMEGRAPH_STACKCOLLAPSE_PL.lstrip('./')
-        flamegraph_rel_path = const.FLAMEGRAPH_FLAMEGRAPH_PL.lstrip('./')
-        stackcollapse_pl = os.path.join(absPath, stackcollapse_rel_path)
-        flamegraph_pl = os.path.join(absPath, flamegraph_rel_path)
+    def __gather_perf_session(self, ssh_client, gather_path, pid_list):
+        """
+        One perf record for all pids of the node, then sample.viz and flame.folded are both generated from perf.data.
+        The session records call graphs. Like the sample capture of a sequential gather it samples every --count cycles,
+        unless only the flame output is asked for: then it samples at 99Hz like the sequential flame capture.
+        """
+        pids = ",".join(str(pid) for pid in pid_list)
+        event = "-F 99" if self.scope == "flame" else "-e cycles -c {0}".format(self.count_option)
+        cmd = "cd {gather_path} && perf record -o perf.data {event} -p {pids} -g -- sleep 20".format(gather_path=gather_path, event=event, pids=pids)
+        self.stdio.verbose("gather perf on {0}, run cmd = [{1}]".format(ssh_client.get_name(), cmd))
+        ssh_client.exec_cmd(cmd)
+        try:
+            data_size = int(get_file_size(ssh_client, os.path.join(gather_path, 'perf.data'), self.stdio) or 0)
+        except (ValueError, TypeError):
+            data_size = 0
+        if data_size == 0:
+            raise Exception("perf record produced empty perf.data. Possible causes: Permission denied (run as root or set kernel.perf_event_paranoid=-1)")
+        if self.scope in ("sample", "all"):
+            ssh_client.exec_cmd("cd {gather_path} && perf script -i perf.data -F ip,sym -f > sample.viz".format(gather_path=gather_path))
+        if self.scope in ("flame", "all"):
+            self.__fold_flame_remote(ssh_client, gather_path, 'perf.data')
 
-        if os.path.isfile(stackcollapse_pl) and os.path.isfile(flamegraph_pl):
-            return (stackcollapse_pl, flamegraph_pl)
-        return (None, None)
+    def __fold_flame_remote(self, ssh_client, gather_path, data_file):
+        """
+        Fold the stacks of data_file on the node, only flame.folded (one line per distinct stack with its count)
+        is packed instead of the full `perf script` text. Falls back to flame.viz when awk is not available.
+        """
+        if ssh_client.exec_cmd("command -v awk"):
+            cmd = "cd {gather_path} && perf script -i {data_file} | awk '{awk}' > flame.folded".format(gather_path=gather_path, data_file=data_file, awk=FOLD_PERF_SCRIPT_AWK)
+            self.stdio.verbose("fold perf stacks on {0}, data file {1}".format(ssh_client.get_name(), data_file))
+            ssh_client.exec_cmd(cmd)
+            if not is_empty_file(ssh_client, os.path.join(gather_path, 'flame.folded'), self.stdio):
+                return os.path.join(gather_path, 'flame.folded')
+            self.stdio.verbose("fold perf stacks on {0} produced nothing, keep the perf script output".format(ssh_client.get_name()))
+            delete_file_force(ssh_client, os.path.join(gather_path, 'flame.folded'), self.stdio)
+        ssh_client.exec_cmd("cd {gather_path} && perf script -i {data_file} > flame.viz".format(gather_path=gather_path, data_file=data_file))
+        return os.path.join(gather_path, 'flame.viz')
 
-    def __generate_flame_graph_svg(self, local_tar_path, remote_dir_name, local_stored_path):
+    def __generate_flame_graph_svg(self, local_tar_path, remote_dir_name, local_stored_path, name):
         """
-        Extract perf pack tar, generate flame graph SVG from flame.viz if present, re-pack tar.
+        Generate <pack>.flame.svg next to the perf pack, from flame.folded or by folding flame.viz as a stream
+        straight out of the tar. The pack itself is left as downloaded.
         See https://github.com/oceanbase/obdiag/issues/95
         """
-        stackcollapse_pl, flamegraph_pl = self.__get_flamegraph_scripts()
-        if not stackcollapse_pl or not flamegraph_pl:
-            self.stdio.verbose("FlameGraph scripts not found at {0}, {1}; skip generating flame graph SVG.".format(const.FLAMEGRAPH_STACKCOLLAPSE_PL, const.FLAMEGRAPH_FLAMEGRAPH_PL))
-            return
-        extract_dir = os.path.join(local_stored_path, remote_dir_name)
         try:
+            counts = None
             with tarfile.open(local_tar_path, "r:gz") as tar:
-                tar.extractall(path=local_stored_path)
-            flame_viz = os.path.join(extract_dir, "flame.viz")
-            if not os.path.isfile(flame_viz):
-                self.stdio.verbose("No flame.viz in pack, skip flame graph SVG.")
-                shutil.rmtree(extract_dir, ignore_errors=True)
+                members = {os.path.basename(member.name): member for member in tar.getmembers() if member.isfile()}
+                if "flame.folded" in members:
+                    counts = read_folded(tar.extractfile(members["flame.folded"]))
+                elif "flame.viz" in members:
+                    counts = fold_perf_script(tar.extractfile(members["flame.viz"]))
+            if not counts:
+                self.stdio.verbose("No flame.folded or flame.viz in pack {0}, skip flame graph SVG.".format(local_tar_path))
                 return
-            started_loading = False
+            flame_svg = os.path.join(local_stored_path, "{0}.flame.svg".format(remote_dir_name))
+            write_flame_svg(counts, flame_svg, title="Flame Graph: {0}".format(name))
+            with self.flame_lock:
+                self.flame_profiles[name] = counts
+            self.stdio.verbose("flame graph SVG of {0} written: {1}".format(name, flame_svg))
+        except Exception as e:
+            self.stdio.verbose("generate flame graph SVG of {0} failed: {1}".format(name, e))
+
+    def __match_diff_node(self):
+        """
+        names of the flame profiles --diff_node stands for: the node name itself (ip plus home_path, as in the summary),
+        or an ip (with "(obproxy)" for an obproxy) and then every node of that host
+        """
+        if self.diff_node in self.flame_profiles:
+            return [self.diff_node]
+        diff_node, kind = self.diff_node, ""
+        if diff_node.endswith("(obproxy)"):
+            diff_node, kind = diff_node[: -len("(obproxy)")], "(obproxy)"
+        prefix = node_key({"ip": diff_node}) + "_"
+        return sorted(name for name in self.flame_profiles if name.startswith(prefix) and name.endswith("(obproxy)") == bool(kind))
+
+    def __load_diff_base(self):
+        """folded stacks of an earlier capture: a .folded file, or a gather perf pack (tar.gz) / pack dir"""
+        path = os.path.abspath(os.path.expanduser(self.diff_base))
+        counts = collections.Counter()
+        if os.path.isdir(path):
+            for file_name in sorted(os.listdir(path)):
+                if file_name.endswith(".tar.gz") and file_name.startswith("perf_"):
+                    counts.update(self.__load_diff_base_pack(os.path.join(path, file_name)))
+        elif path.endswith(".tar.gz"):
+            counts = self.__load_diff_base_pack(path)
+        else:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                counts = read_folded(f)
+        return counts
+
+    @staticmethod
+    def __load_diff_base_pack(pack_path):
+        counts = collections.Counter()
+        with tarfile.open(pack_path, "r:gz") as tar:
+            for member in tar.getmembers():
+                if member.isfile() and os.path.basename(member.name) == "flame.folded":
+                    read_folded(tar.extractfile(member), counts)
+                elif member.isfile() and os.path.basename(member.name) == "flame.viz":
+                    fold_perf_script(tar.extractfile(member), counts)
+        return counts
+
+    def __report_flame_profiles(self, pack_dir):
+        """merged flame graph of all nodes, and the differential ones asked for by --diff_node / --diff_base"""
+        if not self.flame_profiles:
+            if self.diff_node or self.diff_base:
+                self.stdio.warn("no flame profile was gathered, skip the differential flame graph")
+            return
+        merged = merge_folded(self.flame_profiles.values())
+        if len(self.flame_profiles) > 1:
+            write_folded(merged, os.path.join(pack_dir, "flame_merged.folded"))
+            write_flame_svg(merged, os.path.join(pack_dir, "flame_merged.svg"), title="Flame Graph: merged {0} nodes".format(len(self.flame_profiles)))
+            self.stdio.print("merged flame graph of {0} nodes: {1}".format(len(self.flame_profiles), os.path.join(pack_dir, "flame_merged.svg")))
+        if self.diff_node:
+            names = self.__match_diff_node()
+            others = [counts for name, counts in self.flame_profiles.items() if names != [name]]
+            if not names:
+                self.stdio.warn("--diff_node {0}: no flame profile of this node, choices: {1}".format(self.diff_node, ", ".join(sorted(self.flame_profiles))))
+            elif len(names) > 1:
+                self.stdio.warn("--diff_node {0}: more than one node on this host, choose one of: {1}".format(self.diff_node, ", ".join(names)))
+            elif not others:
+                self.stdio.warn("--diff_node {0}: no other node to compare with".format(self.diff_node))
+            else:
+                diff_svg = os.path.join(pack_dir, "flame_diff_{0}.svg".format(names[0].replace("(", "_").replace(")", "")))
+                write_flame_svg(self.flame_profiles[names[0]], diff_svg, title="Differential Flame Graph: {0} vs other nodes".format(names[0]), base_counts=merge_folded(others))
+                self.stdio.print("differential flame graph of {0} against the other nodes: {1}".format(names[0], diff_svg))
+        if self.diff_base:
             try:
-                self.stdio.start_loading("generate flame graph SVG")
-                started_loading = True
-                with open(flame_viz, "r", encoding="utf-8", errors="ignore") as f_in:
-                    p1 = subprocess.Popen(
-                        ["perl", stackcollapse_pl],
-                        stdin=f_in,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                        cwd=extract_dir,
-                    )
-                    p2 = subprocess.Popen(
-                        ["perl", flamegraph_pl],
-                        stdin=p1.stdout,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                        cwd=extract_dir,
-                    )
-                    p1.stdout.close()
-                    out, err = p2.communicate(timeout=120)
-                if p2.returncode != 0:
-                    self.stdio.verbose("flamegraph.pl failed: {0}".format(err.decode("utf-8", errors="ignore") if err else "unknown"))
-                    return
-                flame_svg = os.path.join(extract_dir, "flame.svg")
-                with open(flame_svg, "wb") as f_out:
-                    f_out.write(out)
-                self.stdio.verbose("flame graph SVG written into pack: {0}".format(flame_svg))
-                self.stdio.print("flame graph SVG generated: open flame.svg in the pack to view.")
-                with tarfile.open(local_tar_path, "w:gz") as tar:
-                    for name in os.listdir(extract_dir):
-                        tar.add(os.path.join(extract_dir, name), arcname=name)
+                base_counts = self.__load_diff_base()
             except Exception as e:
-                self.stdio.verbose("generate flame graph SVG failed: {0}".format(e))
-            finally:
-                if started_loading:
-                    self.stdio.stop_loading("succeed")
-        except Exception as e:
-            self.stdio.verbose("extract or flame graph failed: {0}".format(e))
-        finally:
-            shutil.rmtree(extract_dir, ignore_errors=True)
+                self.stdio.warn("--diff_base {0}: can not read the base profile: {1}".format(self.diff_base, e))
+                return
+            if not base_counts:
+                self.stdio.warn("--diff_base {0}: no folded stacks found".format(self.diff_base))
+                return
+            diff_svg = os.path.join(pack_dir, "flame_diff_base.svg")
+            write_flame_svg(merged, diff_svg, title="Differential Flame Graph: this capture vs {0}".format(os.path.basename(self.diff_base.rstrip("/"))), base_counts=base_counts)
+            self.stdio.print("differential flame graph against {0}: {1}".format(self.diff_base, diff_svg))
 
     def __gather_perf_sample(self, ssh_client, gather_path, pid_observer):
         try:
@@ -403,10 +585,8 @@ class GatherPerfHandler(BaseShellHandler):
             if flame_size_int == 0:
                 self.stdio.error("perf record produced empty flame.data on server [{0}]. " "Possible causes: Permission denied (run as root or set kernel.perf_event_paranoid=-1)".format(ssh_client.get_name()))
                 raise Exception("perf record produced empty output")
-            generate_data = "cd {gather_path} && perf script -i flame.data > flame.viz".format(gather_path=gather_path)
-            self.stdio.verbose("generate perf data, run cmd = [{0}]".format(generate_data))
-            ssh_client.exec_cmd(generate_data)
-            self.is_ready(ssh_client, os.path.join(gather_path, 'flame.viz'))
+            flame_path = self.__fold_flame_remote(ssh_client, gather_path, 'flame.data')
+            self.is_ready(ssh_client, flame_path)
             self.stdio.stop_loading('gather perf flame')
         except Exception as e:
             self.stdio.error("generate perf data on server [{0}] failed: {1}".format(ssh_client.get_name(), e))
@@ -15,15 +15,21 @@
 @file: gather_plan_monitor.py
 @desc:
 """
+import copy
 import os
 import re
 import sys
 import shutil
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
 import tabulate
 from prettytable import from_db_cursor
-from src.common.ob_connector import OBConnector
+from src.common.ob_connector import OBConnector, get_ob_connector_pool
+from src.common.constant import const
+from src.common.report_builder import ReportBuilder
+from src.common.ob_sql_fanout import FanoutTask, RowsCursor, SqlFanout, add_server_filter, get_observer_servers, sort_rows
 from src.handler.meta.html_meta import GlobalHtmlMeta
 from src.handler.meta.sql_meta import GlobalSqlMeta
 from src.common.tool import Util
@@ -39,6 +45,17 @@ from src.common.version import OBDIAG_VERSION
 
 
 class GatherPlanMonitorHandler(object):
+    DETAIL_ORDER_BY_V1 = "PLAN_LINE_ID ASC, SVR_IP, SVR_PORT, CHANGE_TS, PROCESS_NAME ASC"
+    DETAIL_ORDER_BY_V2 = "PROCESS_NAME ASC, PLAN_LINE_ID ASC, FIRST_REFRESH_TIME ASC"
+    REPORT_USED_SQL_TEMPLATE = (
+        "<h4>本报告在租户下使用的 SQL</h4>"
+        "<div class='help' style='font-size:11px'>DFO 级<hr /><pre>{{ dfo_sql }}</pre></div><br/>"
+        "<div class='help' style='font-size:11px'>机器级<hr /><pre>{{ svr_agg_sql }}</pre></div><br/>"
+        "<div class='help' style='font-size:11px'>线程级<hr /><pre>{{ detail_sql }}</pre></div><br/>"
+    )
+    REPORT_VERSION_TEMPLATE = "Report generation time： {{ report_time }} <br>" "obdiag version: {{ obdiag_version }} <br>" "observer version: {{ ob_version }} <br>" "{% if commit_id %}observer commit id: {{ commit_id }} <br>{% endif %}"
+    _schema_lock = threading.Lock()
+
     def __init__(self, context, gather_pack_dir='./', is_scene=False):
         self.context = context
         self.stdio = context.stdio
@@ -49,6 +66,8 @@ class GatherPlanMonitorHandler(object):
         self.database = None
         self.enable_dump_db = True
         self.trace_id = None
+        self.trace_ids = []
+        self.report_builder = None
         self.env = {}
         self.STAT_NAME = {}
         self.report_file_path = ""
@@ -63,6 +82,12 @@ class GatherPlanMonitorHandler(object):
         # query_sql from sql_audit may be very long (e.g. INSERT with blob hex); cap EXPLAIN to avoid 1064 spam.
         # See obdiag#1202.
         self._max_explain_sql_chars = 65536
+        # --split_by_server: sql_audit / sql_plan_monitor are queried per server over the connection pool
+        self.split_by_server = False
+        self.server_timeout = None
+        self.partial_servers = {}
+        self._servers = None
+        self._fanout_cache = {}
         if self.context.get_variable("gather_timestamp", None):
             self.gather_timestamp = self.context.get_variable("gather_timestamp")
         else:
@@ -71,10 +96,14 @@ class GatherPlanMonitorHandler(object):
     def init_config(self):
         ob_cluster = self.context.cluster_config
         self.ob_cluster = ob_cluster
-        self.sys_connector = OBConnector(context=self.context, ip=ob_cluster.get("db_host"), port=ob_cluster.get("db_port"), username=ob_cluster.get("tenant_sys").get("user"), password=ob_cluster.get("tenant_sys").get("password"), timeout=100)
+        self.sys_connector = self.__new_sys_connector()
         self.ob_cluster_name = ob_cluster.get("ob_cluster_name")
         return True
 
+    def __new_sys_connector(self):
+        ob_cluster = self.ob_cluster
+        return OBConnector(context=self.context, ip=ob_cluster.get("db_host"), port=ob_cluster.get("db_port"), username=ob_cluster.get("tenant_sys").get("user"), password=ob_cluster.get("tenant_sys").get("password"), timeout=100)
+
     def init_option(self):
         options = self.context.options
         trace_id_option = Util.get_option(options, 'trace_id')
@@ -84,7 +113,8 @@ class GatherPlanMonitorHandler(object):
         if self.context.get_variable("gather_plan_monitor_trace_id", None):
             trace_id_option = self.context.get_variable("gather_plan_monitor_trace_id")
         if trace_id_option is not None:
-            self.trace_id = trace_id_option
+            self.trace_ids = [trace_id.strip() for trace_id in str(trace_id_option).split(",") if trace_id.strip()]
+            self.trace_id = self.trace_ids[0] if self.trace_ids else trace_id_option
         else:
             self.stdio.error("option --trace_id not found, please provide")
             return False
@@ -102,6 +132,16 @@ class GatherPlanMonitorHandler(object):
             self.db_connector = self.sys_connector
         if skip_option:
             self.skip = skip_option
+        self.split_by_server = bool(Util.get_option(options, 'split_by_server'))
+        server_timeout_option = Util.get_option(options, 'server_timeout')
+        if server_timeout_option is not None:
+            try:
+                self.server_timeout = int(server_timeout_option)
+                if self.server_timeout < 1:
+                    raise ValueError()
+            except (TypeError, ValueError):
+                self.stdio.error('option --server_timeout must be a positive integer (seconds)')
+                return False
         return self.tenant_mode_detected()
 
     def __init_db_connector(self):
@@ -124,134 +164,6 @@ class GatherPlanMonitorHandler(object):
         gather_tuples = []
         gather_pack_path_dict = {}
 
-        def handle_plan_monitor_from_ob(cluster_name):
-            """
-            handler sql plan monitor from ob
-            :return:
-            """
-            st = time.time()
-            resp = self.init_resp()
-            result_sql_audit_by_trace_id_limit1 = self.select_sql_audit_by_trace_id_limit1()
-            if len(result_sql_audit_by_trace_id_limit1) > 0:
-                trace = result_sql_audit_by_trace_id_limit1[0]
-                trace_id = trace[0]
-                user_sql = trace[1] or ""
-                sql = trace[1] or ""
-                tenant_name = trace[6]
-                db_name = trace[8]
-                plan_id = trace[9]
-                tenant_id = trace[10]
-                svr_ip = trace[12]
-                svr_port = trace[13]
-                params_value = None
-                try:
-                    params_value = trace[14]
-                except IndexError:
-                    # OB 3.x
-                    self.stdio.verbose("OceanBase version is 3.x, params_value column is not available.")
-
-                # 如果params_value不为空，说明是PS模式的SQL，需要填充参数
-                if params_value:
-                    sql = StringUtils.fill_sql_with_params(sql, params_value, self.stdio)
-                    user_sql = sql
-                self.stdio.verbose("TraceID : %s " % trace_id)
-                self.stdio.verbose("SQL : %s " % sql)
-                self.stdio.verbose("SVR_IP : %s " % svr_ip)
-                self.stdio.verbose("SVR_PORT : %s " % svr_port)
-                self.stdio.verbose("DB: %s " % db_name)
-                self.stdio.verbose("PLAN_ID: %s " % plan_id)
-                self.stdio.verbose("TENANT_NAME: %s " % tenant_name)
-                self.stdio.verbose("TENANT_ID: %s " % tenant_id)
-
-                sql_plan_monitor_svr_agg_template = self.sql_plan_monitor_svr_agg_template_sql()
-                sql_plan_monitor_svr_agg_v1 = str(sql_plan_monitor_svr_agg_template).replace("##REPLACE_TRACE_ID##", trace_id).replace("##REPLACE_ORDER_BY##", "PLAN_LINE_ID ASC, MAX_CHANGE_TIME ASC, SVR_IP, SVR_PORT")
-                sql_plan_monitor_svr_agg_v2 = str(sql_plan_monitor_svr_agg_template).replace("##REPLACE_TRACE_ID##", trace_id).replace("##REPLACE_ORDER_BY##", "SVR_IP, SVR_PORT, PLAN_LINE_ID")
-
-                sql_plan_monitor_detail_template = self.sql_plan_monitor_detail_template_sql()
-                sql_plan_monitor_detail_v1 = str(sql_plan_monitor_detail_template).replace("##REPLACE_TRACE_ID##", trace_id).replace("##REPLACE_ORDER_BY##", "PLAN_LINE_ID ASC, SVR_IP, SVR_PORT, CHANGE_TS, PROCESS_NAME ASC")
-                sql_plan_monitor_detail_v2 = str(sql_plan_monitor_detail_template).replace("##REPLACE_TRACE_ID##", trace_id).replace("##REPLACE_ORDER_BY##", "PROCESS_NAME ASC, PLAN_LINE_ID ASC, FIRST_REFRESH_TIME ASC")
-
-                sql_plan_monitor_dfo_op = self.sql_plan_monitor_dfo_op_sql(tenant_id, plan_id, trace_id, svr_ip, svr_port)
-                sql_ash_top_event = self.sql_ash_top_event_sql(tenant_id, trace_id)
-                sql_plan_monitor_db_time = self.sql_plan_monitor_db_time_sql(tenant_id, trace_id)
-                full_audit_sql_by_trace_id_sql = self.full_audit_sql_by_trace_id_sql(trace_id)
-                plan_explain_sql = self.plan_explain_sql(tenant_id, plan_id, svr_ip, svr_port)
-
-                # 输出报告头
-                self.stdio.verbose("[sql plan monitor report task] report header")
-                self.report_header()
-                # 输出sql_audit的概要信息
-                self.stdio.verbose("[sql plan monitor report task] report sql_audit")
-                if not self.report_sql_audit():
-                    return
-                # 输出sql explain的信息（长 SQL / 含二进制时不要打全量，避免刷屏）
-                self.stdio.verbose("[sql plan monitor report task] report plan explain, sql (truncated): [{0}]".format(self._truncate_sql_for_log(sql)))
-                self.report_plan_explain(db_name, sql)
-                # 输出plan cache的信息
-                self.stdio.verbose("[sql plan monitor report task] report plan cache")
-                self.report_plan_cache(plan_explain_sql)
-                # dbms_xplan.display_cursor
-                display_cursor_sql = "SELECT CONVERT(DBMS_XPLAN.DISPLAY_CURSOR({plan_id}, 'all', '{svr_ip}',  {svr_port}, {tenant_id}) USING utf8mb4) FROM DUAL".format(plan_id=plan_id, svr_ip=svr_ip, svr_port=svr_port, tenant_id=tenant_id)
-                self.report_display_cursor_obversion4(display_cursor_sql)
-                # 输出表结构的信息
-                self.stdio.verbose("[sql plan monitor report task] report table schema")
-                self.report_schema(user_sql, tenant_name)
-                # 检查表和列的collation一致性
-                self.stdio.verbose("[sql plan monitor report task] check table collation")
-                self.report_table_collation_check(user_sql, db_name)
-                # 统计信息直方图 (Issue #626)
-                self.stdio.verbose("[sql plan monitor report task] report table histograms")
-                self.report_table_histograms(user_sql, db_name)
-                # ASH 统计
-                self.stdio.verbose("[ash report task] report ash, sql: [{0}]".format(sql_ash_top_event))
-                self.report_ash_obversion4(sql_ash_top_event)
-                self.init_monitor_stat()
-                # 输出sql_audit的详细信息
-                self.stdio.verbose("[sql plan monitor report task] report sql_audit details")
-                self.report_sql_audit_details(full_audit_sql_by_trace_id_sql)
-                # 输出算子信息 表+图
-                self.stdio.verbose("[sql plan monitor report task] report sql plan monitor dfo")
-                self.report_sql_plan_monitor_dfo_op(sql_plan_monitor_dfo_op)
-                # db time
-                self.stdio.verbose("[db time display task] report db time display")
-                self.report_db_time_display_op(sql_plan_monitor_db_time)
-                # 输出算子信息按 svr 级汇总 表+图
-                self.stdio.verbose("[sql plan monitor report task] report sql plan monitor group by server")
-                self.report_sql_plan_monitor_svr_agg(sql_plan_monitor_svr_agg_v1, sql_plan_monitor_svr_agg_v2)
-                self.report_fast_preview()
-                # 输出算子信息按算子维度聚集
-                self.stdio.verbose("[sql plan monitor report task] sql plan monitor detail operator")
-                self.report_sql_plan_monitor_detail_operator_priority(sql_plan_monitor_detail_v1)
-                # 输出算子信息按线程维度聚集
-                self.stdio.verbose("[sql plan monitor report task] sql plan monitor group by priority")
-                self.reportsql_plan_monitor_detail_svr_priority(sql_plan_monitor_detail_v2)
-
-                # 输出本报告在租户下使用的 SQL
-                self.__report("<h4>本报告在租户下使用的 SQL</h4>")
-                self.__report("<div class='help' style='font-size:11px'>DFO 级<hr /><pre>%s</pre></div><br/>" % (sql_plan_monitor_dfo_op))
-                self.__report("<div class='help' style='font-size:11px'>机器级<hr /><pre>%s</pre></div><br/>" % (sql_plan_monitor_svr_agg_v1))
-                self.__report("<div class='help' style='font-size:11px'>线程级<hr /><pre>%s</pre></div><br/>" % (sql_plan_monitor_detail_v1))
-
-                t = time.localtime(time.time())
-                self.__report("Report generation time： %s <br>" % (time.strftime("%Y-%m-%d %H:%M:%S", t)))
-                self.__report("obdiag version: {0} <br>".format(OBDIAG_VERSION))
-                self.__report("observer version: {0} <br>".format(self.ob_version))
-                observer_version_commit_id = get_observer_commit_id(self.context)
-                if observer_version_commit_id:
-                    self.__report("observer commit id: {0} <br>".format(observer_version_commit_id))
-                self.report_footer()
-                self.stdio.verbose("report footer complete")
-            else:
-                self.stdio.error("The data queried with the specified trace_id {0} from {1} is empty. Please verify if this trace_id has expired.".format(self.trace_id, self.sql_audit_name))
-
-            if resp["skip"]:
-                return
-            if resp["error"]:
-                gather_tuples.append((cluster_name, True, resp["error_msg"], 0, int(time.time() - st), "Error:{0}".format(resp["error_msg"]), ""))
-                return
-            gather_pack_path_dict[cluster_name] = resp["gather_pack_path"]
-            gather_tuples.append((cluster_name, False, "", int(time.time() - st), pack_dir_this_command))
-
         if getattr(sys, 'frozen', False):
             absPath = os.path.dirname(sys.executable)
         else:
@@ -261,14 +173,187 @@ class GatherPlanMonitorHandler(object):
         target_resources_path = os.path.join(pack_dir_this_command, "resources")
         self.copy_cs_resource(cs_resources_path, target_resources_path)
         self.stdio.verbose("[sql plan monitor report task] start")
-        handle_plan_monitor_from_ob(self.ob_cluster_name)
+        if len(self.trace_ids) > 1:
+            # one report per trace id, rendered concurrently by copies of this handler with their own connections
+            handlers = {}
+            for trace_id in self.trace_ids:
+                handlers[trace_id] = self.__fork_for_trace(trace_id, os.path.join(pack_dir_this_command, "sql_plan_monitor_report_{0}.html".format(trace_id)))
+            with ThreadPoolExecutor(max_workers=min(const.GATHER_THREADS_LIMIT, len(handlers))) as executor:
+                futures = [executor.submit(handler.handle_plan_monitor_from_ob, "{0}({1})".format(self.ob_cluster_name, trace_id), pack_dir_this_command, gather_tuples, gather_pack_path_dict) for trace_id, handler in handlers.items()]
+                for future in futures:
+                    future.result()
+            for trace_id, handler in handlers.items():
+                if handler.partial_servers:
+                    self.partial_servers[trace_id] = handler.partial_servers
+        else:
+            self.handle_plan_monitor_from_ob(self.ob_cluster_name, pack_dir_this_command, gather_tuples, gather_pack_path_dict)
         self.stdio.verbose("[sql plan monitor report task] end")
         summary_tuples = self.__get_overall_summary(gather_tuples)
         self.stdio.print(summary_tuples)
         # 将汇总结果持久化记录到文件中
         FileUtil.write_append(os.path.join(pack_dir_this_command, "result_summary.txt"), summary_tuples)
         # return gather_tuples, gather_pack_path_dict
-        return ObdiagResult(ObdiagResult.SUCCESS_CODE, data={"store_dir": pack_dir_this_command})
+        data = {"store_dir": pack_dir_this_command}
+        if self.partial_servers:
+            data["partial"] = self.partial_servers
+        return ObdiagResult(ObdiagResult.SUCCESS_CODE, data=data)
+
+    def handle_plan_monitor_from_ob(self, cluster_name, pack_dir_this_command, gather_tuples, gather_pack_path_dict):
+        """
+        handler sql plan monitor from ob
+        :return:
+        """
+        st = time.time()
+        resp = self.init_resp()
+        self.report_builder = ReportBuilder(self.report_file_path, mode='w')
+        try:
+            if self.__report_plan_monitor() is False:
+                return
+        finally:
+            self.report_builder.close()
+            self.report_builder = None
+        if resp["skip"]:
+            return
+        if resp["error"]:
+            gather_tuples.append((cluster_name, True, resp["error_msg"], 0, int(time.time() - st), "Error:{0}".format(resp["error_msg"]), ""))
+            return
+        gather_pack_path_dict[cluster_name] = resp["gather_pack_path"]
+        gather_tuples.append((cluster_name, False, "", int(time.time() - st), pack_dir_this_command))
+
+    def __report_plan_monitor(self):
+        result_sql_audit_by_trace_id_limit1 = self.select_sql_audit_by_trace_id_limit1()
+        if len(result_sql_audit_by_trace_id_limit1) > 0:
+            trace = result_sql_audit_by_trace_id_limit1[0]
+            trace_id = trace[0]
+            user_sql = trace[1] or ""
+            sql = trace[1] or ""
+            tenant_name = trace[6]
+            db_name = trace[8]
+            plan_id = trace[9]
+            tenant_id = trace[10]
+            svr_ip = trace[12]
+            svr_port = trace[13]
+            params_value = None
+            try:
+                params_value = trace[14]
+            except IndexError:
+                # OB 3.x
+                self.stdio.verbose("OceanBase version is 3.x, params_value column is not available.")
+
+            # 如果params_value不为空，说明是PS模式的SQL，需要填充参数
+            if params_value:
+                sql = StringUtils.fill_sql_with_params(sql, params_value, self.stdio)
+                user_sql = sql
+            self.stdio.verbose("TraceID : %s " % trace_id)
+            self.stdio.verbose("SQL : %s " % sql)
+            self.stdio.verbose("SVR_IP : %s " % svr_ip)
+            self.stdio.verbose("SVR_PORT : %s " % svr_port)
+            self.stdio.verbose("DB: %s " % db_name)
+            self.stdio.verbose("PLAN_ID: %s " % plan_id)
+            self.stdio.verbose("TENANT_NAME: %s " % tenant_name)
+            self.stdio.verbose("TENANT_ID: %s " % tenant_id)
+
+            sql_plan_monitor_svr_agg_template = self.sql_plan_monitor_svr_agg_template_sql()
+            sql_plan_monitor_svr_agg_v1 = str(sql_plan_monitor_svr_agg_template).replace("##REPLACE_TRACE_ID##", trace_id).replace("##REPLACE_ORDER_BY##", "PLAN_LINE_ID ASC, MAX_CHANGE_TIME ASC, SVR_IP, SVR_PORT")
+            sql_plan_monitor_svr_agg_v2 = str(sql_plan_monitor_svr_agg_template).replace("##REPLACE_TRACE_ID##", trace_id).replace("##REPLACE_ORDER_BY##", "SVR_IP, SVR_PORT, PLAN_LINE_ID")
+
+            sql_plan_monitor_detail_template = self.sql_plan_monitor_detail_template_sql()
+            sql_plan_monitor_detail_v1 = str(sql_plan_monitor_detail_template).replace("##REPLACE_TRACE_ID##", trace_id).replace("##REPLACE_ORDER_BY##", self.DETAIL_ORDER_BY_V1)
+            sql_plan_monitor_detail_v2 = str(sql_plan_monitor_detail_template).replace("##REPLACE_TRACE_ID##", trace_id).replace("##REPLACE_ORDER_BY##", self.DETAIL_ORDER_BY_V2)
+
+            sql_plan_monitor_dfo_op = self.sql_plan_monitor_dfo_op_sql(tenant_id, plan_id, trace_id, svr_ip, svr_port)
+            sql_ash_top_event = self.sql_ash_top_event_sql(tenant_id, trace_id)
+            sql_plan_monitor_db_time = self.sql_plan_monitor_db_time_sql(tenant_id, trace_id)
+            full_audit_sql_by_trace_id_sql = self.full_audit_sql_by_trace_id_sql(trace_id)
+            plan_explain_sql = self.plan_explain_sql(tenant_id, plan_id, svr_ip, svr_port)
+
+            # 输出报告头
+            self.stdio.verbose("[sql plan monitor report task] report header")
+            self.report_header()
+            # 输出sql_audit的概要信息
+            self.stdio.verbose("[sql plan monitor report task] report sql_audit")
+            if not self.report_sql_audit():
+                return False
+            # 输出sql explain的信息（长 SQL / 含二进制时不要打全量，避免刷屏）
+            self.stdio.verbose("[sql plan monitor report task] report plan explain, sql (truncated): [{0}]".format(self._truncate_sql_for_log(sql)))
+            self.report_plan_explain(db_name, sql)
+            # 输出plan cache的信息
+            self.stdio.verbose("[sql plan monitor report task] report plan cache")
+            self.report_plan_cache(plan_explain_sql)
+            # dbms_xplan.display_cursor
+            display_cursor_sql = "SELECT CONVERT(DBMS_XPLAN.DISPLAY_CURSOR({plan_id}, 'all', '{svr_ip}',  {svr_port}, {tenant_id}) USING utf8mb4) FROM DUAL".format(plan_id=plan_id, svr_ip=svr_ip, svr_port=svr_port, tenant_id=tenant_id)
+            self.report_display_cursor_obversion4(display_cursor_sql)
+            # 输出表结构的信息
+            self.stdio.verbose("[sql plan monitor report task] report table schema")
+            self.report_schema(user_sql, tenant_name)
+            # 检查表和列的collation一致性
+            self.stdio.verbose("[sql plan monitor report task] check table collation")
+            self.report_table_collation_check(user_sql, db_name)
+            # 统计信息直方图 (Issue #626)
+            self.stdio.verbose("[sql plan monitor report task] report table histograms")
+            self.report_table_histograms(user_sql, db_name)
+            # ASH 统计
+            self.stdio.verbose("[ash report task] report ash, sql: [{0}]".format(sql_ash_top_event))
+            self.report_ash_obversion4(sql_ash_top_event)
+            self.init_monitor_stat()
+            # 输出sql_audit的详细信息
+            self.stdio.verbose("[sql plan monitor report task] report sql_audit details")
+            self.report_sql_audit_details(full_audit_sql_by_trace_id_sql)
+            # 输出算子信息 表+图
+            self.stdio.verbose("[sql plan monitor report task] report sql plan monitor dfo")
+            self.report_sql_plan_monitor_dfo_op(sql_plan_monitor_dfo_op)
+            # db time
+            self.stdio.verbose("[db time display task] report db time display")
+            self.report_db_time_display_op(sql_plan_monitor_db_time)
+            # 输出算子信息按 svr 级汇总 表+图
+            self.stdio.verbose("[sql plan monitor report task] report sql plan monitor group by server")
+            self.report_sql_plan_monitor_svr_agg(sql_plan_monitor_svr_agg_v1, sql_plan_monitor_svr_agg_v2)
+            self.report_fast_preview()
+            # 输出算子信息按算子维度聚集
+            self.stdio.verbose("[sql plan monitor report task] sql plan monitor detail operator")
+            self.report_sql_plan_monitor_detail_operator_priority(sql_plan_monitor_detail_v1)
+            # 输出算子信息按线程维度聚集
+            self.stdio.verbose("[sql plan monitor report task] sql plan monitor group by priority")
+            self.reportsql_plan_monitor_detail_svr_priority(sql_plan_monitor_detail_v2)
+
+            # 输出本报告在租户下使用的 SQL
+            self.report_builder.write_template(
+                self.REPORT_USED_SQL_TEMPLATE,
+                dfo_sql=sql_plan_monitor_dfo_op,
+                svr_agg_sql=sql_plan_monitor_svr_agg_v1,
+                detail_sql=sql_plan_monitor_detail_v1,
+            )
+            self.report_partial_servers()
+            self.report_builder.write_template(
+                self.REPORT_VERSION_TEMPLATE,
+                report_time=time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time())),
+                obdiag_version=OBDIAG_VERSION,
+                ob_version=self.ob_version,
+                commit_id=get_observer_commit_id(self.context),
+            )
+            self.report_footer()
+            self.stdio.verbose("report footer complete")
+        else:
+            self.stdio.error("The data queried with the specified trace_id {0} from {1} is empty. Please verify if this trace_id has expired.".format(self.trace_id, self.sql_audit_name))
+
+    def __fork_for_trace(self, trace_id, report_file_path):
+        handler = copy.copy(self)
+        handler.trace_id = trace_id
+        handler.trace_ids = [trace_id]
+        handler.report_file_path = report_file_path
+        handler.report_builder = None
+        handler.STAT_NAME = {}
+        handler.db_tables = []
+        handler.partial_servers = {}
+        handler._fanout_cache = {}
+        handler.sys_connector = self.__new_sys_connector()
+        if self.db_connector is self.sys_connector:
+            handler.db_connector = handler.sys_connector
+        else:
+            handler.db_connector = OBConnector(
+                context=self.context, ip=self.db_conn.get("host"), port=self.db_conn.get("port"), username=self.db_conn.get("user"), password=self.db_conn.get("password") or "", database=self.db_conn.get("database"), timeout=100
+            )
+        return handler
 
     def __init_db_conn(self, env):
         try:
@@ -419,6 +504,11 @@ class GatherPlanMonitorHandler(object):
         return result
 
     def report_schema(self, sql, tenant_name):
+        # the table dump goes through context variables and a file shared by the handlers of one gather
+        with self._schema_lock:
+            self.__report_schema(sql, tenant_name)
+
+    def __report_schema(self, sql, tenant_name):
         try:
             schemas = ""
             parse_tables = []
@@ -484,8 +574,7 @@ class GatherPlanMonitorHandler(object):
             header = GlobalHtmlMeta().get_value(key="sql_plan_monitor_report_header_obversion4")
         else:
             header = GlobalHtmlMeta().get_value(key="sql_plan_monitor_report_header")
-        with open(self.report_file_path, 'w') as f:
-            f.write(header)
+        self.__report(header)
         self.stdio.verbose("report header complete")
 
     def init_monitor_stat(self):
@@ -810,6 +899,9 @@ class GatherPlanMonitorHandler(object):
         self.__report(footer)
 
     def __report(self, s):
+        if self.report_builder is not None:
+            self.report_builder.write(s)
+            return
         with open(self.report_file_path, 'a') as f:
             f.write(s)
 
@@ -897,9 +989,41 @@ class GatherPlanMonitorHandler(object):
 
     def select_sql_audit_by_trace_id_limit1(self):
         sql = self.sql_audit_by_trace_id_limit1_sql()
+        if self.split_by_server:
+            columns, rows = self.fanout_by_server(sql, "sql_audit", order_by=["REQUEST_TIME DESC"], limit=1)
+            return [tuple(row.get(column) for column in columns) for row in rows]
         result = self.sys_connector.execute_sql(sql)
         return result
 
+    def fanout_by_server(self, sql, title, order_by=None, limit=None):
+        """
+        Run sql once per server, the svr_ip/svr_port filter is added after its trace_id predicate, and merge
+        the rows with order_by/limit. The result of a sql is cached, so the reports sharing it query once.
+        Servers not answering in --server_timeout are recorded in partial_servers.
+        :return: (columns, rows) with dict rows
+        """
+        if sql not in self._fanout_cache:
+            if self._servers is None:
+                self._servers = get_observer_servers(self.sys_connector, self.ob_major_version)
+            tasks = [FanoutTask(add_server_filter(sql, "trace_id", svr_ip, svr_port), svr_ip=svr_ip, svr_port=svr_port) for svr_ip, svr_port in self._servers]
+            pool = get_ob_connector_pool(self.context, self.ob_cluster, timeout=100)
+            result = SqlFanout(self.context, pool, timeout=self.server_timeout).run(tasks)
+            if result.partial:
+                self.partial_servers[title] = result.summary()["failed"]
+            self._fanout_cache[sql] = (result.columns, result.rows())
+        columns, rows = self._fanout_cache[sql]
+        if order_by:
+            rows = sort_rows(rows, order_by)
+        if limit is not None:
+            rows = rows[:limit]
+        return columns, rows
+
+    def report_partial_servers(self):
+        if not self.partial_servers:
+            return
+        items = "".join("<li>%s %s: %s</li>" % (title, name, reason) for title, failed in self.partial_servers.items() for name, reason in failed.items())
+        self.__report("<div class='help' style='font-size:11px'>部分 server 未在 --server_timeout 内返回, 报告不包含它们的数据<hr /><ul>%s</ul></div><br/>" % items)
+
     def plan_explain_sql(self, tenant_id, plan_id, svr_ip, svr_port):
         if self.tenant_mode == 'mysql':
             if self.ob_major_version >= 4:
@@ -1011,7 +1135,11 @@ class GatherPlanMonitorHandler(object):
     # sql audit 细节
     def report_sql_audit_details(self, sql):
         if self.enable_dump_db:
-            full_audit_sql_result = self.sys_connector.execute_sql_pretty(sql)
+            if self.split_by_server:
+                columns, rows = self.fanout_by_server(sql, "sql_audit details", order_by=["REQUEST_ID"], limit=1000)
+                full_audit_sql_result = from_db_cursor(RowsCursor(columns, rows))
+            else:
+                full_audit_sql_result = self.sys_connector.execute_sql_pretty(sql)
             # 保留原表格格式并添加\G风格的垂直显示
             # 获取原始表格HTML
             table_html = full_audit_sql_result.get_html_string()
@@ -1150,7 +1278,11 @@ class GatherPlanMonitorHandler(object):
         sql = self.sql_audit_by_trace_id_limit1_sql()
         self.stdio.verbose("select sql_audit from ob with SQL: %s", sql)
         try:
-            sql_audit_result = self.sys_connector.execute_sql_pretty(sql)
+            if self.split_by_server:
+                columns, rows = self.fanout_by_server(sql, "sql_audit", order_by=["REQUEST_TIME DESC"], limit=1)
+                sql_audit_result = from_db_cursor(RowsCursor(columns, rows))
+            else:
+                sql_audit_result = self.sys_connector.execute_sql_pretty(sql)
             if not sql_audit_result:
                 self.stdio.error("failed to find the related sql_audit for the given trace_id:{0}", self.trace_id)
                 return False
@@ -1273,15 +1405,27 @@ class GatherPlanMonitorHandler(object):
             self.report_svr_agg_graph_data('svr_agg_serial_v2', cursor_data_sql_plan_monitor_svr_agg_v2, '机器优先视图')
         self.stdio.verbose("report SQL_PLAN_MONITOR SQC server priority complete")
 
+    def __detail_cursor(self, sql, order_by, dictionary):
+        # v1 and v2 of the detail sql only differ in ORDER BY, with --split_by_server the rows are fetched once and sorted here
+        sql = sql.replace(self.DETAIL_ORDER_BY_V2, self.DETAIL_ORDER_BY_V1)
+        columns, rows = self.fanout_by_server(sql, "sql_plan_monitor", order_by=order_by.split(","))
+        return RowsCursor(columns, rows, dictionary=dictionary)
+
     def report_sql_plan_monitor_detail_operator_priority(self, sql):
-        cursor_sql_plan_monitor_detail = self.sys_connector.execute_sql_return_cursor(sql)
+        if self.split_by_server:
+            cursor_sql_plan_monitor_detail = self.__detail_cursor(sql, self.DETAIL_ORDER_BY_V1, False)
+        else:
+            cursor_sql_plan_monitor_detail = self.sys_connector.execute_sql_return_cursor(sql)
         self.__report(
             "<div><h2 id='detail_table_anchor'>SQL_PLAN_MONITOR 详情</h2><div class='v' id='detail_table' style='display: none'>"
             + ("no result in --fast mode" if self.enable_fast_dump else from_db_cursor(cursor_sql_plan_monitor_detail).get_html_string())
             + "</div><div class='shortcut'><a href='#detail_serial_v1'>Goto 算子优先</a> <a href='#detail_serial_v2'>Goto 线程优先</a></div></div>"
         )
         self.stdio.verbose("report SQL_PLAN_MONITOR details complete")
-        cursor_sql_plan_monitor_detail_v1 = self.sys_connector.execute_sql_return_cursor_dictionary(sql)
+        if self.split_by_server:
+            cursor_sql_plan_monitor_detail_v1 = self.__detail_cursor(sql, self.DETAIL_ORDER_BY_V1, True)
+        else:
+            cursor_sql_plan_monitor_detail_v1 = self.sys_connector.execute_sql_return_cursor_dictionary(sql)
         if self.ob_major_version >= 4:
             self.report_detail_graph_data_obversion4("detail_serial_v1", cursor_sql_plan_monitor_detail_v1, '算子优先视图')
         else:
@@ -1289,7 +1433,10 @@ class GatherPlanMonitorHandler(object):
         self.stdio.verbose("report SQL_PLAN_MONITOR details operator priority complete")
 
     def reportsql_plan_monitor_detail_svr_priority(self, sql):
-        cursor_sql_plan_monitor_detail_v2 = self.sys_connector.execute_sql_return_cursor_dictionary(sql)
+        if self.split_by_server:
+            cursor_sql_plan_monitor_detail_v2 = self.__detail_cursor(sql, self.DETAIL_ORDER_BY_V2, True)
+        else:
+            cursor_sql_plan_monitor_detail_v2 = self.sys_connector.execute_sql_return_cursor_dictionary(sql)
         if self.ob_major_version >= 4:
             self.report_detail_graph_data_obversion4("detail_serial_v2", cursor_sql_plan_monitor_detail_v2, '线程优先视图')
         else:
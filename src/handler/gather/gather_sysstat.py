@@ -16,13 +16,17 @@
 @desc:
 """
 import os
+import tarfile
+import tempfile
 import time
 import datetime
 
 import tabulate
 from src.common.constant import const
 from src.common.command import SshClient
-from src.common.command import get_file_size, download_file, mkdir
+from src.common.command import get_file_size, download_file, mkdir, upload_file, get_observer_pid
+from src.common.node_runner import NodeRunner
+from src.common.proc_sampler import SAMPLER_FILE_NAME, SAMPLER_SCRIPT, SAMPLER_SCRIPT_NAME, decode_samples, write_sample_reports
 from src.handler.base_shell_handler import BaseShellHandler
 from src.common.tool import Util
 from src.common.tool import DirectoryUtil
@@ -40,6 +44,8 @@ class GatherOsInfoHandler(BaseShellHandler):
         self.remote_stored_path = None
         self.is_scene = is_scene
         self.config_path = const.DEFAULT_CONFIG_PATH
+        self.gather_tuples = []
+        self.sampler_script_path = None
         if self.context.get_variable("gather_timestamp", None):
             self.gather_timestamp = self.context.get_variable("gather_timestamp")
         else:
@@ -51,6 +57,8 @@ class GatherOsInfoHandler(BaseShellHandler):
         if new_nodes:
             self.nodes = new_nodes
         self.inner_config = self.context.inner_config
+        self.sample_interval = 1
+        self.sample_duration = 10
         if self.inner_config is None:
             self.file_number_limit = 20
             self.file_size_limit = 2 * 1024 * 1024 * 1024
@@ -59,6 +67,19 @@ class GatherOsInfoHandler(BaseShellHandler):
             self.file_number_limit = int(basic_config["file_number_limit"])
             self.file_size_limit = int(FileUtil.size(basic_config["file_size_limit"]))
             self.config_path = basic_config['config_path']
+            sysstat_config = (self.inner_config.get('gather') or {}).get('sysstat') or {}
+            self.sample_interval = float(sysstat_config.get('sample_interval', self.sample_interval))
+            self.sample_duration = int(sysstat_config.get('sample_duration', self.sample_duration))
+        # --sample_duration asks for the sampler on every node, otherwise it only stands in for a missing tsar
+        self.sample_always = False
+        if self.sample_duration_option is not None:
+            self.sample_duration = self.sample_duration_option
+            self.sample_always = self.sample_duration > 0
+        if self.sample_interval_option is not None:
+            self.sample_interval = self.sample_interval_option
+        if self.sample_interval <= 0:
+            self.stdio.error("sample_interval must be greater than 0, got {0}".format(self.sample_interval))
+            return False
         for node in self.nodes:
             if node.get("ssh_type") == "docker":
                 self.stdio.warn("the ssh_type is docker not support sysstat")
@@ -74,6 +95,8 @@ class GatherOsInfoHandler(BaseShellHandler):
                 os.makedirs(os.path.abspath(store_dir_option))
             self.local_stored_path = os.path.abspath(store_dir_option)
         self.scope_option = Util.get_option(options, 'scope')
+        self.sample_interval_option = Util.get_option(options, 'sample_interval')
+        self.sample_duration_option = Util.get_option(options, 'sample_duration')
         return True
 
     def handle(self):
@@ -89,23 +112,30 @@ class GatherOsInfoHandler(BaseShellHandler):
         else:
             pack_dir_this_command = os.path.join(self.local_stored_path, "obdiag_gather_pack_{0}".format(TimeUtils.timestamp_to_filename_time(self.gather_timestamp)))
         self.stdio.verbose("Use {0} as pack dir.".format(pack_dir_this_command))
-        gather_tuples = []
-
-        def handle_from_node(node):
-            st = time.time()
-            resp = self.__handle_from_node(node, pack_dir_this_command)
-            file_size = ""
-            if len(resp["error"]) == 0:
-                file_size = os.path.getsize(resp["gather_pack_path"])
-            gather_tuples.append((node.get("ip"), False, resp["error"], file_size, int(time.time() - st), resp["gather_pack_path"]))
+        gather_tuples = self.gather_tuples = []
 
         exec_tag = False
-        for node in self.nodes:
-            if node.get("ssh_type") == "docker" or node.get("ssh_type") == "kubernetes":
-                self.stdio.warn("Skip gather from node {0} because it is a docker or kubernetes node".format(node.get("ip")))
-                continue
-            handle_from_node(node)
-            exec_tag = True
+        try:
+            nodes = []
+            for node in self.nodes:
+                if node.get("ssh_type") == "docker" or node.get("ssh_type") == "kubernetes":
+                    self.stdio.warn("Skip gather from node {0} because it is a docker or kubernetes node".format(node.get("ip")))
+                    continue
+                nodes.append(node)
+            states = [self.__prepare_node(node, pack_dir_this_command) for node in nodes]
+            # the samplers of all the nodes run at once, so their samples cover the same seconds
+            self.__run_proc_samplers([state for state in states if state["sample_cmd"]])
+            for state in states:
+                st = time.time()
+                resp = self.__pack_node(state, pack_dir_this_command)
+                file_size = ""
+                if len(resp["error"]) == 0:
+                    file_size = os.path.getsize(resp["gather_pack_path"])
+                gather_tuples.append((state["node"].get("ip"), False, resp["error"], file_size, int(state["elapsed"] + time.time() - st), resp["gather_pack_path"]))
+                exec_tag = True
+        finally:
+            if self.sampler_script_path and os.path.exists(self.sampler_script_path):
+                os.remove(self.sampler_script_path)
 
         if not exec_tag:
             self.stdio.verbose("No node to gather from, skip")
@@ -117,52 +147,67 @@ class GatherOsInfoHandler(BaseShellHandler):
         FileUtil.write_append(os.path.join(pack_dir_this_command, "result_summary.txt"), summary_tuples)
         return ObdiagResult(ObdiagResult.SUCCESS_CODE, data={"store_dir": pack_dir_this_command})
 
-    def __handle_from_node(self, node, local_stored_path):
-        resp = {"skip": False, "error": "", "gather_pack_path": ""}
+    def __prepare_node(self, node, local_stored_path):
+        """everything of the node up to the /proc sampler, which only gets its command ready in sample_cmd"""
+        st = time.time()
+        state = {"node": node, "ssh_client": None, "error": "", "sample_cmd": None, "sampled": False}
         remote_ip = node.get("ip")
         remote_user = node.get("ssh_username")
         self.stdio.verbose("Sending Collect Shell Command to node {0} ...".format(remote_ip))
         DirectoryUtil.mkdir(path=local_stored_path, stdio=self.stdio)
         now_time = datetime.datetime.now().strftime('%Y%m%d%H%M%S')
-        remote_dir_name = "sysstat_{0}_{1}".format(remote_ip.replace(":", "_"), now_time)
-        remote_dir_full_path = "/tmp/{0}".format(remote_dir_name)
-        ssh_failed = False
-        ssh_client = None
+        state["remote_dir_name"] = "sysstat_{0}_{1}".format(remote_ip.replace(":", "_"), now_time)
+        remote_dir_full_path = state["remote_dir_full_path"] = "/tmp/{0}".format(state["remote_dir_name"])
         try:
-            ssh_client = SshClient(self.context, node)
+            ssh_client = state["ssh_client"] = SshClient(self.context, node)
         except Exception:
             self.stdio.exception("ssh {0}@{1}: failed, Please check the node conf.".format(remote_user, remote_ip))
-            ssh_failed = True
-            resp["skip"] = True
-            resp["error"] = "Please check the node conf."
-        if not ssh_failed:
-            mkdir(ssh_client, remote_dir_full_path, self.stdio)
+            state["error"] = "Please check the node conf."
+            state["elapsed"] = time.time() - st
+            return state
+        mkdir(ssh_client, remote_dir_full_path, self.stdio)
 
-            self.__gather_dmesg_boot_info(ssh_client, remote_dir_full_path)
-            self.__gather_dmesg_current_info(ssh_client, remote_dir_full_path)
-            if self.__tsar_exit(ssh_client):
-                self.__gather_cpu_info(ssh_client, remote_dir_full_path)
-                self.__gather_mem_info(ssh_client, remote_dir_full_path)
-                self.__gather_swap_info(ssh_client, remote_dir_full_path)
-                self.__gather_io_info(ssh_client, remote_dir_full_path)
-                self.__gather_traffic_info(ssh_client, remote_dir_full_path)
-                self.__gather_tcp_udp_info(ssh_client, remote_dir_full_path)
-            tar_cmd = "cd /tmp && tar -czf {0}.tar.gz {0}/*".format(remote_dir_name)
-            self.stdio.verbose("tar the pack by {0}".format(tar_cmd))
-            tar_request = ssh_client.exec_cmd("cd /tmp && tar -czf {0}.tar.gz {0}/*".format(remote_dir_name))
-            self.stdio.verbose("tar_request: {0}".format(tar_request))
-            remote_file_full_path = os.path.join("/tmp/{0}.tar.gz".format(remote_dir_name))
-            file_size = get_file_size(ssh_client, remote_file_full_path, self.stdio)
-            if int(file_size) < self.file_size_limit:
-                local_file_path = "{0}/{1}".format(local_stored_path, os.path.basename(remote_file_full_path))
-                self.stdio.verbose("local file path {0}...".format(local_file_path))
-                download_file(ssh_client, remote_file_full_path, local_file_path, self.stdio)
-                resp["error"] = ""
-                ssh_client.exec_cmd("rm -rf {0}".format(remote_file_full_path))
-                self.stdio.verbose("download success. On node {0} delete file: {1}".format(ssh_client.get_ip(), remote_file_full_path))
-            else:
-                resp["error"] = "File too large"
-            resp["gather_pack_path"] = "{0}/{1}".format(local_stored_path, os.path.basename(remote_file_full_path))
+        self.__gather_dmesg_boot_info(ssh_client, remote_dir_full_path)
+        self.__gather_dmesg_current_info(ssh_client, remote_dir_full_path)
+        tsar_exist = self.__tsar_exit(ssh_client)
+        if tsar_exist:
+            self.__gather_cpu_info(ssh_client, remote_dir_full_path)
+            self.__gather_mem_info(ssh_client, remote_dir_full_path)
+            self.__gather_swap_info(ssh_client, remote_dir_full_path)
+            self.__gather_io_info(ssh_client, remote_dir_full_path)
+            self.__gather_traffic_info(ssh_client, remote_dir_full_path)
+            self.__gather_tcp_udp_info(ssh_client, remote_dir_full_path)
+        if (self.sample_always or not tsar_exist) and self.sample_duration > 0:
+            state["sample_cmd"] = self.__get_proc_sample_cmd(ssh_client, node, remote_dir_full_path)
+        state["elapsed"] = time.time() - st
+        return state
+
+    def __pack_node(self, state, local_stored_path):
+        resp = {"skip": False, "error": "", "gather_pack_path": ""}
+        if state["error"]:
+            resp["skip"] = True
+            resp["error"] = state["error"]
+            return resp
+        ssh_client = state["ssh_client"]
+        remote_dir_name = state["remote_dir_name"]
+        tar_cmd = "cd /tmp && tar -czf {0}.tar.gz {0}/*".format(remote_dir_name)
+        self.stdio.verbose("tar the pack by {0}".format(tar_cmd))
+        tar_request = ssh_client.exec_cmd("cd /tmp && tar -czf {0}.tar.gz {0}/*".format(remote_dir_name))
+        self.stdio.verbose("tar_request: {0}".format(tar_request))
+        remote_file_full_path = os.path.join("/tmp/{0}.tar.gz".format(remote_dir_name))
+        file_size = get_file_size(ssh_client, remote_file_full_path, self.stdio)
+        if int(file_size) < self.file_size_limit:
+            local_file_path = "{0}/{1}".format(local_stored_path, os.path.basename(remote_file_full_path))
+            self.stdio.verbose("local file path {0}...".format(local_file_path))
+            download_file(ssh_client, remote_file_full_path, local_file_path, self.stdio)
+            resp["error"] = ""
+            if state["sampled"]:
+                self.__decode_proc_samples(local_file_path, remote_dir_name, local_stored_path)
+            ssh_client.exec_cmd("rm -rf {0}".format(remote_file_full_path))
+            self.stdio.verbose("download success. On node {0} delete file: {1}".format(ssh_client.get_ip(), remote_file_full_path))
+        else:
+            resp["error"] = "File too large"
+        resp["gather_pack_path"] = "{0}/{1}".format(local_stored_path, os.path.basename(remote_file_full_path))
         return resp
 
     def __gather_dmesg_current_info(self, ssh_client, gather_path):
@@ -188,12 +233,74 @@ class GatherOsInfoHandler(BaseShellHandler):
 
     def __tsar_exit(self, ssh_client):
         try:
-            cmd = "tar --help"
+            cmd = "command -v tsar"
             exit = ssh_client.exec_cmd(cmd)
-            if exit:
+            if exit and exit.strip():
                 return True
+            self.stdio.verbose("tsar not found on server {0}".format(ssh_client.get_name()))
         except Exception:
             self.stdio.warn("tsar not found")
+        return False
+
+    def __get_sampler_script(self):
+        # written once, uploaded to every node
+        if self.sampler_script_path is None:
+            fd, self.sampler_script_path = tempfile.mkstemp(prefix="obdiag_proc_sampler_", suffix=".py")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(SAMPLER_SCRIPT)
+        return self.sampler_script_path
+
+    def __get_proc_sample_cmd(self, ssh_client, node, gather_path):
+        """upload the sampler to the node, returns the command running it or None"""
+        try:
+            python_bin = (ssh_client.exec_cmd("command -v python3 || command -v python || command -v python2") or "").strip().splitlines()
+            if not python_bin:
+                self.stdio.warn("no python on server {0}, skip the /proc sampler".format(ssh_client.get_name()))
+                return None
+            remote_script = "{0}/{1}".format(gather_path, SAMPLER_SCRIPT_NAME)
+            upload_file(ssh_client, self.__get_sampler_script(), remote_script, self.stdio)
+            pids = []
+            try:
+                pids = get_observer_pid(ssh_client, node.get("home_path"), self.stdio)
+            except Exception as e:
+                self.stdio.verbose("get observer pid on server {0} failed: {1}".format(ssh_client.get_name(), e))
+            return "{python} {script} --interval {interval} --duration {duration} --pid '{pids}' --out {gather_path}/{out} && rm -f {script}".format(
+                python=python_bin[0], script=remote_script, interval=self.sample_interval, duration=self.sample_duration, pids=",".join(str(pid) for pid in pids), gather_path=gather_path, out=SAMPLER_FILE_NAME
+            )
+        except Exception as e:
+            self.stdio.error("Failed to sample /proc on server {0}: {1}".format(ssh_client.get_name(), e))
+            return None
+
+    def __run_proc_samplers(self, states):
+        if not states:
+            return
+        st = time.time()
+        self.stdio.start_loading("sampling /proc on {0} servers every {1}s for {2}s".format(len(states), self.sample_interval, self.sample_duration))
+        try:
+            outcomes = NodeRunner(self.stdio).run(states, lambda state: state["ssh_client"].exec_cmd(state["sample_cmd"], timeout=self.sample_duration + 60), lambda state: state["ssh_client"].get_name())
+        finally:
+            self.stdio.stop_loading("succeed")
+        for outcome in outcomes:
+            state = outcome.item
+            state["elapsed"] += time.time() - st
+            if outcome.ok:
+                state["sampled"] = True
+            else:
+                self.stdio.error("Failed to sample /proc on server {0}: {1}".format(outcome.name, outcome.error))
+
+    def __decode_proc_samples(self, local_tar_path, remote_dir_name, local_stored_path):
+        # the samples stay packed in the tar, the csv files and the summary are written next to it
+        try:
+            with tarfile.open(local_tar_path, "r:gz") as tar:
+                member = tar.extractfile("{0}/{1}".format(remote_dir_name, SAMPLER_FILE_NAME))
+                data = member.read()
+            meta, rows = decode_samples(data)
+            out_dir = os.path.join(local_stored_path, "{0}_samples".format(remote_dir_name))
+            summary = write_sample_reports(meta, rows, out_dir, len(data))
+            self.stdio.print("\n/proc samples of {0}:\n{1}".format(remote_dir_name, summary))
+            self.stdio.print("csv files of the samples: {0}".format(out_dir))
+        except Exception as e:
+            self.stdio.warn("decode the /proc samples of {0} failed: {1}".format(local_tar_path, e))
 
     def __gather_cpu_info(self, ssh_client, gather_path):
         try:
@@ -22,6 +22,7 @@ import time
 from src.common.result_type import ObdiagResult
 from src.common.stdio import SafeStdio
 from src.common.ob_connector import OBConnector
+from src.common.report_builder import ReportBuilder
 from src.common.tool import StringUtils
 from src.common.command import get_observer_version
 from src.common.tool import Util
@@ -44,6 +45,7 @@ class GatherTableDumpHandler(SafeStdio):
         self.store_dir = store_dir
         self.is_innner = is_inner
         self.create_tables_sql_file = None
+        self.report_builder = None
         if self.context.get_variable("gather_timestamp", None):
             self.gather_timestamp = self.context.get_variable("gather_timestamp")
         else:
@@ -101,6 +103,7 @@ class GatherTableDumpHandler(SafeStdio):
             self.tenant_connector = OBConnector(context=self.context, ip=self.ob_cluster.get("db_host"), port=self.ob_cluster.get("db_port"), username=user, password=password, timeout=100)
             self.file_name = "{0}/obdiag_tabledump_result_{1}.txt".format(self.store_dir, TimeUtils.timestamp_to_filename_time(self.gather_timestamp))
             self.create_tables_sql_file = "{0}/create_tables_{1}.sql".format(self.store_dir, TimeUtils.timestamp_to_filename_time(self.gather_timestamp))
+            self.report_builder = ReportBuilder(self.file_name)
             return True
         except Exception as e:
             self.stdio.error(e)
@@ -111,7 +114,10 @@ class GatherTableDumpHandler(SafeStdio):
         if not self.init():
             self.stdio.error('init failed')
             return ObdiagResult(ObdiagResult.SERVER_ERROR_CODE, error_data="init failed")
-        excute_status = self.execute()
+        try:
+            excute_status = self.execute()
+        finally:
+            self.report_builder.close()
         if not self.is_innner and excute_status:
             self.__print_result()
             return ObdiagResult(ObdiagResult.SUCCESS_CODE, data={"store_dir": self.store_dir})
@@ -240,17 +246,15 @@ class GatherTableDumpHandler(SafeStdio):
         try:
             table_data = [list(row) for row in data]
             formatted_table = tabulate(table_data, headers=column_names, tablefmt="grid")
-            with open(self.file_name, 'a', encoding='utf-8') as f:
-                f.write('\n\n' + 'obclient > ' + sql + '\n')
-                f.write(formatted_table)
+            self.report_builder.write('\n\n' + 'obclient > ' + sql + '\n')
+            self.report_builder.write(formatted_table)
         except Exception as e:
             self.stdio.error("report sql result to file: {0} failed, error:{1} ".format(self.file_name, e))
 
     def __report_simple(self, sql, data):
         try:
-            with open(self.file_name, 'a', encoding='utf-8') as f:
-                f.write('\n\n' + 'obclient > ' + sql + '\n')
-                f.write(data)
+            self.report_builder.write('\n\n' + 'obclient > ' + sql + '\n')
+            self.report_builder.write(data)
         except Exception as e:
             self.stdio.error("report sql result to file: {0} failed, error:{1} ".format(self.file_name, e))
 
@@ -17,7 +17,7 @@
 """
 import os
 from src.common.stdio import SafeStdio
-from src.common.ob_connector import OBConnector
+from src.common.ob_connector import get_ob_connector_pool
 from tabulate import tabulate
 from src.common.tool import StringUtils
 
@@ -33,7 +33,8 @@ class StepSQLHandler(SafeStdio):
             self.sys_database = None
             self.database = None
             self.env = env
-            self.ob_connector = OBConnector(context=self.context, ip=ob_cluster.get("db_host"), port=ob_cluster.get("db_port"), username=ob_cluster.get("tenant_sys").get("user"), password=ob_cluster.get("tenant_sys").get("password"), timeout=10000)
+            # steps of all tasks share the pooled connections of the cluster
+            self.ob_connector = get_ob_connector_pool(self.context, ob_cluster)
         except Exception as e:
             self.stdio.error("StepSQLHandler init fail. Please check the OBCLUSTER conf. OBCLUSTER: {0} Exception : {1} .".format(ob_cluster, e))
         self.task_variable_dict = task_variable_dict
@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: evidence.py
+@desc: Evidence cache shared by the scenes of one rca sweep.
+       Logs of a (target, time window, nodes) are gathered once without grep and filtered locally per scene,
+       read-only SQL results are memoized for the whole sweep.
+"""
+import os
+import re
+import shlex
+import subprocess
+import threading
+
+from src.common.ob_connector import OBConnectorPool, get_ob_connector_pool
+from src.handler.rca.plugins.gather import Gather_log
+
+
+class EvidenceCache(object):
+    """Holds the gathered logs and SQL results of one sweep, plus hit/miss counters for the summary."""
+
+    def __init__(self, context, store_dir):
+        self.context = context
+        self.stdio = context.stdio
+        self.store_dir = store_dir
+        self.stats = {"log_gather": 0, "log_hit": 0, "sql_query": 0, "sql_hit": 0}
+        self._logs = {}
+        self._logs_locks = {}
+        self._lock = threading.Lock()
+
+    def count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def get_logs(self, key, loader):
+        """
+        Return the files gathered for key, calling loader(gather_dir) once per key.
+        Concurrent callers with the same key wait for the first one instead of gathering again.
+        """
+        with self._lock:
+            if key not in self._logs_locks:
+                self._logs_locks[key] = (threading.Lock(), len(self._logs_locks))
+            key_lock, key_index = self._logs_locks[key]
+        with key_lock:
+            if key in self._logs:
+                self.count("log_hit")
+                return self._logs[key]
+            gather_dir = os.path.join(self.store_dir, "evidence", "logs_{0}".format(key_index))
+            self.stdio.verbose("evidence cache gather logs for {0} to {1}".format(key, gather_dir))
+            self.count("log_gather")
+            files = loader(gather_dir)
+            self._logs[key] = (gather_dir, files)
+            return self._logs[key]
+
+
+class SweepGatherLog(Gather_log):
+    """
+    Gather_log backed by an EvidenceCache. The first execute() for a target/time window/node set runs a
+    full gather without grep; every execute() then greps the cached files locally into its own save_path.
+    """
+
+    WINDOW_KEYS = ("gather_target", "gather_from", "gather_to", "gather_since", "gather_scope", "gather_oms_component_id")
+
+    def __init__(self, context, evidence):
+        super().__init__(context)
+        self.evidence = evidence
+
+    def _window_key(self, nodes_list):
+        key = [self.conf_map.get(k) for k in self.WINDOW_KEYS]
+        key.append(tuple(sorted(node.get("ip") or "" for node in nodes_list)))
+        return tuple(key)
+
+    def execute(self, save_path=""):
+        try:
+            self.stdio.verbose("SweepGatherLog execute, greps_key: {0}".format(self.greps_key))
+            self._prepare_save_path(save_path)
+            target = self.conf_map.get("gather_target", "observer")
+            all_nodes = self._get_all_nodes(target)
+            filter_list = self.conf_map.get("filter_nodes_list", [])
+            nodes_list = self._filter_nodes(all_nodes, filter_list) if filter_list else []
+            conf_map = dict(self.conf_map)
+
+            def loader(gather_dir):
+                gather = Gather_log(self.context)
+                gather.conf_map.update(conf_map)
+                return gather.execute(save_path=gather_dir)
+
+            gather_dir, cached_files = self.evidence.get_logs(self._window_key(nodes_list), loader)
+            result_log_files = []
+            for cached_file in cached_files:
+                local_file = os.path.join(self.work_path, os.path.relpath(cached_file, gather_dir))
+                if os.path.isdir(cached_file):
+                    os.makedirs(local_file, exist_ok=True)
+                elif os.path.isfile(cached_file):
+                    os.makedirs(os.path.dirname(local_file), exist_ok=True)
+                    self._grep_file(cached_file, local_file)
+                else:
+                    continue
+                result_log_files.append(local_file)
+            self.reset()
+            return result_log_files
+        except Exception as e:
+            raise Exception("rca plugins SweepGatherLog execute error: {0}".format(e))
+
+    def _grep_file(self, source_file, target_file):
+        # same pipeline as the remote gather: cat file | grep -e 'p1' | grep -e 'p2' > target
+        if not self.greps_key:
+            cmd = "cp -a {0} {1}".format(shlex.quote(source_file), shlex.quote(target_file))
+        else:
+            grep_pipeline = " | ".join(["grep -e {0}".format(shlex.quote(key)) for key in self.greps_key])
+            cmd = "cat {0} | {1} > {2}".format(shlex.quote(source_file), grep_pipeline, shlex.quote(target_file))
+        subprocess.run(cmd, shell=True, executable='/bin/bash', stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+class _CachedCursor(object):
+    """Minimal cursor over memoized rows, enough for fetchall/fetchone/iteration used by the scenes."""
+
+    def __init__(self, description, rows):
+        self.description = description
+        self._rows = rows
+        self._index = 0
+        self.rowcount = len(rows)
+
+    def fetchall(self):
+        rows = self._rows[self._index :]
+        self._index = len(self._rows)
+        return rows
+
+    def fetchone(self):
+        if self._index >= len(self._rows):
+            return None
+        row = self._rows[self._index]
+        self._index += 1
+        return row
+
+    def fetchmany(self, size=1):
+        rows = self._rows[self._index : self._index + size]
+        self._index += len(rows)
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self):
+        return
+
+
+class MemoizedOBConnector(object):
+    """
+    OBConnector stand-in for a sweep. Read-only statements (SELECT/SHOW/DESC/WITH) are executed once and
+    served from memory afterwards; everything else goes to the database through the thread-safe
+    OBConnectorPool of the cluster.
+    """
+
+    CACHEABLE_SQL_RE = re.compile(r'^\s*(select|show|desc|describe|with)\b', re.IGNORECASE)
+
+    def __init__(self, context, ob_cluster, evidence, ob_connector=None):
+        self.context = context
+        self.stdio = context.stdio
+        self.ob_cluster = ob_cluster
+        self.evidence = evidence
+        self._pool = ob_connector if isinstance(ob_connector, OBConnectorPool) else get_ob_connector_pool(context, ob_cluster)
+        self._results = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def _connector(self):
+        return self._pool
+
+    def _memoize(self, key, sql, query):
+        if not self.CACHEABLE_SQL_RE.match(sql or ""):
+            return query(self._connector())
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if key in self._results:
+                self.evidence.count("sql_hit")
+                return self._results[key]
+            self.evidence.count("sql_query")
+            value = query(self._connector())
+            self._results[key] = value
+            return value
+
+    def execute_sql(self, sql, params=None):
+        return self._memoize(("execute_sql", sql, repr(params)), sql, lambda conn: conn.execute_sql(sql, params))
+
+    def execute_sql_return_columns_and_data(self, sql, params=None):
+        key = ("execute_sql_return_columns_and_data", sql, repr(params))
+        return self._memoize(key, sql, lambda conn: conn.execute_sql_return_columns_and_data(sql, params))
+
+    def _cursor_rows(self, cursor):
+        try:
+            return cursor.description, cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def execute_sql_return_cursor_dictionary(self, sql, params=None):
+        description, rows = self._memoize(("dict_cursor", sql, repr(params)), sql, lambda conn: self._cursor_rows(conn.execute_sql_return_cursor_dictionary(sql, params)))
+        # scenes may modify the dict rows, give each caller its own copy
+        return _CachedCursor(description, [dict(row) for row in rows])
+
+    def execute_sql_return_cursor(self, sql, params=None):
+        description, rows = self._memoize(("cursor", sql, repr(params)), sql, lambda conn: self._cursor_rows(conn.execute_sql_return_cursor(sql, params)))
+        return _CachedCursor(description, list(rows))
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self._connector(), name)
@@ -27,8 +27,8 @@ from src.common.command import (
 )
 import traceback
 from prettytable import PrettyTable
-from src.common.ob_connector import OBConnector
-from src.common.ssh_client.ssh import SshClient
+from src.common.ob_connector import get_ob_connector_pool
+from src.common.ssh_client.ssh import LazySshClientGroup
 from src.handler.rca.plugins.gather import Gather_log
 from src.handler.rca.rca_exception import RCANotNeedExecuteException, RCAReportException
 from src.handler.rca.rca_list import RcaScenesListHandler
@@ -47,46 +47,41 @@ class RCAHandler:
         self.stdio = context.stdio
         self.ob_cluster = self.context.cluster_config
         self.options = self.context.options
+        # ssher of every node is lazy: nothing is connected until a scene uses it,
+        # then all nodes of the same component are connected in parallel
         observer_nodes = self.context.cluster_config.get("servers")
         # build observer_nodes ,add ssher
         context_observer_nodes = []
         if observer_nodes is not None:
+            observer_ssh_group = LazySshClientGroup(context)
             for node in observer_nodes:
-                ssh = SshClient(context, node)
-                node["ssher"] = ssh
+                node["ssher"] = observer_ssh_group.add(node)
                 context_observer_nodes.append(node)
             self.context.set_variable("observer_nodes", context_observer_nodes)
         obproxy_nodes = self.context.obproxy_config.get("servers")
         # build obproxy_nodes
         context_obproxy_nodes = []
         if obproxy_nodes is not None:
+            obproxy_ssh_group = LazySshClientGroup(context)
             for node in obproxy_nodes:
-                ssh = SshClient(context, node)
-                node["ssher"] = ssh
+                node["ssher"] = obproxy_ssh_group.add(node)
                 context_obproxy_nodes.append(node)
             self.context.set_variable("obproxy_nodes", context_obproxy_nodes)
         # build oms_nodes
         oms_nodes = self.context.oms_config.get("servers")
         context_oms_nodes = []
         if oms_nodes is not None:
+            oms_ssh_group = LazySshClientGroup(context)
             for node in oms_nodes:
-                ssh = SshClient(context, node)
-                node["ssher"] = ssh
+                node["ssher"] = oms_ssh_group.add(node)
                 context_oms_nodes.append(node)
             self.context.set_variable("oms_nodes", context_oms_nodes)
 
         # build ob_connector
         try:
             if self.ob_cluster.get("db_host") is not None:
-                ob_connector = OBConnector(
-                    context=self.context,
-                    ip=self.ob_cluster.get("db_host"),
-                    port=self.ob_cluster.get("db_port"),
-                    username=self.ob_cluster.get("tenant_sys").get("user"),
-                    password=self.ob_cluster.get("tenant_sys").get("password"),
-                    timeout=10000,
-                )
-                self.context.set_variable("ob_connector", ob_connector)
+                # thread-safe, connections are opened on the first query of a scene
+                self.context.set_variable("ob_connector", get_ob_connector_pool(self.context, self.ob_cluster))
         except Exception as e:
             self.stdio.warn("RCAHandler init ob_connector failed: {0}. If the scene need it, please check the conf".format(str(e)))
         # build report
@@ -124,11 +119,11 @@ class RCAHandler:
                     self.stdio.warn("RCAHandler.init Failed to get obproxy version.")
                 self.context.set_variable("obproxy_version", obproxy_version)
         self.context.set_variable("ob_cluster", self.ob_cluster)
-        # set rca_deep_limit
-        rca_list = RcaScenesListHandler(self.context)
-        all_scenes_info, all_scenes_item = rca_list.get_all_scenes()
+        # set rca_deep_limit. Scenes are resolved from the index, only the requested one is imported.
+        self.rca_list = RcaScenesListHandler(self.context)
+        all_scenes_info = self.rca_list.get_scenes_index()
         self.context.set_variable("rca_deep_limit", len(all_scenes_info))
-        self.all_scenes = all_scenes_item
+        self.all_scenes_info = all_scenes_info
         self.rca_scene = None
         self.cluster = self.context.get_variable("ob_cluster")
         self.nodes = self.context.get_variable("observer_nodes")
@@ -157,8 +152,8 @@ class RCAHandler:
         scene_name = Util.get_option(self.options, "scene", None)
         if scene_name:
             scene_name = scene_name.strip()
-            if scene_name in self.all_scenes:
-                self.rca_scene = self.all_scenes[scene_name]
+            if scene_name in self.all_scenes_info:
+                self.rca_scene = self.rca_list.get_scene(scene_name)
             if self.rca_scene is None:
                 raise Exception("rca_scene :{0} is not exist".format(scene_name))
 
@@ -15,6 +15,7 @@
 @file: rca_list.py
 @desc:
 """
+import ast
 import os.path
 from src.common.constant import const
 from src.common.tool import DynamicLoading
@@ -40,32 +41,83 @@ class RcaScenesListHandler:
         scenes_files = self.__find_rca_files()
         # get all info
         scene_list = {}
-        scene_info_list = {}
         if not scenes_files or len(scenes_files) == 0:
             self.stdio.error("no rca scene found! Please check RCA_WORK_PATH: {0}".format(self.work_path))
             return
         for scene_file in scenes_files:
-            lib_path = self.work_path
             module_name = os.path.basename(scene_file)[:-3]
-            DynamicLoading.add_lib_path(lib_path)
-            module = DynamicLoading.import_module(os.path.basename(scene_file)[:-3], None)
-            if not hasattr(module, module_name):
-                self.stdio.error("{0} import_module failed".format(module_name))
-                continue
-            scene_list[module_name] = getattr(module, module_name)
-
+            scene = self.__import_scene(module_name)
+            if scene is not None:
+                scene_list[module_name] = scene
+        scene_info_list = {}
         for scene_name, scene in scene_list.items():
-            scene_info = scene.get_scene_info()
-            if "example" in scene_info:
-                scene_info_list[scene_name] = {"name": scene_name, "command": "{0}".format(scene_info.get("example") or "obdiag rca run --scene={0}".format(scene_name)), "info_en": scene_info["info_en"], "info_cn": scene_info["info_cn"]}
-                continue
-            scene_info_list[scene_name] = {"name": scene_name, "command": "obdiag rca run --scene={0}".format(scene_name), "info_en": scene_info["info_en"], "info_cn": scene_info["info_cn"]}
+            scene_info_list[scene_name] = self.__build_scene_info(scene_name, scene.get_scene_info())
         return scene_info_list, scene_list
 
+    def get_scenes_index(self):
+        """
+        Build the scene index (scene name -> info) from the get_scene_info() literal of every scene file,
+        without importing the scene modules. Scenes whose info is not a literal dict are imported as a fallback.
+        """
+        scenes_files = self.__find_rca_files()
+        if not scenes_files or len(scenes_files) == 0:
+            self.stdio.error("no rca scene found! Please check RCA_WORK_PATH: {0}".format(self.work_path))
+            return {}
+        scene_info_list = {}
+        for scene_file in scenes_files:
+            module_name = os.path.basename(scene_file)[:-3]
+            scene_info = self.__read_scene_info(scene_file)
+            if scene_info is None:
+                scene = self.__import_scene(module_name)
+                if scene is None:
+                    continue
+                scene_info = scene.get_scene_info()
+            scene_info_list[module_name] = self.__build_scene_info(module_name, scene_info)
+        return scene_info_list
+
+    def get_scene(self, scene_name):
+        """import only the requested scene module, return its scene object or None"""
+        if not scene_name or not os.path.isfile(os.path.join(self.work_path, scene_name + ".py")):
+            return None
+        return self.__import_scene(scene_name)
+
+    def __import_scene(self, module_name):
+        DynamicLoading.add_lib_path(self.work_path)
+        module = DynamicLoading.import_module(module_name, None)
+        if not hasattr(module, module_name):
+            self.stdio.error("{0} import_module failed".format(module_name))
+            return None
+        return getattr(module, module_name)
+
+    def __read_scene_info(self, scene_file):
+        try:
+            with open(scene_file, 'r', encoding='utf-8') as f:
+                tree = ast.parse(f.read(), filename=scene_file)
+        except Exception as e:
+            self.stdio.verbose("parse rca scene file {0} failed: {1}".format(scene_file, e))
+            return None
+        for node in ast.walk(tree):
+            if isinstance(node, ast.FunctionDef) and node.name == "get_scene_info":
+                for stmt in node.body:
+                    if isinstance(stmt, ast.Return) and isinstance(stmt.value, ast.Dict):
+                        try:
+                            scene_info = ast.literal_eval(stmt.value)
+                        except ValueError:
+                            return None
+                        if "info_en" in scene_info and "info_cn" in scene_info:
+                            return scene_info
+                return None
+        return None
+
+    def __build_scene_info(self, scene_name, scene_info):
+        if "example" in scene_info:
+            return {"name": scene_name, "command": "{0}".format(scene_info.get("example") or "obdiag rca run --scene={0}".format(scene_name)), "info_en": scene_info["info_en"], "info_cn": scene_info["info_cn"]}
+        return {"name": scene_name, "command": "obdiag rca run --scene={0}".format(scene_name), "info_en": scene_info["info_en"], "info_cn": scene_info["info_cn"]}
+
     def handle(self):
         try:
             self.stdio.verbose("list rca scenes")
-            scene_info_list, scene_itme_list = self.get_all_scenes()
+            scene_info_list = self.get_scenes_index()
             Util.print_scene(scene_info_list, stdio=self.stdio)
             return ObdiagResult(ObdiagResult.SUCCESS_CODE, data=scene_info_list)
         except Exception as e:
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: rca_sweep.py
+@desc: Run several rca scenes concurrently over one shared evidence cache.
+"""
+import datetime
+import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from colorama import Fore, Style
+from prettytable import PrettyTable
+
+from src.common.result_type import ObdiagResult
+from src.common.tool import Util
+from src.handler.rca.plugins.evidence import EvidenceCache, MemoizedOBConnector, SweepGatherLog
+from src.handler.rca.rca_exception import RCANotNeedExecuteException
+from src.handler.rca.rca_handler import RCAHandler
+
+
+class RCASweepHandler(RCAHandler):
+    DEFAULT_PARALLEL = 4
+
+    def __init__(self, context):
+        super(RCASweepHandler, self).__init__(context)
+        self.parallel = Util.get_option(self.options, "parallel", self.DEFAULT_PARALLEL)
+        try:
+            self.parallel = max(1, int(self.parallel))
+        except (TypeError, ValueError):
+            self.parallel = self.DEFAULT_PARALLEL
+
+    def __get_scene_names(self):
+        scenes_option = Util.get_option(self.options, "scenes", None)
+        if not scenes_option:
+            return None
+        scenes_option = scenes_option.strip()
+        if scenes_option == "all":
+            return sorted(self.all_scenes_info.keys())
+        scene_names = []
+        for scene_name in scenes_option.split(","):
+            scene_name = scene_name.strip()
+            if scene_name and scene_name not in scene_names:
+                scene_names.append(scene_name)
+        return scene_names
+
+    def handle(self):
+        scene_names = self.__get_scene_names()
+        if not scene_names:
+            self.stdio.error("rca sweep need --scenes, e.g. --scenes=lock_conflict,major_hold or --scenes=all")
+            return ObdiagResult(ObdiagResult.INPUT_ERROR_CODE, error_data="rca sweep need --scenes")
+        unknown_scenes = [scene_name for scene_name in scene_names if scene_name not in self.all_scenes_info]
+        if unknown_scenes:
+            self.stdio.error("rca_scene :{0} is not exist".format(",".join(unknown_scenes)))
+            return ObdiagResult(ObdiagResult.INPUT_ERROR_CODE, error_data="rca_scene :{0} is not exist".format(",".join(unknown_scenes)))
+
+        self.store_dir = os.path.expanduser(os.path.join(self.store_dir, "obdiag_sweep_{0}".format(datetime.datetime.now().strftime("%Y%m%d%H%M%S"))))
+        os.makedirs(self.store_dir, exist_ok=True)
+        evidence = EvidenceCache(self.context, self.store_dir)
+        ob_connector = self.context.get_variable("ob_connector", default=None)
+        if ob_connector is not None:
+            self.context.set_variable("ob_connector", MemoizedOBConnector(self.context, self.ob_cluster, evidence, ob_connector))
+
+        # scenes read store_dir/gather_log/ob_connector from the context in init(), so init them one by one
+        scene_status = {}
+        ready_scenes = []
+        for scene_name in scene_names:
+            scene_store_dir = os.path.join(self.store_dir, scene_name)
+            os.makedirs(scene_store_dir, exist_ok=True)
+            self.context.set_variable("store_dir", scene_store_dir)
+            Util.set_option(self.options, "scene", scene_name)
+            self.context.set_variable("gather_log", SweepGatherLog(self.context, evidence))
+            scene = self.rca_list.get_scene(scene_name)
+            if scene is None:
+                scene_status[scene_name] = {"status": "failed", "info": "import failed", "store_dir": scene_store_dir}
+                continue
+            try:
+                if scene.init(self.context) is False:
+                    scene_status[scene_name] = {"status": "skipped", "info": "init return False", "store_dir": scene_store_dir}
+                    continue
+            except Exception as e:
+                self.stdio.verbose(traceback.format_exc())
+                self.stdio.warn("rca sweep {0} init err: {1}".format(scene_name, e))
+                scene_status[scene_name] = {"status": "failed", "info": "init err: {0}".format(e), "store_dir": scene_store_dir}
+                continue
+            ready_scenes.append((scene_name, scene, scene_store_dir))
+        self.context.set_variable("store_dir", self.store_dir)
+
+        self.stdio.start_loading("rca sweep {0} scenes".format(len(ready_scenes)))
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.parallel, max(1, len(ready_scenes)))) as executor:
+                futures = {scene_name: executor.submit(self.__execute_scene, scene_name, scene, scene_store_dir) for scene_name, scene, scene_store_dir in ready_scenes}
+                for scene_name, future in futures.items():
+                    scene_status[scene_name] = future.result()
+        finally:
+            self.stdio.stop_loading("succeed")
+
+        self.__print_summary(scene_names, scene_status, evidence)
+        return ObdiagResult(ObdiagResult.SUCCESS_CODE, data={"store_dir": self.store_dir, "scenes": scene_status, "evidence": dict(evidence.stats)})
+
+    def __execute_scene(self, scene_name, scene, scene_store_dir):
+        status = {"status": "succeed", "info": "", "store_dir": scene_store_dir}
+        try:
+            scene.execute()
+        except RCANotNeedExecuteException as e:
+            status = {"status": "skipped", "info": "not need execute: {0}".format(e), "store_dir": scene_store_dir}
+        except Exception as e:
+            self.stdio.verbose(traceback.format_exc())
+            self.stdio.warn("rca sweep {0} execute err: {1}".format(scene_name, e))
+            status = {"status": "failed", "info": "execute err: {0}".format(e), "store_dir": scene_store_dir}
+        try:
+            scene.export_result()
+            status["record"] = scene.Result.records_data()
+        except Exception as e:
+            self.stdio.verbose(traceback.format_exc())
+            status["info"] = "{0} export_result err: {1}".format(status["info"], e).strip()
+        return status
+
+    def __print_summary(self, scene_names, scene_status, evidence):
+        summary_tb = PrettyTable(["scene", "status", "info", "result"])
+        summary_tb.align["info"] = "l"
+        summary_tb.title = "rca sweep summary"
+        for scene_name in scene_names:
+            status = scene_status.get(scene_name, {})
+            summary_tb.add_row([scene_name, status.get("status", ""), status.get("info", ""), status.get("store_dir", "")])
+        self.stdio.print(summary_tb.get_string())
+        self.stdio.print(
+            "evidence cache: log gathers {0}, log reuse {1}, sql queries {2}, sql reuse {3}".format(
+                evidence.stats["log_gather"],
+                evidence.stats["log_hit"],
+                evidence.stats["sql_query"],
+                evidence.stats["sql_hit"],
+            )
+        )
+        self.stdio.print("rca sweep finished. For more details, the result on '" + Fore.YELLOW + self.store_dir + Style.RESET_ALL + "'")
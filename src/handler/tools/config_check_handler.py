@@ -14,14 +14,31 @@
 @time: 2025/12/15
 @file: config_check_handler.py
 @desc: Handler for checking config validity including DB connection and SSH connection
+       --preflight probes every host over TCP at once first, only the reachable ones get the SSH check (with short
+       timeouts) and nodes validated recently with the same config are taken from the cluster meta cache.
 """
 
+import hashlib
+import json
+import socket
 import threading
+import time
+from src.common.cluster_meta_cache import get_cluster_meta_cache
+from src.common.node_runner import NodeRunner
 from src.common.result_type import ObdiagResult
 from src.common.ob_connector import OBConnector
-from src.common.ssh_client.ssh import SshClient
+from src.common.ssh_client.ssh import SshClient, get_local_ip_list
+from src.common.tool import Util
 from colorama import Fore, Style
 
+# seconds a TCP connect of --preflight may take before the host counts as unreachable
+PREFLIGHT_PROBE_TIMEOUT = 2
+# seconds for the ssh connect/auth and for each test command of a reachable node in --preflight
+PREFLIGHT_SSH_TIMEOUT = 10
+PREFLIGHT_PROBE_WORKERS = 64
+# cluster meta cache entry of a node whose ssh check passed, kept for the cache ttl
+VALIDATED_NODE_CACHE_KEY = "config_check_ssh"
+
 
 class ConfigCheckHandler:
     """Handler for checking config validity including DB connection and SSH connection"""
@@ -32,6 +49,12 @@ class ConfigCheckHandler:
         self.options = context.options
         self.cluster_config = context.cluster_config
         self.obproxy_config = context.obproxy_config
+        self.preflight = bool(Util.get_option(self.options, 'preflight', False))
+        self.probe_timeout = float(Util.get_option(self.options, 'probe_timeout', PREFLIGHT_PROBE_TIMEOUT) or PREFLIGHT_PROBE_TIMEOUT)
+        # timeout of the ssh test commands, None keeps the ssh_client.cmd_exec_timeout default
+        self.cmd_timeout = PREFLIGHT_SSH_TIMEOUT if self.preflight else None
+        # (ip, port) -> error of the endpoints the pre-flight probe could not reach
+        self.unreachable = {}
 
     def handle(self):
         """Main handler method"""
@@ -42,6 +65,9 @@ class ConfigCheckHandler:
 
             results = {"db_connection": None, "observer_nodes": [], "obproxy_nodes": [], "summary": {"success": 0, "failed": 0, "skipped": 0}}
 
+            if self.preflight:
+                self._probe_endpoints(results)
+
             # 1. Check database connection
             self._check_db_connection(results)
 
@@ -103,6 +129,15 @@ class ConfigCheckHandler:
         self.stdio.print("  User: {0}".format(db_user))
         self.stdio.print("  Password: {0}".format("*" * len(db_password) if db_password else "(empty)"))
 
+        probe_error = self.unreachable.get((str(db_host), str(db_port)))
+        if probe_error:
+            self.stdio.print("  " + Fore.RED + "✗ FAILED" + Style.RESET_ALL + " - Port unreachable")
+            self.stdio.print("    " + Fore.RED + "Error: {0}".format(probe_error) + Style.RESET_ALL)
+            results["db_connection"] = {"status": "failed", "host": db_host, "port": db_port, "error": probe_error}
+            results["summary"]["failed"] += 1
+            self.stdio.print("")
+            return
+
         # Try to connect
         try:
             self.stdio.verbose("Attempting to connect to database...")
@@ -160,21 +195,7 @@ class ConfigCheckHandler:
         self.stdio.print("  Found {0} observer node(s) to check".format(len(nodes)))
         self.stdio.print("")
 
-        # Check each node in parallel
-        threads = []
-        node_results = []
-        lock = threading.Lock()
-
-        for idx, node in enumerate(nodes):
-            node_config = self._merge_node_config(node, global_config)
-            thread = threading.Thread(target=self._check_single_node, args=(idx + 1, node_config, "observer", node_results, lock, results))
-            threads.append(thread)
-            thread.start()
-
-        for thread in threads:
-            thread.join()
-
-        results["observer_nodes"] = node_results
+        results["observer_nodes"] = self._check_nodes(nodes, global_config, "observer", results)
         self.stdio.print("")
 
     def _check_obproxy_nodes(self, results):
@@ -201,22 +222,121 @@ class ConfigCheckHandler:
         self.stdio.print("  Found {0} obproxy node(s) to check".format(len(nodes)))
         self.stdio.print("")
 
-        # Check each node in parallel
-        threads = []
-        node_results = []
-        lock = threading.Lock()
+        results["obproxy_nodes"] = self._check_nodes(nodes, global_config, "obproxy", results)
+        self.stdio.print("")
 
+    def _check_nodes(self, nodes, global_config, node_type, results):
+        """check the nodes in parallel, each result is printed as soon as its node is done"""
+        lock = threading.Lock()
+        cache = get_cluster_meta_cache(self.context, component=node_type)
+        node_results = []
+        pending = []
         for idx, node in enumerate(nodes):
             node_config = self._merge_node_config(node, global_config)
-            thread = threading.Thread(target=self._check_single_node, args=(idx + 1, node_config, "obproxy", node_results, lock, results))
-            threads.append(thread)
-            thread.start()
+            ip, ssh_port = node_config.get("ip", "unknown"), node_config.get("ssh_port", 22)
+            if self.preflight:
+                probe_error = self.unreachable.get((str(ip), str(ssh_port)))
+                if probe_error:
+                    self._record_node(results, node_results, lock, idx + 1, node_config, node_type, "failed", "unreachable: {0}".format(probe_error))
+                    continue
+                validated = cache.get(VALIDATED_NODE_CACHE_KEY, self._node_cache_key(node_config)) if cache is not None else None
+                if validated and validated.get("fingerprint") == self._node_fingerprint(node_config):
+                    self._record_node(results, node_results, lock, idx + 1, node_config, node_type, "success", None, cached_at=validated.get("at"))
+                    continue
+                node_config = dict(node_config, ssh_connect_timeout=PREFLIGHT_SSH_TIMEOUT)
+            pending.append((idx + 1, node_config))
+
+        def check(item):
+            # every node reports into its own list, a node given up at the deadline can not change the results later
+            own_results, own = [], {"summary": {"success": 0, "failed": 0, "skipped": 0}}
+            self._check_single_node(item[0], item[1], node_type, own_results, lock, own)
+            return own_results, own["summary"]
+
+        # connect + the test commands of a reachable node, the rest is a hung host
+        deadline = time.time() + PREFLIGHT_SSH_TIMEOUT * 5 if self.preflight else None
+        outcomes = NodeRunner(self.stdio, deadline=deadline).run(pending, check, name=lambda item: item[1].get("ip", "unknown"))
+        for outcome in outcomes:
+            idx, node_config = outcome.item
+            if not outcome.ok:
+                self._record_node(results, node_results, lock, idx, node_config, node_type, "failed", outcome.error)
+                continue
+            own_results, summary = outcome.result
+            node_results.extend(own_results)
+            for key, count in summary.items():
+                results["summary"][key] += count
+        node_results.sort(key=lambda node_result: node_result["index"])
+        if cache is not None:
+            by_index = dict((idx + 1, self._merge_node_config(node, global_config)) for idx, node in enumerate(nodes))
+            for node_result in node_results:
+                if node_result.get("cached"):
+                    continue
+                node_config = by_index[node_result["index"]]
+                if node_result["status"] == "success":
+                    cache.set(VALIDATED_NODE_CACHE_KEY, {"fingerprint": self._node_fingerprint(node_config), "at": time.time()}, self._node_cache_key(node_config))
+                elif cache.get(VALIDATED_NODE_CACHE_KEY, self._node_cache_key(node_config)) is not None:
+                    cache.set(VALIDATED_NODE_CACHE_KEY, None, self._node_cache_key(node_config))
+        return node_results
+
+    def _record_node(self, results, node_results, lock, idx, node_config, node_type, status, error, cached_at=None):
+        """a node decided without an ssh check: unreachable by the probe, not finished in time, or validated recently"""
+        ip, ssh_port = node_config.get("ip", "unknown"), node_config.get("ssh_port", 22)
+        node_result = {"index": idx, "ip": ip, "ssh_port": ssh_port, "ssh_username": node_config.get("ssh_username", ""), "home_path": node_config.get("home_path", ""), "status": status, "error": error}
+        if cached_at is not None:
+            node_result["cached"] = True
+        with lock:
+            node_results.append(node_result)
+            results["summary"][status] += 1
+            self.stdio.print("  [{0}] {1}:{2} ({3})".format(idx, ip, ssh_port, node_type))
+            if status == "success":
+                self.stdio.print("      " + Fore.GREEN + "✓" + Style.RESET_ALL + " validated {0:.0f}s ago with the same config (cached)".format(time.time() - cached_at))
+            else:
+                self.stdio.print("      " + Fore.RED + "✗ FAILED" + Style.RESET_ALL + " - " + error)
+
+    def _node_cache_key(self, node_config):
+        return "ssh://{0}@{1}:{2}".format(node_config.get("ssh_username", ""), node_config.get("ip", ""), node_config.get("ssh_port", 22))
+
+    def _node_fingerprint(self, node_config):
+        """the settings an ssh check depends on, the password only as a digest"""
+        keys = ("ip", "ssh_port", "ssh_username", "ssh_key_file", "ssh_type", "home_path", "data_dir", "redo_dir")
+        settings = dict((key, node_config.get(key)) for key in keys)
+        settings["ssh_password"] = hashlib.sha256(str(node_config.get("ssh_password") or "").encode("utf-8")).hexdigest()
+        return hashlib.sha1(json.dumps(settings, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def _probe_endpoints(self, results):
+        """TCP connect to the db port and every ssh port at once, the unreachable ones are printed as they fail"""
+        endpoints = []
+        if self.cluster_config and self.cluster_config.get("db_host") and self.cluster_config.get("db_port"):
+            endpoints.append((str(self.cluster_config.get("db_host")), str(self.cluster_config.get("db_port"))))
+        local_ips = get_local_ip_list(self.stdio)
+        for config in (self.cluster_config, self.obproxy_config):
+            for node in (config or {}).get("servers", []) or []:
+                ip = node.get("ip")
+                # local, docker and kubernetes nodes are not reached over ssh
+                if not ip or (node.get("ssh_type") or "remote") not in ("remote", "ssh") or ip in local_ips:
+                    continue
+                endpoints.append((str(ip), str(node.get("ssh_port", 22))))
+        endpoints = list(dict.fromkeys(endpoints))
+        if not endpoints:
+            return
+        self.stdio.print(Fore.YELLOW + "[pre-flight] Probing {0} endpoint(s), timeout {1}s...".format(len(endpoints), self.probe_timeout) + Style.RESET_ALL)
+        self.stdio.print("-" * 70)
+        started = time.time()
 
-        for thread in threads:
-            thread.join()
+        def probe(endpoint):
+            socket.create_connection((endpoint[0], int(endpoint[1])), timeout=self.probe_timeout).close()
 
-        results["obproxy_nodes"] = node_results
+        def on_done(outcome):
+            if not outcome.ok:
+                self.stdio.print("  " + Fore.RED + "✗" + Style.RESET_ALL + " {0}:{1} unreachable - {2}".format(outcome.item[0], outcome.item[1], outcome.error))
+
+        runner = NodeRunner(self.stdio, max_workers=PREFLIGHT_PROBE_WORKERS, deadline=started + self.probe_timeout + 1)
+        for outcome in runner.run(endpoints, probe, name=lambda endpoint: "{0}:{1}".format(*endpoint), on_done=on_done):
+            if not outcome.ok:
+                self.unreachable[outcome.item] = outcome.error or "timed out"
+        elapsed = time.time() - started
+        self.stdio.print("  {0} reachable, {1} unreachable ({2:.2f}s)".format(len(endpoints) - len(self.unreachable), len(self.unreachable), elapsed))
         self.stdio.print("")
+        results["preflight"] = {"endpoints": len(endpoints), "unreachable": ["{0}:{1}".format(*endpoint) for endpoint in self.unreachable], "elapsed": round(elapsed, 3)}
 
     def _merge_node_config(self, node, global_config):
         """Merge node config with global config"""
@@ -264,7 +384,7 @@ class ConfigCheckHandler:
             ssh_client = SshClient(self.context, node_config)
 
             # Test connection by executing a simple command
-            result = ssh_client.exec_cmd("echo 'obdiag_test'")
+            result = ssh_client.exec_cmd("echo 'obdiag_test'", timeout=self.cmd_timeout)
 
             if result is not None and "obdiag_test" in result:
                 path_check_display = []
@@ -275,7 +395,7 @@ class ConfigCheckHandler:
                     # Check home_path/bin/observer exists
                     if home_path:
                         observer_bin = "{0}/bin/observer".format(home_path)
-                        check_observer = ssh_client.exec_cmd("test -f {0} && echo 'yes' || echo 'no'".format(observer_bin))
+                        check_observer = ssh_client.exec_cmd("test -f {0} && echo 'yes' || echo 'no'".format(observer_bin), timeout=self.cmd_timeout)
                         if check_observer and check_observer.strip() == "yes":
                             path_check_display.append(Fore.GREEN + "      ✓ bin/observer found" + Style.RESET_ALL)
                         else:
@@ -285,7 +405,7 @@ class ConfigCheckHandler:
                     # Check data_dir/sstable exists
                     if data_dir:
                         sstable_path = "{0}/sstable".format(data_dir)
-                        check_sstable = ssh_client.exec_cmd("test -d {0} && echo 'yes' || echo 'no'".format(sstable_path))
+                        check_sstable = ssh_client.exec_cmd("test -d {0} && echo 'yes' || echo 'no'".format(sstable_path), timeout=self.cmd_timeout)
                         if check_sstable and check_sstable.strip() == "yes":
                             path_check_display.append(Fore.GREEN + "      ✓ data_dir/sstable found" + Style.RESET_ALL)
                         else:
@@ -295,7 +415,7 @@ class ConfigCheckHandler:
                     # Check redo_dir/clog exists
                     if redo_dir:
                         clog_path = "{0}/clog".format(redo_dir)
-                        check_clog = ssh_client.exec_cmd("test -d {0} && echo 'yes' || echo 'no'".format(clog_path))
+                        check_clog = ssh_client.exec_cmd("test -d {0} && echo 'yes' || echo 'no'".format(clog_path), timeout=self.cmd_timeout)
                         if check_clog and check_clog.strip() == "yes":
                             path_check_display.append(Fore.GREEN + "      ✓ redo_dir/clog found" + Style.RESET_ALL)
                         else:
@@ -305,7 +425,7 @@ class ConfigCheckHandler:
                     # For obproxy nodes, check home_path/bin/obproxy exists
                     if home_path:
                         obproxy_bin = "{0}/bin/obproxy".format(home_path)
-                        check_obproxy = ssh_client.exec_cmd("test -f {0} && echo 'yes' || echo 'no'".format(obproxy_bin))
+                        check_obproxy = ssh_client.exec_cmd("test -f {0} && echo 'yes' || echo 'no'".format(obproxy_bin), timeout=self.cmd_timeout)
                         if check_obproxy and check_obproxy.strip() == "yes":
                             path_check_display.append(Fore.GREEN + "      ✓ bin/obproxy found" + Style.RESET_ALL)
                         else:
@@ -399,6 +519,11 @@ class ConfigCheckHandler:
         else:
             self.stdio.print("  OBProxy Nodes:          " + Fore.YELLOW + "⚠ SKIPPED (no nodes configured)" + Style.RESET_ALL)
 
+        preflight = results.get("preflight")
+        if preflight:
+            cached = len([n for n in observer_nodes + obproxy_nodes if n.get("cached")])
+            self.stdio.print("  Pre-flight:             {0} endpoint(s) probed in {1}s, {2} unreachable, {3} node(s) from cache".format(preflight["endpoints"], preflight["elapsed"], len(preflight["unreachable"]), cached))
+
         self.stdio.print("")
         self.stdio.print("-" * 70)
 
@@ -16,16 +16,32 @@
 @desc: Validate SQL syntax/semantics against a live OceanBase instance
        using EXPLAIN — without executing the SQL.
        See https://github.com/oceanbase/obdiag/issues/1181
+       --file checks whole .sql files: statements are deduplicated by fingerprint, the ones the local parser
+       rejects are reported without a round trip and the rest are EXPLAINed over a pool of connections.
 """
 
+import contextlib
+import datetime
+import io
+import json
+import os
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import pymysql as mysql
 
-from src.common.ob_connector import OBConnector
+from src.common.ob_connector import OBConnector, OBConnectorPool
 from src.common.result_type import ObdiagResult
+from src.common.sql_fingerprint import fingerprint, fingerprint_id, split_statements
 from src.common.tool import StringUtils, Util
 
+# statement kinds the local parser covers well enough for its rejection to be trusted; it also rejects valid
+# INSERT ... ON DUPLICATE KEY UPDATE, REPLACE and most DDL, those always go to EXPLAIN
+PREFILTER_KINDS = ("select", "update", "delete", "with")
+# sources (file:line) kept per distinct statement in the report
+MAX_SOURCES = 20
+
 
 def normalize_sql_for_syntax_check(sql):
     """
@@ -52,6 +68,9 @@ class SqlSyntaxHandler:
         self.options = context.options
 
     def handle(self):
+        files = Util.get_option(self.options, 'file')
+        if files:
+            return self._handle_batch(files)
         sql = self._get_sql()
         if sql is None:
             return ObdiagResult(ObdiagResult.INPUT_ERROR_CODE, error_data="--sql is required")
@@ -94,7 +113,7 @@ class SqlSyntaxHandler:
     def _get_sql(self):
         sql = Util.get_option(self.options, 'sql')
         if not sql or not sql.strip():
-            self.stdio.error("--sql is required. Usage: obdiag tool sql_syntax --sql 'SELECT ...' " "[--env host=... --env port=... --env user=... --env password=... --env database=...]")
+            self.stdio.error("--sql or --file is required. Usage: obdiag tool sql_syntax --sql 'SELECT ...' " "[--env host=... --env port=... --env user=... --env password=... --env database=...]")
             return None
         return sql.strip()
 
@@ -130,34 +149,189 @@ class SqlSyntaxHandler:
 
         return host, int(port), user, password, database
 
-    def _check_syntax(self, connector, sql):
-        """Run EXPLAIN against the SQL and interpret the result."""
+    def _explain(self, connector, sql):
+        """(result, error_code, detail) of EXPLAIN sql, mysql errors other than 1064 are semantic errors"""
         explain_sql = "EXPLAIN {0}".format(sql)
         self.stdio.verbose("[sql-syntax] exec: {0}".format(explain_sql))
-
         try:
             connector.execute_sql(explain_sql)
-            self.stdio.print("Result: VALID")
-            return ObdiagResult(ObdiagResult.SUCCESS_CODE, data={"result": "VALID", "sql": sql})
-
+            return "VALID", None, None
         except mysql.Error as e:
             error_code = e.args[0] if e.args else None
             error_msg = e.args[1] if len(e.args) > 1 else str(e)
+            return ("SYNTAX_ERROR" if error_code == 1064 else "SEMANTIC_ERROR"), error_code, error_msg
 
-            if error_code == 1064:
-                self.stdio.print("Result: SYNTAX ERROR")
-                self.stdio.print("Detail: {0}".format(error_msg))
-                return ObdiagResult(
-                    ObdiagResult.SUCCESS_CODE,
-                    data={"result": "SYNTAX_ERROR", "error_code": error_code, "detail": error_msg},
-                )
-            else:
-                self.stdio.print("Result: VALID (syntax OK, but semantic error [{0}]: {1})".format(error_code, error_msg))
-                return ObdiagResult(
-                    ObdiagResult.SUCCESS_CODE,
-                    data={"result": "SEMANTIC_ERROR", "error_code": error_code, "detail": error_msg},
-                )
-
+    def _check_syntax(self, connector, sql):
+        """Run EXPLAIN against the SQL and interpret the result."""
+        try:
+            result, error_code, error_msg = self._explain(connector, sql)
         except Exception as e:
             self.stdio.error("Unexpected error during SQL syntax check: {0}".format(e))
             return ObdiagResult(ObdiagResult.SERVER_ERROR_CODE, error_data=str(e))
+        if result == "VALID":
+            self.stdio.print("Result: VALID")
+            return ObdiagResult(ObdiagResult.SUCCESS_CODE, data={"result": "VALID", "sql": sql})
+        if result == "SYNTAX_ERROR":
+            self.stdio.print("Result: SYNTAX ERROR")
+            self.stdio.print("Detail: {0}".format(error_msg))
+        else:
+            self.stdio.print("Result: VALID (syntax OK, but semantic error [{0}]: {1})".format(error_code, error_msg))
+        return ObdiagResult(
+            ObdiagResult.SUCCESS_CODE,
+            data={"result": result, "error_code": error_code, "detail": error_msg},
+        )
+
+    # ------------------------------------------------------------------
+    # batch mode (--file)
+    def _handle_batch(self, paths):
+        started = time.time()
+        sql_files = self._get_sql_files(paths)
+        if not sql_files:
+            self.stdio.error("no .sql file found in --file {0}".format(paths))
+            return ObdiagResult(ObdiagResult.INPUT_ERROR_CODE, error_data="no .sql file found")
+        entries, total = self._load_statements(sql_files)
+        self.stdio.print("{0} statements in {1} files, {2} distinct by fingerprint".format(total, len(sql_files), len(entries)))
+        if not entries:
+            return ObdiagResult(ObdiagResult.INPUT_ERROR_CODE, error_data="no SQL statement found")
+
+        host, port, user, password, database = self._resolve_connection()
+        if host is None:
+            return ObdiagResult(ObdiagResult.INPUT_ERROR_CODE, error_data="missing connection info")
+
+        if not Util.get_option(self.options, 'no_prefilter'):
+            self._prefilter(entries)
+        survivors = [entry for entry in entries if entry["result"] is None]
+        if survivors:
+            parallel = max(1, int(Util.get_option(self.options, 'parallel', 4) or 4))
+            pool = OBConnectorPool(self.context, host, port, user, password or '', database, max_size=parallel)
+            try:
+                with pool.connection() as connector:
+                    connected = connector.conn is not None
+                if not connected:
+                    self.stdio.error("Failed to connect to OceanBase at {0}:{1}. Check your connection info.".format(host, port))
+                    return ObdiagResult(ObdiagResult.SERVER_ERROR_CODE, error_data="connection failed")
+                self.stdio.print("EXPLAIN {0} statements on {1}:{2} with {3} connections".format(len(survivors), host, port, parallel))
+                with ThreadPoolExecutor(max_workers=parallel) as executor:
+                    list(executor.map(lambda entry: self._explain_entry(pool, entry), survivors))
+            finally:
+                pool.close()
+
+        summary = self._batch_summary(entries, total, sql_files, time.time() - started)
+        report_path = self._write_report(summary, entries)
+        self._print_batch_result(summary, entries, report_path)
+        return ObdiagResult(ObdiagResult.SUCCESS_CODE, data={"report": report_path, "summary": summary})
+
+    def _get_sql_files(self, paths):
+        """files named by --file are taken as they are, directories are searched for *.sql"""
+        sql_files = []
+        for path in paths:
+            path = os.path.abspath(os.path.expanduser(path))
+            if os.path.isfile(path):
+                sql_files.append(path)
+            elif os.path.isdir(path):
+                for root, _, files in os.walk(path):
+                    sql_files.extend(os.path.join(root, name) for name in sorted(files) if name.lower().endswith(".sql"))
+            else:
+                self.stdio.warn("--file {0} not found, skip it".format(path))
+        return sql_files
+
+    def _load_statements(self, sql_files):
+        """one entry per distinct fingerprint in file order, with how often and where it was seen"""
+        entries = {}
+        total = 0
+        for path in sql_files:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                text = f.read()
+            for line, statement in split_statements(text):
+                total += 1
+                sql, err = normalize_sql_for_syntax_check(statement)
+                fp = fingerprint(sql) if sql else statement
+                entry = entries.get(fp)
+                if entry is None:
+                    entry = entries[fp] = {
+                        "id": fingerprint_id(fp),
+                        "fingerprint": fp,
+                        "sql": sql or statement,
+                        "count": 0,
+                        "sources": [],
+                        "result": "INPUT_ERROR" if err else None,
+                        "checked_by": "input" if err else None,
+                        "error_code": None,
+                        "detail": err,
+                        "latency_ms": None,
+                    }
+                entry["count"] += 1
+                if len(entry["sources"]) < MAX_SOURCES:
+                    entry["sources"].append("{0}:{1}".format(path, line))
+        return list(entries.values()), total
+
+    def _prefilter(self, entries):
+        candidates = [entry for entry in entries if entry["result"] is None and entry["fingerprint"].split(" ", 1)[0] in PREFILTER_KINDS]
+        if not candidates:
+            return
+        from src.handler.analyzer.sql.engine import Engine
+
+        engine = Engine()
+        rejected = 0
+        for entry in candidates:
+            start = time.time()
+            try:
+                # the parser prints its error state to stdout
+                with contextlib.redirect_stdout(io.StringIO()):
+                    engine.parse(entry["sql"])
+            except SyntaxError as e:
+                entry.update(result="SYNTAX_ERROR", checked_by="parser", detail=" ".join(str(e).split()), latency_ms=round((time.time() - start) * 1000, 3))
+                rejected += 1
+            except Exception as e:
+                # a parser bug on a statement it does not model, let the server decide
+                self.stdio.verbose("[sql-syntax] local parser failed on {0}: {1}".format(entry["id"], e))
+        self.stdio.print("local parser: {0} of {1} statements rejected, no EXPLAIN needed for them".format(rejected, len(candidates)))
+
+    def _explain_entry(self, pool, entry):
+        start = time.time()
+        try:
+            with pool.connection() as connector:
+                result, error_code, detail = self._explain(connector, entry["sql"])
+        except Exception as e:
+            result, error_code, detail = "ERROR", None, str(e)
+        entry.update(result=result, checked_by="explain", error_code=error_code, detail=detail, latency_ms=round((time.time() - start) * 1000, 3))
+
+    def _batch_summary(self, entries, total, sql_files, elapsed):
+        by_result = {}
+        for entry in entries:
+            counts = by_result.setdefault(entry["result"], {"distinct": 0, "statements": 0})
+            counts["distinct"] += 1
+            counts["statements"] += entry["count"]
+        latencies = sorted(entry["latency_ms"] for entry in entries if entry["checked_by"] == "explain")
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] if latencies else None
+
+        return {
+            "files": len(sql_files),
+            "statements": total,
+            "distinct": len(entries),
+            "parser_rejected": sum(1 for entry in entries if entry["checked_by"] == "parser"),
+            "explained": len(latencies),
+            "results": by_result,
+            "explain_latency_ms": {"avg": round(sum(latencies) / len(latencies), 3) if latencies else None, "p50": percentile(0.5), "p95": percentile(0.95), "max": latencies[-1] if latencies else None},
+            "elapsed_s": round(elapsed, 3),
+        }
+
+    def _write_report(self, summary, entries):
+        store_dir = os.path.abspath(os.path.expanduser(Util.get_option(self.options, 'store_dir', '.') or '.'))
+        os.makedirs(store_dir, exist_ok=True)
+        report_path = os.path.join(store_dir, "obdiag_sql_syntax_{0}.json".format(datetime.datetime.now().strftime("%Y%m%d%H%M%S")))
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump({"command": "obdiag tool sql_syntax", "summary": summary, "statements": entries}, f, ensure_ascii=False, indent=2, default=str)
+        return report_path
+
+    def _print_batch_result(self, summary, entries, report_path):
+        for result, counts in sorted(summary["results"].items()):
+            self.stdio.print("{0}: {1} distinct, {2} statements".format(result, counts["distinct"], counts["statements"]))
+        failed = [entry for entry in entries if entry["result"] != "VALID"]
+        for entry in failed[:20]:
+            self.stdio.print("[{0}] {1} ({2}): {3}".format(entry["result"], entry["sources"][0], entry["checked_by"], entry["detail"]))
+        if len(failed) > 20:
+            self.stdio.print("... {0} more, see the report".format(len(failed) - 20))
+        self.stdio.print("report: {0}".format(report_path))
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_analyze_combined.py
+@desc:
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from optparse import Values
+from unittest.mock import MagicMock, patch
+
+from src.common.context import HandlerContext
+from src.handler.analyzer import analyze_combined
+from src.handler.analyzer.analyze_combined import AnalyzeCombinedHandler
+from src.handler.analyzer.log_parser.record_engine import LogRecordEngine
+
+
+def memory_dump(time_str, hold):
+    return [
+        "[{0}] INFO  [COMMON] operator() (memory_dump.cpp:1) [200][MemoryDump][T0][Y0-0000000000000000-0-0] [lt=1] [MemoryDump] statistics".format(time_str),
+        "[MEMORY] tenant: 1001, limit: 2,147,483,648 hold: {0} cache_hold: 0 cache_used: 0 cache_item_count: 0".format(hold),
+        "[{0}] INFO  [COMMON] print_tenant_usage (ob_server.cpp:2) [201][ServerGTimer][T0][Y0-0000000000000000-0-0] [lt=1] [CHUNK_MGR] free=0".format(time_str),
+    ]
+
+
+def queue_dump(time_str, tenant_id, req_queue):
+    return "[{0}] INFO  [SERVER.OMT] print_info (ob_tenant.cpp:3) [300][MultiTenant][T0][Y0-0000000000000000-0-0] [lt=1] dump tenant info(tenant={{id:{1}, req_queue:total_size={2} queue[0]=0, multi_level_queue:total_size=0, group_id = 1,queue_size = 0,".format(
+        time_str, tenant_id, req_queue
+    )
+
+
+LINES = (
+    memory_dump("2024-01-01 10:00:00.000001", "1,073,741,824")
+    + [
+        "[2024-01-01 10:00:01.000001] WARN  [STORAGE] get (ob_tablet.cpp:2) [101][T1001_TX][T1001][Y2-0000000000000002-0-0] [lt=1] get tablet failed(ret=-4012)",
+        queue_dump("2024-01-01 10:00:02.000001", 1001, 80),
+        queue_dump("2024-01-01 10:00:03.000001", 1002, 500),
+        "[2024-01-01 10:00:04.000001] WARN  [SQL] open (ob_sql.cpp:3) [102][T1001_SQL][T1001][Y3-0000000000000003-0-0] [lt=1] open failed(ret=-4012)",
+        queue_dump("2024-01-01 10:00:05.000001", 1001, 10),
+    ]
+    + memory_dump("2024-01-01 10:00:10.000001", "2,147,483,648")
+)
+
+
+class TestAnalyzeCombined(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.log_dir = os.path.join(self.tmp, "ob_log")
+        os.makedirs(self.log_dir)
+        with open(os.path.join(self.log_dir, "observer.log"), "w") as f:
+            f.write("\n".join(LINES) + "\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def handle(self, **options):
+        options = dict({"files": [self.log_dir], "store_dir": self.tmp}, **options)
+        context = HandlerContext(options=Values(options), stdio=MagicMock())
+        return AnalyzeCombinedHandler(context).handle()
+
+    def summary_rows(self, summary, title):
+        # the data rows of the grid table following title
+        table = summary.split(title)[1].split("\nAnalyze")[0]
+        return [[cell.strip() for cell in line.strip("|").split("|")] for line in table.splitlines() if line.startswith("|")][1:]
+
+    def test_one_read_for_all(self):
+        with patch.object(analyze_combined, "LogRecordEngine", wraps=LogRecordEngine) as engine:
+            result = self.handle(version="4.3.0.0", tenant_id="1001", queue=50)
+        self.assertEqual(engine.call_count, 1)
+        self.assertEqual(result.data["stats"]["files"], 1)
+        summary = result.data["result"]
+        self.assertEqual(self.summary_rows(summary, "Log Summary"), [["-4012", "Timeout", "2", "2024-01-01 10:00:01.000001", "2024-01-01 10:00:04.000001"]])
+        self.assertEqual(self.summary_rows(summary, "Memory Summary"), [["1001", "2", "2048", "2024-01-01 10:00:10"]])
+        # the dump of tenant 1002 does not count
+        self.assertEqual(self.summary_rows(summary, "Queue Summary"), [["2", "50", "1", "80", "yes"]])
+        with open(os.path.join(result.data["store_dir"], "result_summary.txt")) as f:
+            self.assertEqual(f.read(), summary)
+
+    def test_skip_memory_and_queue(self):
+        result = self.handle()
+        summary = result.data["result"]
+        self.assertIn("Log Summary", summary)
+        self.assertNotIn("Memory Summary", summary)
+        self.assertNotIn("Queue Summary", summary)
+
+    def test_no_files(self):
+        result = self.handle(files=[os.path.join(self.tmp, "missing")])
+        self.assertNotEqual(result.code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_record_engine.py
+@desc:
+"""
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.common.ob_log_parser import ObLogParser
+from src.handler.analyzer.log_parser.log_entry import iter_log_records
+from src.handler.analyzer.log_parser.record_engine import FieldExtractConsumer, FirstMatchConsumer, LogRecordConsumer, LogRecordEngine
+
+LINES = [
+    "dangling tail of a rotated record",
+    "[2024-01-01 10:00:00.000001] INFO  [SERVER] run (ob_server.cpp:1) [100][T1001_Occam][T1001][Y1-0000000000000001-0-0] [lt=1] start",
+    "[2024-01-01 10:00:01.000001] WARN  [STORAGE] get (ob_tablet.cpp:2) [101][T1002_TX][T1002][Y2-0000000000000002-0-0] [lt=1] get tablet failed(tmp_ret=-4002, ret=-4012)",
+    "  stack line 1",
+    "  stack line 2",
+    "[2024-01-01 10:00:02.000001] ERROR [SQL] open (ob_sql.cpp:3) [102][T1002_SQL][T1002][Y3-0000000000000003-0-0] [lt=1] fatal error",
+]
+
+
+class CollectConsumer(LogRecordConsumer):
+    def __init__(self, needles=None):
+        self.needles = needles
+        self.records = []
+
+    def consume(self, record):
+        self.records.append(record.line_no)
+
+
+class FailingConsumer(LogRecordConsumer):
+    def consume(self, record):
+        raise ValueError("broken")
+
+
+class TestRecordEngine(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.log = os.path.join(self.tmp, "observer.log")
+        with open(self.log, "w") as f:
+            f.write("\n".join(LINES) + "\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_records(self):
+        data = ("\n".join(LINES) + "\n").encode("utf-8")
+        records = list(iter_log_records(io.BytesIO(data), "observer.log"))
+        self.assertEqual([record.line_no for record in records], [1, 2, 3, 6])
+        self.assertIsNone(records[0].time_str)
+        record = records[2]
+        self.assertEqual(record.lines(), LINES[2:5])
+        self.assertEqual((record.time_str, record.level, record.thread_id), ("2024-01-01 10:00:01.000001", "WARN", 101))
+        self.assertEqual((record.trace_id, record.tenant_id, record.ret), ("Y2-0000000000000002-0-0", "1002", "-4012"))
+        # with needles only the records holding one are built, the line numbers stay those of the file
+        self.assertEqual([r.line_no for r in iter_log_records(io.BytesIO(data), needles=(b"stack line 2", b"fatal"))], [3, 6])
+        # reading resumes from the offset of a record
+        resumed = list(iter_log_records(io.BytesIO(data), start_offset=record.offset, start_line=record.line_no))
+        self.assertEqual([r.text for r in resumed], [r.text for r in records[2:]])
+
+    def test_consumer_must_consume(self):
+        with self.assertRaises(TypeError):
+            LogRecordConsumer()
+
+        class NoConsume(LogRecordConsumer):
+            needles = ("ret=-",)
+
+        with self.assertRaises(TypeError):
+            NoConsume()
+
+    def test_one_pass_for_all_consumers(self):
+        with gzip.open(self.log + ".1.gz", "wt") as f:
+            f.write(LINES[1] + "\n")
+        engine = LogRecordEngine()
+        every = engine.register(CollectConsumer())
+        stacks = engine.register(CollectConsumer(needles=("stack line",)))
+        engine.register(FailingConsumer())
+        stats = engine.run([self.log, self.log + ".1.gz"])
+        self.assertEqual(every.records, [1, 2, 3, 6, 1])
+        self.assertEqual(stacks.records, [3])
+        self.assertEqual((stats["files"], stats["records"]), (2, 5))
+
+    def test_stops_when_consumers_are_done(self):
+        other = os.path.join(self.tmp, "other.log")
+        with open(other, "w") as f:
+            f.write(LINES[5] + "\n")
+        engine = LogRecordEngine()
+        fatal = engine.register(FirstMatchConsumer("fatal error"))
+        stats = engine.run([self.log, other])
+        self.assertEqual((fatal.match.file_name, fatal.match.line_no), (self.log, 6))
+        self.assertEqual(stats["files"], 1)
+
+    def test_field_extract(self):
+        engine = LogRecordEngine()
+        failed = engine.register(FieldExtractConsumer(ObLogParser.get_field_extractor("failed(", ["tmp_ret", "ret", "stack"])))
+        engine.run([self.log])
+        self.assertEqual([(record.line_no, fields) for record, fields in failed.rows], [(3, {"tmp_ret": "-4002", "ret": "-4012", "stack": None})])
+
+
+if __name__ == '__main__':
+    unittest.main()
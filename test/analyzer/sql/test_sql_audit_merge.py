@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_sql_audit_merge.py
+@desc:
+"""
+import unittest
+from unittest.mock import MagicMock
+
+from src.handler.analyzer.analyze_sql import AnalyzeSQLHandler
+
+
+class TestSqlAuditMerge(unittest.TestCase):
+    def setUp(self):
+        self.merge = AnalyzeSQLHandler(MagicMock())._AnalyzeSQLHandler__merge_sql_audit_row
+
+    def row(self, svr_ip, plan_id, ret_code, plan_type, elapsed_time, request_time, return_rows):
+        return {
+            'traceId': 'Y1',
+            'sqlId': 'S1',
+            'svrIp': svr_ip,
+            'svrPort': 2882,
+            'planId': plan_id,
+            'retCode': ret_code,
+            'planType': plan_type,
+            'isHitPlan': 1,
+            'elapsedTime': elapsed_time,
+            'requestTime': request_time,
+            'returnRows': return_rows,
+            'cpuTime': None,
+        }
+
+    def test_merge(self):
+        merged = self.row('10.0.0.1', 1, 0, 1, 100, 50, 1)
+        self.merge(merged, self.row('10.0.0.2', 2, -4012, 3, 300, 40, 2))
+        self.merge(merged, self.row('10.0.0.3', 3, -5001, 2, 200, 60, 4))
+        # counters are added up, requestTime is the first one
+        self.assertEqual((merged['returnRows'], merged['requestTime'], merged['elapsedTime']), (7, 40, 300))
+        # codes, flags and where the request ran are those of the slowest row, never a sum
+        self.assertEqual((merged['svrIp'], merged['planId'], merged['retCode'], merged['planType'], merged['isHitPlan']), ('10.0.0.2', 2, -4012, 3, 1))
+        self.assertIsNone(merged['cpuTime'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: bench_ob_log_parser.py
+@desc: ObLogFieldExtractor against readlines + re.search (what the queue backlog rca scenes did) on generated
+       observer.log files, not collected by pytest. Run it from the repo root:
+           python test/common/bench_ob_log_parser.py [--lines 637000] [--matches 300] [--grepped 300000]
+"""
+import argparse
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from src.common.ob_log_parser import ObLogParser
+
+SITE = "dump tenant"
+FIELDS = ["req_queue:total_size", ["tenant/id", "tenant_id"]]
+NOISE = [
+    "[{0}] INFO  [STORAGE.TRANS] get_gts (ob_gts_source.cpp:312) [{1}][T1001_TxLoopWor][T1001][Y0-0000000000000000-0-0] [lt={2}] get gts succ(ret=0, gts=1704074400000000000)",
+    "[{0}] WDIAG [SQL.RESV] check_table_exist (ob_dml_resolver.cpp:1234) [{1}][T1002_L0_G0][T1002][YB420A0A0A0A-000600000000{3:04d}-0-0] [lt={2}][errcode=-5019] table not exist(table_name=t{3})",
+    "[{0}] INFO  [COMMON] print_io_status (ob_io_struct.cpp:724) [{1}][IO_TUNING0][T0][Y0-0000000000000000-0-0] [lt={2}] [IO STATUS](io_status={{tenant_id:1001, read_size:{3}}})",
+]
+DUMP = (
+    "[{0}] INFO  [SERVER.OMT] print_info (ob_tenant.cpp:1450) [{1}][MultiTenant][T0][Y0-0000000000000000-0-0] [lt={2}] dump tenant info(tenant={{id:{3}, tenant_meta:{{unit:{{unit_id:1001}}}}, "
+    "unit_min_cpu:1, unit_max_cpu:4, token_cnt:8, ass_token_cnt:8}}, req_queue:total_size={4} queue[0]=0 queue[1]=0, multi_level_queue:total_size=0, recv_rpc_cnt=1024, recv_sql_cnt=2048)"
+)
+
+
+def time_str(i):
+    return "2024-01-01 {0:02d}:{1:02d}:{2:02d}.{3:06d}".format(10 + i // 3600000 % 12, i // 60000 % 60, i // 1000 % 60, i % 1000 * 1000)
+
+
+def write_log(file_name, lines, matches):
+    rnd = random.Random(lines)
+    dump_at = set(rnd.sample(range(lines), matches)) if matches < lines else set(range(lines))
+    with open(file_name, "w") as f:
+        for i in range(lines):
+            if i in dump_at:
+                f.write(DUMP.format(time_str(i), 100 + i % 50, i % 97, 1001 + i % 3, rnd.choice([0, 0, 0, 12, 350])) + "\n")
+            else:
+                f.write(NOISE[i % len(NOISE)].format(time_str(i), 100 + i % 50, i % 97, i % 10000) + "\n")
+
+
+def with_re_search(file_name):
+    # the rca scenes before the extractor: readlines, a site check and one re.search per field
+    rows = []
+    with open(file_name, "r", encoding="utf-8") as f:
+        for line in f.readlines():
+            if SITE in line:
+                match = re.search(r"req_queue:total_size=(\d+)", line)
+                tenant = re.search(r"tenant=\{id:(\d+)", line)
+                if match:
+                    rows.append({"req_queue:total_size": match.group(1), "tenant_id": tenant.group(1) if tenant else None})
+    return rows
+
+
+def with_extractor(file_name):
+    extractor = ObLogParser.get_field_extractor(SITE, FIELDS)
+    return [fields for _, fields in extractor.iter_file(file_name, encoding="utf-8")]
+
+
+def best_of(func, file_name, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = func(file_name)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, rows
+
+
+def compare(title, file_name, repeat):
+    re_time, re_rows = best_of(with_re_search, file_name, repeat)
+    ex_time, ex_rows = best_of(with_extractor, file_name, repeat)
+    # both must read the same values, or the timings mean nothing
+    assert [(row["req_queue:total_size"], row["tenant_id"]) for row in re_rows] == [(row["req_queue:total_size"], row["tenant_id"]) for row in ex_rows]
+    print("{0}: {1} matches, readlines+re.search {2:.2f}s, extractor {3:.2f}s".format(title, len(ex_rows), re_time, ex_time))
+
+
+def per_line(repeat):
+    line = DUMP.format(time_str(1), 100, 1, 1001, 350)
+    extractor = ObLogParser.get_field_extractor(SITE, FIELDS)
+    req_queue, tenant = re.compile(r"req_queue:total_size=(\d+)"), re.compile(r"tenant=\{id:(\d+)")
+    number = 100000
+    re_time = min(timeit.repeat(lambda: SITE in line and (req_queue.search(line), tenant.search(line)), number=number, repeat=repeat)) / number
+    ex_time = min(timeit.repeat(lambda: extractor.extract(line), number=number, repeat=repeat)) / number
+    print("per matching line: site check + two re.search {0:.2f}us, extractor {1:.2f}us".format(re_time * 1e6, ex_time * 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=637000, help="lines of the generated observer.log")
+    parser.add_argument("--matches", type=int, default=300, help="dump tenant lines among them")
+    parser.add_argument("--grepped", type=int, default=300000, help="lines of the pre-grepped file, all dump tenant lines")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case, the best one counts")
+    args = parser.parse_args()
+    tmp = tempfile.mkdtemp()
+    try:
+        log = os.path.join(tmp, "observer.log")
+        write_log(log, args.lines, args.matches)
+        print("python {0}, observer.log {1:.0f}MB, {2} lines".format(sys.version.split()[0], os.path.getsize(log) / 1024 / 1024, args.lines))
+        compare("observer.log", log, args.repeat)
+        grepped = os.path.join(tmp, "observer.log.grep")
+        write_log(grepped, args.grepped, args.grepped)
+        compare("pre-grepped", grepped, args.repeat)
+        per_line(args.repeat)
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -16,12 +16,16 @@
 @desc:
 """
 
+import io
+import tarfile
+import threading
 import unittest
 import os
 from unittest.mock import MagicMock, patch
 from kubernetes import config
 from src.common.context import HandlerContext
-from src.common.ssh_client.kubernetes_client import KubernetesClient
+from src.common.ssh_client.kubernetes_client import KubernetesClient, WSStdoutReader
+from src.common.ssh_client.ssh import SshClient
 from kubernetes.client.api.core_v1_api import CoreV1Api
 from tempfile import NamedTemporaryFile
 from kubernetes.client import ApiClient
@@ -447,5 +451,115 @@ class TestKubernetesClient(unittest.TestCase):
         self.assertTrue("kubernetes need set the ip of observer" in str(context.exception))
 
 
+class FakeWSFileManager:
+    """replay stdout/stderr frames like WSFileManager.read_bytes"""
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+
+    def read_bytes(self, timeout=1):
+        if not self.frames:
+            return None, None, True
+        out, err = self.frames.pop(0)
+        return out, err, False
+
+
+def make_tar(name, content, mode='w'):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode=mode) as tar:
+        info = tarfile.TarInfo(name)
+        info.size = len(content)
+        tar.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+class TestWSStdoutReader(unittest.TestCase):
+    def test_read_across_frames(self):
+        reader = WSStdoutReader(FakeWSFileManager([(b"abc", None), (None, b"warn"), (b"defg", None)]))
+        self.assertEqual(reader.read(5), b"abcde")
+        self.assertEqual(reader.read(), b"fg")
+        self.assertEqual(reader.read(1), b"")
+        self.assertEqual(reader.received_bytes, 7)
+        self.assertEqual(reader.stderr_text(), "warn")
+
+    def test_timeout_without_data(self):
+        reader = WSStdoutReader(FakeWSFileManager([(None, None)] * 3), timeout=0)
+        with self.assertRaises(TimeoutError):
+            reader.read(1)
+
+
+class TestKubernetesStreamDownload(unittest.TestCase):
+    def setUp(self):
+        self.context = HandlerContext()
+        self.context.stdio = MagicMock()
+        self.client = KubernetesClient(context=self.context, node={"namespace": "default", "pod_name": "test-pod", "kubernetes_config_file": FILE_DIR})
+        self.client.client = MagicMock()
+        self.temp_file = NamedTemporaryFile(delete=False)
+        self.temp_file.close()
+
+    def tearDown(self):
+        os.remove(self.temp_file.name)
+
+    def _download(self, frames_list):
+        with patch('src.common.ssh_client.kubernetes_client.stream'), patch('src.common.ssh_client.kubernetes_client.WSFileManager') as mock_manager:
+            mock_manager.side_effect = [FakeWSFileManager(frames) for frames in frames_list]
+            return self.client.download("/home/admin/observer.log", self.temp_file.name)
+
+    def _chunks(self, data, size=100):
+        return [(data[i : i + size], None) for i in range(0, len(data), size)]
+
+    def test_download_gzip_stream(self):
+        content = b"observer log line\n" * 100
+        self.assertTrue(self._download([self._chunks(make_tar("observer.log", content, mode='w:gz'))]))
+        with open(self.temp_file.name, 'rb') as f:
+            self.assertEqual(f.read(), content)
+
+    def test_download_fallback_without_gzip(self):
+        content = b"observer log line\n" * 100
+        self.assertTrue(self._download([[(None, b"gzip: not found")], self._chunks(make_tar("observer.log", content))]))
+        with open(self.temp_file.name, 'rb') as f:
+            self.assertEqual(f.read(), content)
+
+    def _fake_download(self, barrier):
+        def download(remote_path, local_path):
+            # every download waits for the others: they only all get through when they run at once
+            barrier.wait()
+            if remote_path.endswith("missing.log"):
+                raise Exception("file not found")
+            with open(local_path, "w") as f:
+                f.write(remote_path)
+            return True
+
+        return download
+
+    def test_download_files_at_once(self):
+        local_dir = os.path.dirname(self.temp_file.name)
+        file_list = [("/home/admin/log/{0}".format(name), os.path.join(local_dir, "obdiag_test_{0}".format(name))) for name in ("observer.log.1", "observer.log.2", "missing.log")]
+        ssh_client = SshClient.__new__(SshClient)
+        ssh_client.client = self.client
+        ssh_client.stdio = self.context.stdio
+        with patch.object(self.client, "download", side_effect=self._fake_download(threading.Barrier(3, timeout=5))):
+            results = ssh_client.download_files(file_list)
+        try:
+            self.assertEqual([results[remote_path] is True for remote_path, _ in file_list], [True, True, False])
+            self.assertIn("file not found", str(results["/home/admin/log/missing.log"]))
+            with open(file_list[0][1]) as f:
+                self.assertEqual(f.read(), "/home/admin/log/observer.log.1")
+        finally:
+            for _, local_path in file_list[:2]:
+                os.remove(local_path)
+
+    def test_download_files_one_by_one(self):
+        # the other clients keep downloading the files in turn
+        ssh_client = SshClient.__new__(SshClient)
+        ssh_client.client = MagicMock()
+        ssh_client.client.download.side_effect = [True, Exception("Permission denied")]
+        ssh_client.stdio = self.context.stdio
+        results = ssh_client.download_files([("/a.log", self.temp_file.name), ("/b.log", self.temp_file.name)])
+        self.assertTrue(results["/a.log"])
+        self.assertIn("Permission denied", str(results["/b.log"]))
+        self.assertEqual([c.args[0] for c in ssh_client.client.download.call_args_list], ["/a.log", "/b.log"])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_lazy_ssh_client.py
+@desc:
+"""
+import copy
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.common.ssh_client import ssh
+from src.common.ssh_client.ssh import LazySshClient, LazySshClientGroup, get_local_ip_list
+
+
+class TestLazySshClient(unittest.TestCase):
+    def setUp(self):
+        self.context = MagicMock()
+
+    @patch("src.common.ssh_client.ssh.SshClient")
+    def test_connect_on_first_use(self, mock_ssh_client):
+        client = LazySshClient(self.context, {"ip": "192.168.1.1"})
+        mock_ssh_client.assert_not_called()
+        self.assertEqual(client.node["ip"], "192.168.1.1")
+        mock_ssh_client.assert_not_called()
+        client.exec_cmd("ls")
+        mock_ssh_client.assert_called_once()
+        mock_ssh_client.return_value.exec_cmd.assert_called_once_with("ls")
+
+    @patch("src.common.ssh_client.ssh.SshClient")
+    def test_connect_error_raised_on_use(self, mock_ssh_client):
+        mock_ssh_client.side_effect = Exception("connect timeout")
+        client = LazySshClient(self.context, {"ip": "192.168.1.1"})
+        with self.assertRaises(Exception):
+            client.exec_cmd("ls")
+        with self.assertRaises(Exception):
+            client.get_name()
+        mock_ssh_client.assert_called_once()
+
+    @patch("src.common.ssh_client.ssh.SshClient")
+    def test_copy_does_not_connect(self, mock_ssh_client):
+        node = {"ip": "192.168.1.1"}
+        node["ssher"] = LazySshClient(self.context, node)
+        copy.copy(node)
+        copy.deepcopy(node["ssher"])
+        mock_ssh_client.assert_not_called()
+
+    @patch("src.common.ssh_client.ssh.SshClient")
+    def test_group_connects_all_on_first_use(self, mock_ssh_client):
+        group = LazySshClientGroup(self.context)
+        clients = [group.add({"ip": "192.168.1.{0}".format(i)}) for i in range(5)]
+        mock_ssh_client.assert_not_called()
+        clients[0].exec_cmd("ls")
+        group.connect_all(wait=True)
+        for client in clients:
+            client.connect()
+        self.assertEqual(mock_ssh_client.call_count, 5)
+
+
+class TestGetLocalIpList(unittest.TestCase):
+    def setUp(self):
+        ssh._local_ip_list = None
+
+    def tearDown(self):
+        ssh._local_ip_list = None
+
+    @patch("socket.getaddrinfo")
+    def test_resolved_once(self, mock_getaddrinfo):
+        mock_getaddrinfo.return_value = [(None, None, None, None, ("10.0.0.1", 0))]
+        self.assertIn("10.0.0.1", get_local_ip_list())
+        self.assertIn("127.0.0.1", get_local_ip_list())
+        mock_getaddrinfo.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
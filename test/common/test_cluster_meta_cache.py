@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_cluster_meta_cache.py
+@desc: test ClusterMetaCache and its use in command.get_observer_pid
+"""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from src.common import cluster_meta_cache
+from src.common.cluster_meta_cache import ClusterMetaCache, get_cluster_meta_cache
+from src.common.command import get_observer_pid, get_observer_version
+
+
+class TestClusterMetaCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.tmp_dir, "cache.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_get_or_load_persists_between_instances(self):
+        cache = ClusterMetaCache(self.cache_file, ttl=60)
+        loader = Mock(return_value="4.2.5.0")
+        self.assertEqual(cache.get_or_load("observer_version", loader), "4.2.5.0")
+        self.assertEqual(cache.get_or_load("observer_version", loader), "4.2.5.0")
+        loader.assert_called_once()
+        self.assertEqual(ClusterMetaCache(self.cache_file, ttl=60).get("observer_version"), "4.2.5.0")
+
+    def test_ttl_expired(self):
+        cache = ClusterMetaCache(self.cache_file, ttl=10)
+        cache.set("observer_version", "4.2.5.0")
+        with patch("src.common.cluster_meta_cache.time.time", return_value=time.time() + 11):
+            self.assertIsNone(cache.get("observer_version"))
+
+    def test_empty_value_not_cached(self):
+        cache = ClusterMetaCache(self.cache_file, ttl=60)
+        cache.get_or_load("home_path", lambda: "", node="127.0.0.1:2882")
+        self.assertIsNone(cache.get("home_path", node="127.0.0.1:2882"))
+
+    def test_start_time_change_invalidates(self):
+        cache = ClusterMetaCache(self.cache_file, ttl=60)
+        cache.set("observer_version", "4.2.5.0")
+        cache.set("observer_pid", ["100"], node="n1")
+        cache.set_start_time("n1", ["100 Mon Oct 19 10:00:00 2026"])
+        self.assertTrue(cache.check_start_time("n1", ["100 Mon Oct 19 10:00:00 2026"]))
+        self.assertFalse(cache.check_start_time("n1", ["200 Mon Oct 19 11:00:00 2026"]))
+        self.assertIsNone(cache.get("observer_pid", node="n1"))
+        self.assertIsNone(cache.get("observer_version"))
+
+    def test_broken_file_is_ignored(self):
+        with open(self.cache_file, "w") as f:
+            f.write("{not json")
+        cache = ClusterMetaCache(self.cache_file, ttl=60)
+        self.assertIsNone(cache.get("observer_version"))
+
+
+class TestCommandWithClusterMetaCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.env = patch.dict(os.environ, {"OBDIAG_HOME": self.tmp_dir})
+        self.env.start()
+        cluster_meta_cache._caches.clear()
+        self.context = Mock()
+        self.context.cluster_config = {"ob_cluster_name": "test", "db_host": "127.0.0.1", "db_port": 2881, "servers": []}
+        self.context.inner_config = {"obdiag": {"basic": {"cluster_meta_cache_ttl": 600}}}
+
+    def tearDown(self):
+        self.env.stop()
+        cluster_meta_cache._caches.clear()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_cache_disabled(self):
+        self.context.inner_config = {"obdiag": {"basic": {"cluster_meta_cache_ttl": 0}}}
+        self.assertIsNone(get_cluster_meta_cache(self.context))
+
+    @patch("src.common.command._get_observer_version", return_value="4.2.5.0")
+    def test_observer_version_probed_once(self, mock_get_version):
+        self.assertEqual(get_observer_version(self.context), "4.2.5.0")
+        self.assertEqual(get_observer_version(self.context), "4.2.5.0")
+        mock_get_version.assert_called_once()
+
+    def test_observer_pid_reused_until_restart(self):
+        ssh_client = Mock()
+        ssh_client.context = self.context
+        ssh_client.get_ip.return_value = "127.0.0.1"
+        start_time = {"value": "100 Mon Oct 19 10:00:00 2026"}
+
+        def exec_cmd(cmd):
+            if cmd.startswith("cat "):
+                return "100"
+            if "lstart" in cmd:
+                return start_time["value"]
+            return "100"
+
+        ssh_client.exec_cmd.side_effect = exec_cmd
+        self.assertEqual(get_observer_pid(ssh_client, "/home/admin/oceanbase", Mock()), ["100"])
+        calls = ssh_client.exec_cmd.call_count
+        self.assertEqual(get_observer_pid(ssh_client, "/home/admin/oceanbase", Mock()), ["100"])
+        self.assertEqual(ssh_client.exec_cmd.call_count, calls + 1)
+
+        start_time["value"] = "100 Mon Oct 19 11:00:00 2026"
+        get_observer_pid(ssh_client, "/home/admin/oceanbase", Mock())
+        self.assertGreater(ssh_client.exec_cmd.call_count, calls + 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_collector_scheduler.py
+@desc:
+"""
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from src.common.collector_scheduler import Collector, CollectorScheduler
+
+
+class TestCollectorScheduler(unittest.TestCase):
+    def setUp(self):
+        self.stdio = MagicMock()
+        self.lock = threading.Lock()
+        self.events = []
+
+    def job(self, name, seconds=0.05):
+        def run():
+            with self.lock:
+                self.events.append(("start", name))
+            time.sleep(seconds)
+            with self.lock:
+                self.events.append(("end", name))
+            return name
+
+        return run
+
+    def overlapped(self, a, b):
+        order = [event for event in self.events if event[1] in (a, b)]
+        # a and b overlap when both started before the first one ended
+        return [kind for kind, _ in order[:2]] == ["start", "start"]
+
+    def test_independent_collectors_run_concurrently(self):
+        collectors = [Collector("a", self.job("a"), ["n1"], cpu=1), Collector("b", self.job("b"), ["n1"], cpu=1)]
+        records = CollectorScheduler(self.stdio, {"cpu": 2, "io": 1, "ssh": 4}).run(collectors)
+        self.assertEqual([record.status for record in records.values()], ["ok", "ok"])
+        self.assertEqual(records["a"].result, "a")
+        self.assertTrue(self.overlapped("a", "b"))
+
+    def test_budget_of_a_node_serializes(self):
+        collectors = [Collector("perf", self.job("perf"), ["n1"], cpu=2), Collector("log", self.job("log"), ["n1"], cpu=1, io=1)]
+        CollectorScheduler(self.stdio, {"cpu": 2, "io": 1, "ssh": 4}).run(collectors)
+        self.assertFalse(self.overlapped("perf", "log"))
+
+    def test_other_nodes_are_not_limited(self):
+        collectors = [Collector("perf", self.job("perf"), ["n1"], cpu=2), Collector("proxy_log", self.job("proxy_log"), ["n2"], cpu=1, io=1)]
+        CollectorScheduler(self.stdio, {"cpu": 2, "io": 1, "ssh": 4}).run(collectors)
+        self.assertTrue(self.overlapped("perf", "proxy_log"))
+
+    def test_dependency_and_failure(self):
+        def fail():
+            raise Exception("ssh failed")
+
+        collectors = [Collector("perf", self.job("perf"), ["n1"], cpu=1, depends_on=["obstack"]), Collector("obstack", fail, ["n1"], cpu=1)]
+        records = CollectorScheduler(self.stdio, {"cpu": 4}).run(collectors)
+        self.assertEqual(records["obstack"].status, "error")
+        self.assertEqual(records["obstack"].error, "ssh failed")
+        self.assertEqual(records["perf"].status, "ok")
+        self.assertGreaterEqual(records["perf"].start, records["obstack"].end)
+
+    def test_demand_over_budget_still_runs(self):
+        records = CollectorScheduler(self.stdio, {"cpu": 1}).run([Collector("big", self.job("big"), ["n1"], cpu=3)])
+        self.assertEqual(records["big"].status, "ok")
+
+    def test_invalid_graph(self):
+        scheduler = CollectorScheduler(self.stdio, {})
+        with self.assertRaises(ValueError):
+            scheduler.run([Collector("a", self.job("a"), ["n1"], depends_on=["b"]), Collector("b", self.job("b"), ["n1"], depends_on=["a"])])
+        with self.assertRaises(ValueError):
+            scheduler.run([Collector("a", self.job("a"), ["n1"], depends_on=["missing"])])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_file_crypto.py
+@desc:
+"""
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from cryptography.fernet import Fernet
+
+from src.common.file_crypto import file_crypto
+from src.common.file_crypto.file_crypto import FileEncryptor
+
+
+class TestFileEncryptor(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.tmp_dir, "config.yml")
+        self.data = os.urandom(10000)
+        with open(self.file_path, "wb") as f:
+            f.write(self.data)
+        self.encryptor = FileEncryptor(context=None, stdio=MagicMock())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _encrypt(self, data, chunk_size):
+        dst = io.BytesIO()
+        self.encryptor.encrypt_stream(io.BytesIO(data), dst, "pwd", chunk_size=chunk_size)
+        return dst.getvalue()
+
+    def _decrypt(self, encrypted):
+        dst = io.BytesIO()
+        self.encryptor.decrypt_stream(io.BytesIO(encrypted), dst, "pwd")
+        return dst.getvalue()
+
+    def test_encrypt_decrypt_file(self):
+        encrypted_file_path = self.encryptor.encrypt_file(self.file_path, "pwd")
+        self.assertEqual(encrypted_file_path, self.file_path + ".encrypted")
+        self.assertEqual(self.encryptor.decrypt_file(encrypted_file_path, "pwd"), self.data)
+        self.assertTrue(self.encryptor.check_encrypt_file(self.file_path, encrypted_file_path, "pwd"))
+        self.assertFalse(self.encryptor.decrypt_file(encrypted_file_path, "wrong"))
+
+    def test_chunk_boundaries(self):
+        for data in (b"", b"a" * 100, b"a" * 99, b"a" * 101):
+            self.assertEqual(self._decrypt(self._encrypt(data, 100)), data)
+
+    def test_truncated_and_reordered_chunks_rejected(self):
+        encrypted = self._encrypt(b"a" * 250, 100)
+        header_size = file_crypto.HEADER_STRUCT.size
+        block = 100 + file_crypto.TAG_SIZE
+        with self.assertRaises(ValueError):
+            self._decrypt(encrypted[: header_size + 2 * block])
+        chunks = encrypted[header_size:]
+        with self.assertRaises(ValueError):
+            self._decrypt(encrypted[:header_size] + chunks[block : 2 * block] + chunks[:block] + chunks[2 * block :])
+
+    def test_read_range(self):
+        encrypted_file_path = self.file_path + ".encrypted"
+        with open(self.file_path, "rb") as src, open(encrypted_file_path, "wb") as dst:
+            self.encryptor.encrypt_stream(src, dst, "pwd", chunk_size=1000)
+        self.assertEqual(self.encryptor.read_range(encrypted_file_path, "pwd", 2500, 1700), self.data[2500:4200])
+        self.assertEqual(self.encryptor.read_range(encrypted_file_path, "pwd", 9990, 100), self.data[9990:])
+
+    def test_legacy_fernet_file(self):
+        encrypted_file_path = self.file_path + ".encrypted"
+        with open(encrypted_file_path, "wb") as f:
+            f.write(Fernet(self.encryptor.generate_key_from_password("pwd")).encrypt(self.data))
+        self.assertEqual(self.encryptor.decrypt_file(encrypted_file_path, "pwd"), self.data)
+        self.assertTrue(self.encryptor.check_encrypt_file(self.file_path, encrypted_file_path, "pwd"))
+
+    def test_derived_key_cached(self):
+        file_crypto._derived_keys.clear()
+        with patch("src.common.file_crypto.file_crypto.PBKDF2HMAC", wraps=file_crypto.PBKDF2HMAC) as mock_kdf:
+            self.encryptor.generate_key_from_password("pwd")
+            self.encryptor.generate_key_from_password("pwd")
+            self.assertEqual(mock_kdf.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
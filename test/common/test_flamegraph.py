@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_flamegraph.py
+@desc:
+"""
+import collections
+import shutil
+import subprocess
+import unittest
+
+from src.common.flamegraph import FOLD_PERF_SCRIPT_AWK, fold_perf_script, merge_folded, read_folded, render_flame_svg
+
+PERF_SCRIPT = """observer 1234/1240 [003] 100.000001:   10101010 cycles:
+\t    55d0c0a1b2c3 oceanbase::common::ObLatch::wr_lock(unsigned int, long)+0x12 (/home/admin/oceanbase/bin/observer)
+\t    55d0c0a1b000 oceanbase::sql::ObSql::handle_text_query+0x1a0 (/home/admin/oceanbase/bin/observer)
+\t    7f0000001000 start_thread+0xdb (/usr/lib64/libpthread-2.17.so)
+
+observer 1234/1241 [001] 100.000002:   10101010 cycles:
+\t    7f0000002000 [unknown] (/usr/lib64/libc-2.17.so)
+\t    7f0000001000 start_thread+0xdb (/usr/lib64/libpthread-2.17.so)
+
+T_RPC;Worker 1234/1242 [001] 100.000003:   10101010 cycles:
+\t    55d0c0a1b2c3 oceanbase::common::ObLatch::wr_lock(unsigned int, long)+0x12 (/home/admin/oceanbase/bin/observer)
+\t    55d0c0a1b000 oceanbase::sql::ObSql::handle_text_query+0x1a0 (/home/admin/oceanbase/bin/observer)
+\t    7f0000001000 start_thread+0xdb (/usr/lib64/libpthread-2.17.so)
+
+observer 1234/1240 [003] 100.000004:   10101010 cycles:
+\t    55d0c0a1b2c3 oceanbase::common::ObLatch::wr_lock(unsigned int, long)+0x12 (/home/admin/oceanbase/bin/observer)
+\t    55d0c0a1b000 oceanbase::sql::ObSql::handle_text_query+0x1a0 (/home/admin/oceanbase/bin/observer)
+\t    7f0000001000 start_thread+0xdb (/usr/lib64/libpthread-2.17.so)
+"""
+
+EXPECTED = {
+    "observer;start_thread;oceanbase::sql::ObSql::handle_text_query;oceanbase::common::ObLatch::wr_lock(unsigned int, long)": 2,
+    "observer;start_thread;[libc-2.17.so]": 1,
+    "T_RPC:Worker;start_thread;oceanbase::sql::ObSql::handle_text_query;oceanbase::common::ObLatch::wr_lock(unsigned int, long)": 1,
+}
+
+
+class TestFoldPerfScript(unittest.TestCase):
+    def test_fold_stream(self):
+        self.assertEqual(dict(fold_perf_script(PERF_SCRIPT.splitlines(True))), EXPECTED)
+        self.assertEqual(dict(fold_perf_script(line.encode() for line in PERF_SCRIPT.splitlines(True))), EXPECTED)
+
+    @unittest.skipIf(shutil.which("awk") is None, "awk is not installed")
+    def test_awk_fold_matches_python_fold(self):
+        output = subprocess.run(["awk", FOLD_PERF_SCRIPT_AWK], input=PERF_SCRIPT, capture_output=True, text=True, check=True).stdout
+        self.assertEqual(dict(read_folded(output.splitlines())), EXPECTED)
+
+    def test_read_and_merge_folded(self):
+        first = read_folded(["a;b 2\n", "a;c 1\n", "\n", "broken line\n"])
+        second = read_folded([b"a;b 3\n"])
+        self.assertEqual(merge_folded([first, second]), collections.Counter({"a;b": 5, "a;c": 1}))
+
+
+class TestRenderFlameSvg(unittest.TestCase):
+    def test_render(self):
+        svg = render_flame_svg(read_folded(["main;<lambda> 3", "main;work 1"]), title="t & t")
+        self.assertTrue(svg.startswith("<?xml"))
+        self.assertIn("t &amp; t", svg)
+        self.assertIn("&lt;lambda&gt; (3 samples, 75.00%)", svg)
+        self.assertIn("all (4 samples, 100.00%)", svg)
+
+    def test_differential(self):
+        base = read_folded(["main;a 1", "main;b 1"])
+        current = read_folded(["main;a 3", "main;b 1"])
+        svg = render_flame_svg(current, base_counts=base)
+        self.assertIn("a (3 samples, 75.00%, +25.00%)", svg)
+        self.assertIn("b (1 samples, 25.00%, -25.00%)", svg)
+        self.assertIn('fill="rgb(255,45,45)"', svg)
+        self.assertIn('fill="rgb(45,45,255)"', svg)
+
+
+if __name__ == '__main__':
+    unittest.main()
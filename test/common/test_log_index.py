@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_log_index.py
+@desc:
+"""
+import gzip
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+
+from src.common import log_index
+from src.common.log_index import LogPackIndex, parse_line
+
+LINES = [
+    "[2024-01-01 10:00:00.000001] INFO  [SERVER] run (ob_server.cpp:1) [100][T1001_Occam][T1001][Y1-0000000000000001-0-0] [lt=1] start",
+    "[2024-01-01 10:00:01.000001] WARN  [STORAGE] get (ob_tablet.cpp:2) [101][T1002_TX][T1002][Y2-0000000000000002-0-0] [lt=1] get tablet failed(ret=-4012, tenant_id=1002)",
+    "[2024-01-01 10:00:02.000001] ERROR [SQL] open (ob_sql.cpp:3) [102][T1002_SQL][T1002][Y2-0000000000000002-0-0] [lt=1] open failed(ret=-4012)",
+    "  continued line of the error",
+    "[2024-01-01 10:05:00.000001] INFO  [SERVER] stat (ob_server.cpp:4) [100][T1001_Occam][T1001][Y3-0000000000000003-0-0] [lt=1] tablet stat",
+    "[2024-01-01 10:06:00.000001] EDIAG [RS] check (ob_rs.cpp:5) [103][T1][T1][Y4-0000000000000004-0-0] [lt=1] check failed(ret=-4002)",
+]
+
+
+class TestLogIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.pack = os.path.join(self.tmp, "obdiag_gather_pack_1")
+        os.makedirs(self.pack)
+        # one node packed as tar.gz with a gzipped rotated log inside, one plain log, one binary file
+        node_log = "\n".join(LINES[:4]).encode("utf-8")
+        rotated = gzip.compress(LINES[4].encode("utf-8"))
+        with tarfile.open(os.path.join(self.pack, "ob_log_node1.tar.gz"), "w:gz") as tar:
+            for name, data in (("node1/observer.log", node_log), ("node1/observer.log.20240101100600.gz", rotated)):
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+        with open(os.path.join(self.pack, "rootservice.log"), "w") as f:
+            f.write(LINES[5] + "\n")
+        with open(os.path.join(self.pack, "core.bin"), "wb") as f:
+            f.write(b"\x00\x01\x02" * 100)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_parse_line(self):
+        ts, level, terms = parse_line(LINES[1])
+        self.assertEqual(ts, "2024-01-01 10:00:01")
+        self.assertEqual(level, "WARN")
+        self.assertEqual(terms["trace"], ["Y2-0000000000000002-0-0"])
+        self.assertEqual(terms["ret"], ["-4012"])
+        self.assertEqual(set(terms["tenant"]), {"1002"})
+        self.assertEqual(parse_line(LINES[3], ts)[:2], (ts, None))
+
+    def test_build_and_summary(self):
+        with LogPackIndex(self.pack).open() as index:
+            self.assertTrue(index.built)
+            summary = index.summary()
+        names = [member["name"] for member in summary["members"]]
+        self.assertEqual(names, ["ob_log_node1.tar.gz/node1/observer.log", "ob_log_node1.tar.gz/node1/observer.log.20240101100600", "rootservice.log"])
+        self.assertEqual((summary["from"], summary["to"]), ("2024-01-01 10:00:00", "2024-01-01 10:06:00"))
+        self.assertEqual(summary["top_ret_codes"][0], ("-4012", 2))
+        self.assertEqual((summary["warn_lines"], summary["error_lines"]), (1, 2))
+        self.assertTrue(os.path.exists(self.pack + log_index.INDEX_SUFFIX))
+
+    def test_index_is_reused_until_the_pack_changes(self):
+        LogPackIndex(self.pack).open().close()
+        index = LogPackIndex(self.pack).open()
+        self.assertFalse(index.built)
+        index.close()
+        with open(os.path.join(self.pack, "rootservice.log"), "a") as f:
+            f.write(LINES[0] + "\n")
+        os.utime(os.path.join(self.pack, "rootservice.log"), (1, 1))
+        index = LogPackIndex(self.pack).open()
+        self.assertTrue(index.built)
+        index.close()
+
+    def test_search_filters_and_rank(self):
+        with LogPackIndex(self.pack).open() as index:
+            result = index.search(level="WARN")
+            self.assertEqual([hit["level"] for hit in result["hits"]], ["ERROR", "EDIAG", "WARN"])
+            result = index.search(ret_code="4012", tenant_id="1002", context_lines=1)
+            self.assertEqual(result["total"], 2)
+            self.assertEqual(result["hits"][0]["after"], ["  continued line of the error"])
+            result = index.search(trace_id="[Y3-0000000000000003-0-0]")
+            self.assertEqual([hit["line"] for hit in result["hits"]], [1])
+            result = index.search(keyword="TABLET", start_time="2024-01-01T10:00:01", end_time="2024-01-01 10:04:00")
+            self.assertEqual(result["total"], 1)
+            self.assertEqual(result["hits"][0]["member"], "ob_log_node1.tar.gz/node1/observer.log")
+            result = index.search(keyword="failed", member_pattern="rootservice*", limit=1)
+            self.assertEqual((result["total"], len(result["hits"])), (1, 1))
+            # a trace the index does not know reads no block at all
+            result = index.search(trace_id="Y9-0000000000000009-0-0")
+            self.assertEqual((result["total"], result["blocks_read"]), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
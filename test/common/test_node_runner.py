@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_node_runner.py
+@desc:
+"""
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from src.common.node_runner import NodeRunner, node_key
+
+
+class TestNodeRunner(unittest.TestCase):
+    def setUp(self):
+        self.stdio = MagicMock()
+
+    def test_results_in_item_order(self):
+        outcomes = NodeRunner(self.stdio, 2).run([3, 1, 2], lambda item: item * 10)
+        self.assertEqual([(outcome.name, outcome.status, outcome.result) for outcome in outcomes], [("3", "ok", 30), ("1", "ok", 10), ("2", "ok", 20)])
+
+    def test_parallelism_limit(self):
+        lock = threading.Lock()
+        running = {"now": 0, "max": 0}
+
+        def work(item):
+            with lock:
+                running["now"] += 1
+                running["max"] = max(running["max"], running["now"])
+            time.sleep(0.05)
+            with lock:
+                running["now"] -= 1
+
+        outcomes = NodeRunner(self.stdio, 2).run(range(6), work)
+        self.assertTrue(all(outcome.ok for outcome in outcomes))
+        self.assertEqual(running["max"], 2)
+
+    def test_error_and_deadline(self):
+        release = threading.Event()
+
+        def work(item):
+            if item == "hung":
+                release.wait(5)
+            if item == "bad":
+                raise Exception("ssh failed")
+            return item
+
+        st = time.time()
+        try:
+            outcomes = NodeRunner(self.stdio, 3, deadline=time.time() + 0.3).run(["ok", "bad", "hung"], work)
+        finally:
+            release.set()
+        self.assertLess(time.time() - st, 2)
+        self.assertEqual([outcome.status for outcome in outcomes], ["ok", "error", "timeout"])
+        self.assertEqual(outcomes[1].error, "ssh failed")
+        self.stdio.warn.assert_called_once()
+
+    def test_queued_items_not_started_after_deadline(self):
+        started = []
+        release = threading.Event()
+
+        def work(item):
+            started.append(item)
+            release.wait(5)
+
+        try:
+            outcomes = NodeRunner(self.stdio, 1, deadline=time.time() + 0.2).run(["a", "b"], work)
+        finally:
+            release.set()
+        time.sleep(0.1)
+        self.assertEqual(started, ["a"])
+        self.assertEqual([outcome.status for outcome in outcomes], ["timeout", "timeout"])
+
+    def test_on_done_in_finish_order(self):
+        done = []
+
+        def work(item):
+            time.sleep(item)
+            return item
+
+        outcomes = NodeRunner(self.stdio).run([0.2, 0.0, 0.1], work, on_done=lambda outcome: done.append(outcome.result))
+        self.assertEqual(done, [0.0, 0.1, 0.2])
+        self.assertEqual([outcome.result for outcome in outcomes], [0.2, 0.0, 0.1])
+
+    def test_node_key(self):
+        self.assertEqual(node_key({"ip": "10.0.0.1", "home_path": "/home/admin/oceanbase/"}), "10.0.0.1_home_admin_oceanbase")
+        self.assertEqual(node_key({"ip": "10.0.0.1", "ssh_port": 2022}), "10.0.0.1_2022")
+        self.assertEqual(node_key({"ip": "fe80::1", "home_path": "/ob"}), "fe80_1_ob")
+        self.assertNotEqual(node_key({"ip": "10.0.0.1", "home_path": "/data/ob1"}), node_key({"ip": "10.0.0.1", "home_path": "/data/ob2"}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_ob_connector.py
+@desc: test OBConnector health check, streaming and OBConnectorPool with a mocked pymysql
+"""
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.common import ob_connector
+from src.common.ob_connector import OBConnector, OBConnectorPool, QueryMetrics, get_ob_connector_pool
+
+
+def make_connection(rows=None):
+    conn = MagicMock()
+    conn.thread_id.return_value = 1
+    cursor = MagicMock()
+    cursor.rowcount = len(rows or [])
+    cursor.fetchall.return_value = rows or []
+    batches = [rows or [], []]
+    cursor.fetchmany.side_effect = lambda size: batches.pop(0) if batches else []
+    conn.cursor.return_value = cursor
+    return conn
+
+
+class TestOBConnector(unittest.TestCase):
+    def setUp(self):
+        self.context = MagicMock()
+
+    @patch("src.common.ob_connector.mysql.connect")
+    def test_ping_only_after_idle(self, mock_connect):
+        conn = make_connection([(1,)])
+        mock_connect.return_value = conn
+        connector = OBConnector(self.context, "127.0.0.1", 2881, "root@sys", health_check_interval=30)
+        for _ in range(5):
+            self.assertEqual(connector.execute_sql("select 1"), [(1,)])
+        conn.ping.assert_not_called()
+        connector._last_active -= 31
+        connector.execute_sql("select 1")
+        conn.ping.assert_called_once_with(reconnect=True)
+
+    @patch("src.common.ob_connector.mysql.connect")
+    def test_params_and_metrics(self, mock_connect):
+        conn = make_connection([(1,), (2,)])
+        mock_connect.return_value = conn
+        connector = OBConnector(self.context, "127.0.0.1", 2881, "root@sys")
+        connector.metrics = QueryMetrics()
+        connector.execute_sql("select * from t where id = %s", (1,))
+        conn.cursor.return_value.execute.assert_called_with("select * from t where id = %s", (1,))
+        summary = connector.metrics.summary()
+        self.assertEqual(summary["count"], 1)
+        self.assertEqual(summary["rows"], 2)
+        self.assertEqual(summary["slowest"][0]["sql"], "select * from t where id = %s")
+
+    @patch("src.common.ob_connector.mysql.connect")
+    def test_iter_sql_uses_server_side_cursor(self, mock_connect):
+        conn = make_connection([(1,), (2,), (3,)])
+        mock_connect.return_value = conn
+        connector = OBConnector(self.context, "127.0.0.1", 2881, "root@sys")
+        connector.metrics = QueryMetrics()
+        self.assertEqual(list(connector.iter_sql("select * from __all_virtual_sql_audit")), [(1,), (2,), (3,)])
+        conn.cursor.assert_called_with(ob_connector.mysql.cursors.SSCursor)
+        self.assertEqual(connector.metrics.rows, 3)
+
+    @patch("src.common.ob_connector.mysql.connect")
+    def test_set_query_timeout(self, mock_connect):
+        conn = make_connection()
+        mock_connect.return_value = conn
+        connector = OBConnector(self.context, "127.0.0.1", 2881, "root@sys")
+        connector.set_query_timeout(2.5)
+        conn.cursor.return_value.execute.assert_called_with("SET SESSION ob_query_timeout=2500000;")
+        self.assertEqual(conn._read_timeout, 2.5 + ob_connector.READ_TIMEOUT_MARGIN)
+        connector.set_query_timeout(None)
+        conn.cursor.return_value.execute.assert_called_with("SET SESSION ob_query_timeout={0};".format(ob_connector.SESSION_TIMEOUT_US))
+        self.assertIsNone(conn._read_timeout)
+
+
+class TestOBConnectorPool(unittest.TestCase):
+    def setUp(self):
+        self.context = MagicMock()
+        self.context.inner_config = {"obdiag": {"ob_connector": {"pool_size": 2}}}
+        ob_connector._pools.clear()
+
+    def tearDown(self):
+        ob_connector._pools.clear()
+
+    @patch("src.common.ob_connector.mysql.connect")
+    def test_connections_reused_and_bounded(self, mock_connect):
+        mock_connect.side_effect = lambda **kwargs: make_connection([(1,)])
+        pool = OBConnectorPool(self.context, "127.0.0.1", 2881, "root@sys", max_size=2)
+        self.assertEqual(mock_connect.call_count, 0)
+
+        def query():
+            for _ in range(10):
+                pool.execute_sql("select 1")
+
+        threads = [threading.Thread(target=query) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLessEqual(mock_connect.call_count, 2)
+        # 2 session variable statements per new connection
+        self.assertEqual(pool.metrics.summary()["count"], 40 + 2 * mock_connect.call_count)
+
+    @patch("src.common.ob_connector.mysql.connect")
+    def test_get_connection_timeout(self, mock_connect):
+        mock_connect.side_effect = lambda **kwargs: make_connection()
+        pool = OBConnectorPool(self.context, "127.0.0.1", 2881, "root@sys", max_size=1)
+        conn = pool.get_connection()
+        with self.assertRaises(Exception):
+            pool.get_connection(timeout=0.1)
+        pool.release_connection(conn)
+        self.assertIs(pool.get_connection(), conn)
+
+    @patch("src.common.ob_connector.mysql.connect")
+    def test_filter_sql(self, mock_connect):
+        pool = OBConnectorPool(self.context, "127.0.0.1", 2881, "root@sys")
+        self.assertIsNone(pool.filter_sql("select * from oceanbase.__all_server"))
+        with self.assertRaises(Exception) as cm:
+            pool.filter_sql("delete from t where id = 1")
+        self.assertIn("not safe", str(cm.exception))
+        with self.assertRaises(Exception):
+            pool.filter_sql("  create table t (id int)")
+        # a string check, no connection is opened for it
+        self.assertEqual(mock_connect.call_count, 0)
+
+    def test_shared_pool(self):
+        cluster = {"db_host": "127.0.0.1", "db_port": 2881, "tenant_sys": {"user": "root@sys", "password": ""}}
+        pool = get_ob_connector_pool(self.context, cluster)
+        self.assertIs(get_ob_connector_pool(self.context, cluster), pool)
+        self.assertEqual(pool.max_size, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
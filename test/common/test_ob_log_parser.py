@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_ob_log_parser.py
+@desc:
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.common.ob_log_parser import ObLogParser
+
+DUMP_TENANT = (
+    "[2024-01-01 10:00:00.000001] INFO  [SERVER] dump (ob_multi_tenant.cpp:1) [1][T1_MultiTenant][T0][Y0-0000000000000000-0-0] [lt=1] "
+    "dump tenant info(tenant={id:1001, unit_min_cpu:1, req_queue:total_size=3 queue[0]=0, multi_level_queue:total_size=0, group_id = 3,queue_size = 1)"
+)
+MVCC_CONFLICT = (
+    "[2024-01-01 10:00:01.000001] INFO  [STORAGE] mvcc_write_ (ob_mvcc_row.cpp:2) [2][T1002_TX][T1002][Y1-0000000000000001-0-0] [lt=1] "
+    "mvcc_write conflict(ret=-6005, msg=\"row, locked\", conflict_tx_id={txid:123}, avg_used=7, used=8, list=[{a:1}, {b:2}])"
+)
+
+
+class TestObLogFieldExtractor(unittest.TestCase):
+    def test_extract(self):
+        extractor = ObLogParser.get_field_extractor('dump tenant info', ['req_queue:total_size', ['tenant/id', 'tenant_id'], 'group_id', 'absent'])
+        self.assertEqual(extractor.extract(DUMP_TENANT), {'req_queue:total_size': '3', 'tenant_id': '1001', 'group_id': '3', 'absent': None})
+        # another site is skipped before any regex runs
+        self.assertIsNone(extractor.extract(MVCC_CONFLICT))
+        fields = ObLogParser.get_field_extractor('mvcc_write conflict', ['ret', 'msg', 'conflict_tx_id/txid', 'used', 'list']).extract(MVCC_CONFLICT)
+        self.assertEqual(fields, {'ret': '-6005', 'msg': 'row, locked', 'conflict_tx_id/txid': '123', 'used': '8', 'list': '[{a:1}, {b:2}]'})
+        # a path takes the key of the object itself, not the one of an object nested in it
+        nested = ObLogParser.get_field_extractor(None, ['tenant/id', 'tenant/meta/id', 'tenant/absent'])
+        self.assertEqual(nested.extract('tenant={meta:{id:5}, id:1}, id=2'), {'tenant/id': '1', 'tenant/meta/id': '5', 'tenant/absent': None})
+
+    def test_compiled_once(self):
+        extractor = ObLogParser.get_field_extractor('dump tenant info', ['req_queue:total_size', ['tenant/id', 'tenant_id']])
+        self.assertIs(extractor, ObLogParser.get_field_extractor('dump tenant info', ['req_queue:total_size', ['tenant/id', 'tenant_id']]))
+        self.assertIsNot(extractor, ObLogParser.get_field_extractor('dump tenant info', ['req_queue:total_size']))
+
+    def test_iter_file(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            log = os.path.join(tmp, "observer.log")
+            with open(log, "w") as f:
+                f.write("\n".join([DUMP_TENANT, MVCC_CONFLICT, DUMP_TENANT.replace("id:1001", "id:1002")]) + "\n")
+            rows = list(ObLogParser.get_field_extractor('dump tenant info', [['tenant/id', 'tenant_id']]).iter_file(log))
+            self.assertEqual([fields['tenant_id'] for line, fields in rows], ['1001', '1002'])
+        finally:
+            shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    unittest.main()
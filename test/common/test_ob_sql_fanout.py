@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_ob_sql_fanout.py
+@desc:
+"""
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import contextmanager
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+from prettytable import from_db_cursor
+
+from src.common.ob_sql_fanout import FanoutTask, RowsCursor, SqlFanout, add_server_filter, build_time_slices, sort_rows
+
+
+class FakePool(object):
+    def __init__(self, rows_by_ip, slow_ips=()):
+        self.max_size = 4
+        self.rows_by_ip = rows_by_ip
+        self.slow_ips = slow_ips
+        self.release = threading.Event()
+        self.timeouts = []
+
+    @contextmanager
+    def connection(self, timeout=30):
+        yield FakeConnection(self)
+
+    def iter_sql(self, sql, params=None, dictionary=False, batch_size=1000):
+        for ip, rows in self.rows_by_ip.items():
+            if "'{0}'".format(ip) in sql:
+                if ip in self.slow_ips:
+                    self.release.wait(5)
+                for row in rows:
+                    yield dict(row)
+                return
+
+
+class FakeConnection(object):
+    def __init__(self, pool):
+        self.pool = pool
+
+    def set_query_timeout(self, seconds=None):
+        self.pool.timeouts.append(seconds)
+
+    def iter_sql(self, sql, params=None, dictionary=False, batch_size=1000):
+        return self.pool.iter_sql(sql, params, dictionary, batch_size)
+
+    def close(self):
+        return
+
+
+class TestSqlFanoutHelpers(unittest.TestCase):
+    def test_build_time_slices(self):
+        self.assertEqual(build_time_slices(0, 2999999, 1), [(0, 999999), (1000000, 1999999), (2000000, 2999999)])
+        self.assertEqual(build_time_slices(0, 1500000, 1), [(0, 999999), (1000000, 1500000)])
+        self.assertEqual(build_time_slices(10, 20, 0), [(10, 20)])
+
+    def test_add_server_filter(self):
+        sql = "select * from gv$sql_plan_monitor where trace_id = 'Y1' order by plan_line_id"
+        self.assertEqual(add_server_filter(sql, "trace_id", "10.0.0.1", 2882), "select * from gv$sql_plan_monitor where trace_id = 'Y1' and svr_ip = '10.0.0.1' and svr_port = 2882 order by plan_line_id")
+        with self.assertRaises(ValueError):
+            add_server_filter("select 1", "trace_id", "10.0.0.1", 2882)
+
+    def test_sort_rows_like_sql(self):
+        rows = [{"A": 2, "B": "x"}, {"A": None, "B": "y"}, {"A": 1, "B": "z"}, {"A": 2, "B": "a"}]
+        self.assertEqual([row["B"] for row in sort_rows(rows, ["A", "B DESC"])], ["y", "z", "x", "a"])
+        self.assertEqual([row["B"] for row in sort_rows(rows, ["a desc", "b"])], ["a", "x", "z", "y"])
+
+    def test_rows_cursor_for_prettytable(self):
+        table = from_db_cursor(RowsCursor(["A", "B"], [{"A": 1, "B": "x"}]))
+        self.assertEqual(table.field_names, ["A", "B"])
+        self.assertEqual(len(table.rows), 1)
+        self.assertIsNone(from_db_cursor(RowsCursor([], [])))
+
+
+class TestSqlFanout(unittest.TestCase):
+    def setUp(self):
+        self.context = MagicMock()
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _tasks(self, ips):
+        sql = "select * from gv$ob_sql_audit where trace_id = 'Y1'"
+        return [FanoutTask(add_server_filter(sql, "trace_id", ip, 2882), svr_ip=ip, svr_port=2882) for ip in ips]
+
+    def test_rows_of_all_servers(self):
+        pool = FakePool({"10.0.0.1": [{"ID": 1}], "10.0.0.2": [{"ID": 2}, {"ID": 3}]})
+        result = SqlFanout(self.context, pool).run(self._tasks(["10.0.0.1", "10.0.0.2"]))
+        self.assertFalse(result.partial)
+        self.assertEqual(result.columns, ["ID"])
+        self.assertEqual(sorted(row["ID"] for row in result.iter_rows()), [1, 2, 3])
+
+    def test_spill_to_disk(self):
+        pool = FakePool({"10.0.0.1": [{"ID": Decimal("1"), "T": Decimal("1.5")}]})
+        result = SqlFanout(self.context, pool, spill_dir=self.tmp_dir).run(self._tasks(["10.0.0.1"]))
+        self.assertEqual(result.rows(), [{"ID": 1, "T": 1.5}])
+        self.assertEqual(len(result._files), 1)
+
+    def test_slow_server_gives_partial_result(self):
+        pool = FakePool({"10.0.0.1": [{"ID": 1}], "10.0.0.2": [{"ID": 2}]}, slow_ips=("10.0.0.2",))
+        try:
+            result = SqlFanout(self.context, pool, timeout=0.5).run(self._tasks(["10.0.0.1", "10.0.0.2"]))
+        finally:
+            pool.release.set()
+        self.assertTrue(result.partial)
+        self.assertEqual(result.rows(), [{"ID": 1}])
+        self.assertEqual(list(result.failed_tasks().keys()), ["10.0.0.2_2882"])
+        self.assertEqual(result.status["10.0.0.2_2882"]["status"], "timeout")
+
+    def test_queries_bounded_by_the_time_left(self):
+        pool = FakePool({"10.0.0.1": [{"ID": 1}], "10.0.0.2": [{"ID": 2}]}, slow_ips=("10.0.0.2",))
+        try:
+            start = time.time()
+            SqlFanout(self.context, pool, timeout=0.5).run(self._tasks(["10.0.0.1", "10.0.0.2"]))
+            # the caller is back at the deadline, the slow query is left on a daemon thread
+            self.assertLess(time.time() - start, 2)
+            left = [thread for thread in threading.enumerate() if thread.name == "node-10.0.0.2_2882"]
+            self.assertTrue(left and all(thread.daemon for thread in left))
+        finally:
+            pool.release.set()
+        for thread in left:
+            thread.join(5)
+        # every session got the time left as its query timeout and was given its default back
+        bounded = [seconds for seconds in pool.timeouts if seconds is not None]
+        self.assertEqual(len(bounded), 2)
+        self.assertTrue(all(0 < seconds <= 0.5 for seconds in bounded))
+        self.assertEqual(pool.timeouts.count(None), 2)
+
+    def test_failed_server(self):
+        pool = MagicMock()
+        pool.max_size = 2
+        pool.iter_sql.side_effect = Exception("connection lost")
+        result = SqlFanout(self.context, pool).run(self._tasks(["10.0.0.1"]))
+        self.assertTrue(result.partial)
+        self.assertEqual(result.status["10.0.0.1_2882"]["error"], "connection lost")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_proc_sampler.py
+@desc:
+"""
+import csv
+import json
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from src.common.proc_sampler import SAMPLER_MAGIC, SAMPLER_SCRIPT, decode_samples, sampler_overhead, write_sample_reports
+
+
+def build_samples(columns, rows, meta=None):
+    meta = dict(meta or {}, columns=columns)
+    meta_bytes = json.dumps(meta).encode("utf-8")
+    data = SAMPLER_MAGIC + struct.pack("<I", len(meta_bytes)) + meta_bytes
+    for row in rows:
+        data += struct.pack("<{0}Q".format(len(columns)), *row)
+    return data
+
+
+class TestProcSampler(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_decode_ignores_cut_record(self):
+        data = build_samples(["ts_us", "cost_us"], [(1, 2), (3, 4)])
+        meta, rows = decode_samples(data + b"\x01\x02")
+        self.assertEqual(rows, [{"ts_us": 1, "cost_us": 2}, {"ts_us": 3, "cost_us": 4}])
+        self.assertEqual(meta["record_size"], 16)
+        with self.assertRaises(ValueError):
+            decode_samples(b"garbage")
+
+    def test_reports_rates(self):
+        columns = ["ts_us", "cost_us", "sampler_utime_us", "sampler_stime_us"]
+        columns += ["cpu." + name for name in ["user", "nice", "system", "idle", "iowait", "irq", "softirq", "steal", "ctxt", "procs_running", "procs_blocked"]]
+        columns += ["mem." + key for key in ["MemTotal", "MemFree", "MemAvailable", "Buffers", "Cached", "SwapTotal", "SwapFree", "Dirty"]]
+        columns += ["disk.sda." + name for name in ["reads", "sectors_read", "ms_reading", "writes", "sectors_written", "ms_writing", "in_flight", "ms_io"]]
+        first = [1000000, 100, 0, 0] + [100, 0, 100, 800, 0, 0, 0, 0, 1000, 1, 0] + [1024] * 8 + [0, 0, 0, 0, 0, 0, 0, 0]
+        second = [2000000, 300, 10000, 0] + [150, 0, 150, 850, 50, 0, 0, 0, 3000, 2, 1] + [1024] * 8 + [10, 20, 0, 100, 2048, 500, 1, 500]
+        meta, rows = decode_samples(build_samples(columns, [first, second], {"interval": 1, "clk_tck": 100, "disks": ["sda"], "nics": [], "pids": []}))
+        summary = write_sample_reports(meta, rows, self.tmp_dir)
+        with open(os.path.join(self.tmp_dir, "cpu.csv")) as f:
+            cpu = list(csv.reader(f))
+        self.assertEqual(cpu[1][1:4], ["25.0", "0.0", "25.0"])
+        self.assertEqual(cpu[1][9], "2000.0")
+        with open(os.path.join(self.tmp_dir, "disk.csv")) as f:
+            disk = list(csv.reader(f))
+        # 100 writes of 2048 sectors in one second, 500 ms busy
+        self.assertEqual(disk[1][1:9], ["sda", "10.0", "100.0", "10.0", "1024.0", "0.0", "5.0", "50.0"])
+        self.assertIn("cpu util %", summary)
+        overhead = sampler_overhead(meta, rows)
+        self.assertEqual(overhead["sampler cpu % of one core"], 1.0)
+        self.assertEqual(overhead["read cost per sample max ms"], 0.3)
+
+    @unittest.skipUnless(os.path.exists("/proc/stat"), "needs /proc")
+    def test_sampler_script_on_this_host(self):
+        script = os.path.join(self.tmp_dir, "sampler.py")
+        out = os.path.join(self.tmp_dir, "samples.bin")
+        with open(script, "w") as f:
+            f.write(SAMPLER_SCRIPT)
+        subprocess.check_call([sys.executable, script, "--interval", "0.05", "--duration", "0.3", "--pid", str(os.getpid()), "--out", out])
+        with open(out, "rb") as f:
+            meta, rows = decode_samples(f.read())
+        self.assertGreaterEqual(len(rows), 5)
+        self.assertEqual(meta["pids"], [str(os.getpid())])
+        self.assertGreater(rows[-1]["mem.MemTotal"], 0)
+        self.assertGreater(rows[-1]["proc.{0}.threads".format(os.getpid())], 0)
+        write_sample_reports(meta, rows, self.tmp_dir)
+        for name in ("cpu.csv", "mem.csv", "disk.csv", "net.csv", "process.csv", "summary.txt"):
+            self.assertTrue(os.path.exists(os.path.join(self.tmp_dir, name)))
+
+
+if __name__ == '__main__':
+    unittest.main()
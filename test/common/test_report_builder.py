@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_report_builder.py
+@desc:
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.common.report_builder import ReportBuilder
+
+
+class TestReportBuilder(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "sub", "report.html")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def read(self):
+        with open(self.path, encoding='utf-8') as f:
+            return f.read()
+
+    def test_file_opened_once(self):
+        with patch("builtins.open", wraps=open) as mock_open:
+            with ReportBuilder(self.path, mode='w') as builder:
+                for i in range(100):
+                    builder.write("<p>%d</p>" % i)
+            self.assertEqual(mock_open.call_count, 1)
+        self.assertEqual(self.read(), "".join("<p>%d</p>" % i for i in range(100)))
+        self.assertEqual(builder.bytes_written, len(self.read()))
+
+    def test_empty_report_creates_no_file(self):
+        with ReportBuilder(self.path) as builder:
+            builder.write("")
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_write_template(self):
+        with ReportBuilder(self.path, mode='w') as builder:
+            builder.write("<h4>head</h4>")
+            builder.write_template("{% for item in items %}<li>{{ item }}</li>{% endfor %}{% if note %}{{ note }}{% endif %}", items=["a", "b"], note="")
+        self.assertEqual(self.read(), "<h4>head</h4><li>a</li><li>b</li>")
+
+    def test_append_mode_keeps_content(self):
+        with ReportBuilder(self.path, mode='w') as builder:
+            builder.write("first")
+        with ReportBuilder(self.path) as builder:
+            builder.write(" second")
+        self.assertEqual(self.read(), "first second")
+
+
+if __name__ == '__main__':
+    unittest.main()
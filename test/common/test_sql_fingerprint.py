@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_sql_fingerprint.py
+@desc:
+"""
+import unittest
+
+from src.common.sql_fingerprint import fingerprint, split_statements
+
+
+class TestSqlFingerprint(unittest.TestCase):
+    def test_split_statements(self):
+        text = "-- header\nselect 1;\n/* only a comment */;\nselect 'a;b' from t -- c;\n where x = `c;d`;\nupdate t set a = 1"
+        self.assertEqual(
+            split_statements(text),
+            [(2, "select 1"), (4, "select 'a;b' from t -- c;\n where x = `c;d`"), (6, "update t set a = 1")],
+        )
+
+    def test_fingerprint_folds_literals_and_lists(self):
+        self.assertEqual(fingerprint("SELECT * FROM `T` WHERE id IN (1, -2) AND name = 'it''s' -- note"), "select * from `T` where id in (?+) and name = ?")
+        self.assertEqual(fingerprint("select * from t where id in (3)"), fingerprint("select  *  from T where ID in (4,5,6)"))
+        self.assertEqual(fingerprint("insert into t values (1, 'a'), (2, 'b')"), "insert into t values (?+)")
+        self.assertEqual(fingerprint("select a-1 from t where b<=2"), "select a - ? from t where b <= ?")
+
+    def test_fingerprint_keeps_hints(self):
+        self.assertNotEqual(fingerprint("select /*+ parallel(4) */ a from t"), fingerprint("select a from t"))
+        self.assertEqual(fingerprint("select /* any */ a from t"), fingerprint("select a from t"))
+
+    def test_fingerprint_keeps_backquotes(self):
+        # a keyword used as a name is only valid backquoted, the two must not share a fingerprint
+        pairs = [
+            ("select `order` from t where `key`=1", "select order from t where key=1"),
+            ("select * from `group`", "select * from group"),
+            ("insert into t (`desc`, `rank`) values (1, 2)", "insert into t (desc, rank) values (1, 2)"),
+            ("select `a``b` from t", "select a`b from t"),
+        ]
+        for quoted, bare in pairs:
+            self.assertNotEqual(fingerprint(quoted), fingerprint(bare), quoted)
+        self.assertEqual(fingerprint("select `order` from t where `key`=1"), "select `order` from t where `key` = ?")
+        self.assertEqual(fingerprint("SELECT `order` FROM t WHERE `key` = 2"), fingerprint("select `order` from t where `key`=1"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_stdio.py
+@desc: test the trace log of IO
+"""
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.common.stdio import IO, format_log_msg
+
+
+class CountStr(object):
+    def __init__(self):
+        self.count = 0
+
+    def __str__(self):
+        self.count += 1
+        return "value"
+
+
+class TestIOTraceLog(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.tmp_dir, "obdiag.log")
+        self.io = IO(1, output_stream=io.StringIO())
+        self.io.init_trace_logger(self.log_path, "obdiag", "trace-1")
+
+    def tearDown(self):
+        self.io.flush_log_writer()
+        for handler in self.io.trace_logger.handlers:
+            handler.close()
+        self.io.init_trace_logger(None, recreate=True)
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _read_log(self):
+        self.io.flush_log_writer()
+        with open(self.log_path) as f:
+            return f.read()
+
+    def test_verbose_lazy_args(self):
+        self.io.verbose("read %s lines from %s", 10, "observer.log")
+        self.io.verbose("brace {} style {}", 1, 2)
+        self.io.verbose("multi\nline 100%")
+        log = self._read_log()
+        self.assertIn("read 10 lines from observer.log", log)
+        self.assertIn("brace 1 style 2", log)
+        self.assertIn("[trace-1] [DEBUG] line 100%\n", log)
+
+    def test_no_format_without_trace_logger(self):
+        quiet_io = IO(1, output_stream=io.StringIO())
+        arg = CountStr()
+        quiet_io.verbose("value %s", arg)
+        self.assertEqual(arg.count, 0)
+
+    def test_log_stats(self):
+        for i in range(100):
+            self.io.verbose("line %d", i)
+        stats = self.io.get_log_stats()
+        self.assertEqual(stats[self.log_path]["records"], 100)
+        self.assertEqual(stats[self.log_path]["bytes"], os.path.getsize(self.log_path))
+
+
+class TestFormatLogMsg(unittest.TestCase):
+    def test_format(self):
+        self.assertEqual(format_log_msg("a %s", ("b",)), "a b")
+        self.assertEqual(format_log_msg("100%", ()), "100%")
+        self.assertEqual(format_log_msg("a {0}", ("b",)), "a b")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_tar_stream_to_zip.py
+@desc:
+"""
+import gzip
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from unittest.mock import MagicMock
+
+from src.common.tool import FileUtil
+
+
+class ReadOnlyStream(object):
+    # a file opened over sftp: read() only, no seek
+    def __init__(self, data):
+        self._buf = io.BytesIO(data)
+
+    def read(self, size=-1):
+        return self._buf.read(size)
+
+
+class TestTarStreamToZip(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.members = {
+            "pack/1.dump.gz": gzip.compress(os.urandom(5000)),
+            "pack/1.ob_admin.log.gz": gzip.compress(b"log of 1\n"),
+            "pack/readme.txt": b"plain text\n" * 100,
+        }
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode="w") as tar:
+            directory = tarfile.TarInfo("pack")
+            directory.type = tarfile.DIRTYPE
+            tar.addfile(directory)
+            for name, data in self.members.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+        self.tar_data = buf.getvalue()
+        self.output = os.path.join(self.tmp, "pack.zip")
+        self.stdio = MagicMock()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_without_password(self):
+        self.assertTrue(FileUtil.tar_stream_to_zip(ReadOnlyStream(self.tar_data), self.output, "", self.stdio, temp_dir=self.tmp))
+        with zipfile.ZipFile(self.output) as zf:
+            self.assertEqual(sorted(zf.namelist()), sorted(self.members))
+            for name, data in self.members.items():
+                self.assertEqual(zf.read(name), data)
+            # the gzipped members are stored, the others deflated
+            self.assertEqual(zf.getinfo("pack/1.dump.gz").compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(zf.getinfo("pack/readme.txt").compress_type, zipfile.ZIP_DEFLATED)
+        # nothing is left in the spool dir
+        self.assertEqual(os.listdir(self.tmp), ["pack.zip"])
+
+    def test_with_password(self):
+        self.assertTrue(FileUtil.tar_stream_to_zip(ReadOnlyStream(self.tar_data), self.output, "secret", self.stdio, temp_dir=self.tmp))
+        with zipfile.ZipFile(self.output) as zf:
+            names = zf.namelist()
+            self.assertEqual(sorted(names), sorted(self.members))
+            self.assertTrue(all(zf.getinfo(name).flag_bits & 0x1 for name in names))
+            with self.assertRaises(RuntimeError):
+                zf.read(names[0])
+            for name, data in self.members.items():
+                self.assertEqual(zf.read(name, pwd=b"secret"), data)
+        self.assertEqual(os.listdir(self.tmp), ["pack.zip"])
+
+    def test_broken_tar(self):
+        # cut in the data of the first file
+        self.assertFalse(FileUtil.tar_stream_to_zip(ReadOnlyStream(self.tar_data[:2000]), self.output, "", self.stdio, temp_dir=self.tmp))
+        self.stdio.exception.assert_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
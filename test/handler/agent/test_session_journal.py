@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_session_journal.py
+@desc:
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from pydantic_ai.messages import ModelRequest, ModelResponse, TextPart, UserPromptPart
+
+from src.handler.agent import session_journal
+from src.handler.agent.session_journal import SessionJournal
+
+
+def turn(i):
+    return [ModelRequest(parts=[UserPromptPart(content="question {0}".format(i))]), ModelResponse(parts=[TextPart(content="answer {0}".format(i))])]
+
+
+def texts(messages):
+    return [message.parts[0].content for message in messages]
+
+
+class TestSessionJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "20260101_000000.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def records(self):
+        with open(self.path, "rb") as f:
+            return [json.loads(line)["t"] if line.count(b'{"t":') == 1 else "?" for line in f.read().split(b"\n") if line]
+
+    def test_save_appends_new_messages(self):
+        journal = SessionJournal(self.path)
+        history = turn(1)
+        journal.save(history, {"requests": 1})
+        history += turn(2)
+        journal.save(history, {"requests": 2})
+        # the usage is only written when it changed
+        journal.save(history, {"requests": 2})
+        self.assertEqual(self.records(), ["h", "m", "m", "u", "m", "m", "u"])
+        loaded, usage = SessionJournal(self.path).read_tail(10)
+        self.assertEqual(texts(loaded), texts(history))
+        self.assertEqual(usage, {"requests": 2})
+        loaded, _ = SessionJournal(self.path).read_tail(3)
+        self.assertEqual(texts(loaded), texts(history[1:]))
+
+    def test_attach_and_replaced_history(self):
+        history = turn(1) + turn(2)
+        SessionJournal(self.path).save(history, {"requests": 2})
+        journal = SessionJournal(self.path)
+        loaded, usage = journal.read_tail(10)
+        journal.attach(loaded, usage)
+        journal.save(loaded + turn(3), usage)
+        self.assertEqual(self.records(), ["h", "m", "m", "m", "m", "u", "m", "m"])
+        # a history that does not continue the journal (compacted, truncated) is written after a reset
+        journal.save(turn(4), {"requests": 3})
+        self.assertEqual(self.records()[-4:], ["r", "m", "m", "u"])
+        loaded, usage = SessionJournal(self.path).read_tail(10)
+        self.assertEqual(texts(loaded), texts(turn(4)))
+        self.assertEqual(usage, {"requests": 3})
+
+    def test_compaction(self):
+        journal = SessionJournal(self.path)
+        history = turn(1)
+        journal.save(history, {"requests": 1})
+        journal.save(turn(2), {"requests": 2})
+        with patch.object(session_journal, "SESSION_JOURNAL_COMPACT_BYTES", 1):
+            history = turn(2) + turn(3)
+            journal.save(history, {"requests": 3})
+        with open(self.path, "rb") as f:
+            self.assertTrue(json.loads(f.readline())["compacted"])
+        self.assertEqual(self.records(), ["h", "m", "m", "m", "m", "u"])
+        loaded, usage = SessionJournal(self.path).read_tail(10)
+        self.assertEqual(texts(loaded), texts(history))
+        self.assertEqual(usage, {"requests": 3})
+
+    def test_torn_last_line(self):
+        history = turn(1)
+        SessionJournal(self.path).save(history, {"requests": 1})
+        with open(self.path, "ab") as f:
+            f.write(b'{"t":"m","m":{"parts":[{"content":"quest')
+        # resume ignores the torn line, the next save cuts it off before appending
+        journal = SessionJournal(self.path)
+        loaded, usage = journal.read_tail(10)
+        self.assertEqual(texts(loaded), texts(history))
+        journal.attach(loaded, usage)
+        history = loaded + turn(2)
+        journal.save(history, {"requests": 2})
+        self.assertEqual(self.records(), ["h", "m", "m", "u", "m", "m", "u"])
+        self.assertEqual(texts(SessionJournal(self.path).read_tail(10)[0]), texts(history))
+
+    def test_torn_line_of_this_journal(self):
+        # a save of this journal was cut: the messages it counts as written are written again after a reset
+        journal = SessionJournal(self.path)
+        history = turn(1)
+        journal.save(history, {"requests": 1})
+        with open(self.path, "rb+") as f:
+            f.truncate(os.path.getsize(self.path) - 5)
+        history += turn(2)
+        journal.save(history, {"requests": 2})
+        self.assertEqual(self.records(), ["h", "m", "m", "r", "m", "m", "m", "m", "u"])
+        self.assertEqual(texts(SessionJournal(self.path).read_tail(10)[0]), texts(history))
+
+    def test_glued_record(self):
+        # a journal written before torn lines were cut: the messages after the broken line are still resumed
+        journal = SessionJournal(self.path)
+        history = turn(1)
+        journal.save(history, {"requests": 1})
+        with open(self.path, "ab") as f:
+            f.write(b'{"t":"m","m":{"parts":[{"con{"t":"m","m":{"kind":"request"}}\n')
+        journal.save(history + turn(2), {"requests": 2})
+        self.assertEqual(self.records()[-3:], ["m", "m", "u"])
+        loaded, _ = SessionJournal(self.path).read_tail(10)
+        self.assertEqual(texts(loaded), texts(turn(2)))
+
+
+if __name__ == '__main__':
+    unittest.main()
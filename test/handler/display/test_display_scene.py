@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_display_scene.py
+@desc:
+"""
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from src.common.context import HandlerContext
+from src.common.ob_connector import OBConnectorPool
+from src.handler.display.scenes.base import SceneBase, SharedConnector
+
+NODES = [{"ip": "10.0.0.1", "home_path": "/home/admin/ob1"}, {"ip": "10.0.0.2", "home_path": "/home/admin/ob2"}]
+STEPS = [
+    {"type": "sql", "sql": "select 'broken' from dual", "tittle": "first"},
+    {"type": "sql", "sql": "select ${remote_ip} from dual", "tittle": "second"},
+]
+
+
+class FakeConnector(object):
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def execute_sql_return_columns_and_data(self, sql, params=None):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            time.sleep(self.delay)
+            if "broken" in sql:
+                raise Exception("(1146, \"Table doesn't exist\")")
+            return ["value"], [(sql,)]
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+class FakePool(OBConnectorPool):
+    """a pool whose connections are the fake connector, every node queries at the same time"""
+
+    def __init__(self, connector):
+        self.connector = connector
+
+    def execute_sql_return_columns_and_data(self, sql, params=None):
+        return self.connector.execute_sql_return_columns_and_data(sql, params)
+
+
+class TestSceneBase(unittest.TestCase):
+    def scene(self, db_connector):
+        context = HandlerContext(stdio=MagicMock(), cluster_config={"servers": NODES, "ob_cluster_name": "c1"}, obproxy_config={"servers": []})
+        scene = SceneBase(context, [], db_connector)
+        scene._steps = STEPS
+        return scene
+
+    def test_failing_step_does_not_stop_the_node(self):
+        scene = self.scene(FakePool(FakeConnector()))
+        text = scene._SceneBase__execute_yaml_mode(NODES)
+        # the first step fails on both nodes, the second one still runs on both
+        self.assertIn("select \"10.0.0.1\" from dual", text)
+        self.assertIn("select \"10.0.0.2\" from dual", text)
+        self.assertLess(text.index("10.0.0.1"), text.index("10.0.0.2"))
+        self.assertEqual(len([c for c in scene.stdio.error.call_args_list if "Table doesn't exist" in c.args[0]]), 4)
+
+    def test_pool_runs_nodes_at_once(self):
+        connector = FakeConnector(delay=0.3)
+        scene = self.scene(FakePool(connector))
+        st = time.time()
+        scene._SceneBase__execute_yaml_mode(NODES)
+        self.assertEqual(connector.max_running, 2)
+        self.assertLess(time.time() - st, 1.0)
+        self.assertIsInstance(scene.db_connector, FakePool)
+
+    def test_single_connection_is_shared(self):
+        connector = FakeConnector(delay=0.05)
+        scene = self.scene(connector)
+        scene._SceneBase__execute_yaml_mode(NODES)
+        self.assertIsInstance(scene.db_connector, SharedConnector)
+        self.assertEqual(connector.max_running, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
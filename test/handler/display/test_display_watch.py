@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_display_watch.py
+@desc:
+"""
+import datetime
+import decimal
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.common.context import HandlerContext
+from src.handler.display.watch import ScreenRenderer, SceneWatcher, diff_rows, row_keys
+
+COLUMNS = ["svr_ip", "tenant_id", "name", "value", "time"]
+T0 = datetime.datetime(2024, 1, 1, 10, 0, 0)
+T1 = datetime.datetime(2024, 1, 1, 10, 0, 2)
+
+
+class TestDiffRows(unittest.TestCase):
+    def test_first_refresh(self):
+        rows = [("10.0.0.1", 1001, "sql count", 5, T0)]
+        self.assertEqual(diff_rows(COLUMNS, None, rows, 0), [["10.0.0.1", 1001, "sql count", 5, T0]])
+        self.assertEqual(diff_rows(COLUMNS, rows, rows, 0), [["10.0.0.1", 1001, "sql count", 5, T0]])
+
+    def test_changed_added_removed(self):
+        prev = [("10.0.0.1", 1001, "sql count", 10, T0), ("10.0.0.1", 1002, "sql count", 7, T0), ("10.0.0.2", 1001, "sql count", 3, T0)]
+        rows = [("10.0.0.2", 1001, "sql count", decimal.Decimal(3), T1), ("10.0.0.1", 1001, "sql count", 30, T1), ("10.0.0.3", 1001, "sql count", 4, T1)]
+        result = diff_rows(COLUMNS, prev, rows, 2)
+        # the order of the rows does not matter, a row is found by its key columns; the time is not one of them
+        self.assertEqual(result[0], ["10.0.0.2", 1001, "sql count", decimal.Decimal(3), T1])
+        self.assertEqual(result[1], ["10.0.0.1", 1001, "sql count", "30 (+20, +10/s)", T1])
+        # an added row is shown as it is, a removed one (1002) is gone
+        self.assertEqual(result[2], ["10.0.0.3", 1001, "sql count", 4, T1])
+        self.assertEqual(len(result), 3)
+
+    def test_id_columns_are_keys(self):
+        prev = [(1001, 10), (1002, 20)]
+        rows = [(1002, 25), (1001, 10)]
+        self.assertEqual(diff_rows(["tenant_id", "value"], prev, rows, 5), [[1002, "25 (+5, +1/s)"], [1001, 10]])
+
+    def test_rows_without_key_columns(self):
+        # only numbers: the rows are matched by position
+        self.assertEqual(row_keys(["a", "b"], [(1, 2), (3, 4)]), [(1,), (2,)])
+        self.assertEqual(diff_rows(["a", "b"], [(1, 2), (3, 4)], [(2, 2), (3, 8)], 1), [["2 (+1, +1/s)", 2], [3, "8 (+4, +4/s)"]])
+
+    def test_missing_and_duplicate_keys(self):
+        # a NULL key cell is a key of its own, equal keys are told apart by their position
+        columns = ["name", "value"]
+        self.assertEqual(row_keys(columns, [(None, 1), ("a", 1), ("a", 2)]), [(None, 1), ("a", 1), ("a", 2)])
+        prev = [(None, 1), ("a", 10), ("a", 20)]
+        rows = [("a", 11), (None, 1), ("a", 22)]
+        self.assertEqual(diff_rows(columns, prev, rows, 1), [["a", "11 (+1, +1/s)"], [None, 1], ["a", "22 (+2, +2/s)"]])
+
+    def test_short_rows(self):
+        # a row with fewer cells than the previous one is not compared past its end
+        prev = [("a", 1, 2)]
+        self.assertEqual(diff_rows(["name", "x", "y"], prev, [("a", 3)], 1), [["a", "3 (+2, +2/s)"]])
+        self.assertEqual(diff_rows(["name", "x", "y"], [("a", 1)], [("a", 3, 4)], 1), [["a", "3 (+2, +2/s)", 4]])
+
+    def test_non_numbers_not_diffed(self):
+        self.assertEqual(diff_rows(["name", "flag"], [("a", True)], [("a", False)], 1), [["a", False]])
+
+
+class TestAdapt(unittest.TestCase):
+    def setUp(self):
+        self.watcher = SceneWatcher(HandlerContext(stdio=MagicMock()), [], interval=2, max_interval=10, tty=False)
+
+    def test_back_off_and_recover(self):
+        self.assertEqual(self.watcher.adapt(1), 2)
+        # slower than the interval: doubled, at least the time the refresh took
+        self.assertEqual(self.watcher.adapt(3), 4)
+        self.assertEqual(self.watcher.adapt(7), 8)
+        self.assertEqual(self.watcher.adapt(9), 10)
+        self.assertEqual(self.watcher.adapt(30), 10)
+        # fast again: halved step by step, not below the asked interval
+        self.assertEqual(self.watcher.adapt(6), 10)
+        self.assertEqual(self.watcher.adapt(1), 5)
+        self.assertEqual(self.watcher.adapt(1), 2.5)
+        self.assertEqual(self.watcher.adapt(1), 2)
+        self.assertEqual(self.watcher.adapt(0.1), 2)
+
+    def test_max_interval_below_interval(self):
+        watcher = SceneWatcher(HandlerContext(stdio=MagicMock()), [], interval=30, max_interval=10, tty=False)
+        self.assertEqual(watcher.adapt(100), 30)
+
+
+class TestScreenRenderer(unittest.TestCase):
+    def test_not_a_tty(self):
+        stdio = MagicMock()
+        renderer = ScreenRenderer(stdio, tty=False)
+        renderer.render(["a", "b"])
+        renderer.render(["a", "c"])
+        self.assertEqual([c.args[0] for c in stdio.print.call_args_list], ["a\nb", "a\nc"])
+
+    def test_tty_redraws_changed_lines(self):
+        stdio = MagicMock()
+        renderer = ScreenRenderer(stdio, tty=True)
+        renderer.render(["head", "a", "b"])
+        self.assertEqual(stdio.print.call_args.args[0], "\033[H\033[2Jhead\na\nb")
+        renderer.render(["head", "a", "c"])
+        self.assertEqual(stdio.print.call_args.args[0], "\033[3;1Hc\033[K\033[4;1H\033[J")
+        # longer frame: the new lines are drawn; shorter one: the rest of the screen is cleared
+        renderer.render(["head", "a", "c", "d"])
+        self.assertEqual(stdio.print.call_args.args[0], "\033[4;1Hd\033[K\033[5;1H\033[J")
+        renderer.render(["head"])
+        self.assertEqual(stdio.print.call_args.args[0], "\033[2;1H\033[J")
+
+
+class FakeScene(object):
+    def __init__(self):
+        self.values = [10, 30]
+
+    def collect(self):
+        return [("stat", "sql count", ["name", "value"], [("sql count", self.values.pop(0))])]
+
+
+class TestSceneWatcher(unittest.TestCase):
+    @patch("src.handler.display.watch.time")
+    def test_run(self, fake_time):
+        fake_time.time.side_effect = [100.0, 100.5, 102.0, 102.5]
+        stdio = MagicMock()
+        watcher = SceneWatcher(HandlerContext(stdio=stdio), [("sysstat", FakeScene())], interval=1, count=2, tty=False)
+        text = watcher.run()
+        fake_time.sleep.assert_called_once_with(0.5)
+        self.assertIn("== sysstat", text)
+        self.assertIn("30 (+20, +10/s)", text)
+        self.assertIn("watch #2", text)
+        self.assertEqual(stdio.print.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_gather_awr.py
+@desc:
+"""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from optparse import Values
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from src.common.constant import const
+from src.common.context import HandlerContext
+from src.handler.gather.gather_awr import GatherAwrHandler
+
+SNAPSHOTS = [(1, "2024-01-01T02:00:00.000"), (2, "2024-01-01T03:00:00.000")]
+
+
+class FakeResponse(object):
+    def __init__(self, body=None, chunks=(), status_code=200, broken_after=None):
+        self.body = body
+        self.chunks = chunks
+        self.status_code = status_code
+        self.broken_after = broken_after
+
+    def json(self):
+        return self.body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError("{0} Server Error".format(self.status_code))
+
+    def iter_content(self, chunk_size=1):
+        for i, chunk in enumerate(self.chunks):
+            if self.broken_after is not None and i >= self.broken_after:
+                raise requests.exceptions.ChunkedEncodingError("Connection broken: IncompleteRead")
+            yield chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+class FakeOcpSession(object):
+    """the few OCP endpoints gather awr uses: generate a report (a task), list the reports, download one"""
+
+    def __init__(self, statuses, download):
+        self.statuses = list(statuses)
+        self.download = download
+        self.names = []
+        self.closed = False
+
+    def post(self, url, auth=None, data=None):
+        self.names.append(data["name"])
+        return FakeResponse({"data": {"taskInstanceId": 7, "name": data["name"]}})
+
+    def get(self, url, auth=None, timeout=None, stream=False):
+        if "/api/v2/tasks/instances/7" in url:
+            status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+            return FakeResponse({"data": {"name": "generate awr", "status": status}})
+        if url.endswith("/performance/workload/reports"):
+            return FakeResponse({"data": {"contents": [{"name": name, "id": index + 1} for index, name in enumerate(self.names)]}})
+        if "/performance/workload/reports/" in url:
+            return self.download(self.names[int(url.rsplit("/", 1)[1]) - 1])
+        raise AssertionError("unexpected url {0}".format(url))
+
+    def close(self):
+        self.closed = True
+
+
+class TestGatherAwr(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        options = Values({"cluster_name": "c1,c2", "cluster_id": "1,2", "from": "2024-01-01 10:00:00", "to": "2024-01-01 11:00:00", "store_dir": self.tmp})
+        self.context = HandlerContext(options=options, stdio=MagicMock(), ocp_config={"user": "admin", "password": "***", "url": "http://ocp:8080"})
+        self.handler = GatherAwrHandler(self.context)
+        self.handler.init_config()
+        snapshot_patch = patch.object(GatherAwrHandler, "_GatherAwrHandler__get_snapshot_list", return_value=SNAPSHOTS)
+        snapshot_patch.start()
+        self.addCleanup(snapshot_patch.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def generate(self, session):
+        self.handler.session = session
+        return self.handler._GatherAwrHandler__generate_awr_report("c1", 1, "2024-01-01 10:00:00", "2024-01-01 11:00:00")
+
+    @patch("src.common.ocp.ocp_task.time.sleep")
+    def test_wait_done(self, sleep):
+        session = FakeOcpSession(["RUNNING", "RUNNING", "RUNNING", "SUCCESSFUL"], None)
+        name = self.generate(session)
+        self.assertTrue(name.startswith("OBAWR_obcluster_c1_"))
+        # the poll interval doubles
+        self.assertEqual([c.args[0] for c in sleep.call_args_list], [1, 2])
+
+    @patch("src.common.ocp.ocp_task.time.sleep")
+    def test_wait_done_failed(self, sleep):
+        with self.assertRaisesRegex(Exception, "task failed"):
+            self.generate(FakeOcpSession(["RUNNING", "FAILED"], None))
+
+    def test_wait_done_timeout(self):
+        st = time.time()
+        with patch("src.handler.gather.gather_awr.const", SimpleNamespace(AWR_REPORT_TASK_TIMEOUT=0.3)):
+            with self.assertRaisesRegex(Exception, "task timeout"):
+                self.generate(FakeOcpSession(["RUNNING"], None))
+        # the last poll does not sleep past the timeout
+        self.assertLess(time.time() - st, 1)
+        self.assertEqual(const.AWR_REPORT_TASK_TIMEOUT, 1800)
+
+    def download_report(self, response):
+        self.handler.session = FakeOcpSession(["SUCCESSFUL"], lambda report_name: response)
+        self.handler.session.names.append("OBAWR_x")
+        return self.handler._GatherAwrHandler__download_report(self.tmp, "c1", 1, "OBAWR_x", 1)
+
+    def test_download(self):
+        resp = self.download_report(FakeResponse(chunks=[b"<html>", b"report", b"</html>"]))
+        self.assertFalse(resp["error"])
+        self.assertEqual(resp["gather_pack_path"], os.path.join(self.tmp, "OBAWR_x.html"))
+        with open(resp["gather_pack_path"], "rb") as f:
+            self.assertEqual(f.read(), b"<html>report</html>")
+
+    def test_download_cut_off(self):
+        # the chunks written before the connection broke are not kept
+        resp = self.download_report(FakeResponse(chunks=[b"<html>", b"report", b"</html>"], broken_after=2))
+        self.assertTrue(resp["error"])
+        self.assertIn("Connection broken", resp["error_msg"])
+        self.assertEqual(os.listdir(self.tmp), [])
+
+    def test_download_http_error(self):
+        resp = self.download_report(FakeResponse(status_code=500))
+        self.assertTrue(resp["error"])
+        self.assertIn("500 Server Error", resp["error_msg"])
+        self.assertEqual(os.listdir(self.tmp), [])
+
+    def test_handle(self):
+        # the report of c2 is cut off, the one of c1 is kept
+        def download(report_name):
+            cluster_name = report_name.split("_")[2]
+            return FakeResponse(chunks=[b"<html>", cluster_name.encode(), b"</html>"], broken_after=1 if cluster_name == "c2" else None)
+
+        session = FakeOcpSession(["SUCCESSFUL"], download)
+        with patch("src.handler.gather.gather_awr.ocp_api.new_session", return_value=session):
+            result = self.handler.handle()
+        self.assertTrue(session.closed)
+        pack_dir = result.data["store_dir"]
+        reports = sorted(name for name in os.listdir(pack_dir) if name.endswith(".html"))
+        self.assertEqual(len(reports), 1)
+        with open(os.path.join(pack_dir, reports[0]), "rb") as f:
+            self.assertEqual(f.read(), b"<html>c1</html>")
+        with open(os.path.join(pack_dir, "result_summary.txt")) as f:
+            summary = f.read()
+        self.assertIn("Connection broken", summary)
+
+
+if __name__ == '__main__':
+    unittest.main()
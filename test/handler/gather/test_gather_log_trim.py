@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_gather_log_trim.py
+@desc:
+"""
+import datetime
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from src.common.context import HandlerContext
+from src.handler.gather.gather_log.observer import ObserverGatherLogOnNode
+
+
+class LocalShell(object):
+    """runs the commands here and, like RemoteClient.exec_cmd, returns stderr instead of stdout when there is any"""
+
+    def exec_cmd(self, cmd):
+        result = subprocess.run(["sh", "-c", cmd], capture_output=True, timeout=60)
+        return (result.stderr or result.stdout).decode("utf-8", errors="ignore")
+
+
+class TestTrimScript(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.source = os.path.join(self.tmp, "observer.log")
+        self.target = os.path.join(self.tmp, "out.log")
+        start = datetime.datetime(2024, 1, 1, 10, 0, 0)
+        self.lines = []
+        for i in range(3600):
+            self.lines.append("[{0}.000001] INFO  [SERVER] line {1} {2}\n".format((start + datetime.timedelta(seconds=i)).strftime("%Y-%m-%d %H:%M:%S"), i, "x" * 40))
+            if i % 100 == 0:
+                # the continuation lines of a record go with it
+                self.lines.append("    at frame {0}\n".format(i))
+        with open(self.source, "w") as f:
+            f.writelines(self.lines)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def extract(self, from_time="2024-01-01 10:10:00", to_time="2024-01-01 10:20:00", grep=None):
+        context = HandlerContext(stdio=MagicMock())
+        gather = ObserverGatherLogOnNode(context, {"home_path": self.tmp}, {"tmp_dir": self.tmp, "from_time": from_time, "to_time": to_time, "grep": grep})
+        # small probes, so the binary search really runs over the 200KB file
+        gather.TRIM_PROBE_BYTES = 1024
+        gather.ssh_client = LocalShell()
+        gather._extract_log(self.source, self.target, gather._build_grep_options())
+        with open(self.target) as f:
+            return gather, f.readlines()
+
+    def expected(self, from_time, to_time):
+        expected, keep = [], False
+        for line in self.lines:
+            if line.startswith("["):
+                keep = from_time <= line[1:20] <= to_time
+            if keep:
+                expected.append(line)
+        return expected
+
+    def test_trim(self):
+        gather, lines = self.extract()
+        self.assertEqual(lines, self.expected("2024-01-01 10:10:00", "2024-01-01 10:20:00"))
+        self.assertIn("    at frame 600\n", lines)
+        self.assertEqual(gather.full_bytes, os.path.getsize(self.source))
+        self.assertEqual(gather.shipped_bytes, os.path.getsize(self.target))
+        self.assertLess(gather.shipped_bytes * 5, gather.full_bytes)
+
+    def test_edges(self):
+        # the whole file, and a range before the first line
+        gather, lines = self.extract("2024-01-01 09:00:00", "2024-01-01 12:00:00")
+        self.assertEqual(lines, self.lines)
+        gather, lines = self.extract("2024-01-01 08:00:00", "2024-01-01 09:00:00")
+        self.assertEqual(lines, [])
+        self.assertEqual(gather.shipped_bytes, 0)
+        self.assertEqual(gather.full_bytes, os.path.getsize(self.source))
+
+    def test_grep(self):
+        gather, lines = self.extract(grep=["line 7", "x"])
+        self.assertEqual(lines, [line for line in self.expected("2024-01-01 10:10:00", "2024-01-01 10:20:00") if "line 7" in line])
+        self.assertEqual(gather.shipped_bytes, os.path.getsize(self.target))
+
+    def test_stats_survive_stderr(self):
+        # grep complains on stderr, the stats line still comes back
+        gather, lines = self.extract(grep=["["])
+        self.assertEqual(lines, [])
+        self.assertEqual(gather.full_bytes, os.path.getsize(self.source))
+        gather._update_shipped()
+        self.assertTrue(gather.gather_tuple["shipped"].endswith("(0.0%)"))
+
+    def test_file_without_timestamps(self):
+        with open(self.source, "w") as f:
+            f.write("no timestamp here\nnor here\n")
+        gather, lines = self.extract()
+        self.assertEqual(lines, ["no timestamp here\n", "nor here\n"])
+        self.assertEqual(gather.shipped_bytes, gather.full_bytes)
+
+
+if __name__ == '__main__':
+    unittest.main()
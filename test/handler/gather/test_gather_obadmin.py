@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_gather_obadmin.py
+@desc:
+"""
+import gzip
+import os
+import shutil
+import stat
+import subprocess
+import tempfile
+import unittest
+
+from src.handler.gather.gather_obadmin import GatherObAdminHandler
+
+# stands in for ob_admin: prints its arguments and the file, and leaves an ob_admin.log in its working dir
+FAKE_OB_ADMIN = """#!/bin/sh
+echo "args: $1 $2"
+cat "$3"
+echo "log of $3" > ob_admin.log
+"""
+
+
+class TestObAdminDumpScript(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.home = os.path.join(self.tmp, "home")
+        self.log_dir = os.path.join(self.tmp, "clog")
+        self.out = os.path.join(self.tmp, "out")
+        for path in (os.path.join(self.home, "bin"), self.log_dir, self.out):
+            os.makedirs(path)
+        ob_admin = os.path.join(self.home, "bin", "ob_admin")
+        with open(ob_admin, "w") as f:
+            f.write(FAKE_OB_ADMIN)
+        os.chmod(ob_admin, os.stat(ob_admin).st_mode | stat.S_IEXEC)
+        self.files = [str(i) for i in range(1, 6)]
+        for name in self.files:
+            with open(os.path.join(self.log_dir, name), "w") as f:
+                f.write("content of {0}\n".format(name))
+        self.script = os.path.join(self.tmp, GatherObAdminHandler.DUMP_SCRIPT_NAME)
+        with open(self.script, "w") as f:
+            f.write(GatherObAdminHandler.DUMP_SCRIPT)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def _run(self, mode, parallel):
+        subprocess.run(["sh", self.script, str(parallel), self.home, self.log_dir, mode, self.out] + self.files, check=True, timeout=60)
+
+    def _read(self, name):
+        with gzip.open(os.path.join(self.out, name), "rt") as f:
+            return f.read()
+
+    def test_clog_dump(self):
+        self._run("clog", 3)
+        # one gzipped dump and one gzipped ob_admin.log per file, the work dirs are removed
+        expected = sorted(["{0}.dump.gz".format(name) for name in self.files] + ["{0}.ob_admin.log.gz".format(name) for name in self.files])
+        self.assertEqual(sorted(os.listdir(self.out)), expected)
+        self.assertEqual(self._read("2.dump.gz"), "args: clog_tool dump_all\ncontent of 2\n")
+        self.assertEqual(self._read("2.ob_admin.log.gz"), "log of {0}\n".format(os.path.join(self.log_dir, "2")))
+
+    def test_slog_dump(self):
+        self._run("slog", 1)
+        self.assertEqual(self._read("5.dump.gz"), "args: slog_tool -f\ncontent of 5\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
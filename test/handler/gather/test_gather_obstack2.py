@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_gather_obstack2.py
+@desc:
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from optparse import Values
+from unittest.mock import MagicMock, patch
+
+from src.common.context import HandlerContext
+from src.common.node_runner import node_key
+from src.handler.gather.gather_core import GatherCoreHandler
+from src.handler.gather.gather_obstack2 import GatherObstack2Handler
+
+NODES = [{"ip": "10.0.0.1", "home_path": "/home/admin/ob1"}, {"ip": "10.0.0.1", "home_path": "/home/admin/ob2"}]
+
+
+class FakeSshClient(object):
+    def __init__(self, context, node):
+        self.node = node
+        self.cmds = []
+
+    def get_name(self):
+        return self.node["ip"]
+
+    def exec_cmd(self, cmd, timeout=None):
+        self.cmds.append(cmd)
+        if cmd.startswith("test -e"):
+            return "exists"
+        if cmd.startswith("ps "):
+            return "admin\n"
+        if cmd == "whoami":
+            return "admin"
+        return ""
+
+
+def fake_download_file(ssh_client, remote_path, local_path, stdio=None):
+    with open(local_path, "w") as f:
+        f.write("{0}:{1}".format(ssh_client.node["home_path"], remote_path))
+
+
+class TestGatherObstack2Nodes(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.context = HandlerContext(options=Values(), stdio=MagicMock(), cluster_config={"servers": NODES})
+        self.handler = GatherObstack2Handler(self.context)
+        self.handler.file_size_limit = 1024 * 1024
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    @patch("src.handler.gather.gather_obstack2.delete_file_force")
+    @patch("src.handler.gather.gather_obstack2.download_file", side_effect=fake_download_file)
+    @patch("src.handler.gather.gather_obstack2.get_file_size", return_value="100")
+    @patch("src.handler.gather.gather_obstack2.is_empty_file", return_value=False)
+    @patch("src.handler.gather.gather_obstack2.is_empty_dir", return_value=False)
+    @patch("src.handler.gather.gather_obstack2.get_observer_pid", side_effect=lambda ssh_client, home_path, stdio=None: [home_path[-1]])
+    @patch("src.handler.gather.gather_obstack2.mkdir")
+    @patch("src.handler.gather.gather_obstack2.is_support_arch", return_value=True)
+    @patch("src.handler.gather.gather_obstack2.SshClient", FakeSshClient)
+    @patch("src.handler.gather.gather_obstack2.StringUtils.compare_versions_greater", return_value=True)
+    @patch("src.handler.gather.gather_obstack2.get_observer_version", return_value="4.2.1.0")
+    def test_two_observers_of_one_host(self, *mocks):
+        gather_tuples = self.handler._GatherObstack2Handler__handle_nodes(self.tmp, NODES)
+        self.assertEqual([tup[0] for tup in gather_tuples], ["10.0.0.1_home_admin_ob1", "10.0.0.1_home_admin_ob2"])
+        self.assertEqual([tup[2] for tup in gather_tuples], ["", ""])
+        pack_paths = [tup[5] for tup in gather_tuples]
+        self.assertEqual(len(set(pack_paths)), 2)
+        for home_path, pack_path in zip(("/home/admin/ob1", "/home/admin/ob2"), pack_paths):
+            self.assertIn(os.path.basename(home_path), os.path.basename(pack_path))
+            with open(pack_path) as f:
+                self.assertTrue(f.read().startswith(home_path + ":"))
+
+
+class TestGatherCoreNodes(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.context = HandlerContext(options=Values(), stdio=MagicMock(), cluster_config={"servers": NODES})
+        self.handler = GatherCoreHandler(self.context)
+        self.handler.from_time = self.handler.to_time = ""
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    @patch("src.handler.gather.gather_core.download_file", side_effect=fake_download_file)
+    def test_two_observers_of_one_host(self, download):
+        def discover(node):
+            # both observers dump their cores into the same directory
+            return {"ip": node["ip"], "key": node_key(node), "ssh_client": FakeSshClient(self.context, node), "core_files_info": [{"path": "/data/core/core.123", "size": 10, "mtime": ""}]}
+
+        with patch.object(GatherCoreHandler, "_GatherCoreHandler__discover_node", side_effect=discover), patch.object(GatherCoreHandler, "_GatherCoreHandler__show_core_files_and_confirm", return_value=True):
+            gather_tuples = self.handler._GatherCoreHandler__handle_nodes(self.tmp, NODES)
+        self.assertEqual([tup[0] for tup in gather_tuples], ["10.0.0.1_home_admin_ob1", "10.0.0.1_home_admin_ob2"])
+        self.assertEqual([tup[2] for tup in gather_tuples], ["", ""])
+        self.assertEqual(sorted(os.listdir(self.tmp)), ["10.0.0.1_home_admin_ob1_core.123", "10.0.0.1_home_admin_ob2_core.123"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_gather_perf.py
+@desc:
+"""
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+import time
+import unittest
+from optparse import Values
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from src.common.constant import const
+from src.common.context import HandlerContext
+from src.handler.gather.gather_perf import GatherPerfHandler
+
+NODES = [{"ip": "10.0.0.1", "home_path": "/home/admin/ob1"}, {"ip": "10.0.0.1", "home_path": "/home/admin/ob2"}, {"ip": "10.0.0.2", "home_path": "/home/admin/ob3"}]
+
+
+class FakeSshClient(object):
+    records = []
+    lock = threading.Lock()
+
+    def __init__(self, context, node):
+        self.node = node
+
+    def get_name(self):
+        return self.node["ip"]
+
+    def exec_cmd(self, cmd, timeout=None):
+        if "perf record" in cmd:
+            with FakeSshClient.lock:
+                FakeSshClient.records.append((self.node["home_path"], time.time(), cmd))
+        if cmd == "command -v perf":
+            return "/usr/bin/perf"
+        return ""
+
+
+def fake_download_file(ssh_client, remote_path, local_path, stdio=None):
+    folded = "observer;main;{0} 10\n".format(os.path.basename(ssh_client.node["home_path"])).encode()
+    with tarfile.open(local_path, "w:gz") as tar:
+        member = tarfile.TarInfo(name=os.path.basename(remote_path)[: -len(".tar.gz")] + "/flame.folded")
+        member.size = len(folded)
+        tar.addfile(member, io.BytesIO(folded))
+
+
+def patch_const(**overrides):
+    # const refuses to be changed, hand gather_perf a copy instead
+    return patch("src.handler.gather.gather_perf.const", SimpleNamespace(**dict(vars(const), **overrides)))
+
+
+class TestGatherPerfConcurrent(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        FakeSshClient.records = []
+        self.context = HandlerContext(options=Values(), stdio=MagicMock(), cluster_config={"servers": NODES})
+        self.handler = GatherPerfHandler(self.context)
+        self.handler.nodes = NODES
+        self.handler.file_size_limit = 1024 * 1024
+        self.handler.count_option = 5000000
+        self.pids = {"/home/admin/ob1": ["101"], "/home/admin/ob2": ["102"], "/home/admin/ob3": ["103"]}
+        self.prepare_delay = {}
+        patches = [
+            patch("src.handler.gather.gather_perf.SshClient", FakeSshClient),
+            patch("src.handler.gather.gather_perf.mkdir"),
+            patch("src.handler.gather.gather_perf.get_observer_pid", side_effect=self.get_observer_pid),
+            patch("src.handler.gather.gather_perf.get_file_size", return_value="100"),
+            patch("src.handler.gather.gather_perf.is_empty_file", return_value=False),
+            patch("src.handler.gather.gather_perf.download_file", side_effect=fake_download_file),
+            patch("src.handler.gather.gather_perf.delete_file_force"),
+            patch_const(PERF_SYNC_START_DELAY=0.05, PERF_SYNC_PREPARE_TIMEOUT=5),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def get_observer_pid(self, ssh_client, home_path, stdio=None):
+        time.sleep(self.prepare_delay.get(home_path, 0))
+        return self.pids[home_path]
+
+    def handle_concurrent(self):
+        gather_tuples = []
+        self.assertTrue(self.handler._GatherPerfHandler__handle_concurrent(self.tmp, gather_tuples))
+        return gather_tuples
+
+    def test_capture(self):
+        self.pids["/home/admin/ob3"] = []
+        gather_tuples = self.handle_concurrent()
+        self.assertEqual([tup[0] for tup in gather_tuples], ["10.0.0.1_home_admin_ob1", "10.0.0.1_home_admin_ob2", "10.0.0.2_home_admin_ob3"])
+        self.assertEqual([tup[2] for tup in gather_tuples], ["", "", "can't find observer"])
+        # the two observers of one host get their own remote dir, pack and flame profile
+        self.assertNotEqual(gather_tuples[0][5], gather_tuples[1][5])
+        self.assertTrue(all(os.path.isfile(tup[5]) for tup in gather_tuples[:2]))
+        self.assertEqual(sorted(self.handler.flame_profiles), ["10.0.0.1_home_admin_ob1", "10.0.0.1_home_admin_ob2"])
+        self.assertEqual(dict(self.handler.flame_profiles["10.0.0.1_home_admin_ob2"]), {"observer;main;ob2": 10})
+        records = sorted(FakeSshClient.records)
+        self.assertEqual([record[0] for record in records], ["/home/admin/ob1", "/home/admin/ob2"])
+        for home_path, _, cmd in records:
+            self.assertIn("-e cycles -c 5000000 -p {0} -g".format(self.pids[home_path][0]), cmd)
+            self.assertIn("perf_10.0.0.1_home_admin_{0}_".format(os.path.basename(home_path)), cmd)
+
+    def test_flame_scope_samples_at_99hz(self):
+        self.handler.scope = "flame"
+        self.handle_concurrent()
+        self.assertEqual(len(FakeSshClient.records), 3)
+        for _, _, cmd in FakeSshClient.records:
+            self.assertIn("-F 99 -p", cmd)
+            self.assertNotIn("-c 5000000", cmd)
+
+    def test_barrier(self):
+        # the nodes wait for the slowest one to be prepared, then start together
+        self.prepare_delay["/home/admin/ob3"] = 0.5
+        st = time.time()
+        self.handle_concurrent()
+        start_times = [record[1] for record in FakeSshClient.records]
+        self.assertEqual(len(start_times), 3)
+        self.assertGreaterEqual(min(start_times) - st, 0.5)
+        self.assertLess(max(start_times) - min(start_times), 0.2)
+
+    def test_barrier_timeout(self):
+        # a node not prepared in time does not hold the others back
+        self.prepare_delay["/home/admin/ob3"] = 1.5
+        with patch_const(PERF_SYNC_START_DELAY=0.05, PERF_SYNC_PREPARE_TIMEOUT=0.3):
+            st = time.time()
+            gather_tuples = self.handle_concurrent()
+        self.assertEqual([tup[2] for tup in gather_tuples], ["", "", ""])
+        start_times = {home_path: start - st for home_path, start, _ in FakeSshClient.records}
+        self.assertLess(start_times["/home/admin/ob1"], 1.0)
+        self.assertLess(start_times["/home/admin/ob2"], 1.0)
+        self.assertGreaterEqual(start_times["/home/admin/ob3"], 1.5)
+
+    def test_sequential_keys(self):
+        self.handler.scope = "flame"
+        with patch.object(GatherPerfHandler, "is_ready"):
+            for node in NODES[:2]:
+                resp = self.handler._GatherPerfHandler__handle_from_node(node, self.tmp)
+                self.assertEqual(resp["error"], "")
+        self.assertEqual(sorted(self.handler.flame_profiles), ["10.0.0.1_home_admin_ob1", "10.0.0.1_home_admin_ob2"])
+        self.assertEqual(len([name for name in os.listdir(self.tmp) if name.endswith(".flame.svg")]), 2)
+
+
+class TestGatherPerfDiffNode(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.context = HandlerContext(options=Values(), stdio=MagicMock(), cluster_config={"servers": NODES})
+        self.handler = GatherPerfHandler(self.context)
+        self.handler.flame_profiles = {
+            "10.0.0.1_home_admin_ob1": {"a;b": 1},
+            "10.0.0.1_home_admin_ob2": {"a;c": 1},
+            "10.0.0.10_home_admin_ob3": {"a;d": 1},
+            "10.0.0.1_home_admin_obproxy(obproxy)": {"p;q": 1},
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def diff(self, diff_node):
+        self.handler.diff_node = diff_node
+        self.handler._GatherPerfHandler__report_flame_profiles(self.tmp)
+        return sorted(name for name in os.listdir(self.tmp) if name.startswith("flame_diff_"))
+
+    def test_node_name(self):
+        self.assertEqual(self.diff("10.0.0.1_home_admin_ob2"), ["flame_diff_10.0.0.1_home_admin_ob2.svg"])
+
+    def test_ip_alone_on_its_host(self):
+        self.assertEqual(self.diff("10.0.0.10"), ["flame_diff_10.0.0.10_home_admin_ob3.svg"])
+        self.assertEqual(self.diff("10.0.0.1(obproxy)"), ["flame_diff_10.0.0.10_home_admin_ob3.svg", "flame_diff_10.0.0.1_home_admin_obproxy_obproxy.svg"])
+
+    def test_ip_of_two_nodes(self):
+        self.assertEqual(self.diff("10.0.0.1"), [])
+        self.assertIn("more than one node", self.context.stdio.warn.call_args[0][0])
+        self.assertEqual(self.diff("10.0.0.3"), [])
+        self.assertIn("no flame profile", self.context.stdio.warn.call_args[0][0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_gather_sysstat.py
+@desc:
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from optparse import Values
+from unittest.mock import MagicMock, patch
+
+from src.common.context import HandlerContext
+from src.handler.gather.gather_sysstat import GatherOsInfoHandler
+
+SAMPLE_SECONDS = 0.3
+
+
+class FakeSshClient(object):
+    """a node without tsar, its sampler takes SAMPLE_SECONDS and fails where the node says so"""
+
+    sampler_starts = {}
+    lock = threading.Lock()
+
+    def __init__(self, context, node):
+        self.node = node
+
+    def get_name(self):
+        return self.node["ip"]
+
+    def get_ip(self):
+        return self.node["ip"]
+
+    def exec_cmd(self, cmd, timeout=None):
+        if cmd.startswith("command -v python3"):
+            return "/usr/bin/python3"
+        if "--interval" in cmd:
+            with FakeSshClient.lock:
+                FakeSshClient.sampler_starts[self.node["ip"]] = time.time()
+            time.sleep(SAMPLE_SECONDS)
+            if self.node.get("sampler_fails"):
+                raise Exception("sampler exited 1")
+        return ""
+
+
+def fake_download(ssh_client, remote_path, local_path, stdio=None):
+    with open(local_path, "wb") as f:
+        f.write(b"not a tar")
+    return local_path
+
+
+class TestGatherSysstat(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        FakeSshClient.sampler_starts = {}
+        patches = [
+            patch("src.handler.gather.gather_sysstat.SshClient", FakeSshClient),
+            patch("src.handler.gather.gather_sysstat.mkdir"),
+            patch("src.handler.gather.gather_sysstat.upload_file"),
+            patch("src.handler.gather.gather_sysstat.get_observer_pid", return_value=[123]),
+            patch("src.handler.gather.gather_sysstat.get_file_size", return_value="9"),
+            patch("src.handler.gather.gather_sysstat.download_file", side_effect=fake_download),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def handle(self, nodes):
+        context = HandlerContext(options=Values({"store_dir": self.tmp, "sample_duration": 1}), stdio=MagicMock(), cluster_config={"servers": nodes})
+        handler = GatherOsInfoHandler(context)
+        result = handler.handle()
+        return handler, result
+
+    def test_samplers_run_at_once(self):
+        nodes = [{"ip": "10.0.0.{0}".format(i), "home_path": "/home/admin/oceanbase"} for i in range(1, 5)]
+        st = time.time()
+        handler, result = self.handle(nodes)
+        self.assertLess(time.time() - st, SAMPLE_SECONDS * 3)
+        starts = FakeSshClient.sampler_starts
+        self.assertEqual(sorted(starts), [node["ip"] for node in nodes])
+        self.assertLess(max(starts.values()) - min(starts.values()), SAMPLE_SECONDS / 2)
+        self.assertEqual([tup[2] for tup in handler.gather_tuples], [""] * 4)
+
+    def test_failed_sampler_keeps_the_pack(self):
+        nodes = [{"ip": "10.0.0.1"}, {"ip": "10.0.0.2", "sampler_fails": True}]
+        with patch.object(GatherOsInfoHandler, "_GatherOsInfoHandler__decode_proc_samples") as decode:
+            handler, result = self.handle(nodes)
+        # the pack of the node is still downloaded, only its samples are not decoded
+        self.assertEqual([tup[2] for tup in handler.gather_tuples], ["", ""])
+        self.assertEqual([c.args[1] for c in decode.call_args_list], [os.path.basename(handler.gather_tuples[0][5])[: -len(".tar.gz")]])
+        handler.stdio.error.assert_any_call("Failed to sample /proc on server 10.0.0.2: sampler exited 1")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_rca_evidence.py
+@desc:
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from optparse import Values
+from unittest.mock import MagicMock, patch
+
+from src.common.context import HandlerContext
+from src.handler.rca.plugins.evidence import EvidenceCache, MemoizedOBConnector, SweepGatherLog
+
+LOG_LINES = ["[2024-01-01 10:00:00] ERROR lock conflict ret=-6003\n", "[2024-01-01 10:00:01] INFO  nothing\n", "[2024-01-01 10:00:02] WARN  lock wait ret=-6004\n"]
+
+
+class FakeGatherLog(object):
+    """stands in for the real Gather_log of the loader, counts the gathers and writes one log per node"""
+
+    gathers = []
+
+    def __init__(self, context):
+        self.conf_map = {}
+
+    def execute(self, save_path=""):
+        FakeGatherLog.gathers.append(dict(self.conf_map))
+        node_dir = os.path.join(save_path, "ob_log_10.0.0.1_2882")
+        os.makedirs(node_dir, exist_ok=True)
+        log_file = os.path.join(node_dir, "observer.log")
+        with open(log_file, "w") as f:
+            f.writelines(LOG_LINES)
+        return [node_dir, log_file]
+
+
+class FakeConnector(object):
+    def __init__(self):
+        self.queries = []
+
+    def execute_sql(self, sql, params=None):
+        self.queries.append(sql)
+        return [(len(self.queries),)]
+
+    def execute_sql_return_cursor_dictionary(self, sql, params=None):
+        self.queries.append(sql)
+        cursor = MagicMock()
+        cursor.description = (("tenant_id",),)
+        cursor.fetchall.return_value = [{"tenant_id": 1001}]
+        return cursor
+
+    def get_server_version(self):
+        return "4.2.1.0"
+
+
+class TestEvidenceCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.context = HandlerContext(options=Values(), stdio=MagicMock(), cluster_config={"servers": [{"ip": "10.0.0.1"}]})
+        self.context.set_variable("store_dir", self.tmp)
+        self.evidence = EvidenceCache(self.context, self.tmp)
+        FakeGatherLog.gathers = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_get_logs_once_per_key(self):
+        calls = []
+
+        def loader(gather_dir):
+            calls.append(gather_dir)
+            time.sleep(0.2)
+            return [gather_dir]
+
+        threads = [threading.Thread(target=self.evidence.get_logs, args=("window_a", loader)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.evidence.get_logs("window_a", loader), (calls[0], calls))
+        self.evidence.get_logs("window_b", loader)
+        self.assertEqual(len(calls), 2)
+        self.assertNotEqual(calls[0], calls[1])
+        self.assertEqual(self.evidence.stats["log_gather"], 2)
+        self.assertEqual(self.evidence.stats["log_hit"], 4)
+
+    @patch("src.handler.rca.plugins.evidence.Gather_log", FakeGatherLog)
+    def test_sweep_gather_log(self):
+        results = {}
+        for name, greps in (("lock", ["lock"]), ("6004", ["lock", "-6004"]), ("all", [])):
+            gather_log = SweepGatherLog(self.context, self.evidence)
+            gather_log.set_parameters("scope", "observer")
+            for key in greps:
+                gather_log.grep(key)
+            files = gather_log.execute(save_path=os.path.join(self.tmp, name))
+            self.assertEqual(gather_log.greps_key, [])
+            log_file = [file for file in files if os.path.isfile(file)][0]
+            self.assertTrue(log_file.startswith(os.path.join(self.tmp, name)))
+            with open(log_file) as f:
+                results[name] = f.readlines()
+        # one gather without grep for the three requests of the same window, grep applied locally
+        self.assertEqual(len(FakeGatherLog.gathers), 1)
+        self.assertEqual(FakeGatherLog.gathers[0]["gather_scope"], "observer")
+        self.assertEqual(self.evidence.stats, {"log_gather": 1, "log_hit": 2, "sql_query": 0, "sql_hit": 0})
+        self.assertEqual(results["lock"], [LOG_LINES[0], LOG_LINES[2]])
+        self.assertEqual(results["6004"], [LOG_LINES[2]])
+        self.assertEqual(results["all"], LOG_LINES)
+
+        # another time window is gathered again
+        gather_log = SweepGatherLog(self.context, self.evidence)
+        gather_log.set_parameters("since", "1h")
+        gather_log.execute(save_path=os.path.join(self.tmp, "since"))
+        self.assertEqual(len(FakeGatherLog.gathers), 2)
+
+
+class TestMemoizedOBConnector(unittest.TestCase):
+    def setUp(self):
+        self.context = HandlerContext(options=Values(), stdio=MagicMock())
+        self.evidence = EvidenceCache(self.context, tempfile.gettempdir())
+        self.connector = FakeConnector()
+        with patch("src.handler.rca.plugins.evidence.get_ob_connector_pool", return_value=self.connector):
+            self.memoized = MemoizedOBConnector(self.context, {}, self.evidence, ob_connector=MagicMock())
+
+    def test_read_only_memoized(self):
+        first = self.memoized.execute_sql("select count(*) from oceanbase.DBA_OB_TENANTS")
+        self.assertEqual(self.memoized.execute_sql("select count(*) from oceanbase.DBA_OB_TENANTS"), first)
+        self.memoized.execute_sql("select count(*) from oceanbase.DBA_OB_TENANTS where tenant_id=%s", (1001,))
+        self.memoized.execute_sql("show parameters like 'cpu_count'")
+        self.memoized.execute_sql("show parameters like 'cpu_count'")
+        self.assertEqual(len(self.connector.queries), 3)
+        self.assertEqual(self.evidence.stats["sql_query"], 3)
+        self.assertEqual(self.evidence.stats["sql_hit"], 2)
+
+    def test_write_not_memoized(self):
+        self.memoized.execute_sql("alter system flush plan cache")
+        self.memoized.execute_sql("alter system flush plan cache")
+        self.assertEqual(len(self.connector.queries), 2)
+        self.assertEqual(self.evidence.stats["sql_query"], 0)
+
+    def test_dict_cursor_copies(self):
+        cursor = self.memoized.execute_sql_return_cursor_dictionary("select tenant_id from oceanbase.DBA_OB_TENANTS")
+        self.assertEqual(cursor.description, (("tenant_id",),))
+        row = cursor.fetchone()
+        row["tenant_id"] = 1
+        self.assertIsNone(cursor.fetchone())
+        # a scene changing its rows does not change the rows of the next one
+        cursor = self.memoized.execute_sql_return_cursor_dictionary("select tenant_id from oceanbase.DBA_OB_TENANTS")
+        self.assertEqual(cursor.fetchall(), [{"tenant_id": 1001}])
+        self.assertEqual(len(self.connector.queries), 1)
+
+    def test_other_methods_passed_through(self):
+        self.assertEqual(self.memoized.get_server_version(), "4.2.1.0")
+
+
+if __name__ == '__main__':
+    unittest.main()
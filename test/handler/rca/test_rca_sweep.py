@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_rca_sweep.py
+@desc:
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from optparse import Values
+from unittest.mock import MagicMock, patch
+
+from src.common.context import HandlerContext
+from src.common.result_type import ObdiagResult
+from src.handler.rca.plugins.evidence import MemoizedOBConnector, SweepGatherLog
+from src.handler.rca.rca_exception import RCANotNeedExecuteException
+from src.handler.rca.rca_sweep import RCASweepHandler
+
+
+class FakeScene(object):
+    running = 0
+    max_running = 0
+    lock = threading.Lock()
+
+    def __init__(self, init_result=None, init_error=None, execute_error=None):
+        self.init_result = init_result
+        self.init_error = init_error
+        self.execute_error = execute_error
+        self.Result = MagicMock()
+        self.Result.records_data.return_value = [{"ok": True}]
+        self.exported = False
+
+    def init(self, context):
+        self.store_dir = context.get_variable("store_dir")
+        self.gather_log = context.get_variable("gather_log")
+        self.ob_connector = context.get_variable("ob_connector")
+        if self.init_error is not None:
+            raise self.init_error
+        return self.init_result
+
+    def execute(self):
+        with FakeScene.lock:
+            FakeScene.running += 1
+            FakeScene.max_running = max(FakeScene.max_running, FakeScene.running)
+        time.sleep(0.1)
+        with FakeScene.lock:
+            FakeScene.running -= 1
+        if self.execute_error is not None:
+            raise self.execute_error
+
+    def export_result(self):
+        self.exported = True
+
+
+class TestRCASweepHandler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        FakeScene.running = 0
+        FakeScene.max_running = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def build_handler(self, scenes, scenes_option, parallel=None):
+        options = Values({"scenes": scenes_option, "parallel": parallel})
+        context = HandlerContext(options=options, stdio=MagicMock(), cluster_config={"servers": []})
+        context.set_variable("ob_connector", MagicMock())
+        context.set_variable("store_dir", self.tmp)
+        # skip RCAHandler.__init__, it connects the cluster
+        handler = RCASweepHandler.__new__(RCASweepHandler)
+        handler.context = context
+        handler.stdio = context.stdio
+        handler.options = options
+        handler.ob_cluster = {}
+        handler.store_dir = self.tmp
+        handler.parallel = parallel or RCASweepHandler.DEFAULT_PARALLEL
+        handler.all_scenes_info = {name: {} for name in scenes}
+        handler.rca_list = MagicMock()
+        handler.rca_list.get_scene.side_effect = lambda name: scenes[name]
+        return handler
+
+    @patch("src.handler.rca.plugins.evidence.get_ob_connector_pool", return_value=MagicMock())
+    def test_sweep(self, get_pool):
+        scenes = {
+            "a_ok": FakeScene(),
+            "b_ok": FakeScene(),
+            "c_ok": FakeScene(),
+            "d_not_need": FakeScene(execute_error=RCANotNeedExecuteException("no lock")),
+            "e_execute_err": FakeScene(execute_error=Exception("boom")),
+            "f_init_false": FakeScene(init_result=False),
+            "g_init_err": FakeScene(init_error=Exception("no tenant")),
+            "h_import_failed": None,
+        }
+        handler = self.build_handler(scenes, "all", parallel=2)
+        result = handler.handle()
+        self.assertEqual(result.code, ObdiagResult.SUCCESS_CODE)
+        status = {name: value["status"] for name, value in result.data["scenes"].items()}
+        self.assertEqual(
+            status,
+            {"a_ok": "succeed", "b_ok": "succeed", "c_ok": "succeed", "d_not_need": "skipped", "e_execute_err": "failed", "f_init_false": "skipped", "g_init_err": "failed", "h_import_failed": "failed"},
+        )
+        self.assertEqual(result.data["scenes"]["a_ok"]["record"], [{"ok": True}])
+        self.assertTrue(scenes["e_execute_err"].exported)
+        self.assertFalse(scenes["f_init_false"].exported)
+        self.assertLessEqual(FakeScene.max_running, 2)
+        self.assertGreater(FakeScene.max_running, 1)
+
+        # every scene has its own store dir and gather_log, all share one evidence cache and connector
+        sweep_dir = result.data["store_dir"]
+        self.assertTrue(os.path.basename(sweep_dir).startswith("obdiag_sweep_"))
+        self.assertEqual(handler.context.get_variable("store_dir"), sweep_dir)
+        for name in ("a_ok", "b_ok"):
+            self.assertEqual(scenes[name].store_dir, os.path.join(sweep_dir, name))
+            self.assertTrue(os.path.isdir(scenes[name].store_dir))
+            self.assertIsInstance(scenes[name].gather_log, SweepGatherLog)
+            self.assertIsInstance(scenes[name].ob_connector, MemoizedOBConnector)
+        self.assertIsNot(scenes["a_ok"].gather_log, scenes["b_ok"].gather_log)
+        self.assertIs(scenes["a_ok"].gather_log.evidence, scenes["b_ok"].gather_log.evidence)
+        self.assertIs(scenes["a_ok"].ob_connector, scenes["b_ok"].ob_connector)
+
+    def test_selected_scenes(self):
+        scenes = {"a_ok": FakeScene(), "b_ok": FakeScene()}
+        handler = self.build_handler(scenes, " b_ok,b_ok, ")
+        with patch("src.handler.rca.plugins.evidence.get_ob_connector_pool", return_value=MagicMock()):
+            result = handler.handle()
+        self.assertEqual(list(result.data["scenes"]), ["b_ok"])
+        self.assertFalse(hasattr(scenes["a_ok"], "store_dir"))
+
+    def test_bad_scenes(self):
+        handler = self.build_handler({"a_ok": FakeScene()}, None)
+        self.assertEqual(handler.handle().code, ObdiagResult.INPUT_ERROR_CODE)
+        handler = self.build_handler({"a_ok": FakeScene()}, "a_ok,missing")
+        result = handler.handle()
+        self.assertEqual(result.code, ObdiagResult.INPUT_ERROR_CODE)
+        self.assertIn("missing", result.error_data)
+        self.assertEqual(os.listdir(self.tmp), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
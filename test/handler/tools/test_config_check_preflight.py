@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_config_check_preflight.py
+@desc:
+"""
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from optparse import Values
+from unittest.mock import MagicMock, patch
+
+from src.common.cluster_meta_cache import ClusterMetaCache
+from src.common.context import HandlerContext
+from src.handler.tools.config_check_handler import VALIDATED_NODE_CACHE_KEY, ConfigCheckHandler
+
+
+def make_node(ip, **kwargs):
+    return dict({"ip": ip, "ssh_port": 22, "ssh_username": "admin", "ssh_password": "pwd", "home_path": "/home/admin/oceanbase"}, **kwargs)
+
+
+class FakeSshClient(object):
+    """an ssh test that passes, unless the host is told to fail or to hang"""
+
+    connected = []
+    failing = set()
+    hanging = {}
+    lock = threading.Lock()
+
+    def __init__(self, context, node):
+        self.node = node
+        with FakeSshClient.lock:
+            FakeSshClient.connected.append(node["ip"])
+        time.sleep(FakeSshClient.hanging.get(node["ip"], 0))
+        if node["ip"] in FakeSshClient.failing:
+            raise Exception("Authentication failed")
+
+    def exec_cmd(self, cmd, timeout=None):
+        if cmd.startswith("echo"):
+            return "obdiag_test"
+        return "yes"
+
+
+class TestConfigCheckPreflight(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache = ClusterMetaCache(os.path.join(self.tmp, "cache.json"), ttl=600)
+        self.unreachable = {}
+        FakeSshClient.connected = []
+        FakeSshClient.failing = set()
+        FakeSshClient.hanging = {}
+        patches = [
+            patch("src.handler.tools.config_check_handler.SshClient", FakeSshClient),
+            patch("src.handler.tools.config_check_handler.get_cluster_meta_cache", return_value=self.cache),
+            patch("src.handler.tools.config_check_handler.get_local_ip_list", return_value=[]),
+            patch("src.handler.tools.config_check_handler.socket.create_connection", side_effect=self.create_connection),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def create_connection(self, address, timeout=None):
+        behaviour = self.unreachable.get("{0}:{1}".format(*address))
+        if behaviour == "hang":
+            time.sleep(3)
+        elif behaviour:
+            raise socket.timeout("timed out")
+        return MagicMock()
+
+    def check(self, nodes, **options):
+        options = dict({"preflight": True}, **options)
+        context = HandlerContext(options=Values(options), stdio=MagicMock(), cluster_config={"servers": nodes})
+        handler = ConfigCheckHandler(context)
+        results = {"db_connection": None, "observer_nodes": [], "obproxy_nodes": [], "summary": {"success": 0, "failed": 0, "skipped": 0}}
+        handler._probe_endpoints(results)
+        results["observer_nodes"] = handler._check_nodes(nodes, {}, "observer", results)
+        return results
+
+    def test_unreachable_node_not_sshed(self):
+        self.unreachable["10.0.0.2:22"] = True
+        results = self.check([make_node("10.0.0.1"), make_node("10.0.0.2"), make_node("10.0.0.2", ssh_port=2022)])
+        self.assertEqual(results["preflight"]["unreachable"], ["10.0.0.2:22"])
+        self.assertEqual([node["status"] for node in results["observer_nodes"]], ["success", "failed", "success"])
+        self.assertIn("unreachable: timed out", results["observer_nodes"][1]["error"])
+        # the other ssh port of the host was reachable and checked
+        self.assertEqual(sorted(FakeSshClient.connected), ["10.0.0.1", "10.0.0.2"])
+        self.assertEqual(results["summary"], {"success": 2, "failed": 1, "skipped": 0})
+
+    def test_probe_deadline(self):
+        self.unreachable["10.0.0.2:22"] = "hang"
+        st = time.time()
+        results = self.check([make_node("10.0.0.1"), make_node("10.0.0.2")], probe_timeout=0.2)
+        # a connect hanging past its timeout does not hold the probe phase back
+        self.assertLess(time.time() - st, 2.5)
+        self.assertEqual(results["preflight"]["unreachable"], ["10.0.0.2:22"])
+        self.assertIn("not finished before the deadline", results["observer_nodes"][1]["error"])
+        self.assertEqual(FakeSshClient.connected, ["10.0.0.1"])
+
+    def test_cached_when_fingerprint_matches(self):
+        nodes = [make_node("10.0.0.1"), make_node("10.0.0.2")]
+        self.check(nodes)
+        self.assertEqual(sorted(FakeSshClient.connected), ["10.0.0.1", "10.0.0.2"])
+        FakeSshClient.connected = []
+        results = self.check(nodes)
+        self.assertEqual(FakeSshClient.connected, [])
+        self.assertEqual([node.get("cached") for node in results["observer_nodes"]], [True, True])
+        self.assertEqual(results["summary"]["success"], 2)
+        # a changed password (or path) means the node is checked again
+        results = self.check([make_node("10.0.0.1", ssh_password="new"), make_node("10.0.0.2", home_path="/data/ob")])
+        self.assertEqual(sorted(FakeSshClient.connected), ["10.0.0.1", "10.0.0.2"])
+        self.assertEqual([node.get("cached") for node in results["observer_nodes"]], [None, None])
+        # the cache now holds the new settings
+        FakeSshClient.connected = []
+        self.check([make_node("10.0.0.1", ssh_password="new"), make_node("10.0.0.2", home_path="/data/ob")])
+        self.assertEqual(FakeSshClient.connected, [])
+
+    def test_cache_not_used_without_preflight(self):
+        nodes = [make_node("10.0.0.1")]
+        self.check(nodes)
+        FakeSshClient.connected = []
+        self.check(nodes, preflight=False)
+        self.assertEqual(FakeSshClient.connected, ["10.0.0.1"])
+
+    def test_failure_drops_cache_entry(self):
+        nodes = [make_node("10.0.0.1"), make_node("10.0.0.2")]
+        self.check(nodes)
+        key = "ssh://admin@10.0.0.2:22"
+        self.assertIsNotNone(self.cache.get(VALIDATED_NODE_CACHE_KEY, key))
+        # the password changed and is wrong now: the node is checked, fails and its old entry goes
+        FakeSshClient.failing.add("10.0.0.2")
+        results = self.check([make_node("10.0.0.1"), make_node("10.0.0.2", ssh_password="wrong")])
+        self.assertEqual(results["observer_nodes"][1]["status"], "failed")
+        self.assertIsNone(self.cache.get(VALIDATED_NODE_CACHE_KEY, key))
+        self.assertIsNotNone(self.cache.get(VALIDATED_NODE_CACHE_KEY, "ssh://admin@10.0.0.1:22"))
+        # an unreachable host loses its entry too
+        self.unreachable["10.0.0.1:22"] = True
+        self.check(nodes)
+        self.assertIsNone(self.cache.get(VALIDATED_NODE_CACHE_KEY, "ssh://admin@10.0.0.1:22"))
+
+    def test_ssh_phase_deadline(self):
+        FakeSshClient.hanging["10.0.0.2"] = 1.5
+        with patch("src.handler.tools.config_check_handler.PREFLIGHT_SSH_TIMEOUT", 0.1):
+            st = time.time()
+            results = self.check([make_node("10.0.0.1"), make_node("10.0.0.2")])
+            self.assertLess(time.time() - st, 1.2)
+        self.assertEqual([node["status"] for node in results["observer_nodes"]], ["success", "failed"])
+        self.assertIn("not finished before the deadline", results["observer_nodes"][1]["error"])
+        summary = dict(results["summary"])
+        self.assertEqual(summary, {"success": 1, "failed": 1, "skipped": 0})
+        # the node left behind finishes later and does not change what was reported
+        time.sleep(1.6)
+        self.assertEqual(results["summary"], summary)
+        self.assertEqual(len(results["observer_nodes"]), 2)
+        self.assertIsNone(self.cache.get(VALIDATED_NODE_CACHE_KEY, "ssh://admin@10.0.0.2:22"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright (c) 2022 OceanBase
+# OceanBase Diagnostic Tool is licensed under Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#          http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+# EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+# MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+# See the Mulan PSL v2 for more details.
+
+"""
+@time: 2026/10/19
+@file: test_sql_syntax_batch.py
+@desc:
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from optparse import Values
+from unittest.mock import MagicMock
+
+from src.common.context import HandlerContext
+from src.handler.tools.sql_syntax_handler import SqlSyntaxHandler
+
+
+class TestLoadStatements(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.handler = SqlSyntaxHandler(HandlerContext(options=Values(), stdio=MagicMock()))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_backquoted_keyword_not_merged(self):
+        path = os.path.join(self.tmp, "a.sql")
+        with open(path, "w") as f:
+            f.write("select `order` from t where `key`=1;\nselect order from t where key=1;\nSELECT `order` FROM t WHERE `key` = 2;\n")
+        entries, total = self.handler._load_statements([path])
+        self.assertEqual(total, 3)
+        self.assertEqual([(entry["sql"], entry["count"]) for entry in entries], [("select `order` from t where `key`=1", 2), ("select order from t where key=1", 1)])
+        self.assertEqual(entries[0]["sources"], ["{0}:1".format(path), "{0}:3".format(path)])
+
+
+if __name__ == '__main__':
+    unittest.main()